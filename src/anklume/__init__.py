@@ -1,8 +1,19 @@
 """anklume — framework déclaratif de compartimentalisation d'infrastructure."""
 
-from importlib.metadata import PackageNotFoundError, version
+from __future__ import annotations
 
-try:
-    __version__ = version("anklume")
-except PackageNotFoundError:
-    __version__ = "0.0.0-dev"
+
+def __getattr__(name: str) -> str:
+    # Version résolue à la demande : importlib.metadata coûte ~30 ms au
+    # démarrage de chaque commande, pour une valeur rarement affichée.
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            value = version("anklume")
+        except PackageNotFoundError:
+            value = "0.0.0-dev"
+        globals()["__version__"] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,5 @@
+"""Point d'entrée `python -m anklume`."""
+
+from anklume.cli import app
+
+app()
@@ -4,12 +4,13 @@ from typing import Annotated
 
 import typer
 
-from anklume import __version__
+from anklume.cli._plugins import LazyGroup
 
 app = typer.Typer(
     name="anklume",
     help="Cloisonnez votre poste Linux — IA sécurisée + enseignement.",
     no_args_is_help=True,
+    cls=LazyGroup,
 )
 
 # Sous-commandes groupées
@@ -47,6 +48,8 @@ app.add_typer(workspace_app, name="workspace")
 
 def _version_callback(value: bool) -> None:
     if value:
+        from anklume import __version__
+
         typer.echo(f"anklume {__version__}")
         raise typer.Exit()
 
@@ -109,11 +112,15 @@ def rollback(
         bool,
         typer.Option("--dry-run", help="Afficher le plan sans appliquer"),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Restaurations simultanées"),
+    ] = 4,
 ) -> None:
     """Restaurer les snapshots pré-apply les plus récents (rollback global)."""
     from anklume.cli._snapshot import run_rollback
 
-    run_rollback(dry_run=dry_run)
+    run_rollback(dry_run=dry_run, jobs=jobs)
 
 
 @app.command()
@@ -122,11 +129,15 @@ def destroy(
         bool,
         typer.Option("--force", help="Détruire aussi les instances protégées"),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Instances supprimées simultanément"),
+    ] = 4,
 ) -> None:
     """Détruire l'infrastructure."""
     from anklume.cli._destroy import run_destroy
 
-    run_destroy(force=force)
+    run_destroy(force=force, jobs=jobs)
 
 
 # --- anklume apply <all|domaine> ---
@@ -142,11 +153,24 @@ def apply_all(
         bool,
         typer.Option("--no-provision", help="Ignorer le provisioning Ansible"),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Domaines et instances déployés en parallèle (1 = séquentiel)",
+        ),
+    ] = 1,
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="Réconcilier aussi les domaines inchangés"),
+    ] = False,
 ) -> None:
     """Déployer tous les domaines."""
     from anklume.cli._apply import run_apply
 
-    run_apply(dry_run=dry_run, no_provision=no_provision)
+    run_apply(dry_run=dry_run, no_provision=no_provision, jobs=jobs, full=full)
 
 
 @apply_app.command("domain")
@@ -160,11 +184,30 @@ def apply_domain(
         bool,
         typer.Option("--no-provision", help="Ignorer le provisioning Ansible"),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Domaines et instances déployés en parallèle (1 = séquentiel)",
+        ),
+    ] = 1,
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="Réconcilier aussi les domaines inchangés"),
+    ] = False,
 ) -> None:
     """Déployer un domaine spécifique."""
     from anklume.cli._apply import run_apply
 
-    run_apply(domain_name=name, dry_run=dry_run, no_provision=no_provision)
+    run_apply(
+        domain_name=name,
+        dry_run=dry_run,
+        no_provision=no_provision,
+        jobs=jobs,
+        full=full,
+    )
 
 
 # --- anklume dev <setup|lint|test> ---
@@ -500,11 +543,15 @@ def snapshot_list(
         str | None,
         typer.Argument(help="Nom de l'instance (toutes si omis)"),
     ] = None,
+    json_output: Annotated[
+        bool,
+        typer.Option("--json", help="Sortie JSON Lines (une ligne par instance)"),
+    ] = False,
 ) -> None:
     """Lister les snapshots."""
     from anklume.cli._snapshot import run_snapshot_list
 
-    run_snapshot_list(instance=instance)
+    run_snapshot_list(instance=instance, json_output=json_output)
 
 
 @snapshot_app.command("restore")
@@ -540,7 +587,24 @@ def snapshot_rollback(
     run_snapshot_rollback(instance=instance, snapshot=snapshot)
 
 
-# --- anklume network <rules|deploy|status> ---
+@snapshot_app.command("prune")
+def snapshot_prune(
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Afficher les suppressions sans les faire"),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Suppressions simultanées"),
+    ] = 4,
+) -> None:
+    """Élaguer les snapshots anklume-* selon la politique de rétention."""
+    from anklume.cli._snapshot import run_snapshot_prune
+
+    run_snapshot_prune(dry_run=dry_run, jobs=jobs)
+
+
+# --- anklume network <rules|analyze|deploy|status> ---
 
 
 @network_app.command("rules")
@@ -551,12 +615,25 @@ def network_rules() -> None:
     run_network_rules()
 
 
+@network_app.command("analyze")
+def network_analyze() -> None:
+    """Analyser les politiques : masquages, doublons, fusions."""
+    from anklume.cli._network import run_network_analyze
+
+    run_network_analyze()
+
+
 @network_app.command("deploy")
-def network_deploy() -> None:
+def network_deploy(
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="Recharger toute la table au lieu du delta"),
+    ] = False,
+) -> None:
     """Appliquer les règles nftables sur l'hôte."""
     from anklume.cli._network import run_network_deploy
 
-    run_network_deploy()
+    run_network_deploy(full=full)
 
 
 @network_app.command("status")
@@ -567,6 +644,23 @@ def network_status() -> None:
     run_network_status()
 
 
+@network_app.command("stats")
+def network_stats(
+    interval: Annotated[
+        float,
+        typer.Option("--interval", "-i", min=0.1, help="Secondes entre les deux lectures"),
+    ] = 1.0,
+    sort: Annotated[
+        str,
+        typer.Option("--sort", "-s", help="Tri : bps, pps, bytes, packets ou name"),
+    ] = "bps",
+) -> None:
+    """Afficher le trafic par politique (compteurs nftables nommés)."""
+    from anklume.cli._network import run_network_stats
+
+    run_network_stats(interval=interval, sort=sort)
+
+
 @network_app.command("passthrough")
 def network_passthrough(
     action: str = typer.Argument(help="enable ou disable"),
@@ -641,11 +735,20 @@ def llm_sanitize(
 
 
 @ai_app.command("status")
-def ai_status() -> None:
+def ai_status(
+    samples: Annotated[
+        int,
+        typer.Option("--samples", "-n", min=1, help="Échantillons GPU (moyenne d'utilisation)"),
+    ] = 1,
+    interval: Annotated[
+        float,
+        typer.Option("--interval", min=0.1, help="Secondes entre deux échantillons GPU"),
+    ] = 1.0,
+) -> None:
     """Afficher l'état des services IA."""
     from anklume.cli._ai import run_ai_status
 
-    run_ai_status()
+    run_ai_status(samples=samples, interval=interval)
 
 
 @ai_app.command("flush")
@@ -996,7 +1099,7 @@ def workspace_grid(
     run_workspace_grid(add_cols=add_cols, add_rows=add_rows, set_grid=set_grid)
 
 
-# --- anklume resource <show> ---
+# --- anklume resource <show|rebalance> ---
 
 
 @resource_app.command("show")
@@ -1012,6 +1115,31 @@ def resource_show(
     run_resource_show(project_dir=project)
 
 
+@resource_app.command("rebalance")
+def resource_rebalance(
+    project: Annotated[
+        str,
+        typer.Option("--project", "-p", help="Répertoire du projet anklume"),
+    ] = ".",
+    dry_run: Annotated[
+        bool,
+        typer.Option("--dry-run", help="Afficher les limites modifiées sans les appliquer"),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Instances mises à jour simultanément"),
+    ] = 4,
+    interval: Annotated[
+        int,
+        typer.Option("--interval", min=0, help="Recommencer toutes les N secondes (0 = une fois)"),
+    ] = 0,
+) -> None:
+    """Pousser l'allocation recalculée sur les instances existantes."""
+    from anklume.cli._resource import run_resource_rebalance
+
+    run_resource_rebalance(project_dir=project, dry_run=dry_run, jobs=jobs, interval=interval)
+
+
 # --- anklume tui ---
 
 
@@ -1045,30 +1173,22 @@ def _builtin_names() -> set[str]:
     return names
 
 
-def _discover_plugins() -> None:
-    """Charge les plugins CLI externes via entry_points (groupe 'anklume.commands')."""
+def _discover_plugins(*, refresh: bool = False) -> None:
+    """Enregistre les plugins CLI externes (groupe 'anklume.commands').
+
+    La liste vient du cache disque ; les plugins ne sont importés qu'à
+    l'exécution de leur sous-commande.
+    """
     import logging
-    from importlib.metadata import entry_points
 
-    log = logging.getLogger(__name__)
-    builtin = _builtin_names()
+    from anklume.cli._plugins import load_plugin_specs, register
 
     try:
-        plugins = entry_points(group="anklume.commands")
+        specs = load_plugin_specs(refresh=refresh)
     except Exception:
-        log.debug("entry_points indisponible", exc_info=True)
+        logging.getLogger(__name__).debug("entry_points indisponible", exc_info=True)
         return
-
-    for ep in plugins:
-        if ep.name in builtin:
-            log.warning("Plugin '%s' entre en conflit avec une commande intégrée", ep.name)
-            continue
-        try:
-            plugin_app = ep.load()
-            app.add_typer(plugin_app, name=ep.name)
-            log.debug("Plugin '%s' chargé", ep.name)
-        except Exception:
-            log.debug("Échec chargement plugin '%s'", ep.name, exc_info=True)
+    register(specs, _builtin_names())
 
 
 _discover_plugins()
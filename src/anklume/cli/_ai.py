@@ -2,23 +2,34 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import typer
 
 from anklume.cli._common import load_infra
 
+if TYPE_CHECKING:
+    from anklume.engine.gpu_telemetry import GpuSample
+
 
-def run_ai_status() -> None:
+def run_ai_status(*, samples: int = 1, interval: float = 1.0) -> None:
     """Affiche l'état des services IA."""
     from anklume.engine.ai import compute_ai_status, read_ai_access
+    from anklume.engine.gpu import detect_gpu
+    from anklume.engine.gpu_telemetry import GpuTelemetry
 
     infra = load_infra()
-    status = compute_ai_status(infra)
+    telemetry = GpuTelemetry(interval=interval)
+    if samples > 1 and detect_gpu().detected:
+        telemetry.collect(samples)
+    status = compute_ai_status(infra, telemetry=telemetry)
 
     # GPU
     typer.echo("GPU:")
     if status.gpu.detected:
         typer.echo(f"  Détecté : oui ({status.gpu.model})")
         typer.echo(f"  VRAM : {status.gpu.vram_used_mib} / {status.gpu.vram_total_mib} MiB")
+        _echo_telemetry(status.samples)
     else:
         typer.echo("  Détecté : non")
 
@@ -44,6 +55,22 @@ def run_ai_status() -> None:
             typer.echo(f"  État : injoignable ({svc.url})")
 
 
+def _echo_telemetry(samples: list[GpuSample]) -> None:
+    """Utilisation, puissance et processus GPU (dernier échantillon)."""
+    if not samples:
+        return
+    latest = samples[-1]
+    utilization = f"{latest.utilization_pct} %"
+    if len(samples) > 1:
+        mean = sum(s.utilization_pct for s in samples) / len(samples)
+        utilization += f" (moyenne {mean:.0f} % sur {len(samples)} échantillons)"
+    typer.echo(f"  Utilisation : {utilization}")
+    if latest.power_w is not None:
+        typer.echo(f"  Puissance : {latest.power_w:.0f} W")
+    for proc in latest.processes:
+        typer.echo(f"  Processus : {proc.name or '?'} ({proc.pid}) — {proc.vram_mib} MiB")
+
+
 def run_ai_flush() -> None:
     """Libère la VRAM GPU."""
     from anklume.engine.ai import flush_vram
@@ -63,6 +90,8 @@ def run_ai_flush() -> None:
         typer.echo("llama-server arrêté.")
 
     typer.echo(f"VRAM : {result.vram_before_mib} → {result.vram_after_mib} MiB")
+    for proc in result.processes_remaining:
+        typer.echo(f"VRAM encore utilisée : {proc.name or '?'} ({proc.pid}) — {proc.vram_mib} MiB")
 
 
 def run_ai_switch(domain: str) -> None:
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import dataclasses
+
 import typer
 
-from anklume.cli._common import load_infra, resolve_project_dir
-from anklume.engine.incus_driver import IncusDriver
-from anklume.engine.nesting import detect_nesting_context
+from anklume.cli._common import get_driver, load_infra, resolve_project_dir
+from anklume.engine.nesting import detect_nesting_context, prefix_name
 from anklume.engine.reconciler import ReconcileResult, reconcile
 from anklume.engine.snapshot import create_auto_snapshots
 
@@ -16,8 +17,14 @@ def run_apply(
     domain_name: str | None = None,
     dry_run: bool = False,
     no_provision: bool = False,
+    jobs: int = 1,
+    full: bool = False,
 ) -> None:
-    """Pipeline apply : parse → validate → reconcile → snapshot → provision."""
+    """Pipeline apply : parse → validate → reconcile → snapshot → provision.
+
+    Sauf avec ``full``, les domaines inchangés depuis le dernier apply
+    réussi (hash YAML résolu + empreinte Incus) sont sautés.
+    """
     project_dir = resolve_project_dir()
     infra = load_infra(project_dir)
 
@@ -43,19 +50,7 @@ def run_apply(
 
     gui_info = apply_gui_profiles(infra)
 
-    # Resource policy : allocation CPU/mémoire par poids
-    from anklume.engine.resources import (
-        apply_resource_config,
-        compute_resource_allocation,
-        detect_hardware,
-    )
-
-    if infra.config.resource_policy:
-        hw = detect_hardware()
-        allocations = compute_resource_allocation(infra, hw)
-        apply_resource_config(infra, allocations)
-
-    driver = IncusDriver()
+    driver = get_driver(infra)
     nesting_ctx = detect_nesting_context()
 
     # Vérifier que le profil default a un root disk (nécessaire sur Incus frais)
@@ -66,47 +61,107 @@ def run_apply(
         except Exception as e:
             typer.echo(f"Avertissement root disk : {e}", err=True)
 
-    # Pré-fetch des projets existants (un seul appel subprocess pour tout le pipeline)
-    existing_projects = {p.name for p in driver.project_list()}
+    # Lecture groupée de l'état Incus, partagée par les snapshots pré-apply et le plan
+    state = driver.state_snapshot()
 
-    # Snapshots pré-apply (instances existantes)
-    if not dry_run:
-        pre = create_auto_snapshots(
-            driver,
+    # Resource policy : allocation CPU/mémoire par poids (et consommation en adaptive)
+    policy = infra.config.resource_policy
+    if policy:
+        from anklume.engine.resources import (
+            apply_resource_config,
+            compute_resource_allocation,
+            detect_hardware,
+        )
+
+        usage = None
+        if policy.mode == "adaptive":
+            from anklume.engine.usage import refresh_usage
+
+            usage = refresh_usage(
+                project_dir,
+                infra,
+                driver,
+                state=state,
+                nesting_context=nesting_ctx,
+                persist=not dry_run,
+            )
+        hw = detect_hardware(driver)
+        allocations = compute_resource_allocation(infra, hw, usage)
+        apply_resource_config(infra, allocations)
+
+    # Apply incrémental : ne réconcilier que les domaines modifiés
+    from anklume.engine.incremental import (
+        load_apply_state,
+        record_apply,
+        save_apply_state,
+        unchanged_domains,
+    )
+
+    previous = load_apply_state(project_dir)
+    skipped = set() if full else unchanged_domains(infra, state, previous, nesting_ctx)
+    target = infra
+    if skipped:
+        names = ", ".join(sorted(skipped))
+        typer.echo(f"Domaines inchangés (ignorés, --full pour forcer) : {names}")
+        target = dataclasses.replace(
             infra,
-            "pre",
-            existing_projects=existing_projects,
+            domains={n: d for n, d in infra.domains.items() if n not in skipped},
         )
+
+    # Snapshots pré-apply (instances existantes)
+    if not dry_run:
+        pre = create_auto_snapshots(driver, target, "pre", state=state)
         if pre:
             typer.echo(f"Snapshots pré-apply : {len(pre)} créé(s)")
 
     reconcile_result = reconcile(
-        infra,
+        target,
         driver,
         dry_run=dry_run,
         nesting_context=nesting_ctx,
         gui_info=gui_info,
+        state=state,
+        jobs=jobs,
     )
 
-    # Snapshots post-apply — refetch des projets (reconcile a pu en créer)
-    if not dry_run and reconcile_result.executed:
-        post_projects = {p.name for p in driver.project_list()}
-        post = create_auto_snapshots(
-            driver,
-            infra,
-            "post",
-            existing_projects=post_projects,
+    # Snapshots post-apply — nouvelle lecture (reconcile a pu créer des instances)
+    if not dry_run:
+        post_state = driver.state_snapshot() if reconcile_result.executed else state
+        if reconcile_result.executed:
+            post = create_auto_snapshots(driver, target, "post", state=post_state)
+            if post:
+                typer.echo(f"Snapshots post-apply : {len(post)} créé(s)")
+
+        if infra.config.snapshots.auto_prune and infra.config.snapshots.retention.enabled:
+            from anklume.engine.retention import prune_snapshots
+
+            pruned = prune_snapshots(driver, target)
+            if pruned.deleted:
+                typer.echo(f"Snapshots élagués : {len(pruned.deleted)} supprimé(s)")
+            for (inst_name, _project, snap_name), error in pruned.errors:
+                typer.echo(f"Élagage {inst_name}/{snap_name} : {error}", err=True)
+
+        domain_of = {
+            prefix_name(d.name, nesting_ctx, infra.config.nesting): d.name
+            for d in target.enabled_domains
+        }
+        failed = {domain_of.get(a.project, a.project) for a, _ in reconcile_result.errors}
+        executed: dict[str, int] = {}
+        for action in reconcile_result.executed:
+            name = domain_of.get(action.project, action.project)
+            executed[name] = executed.get(name, 0) + 1
+        save_apply_state(
+            project_dir,
+            record_apply(previous, target, post_state, failed, executed, nesting_ctx),
         )
-        if post:
-            typer.echo(f"Snapshots post-apply : {len(post)} créé(s)")
 
     # Déploiement nftables (après les snapshots, avant le provisioning)
     if not dry_run:
         try:
             from anklume.cli._network import deploy_nftables
 
-            deploy_nftables(infra)
-            typer.echo("Règles nftables appliquées.")
+            delta = deploy_nftables(infra)
+            typer.echo(f"Règles nftables : {delta.summary()}.")
         except RuntimeError as e:
             typer.echo(f"nftables : {e}", err=True)
 
@@ -147,9 +202,14 @@ def _print_result(result: ReconcileResult, *, dry_run: bool) -> None:
         return
 
     for action in result.actions:
-        symbol = "+" if action.verb == "create" else "▶" if action.verb == "start" else "•"
+        symbol = {"create": "+", "start": "▶", "update": "~"}.get(action.verb, "•")
         typer.echo(f"{prefix}  {symbol} {action.detail}")
 
+    typer.echo(
+        f"{prefix}Chemin critique : {result.critical_path} étape(s)"
+        f" pour {len(result.actions)} action(s)."
+    )
+
     if not dry_run:
         ok = len(result.executed)
         fail = len(result.errors)
@@ -8,6 +8,7 @@ from pathlib import Path
 import typer
 
 from anklume.engine.addressing import assign_addresses
+from anklume.engine.incus_driver import IncusDriver, make_driver
 from anklume.engine.models import Infrastructure
 from anklume.engine.parser import ParseError, parse_project
 from anklume.engine.validator import validate
@@ -57,3 +58,13 @@ def load_infra(project_dir: Path | None = None) -> Infrastructure:
 
     assign_addresses(infra)
     return infra
+
+
+def get_driver(infra: Infrastructure | None = None) -> IncusDriver:
+    """Driver Incus du backend configuré (anklume.yml ou ANKLUME_INCUS_BACKEND)."""
+    backend = infra.config.incus_backend if infra is not None else None
+    try:
+        return make_driver(backend)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from None
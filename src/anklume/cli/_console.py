@@ -4,14 +4,13 @@ from __future__ import annotations
 
 import typer
 
-from anklume.cli._common import load_infra
+from anklume.cli._common import get_driver, load_infra
 from anklume.engine.console import (
     SESSION_NAME,
     build_console_config,
     kill_session,
     launch_console,
 )
-from anklume.engine.incus_driver import IncusDriver
 
 
 def run_console(
@@ -22,8 +21,8 @@ def run_console(
     status_color: str = "terminal",
 ) -> None:
     """Lance une console tmux colorée par domaine."""
-    driver = IncusDriver()
     infra = load_infra()
+    driver = get_driver(infra)
 
     config = build_console_config(infra, driver, domain=domain)
     config.status_color = status_color
@@ -4,19 +4,18 @@ from __future__ import annotations
 
 import typer
 
-from anklume.cli._common import load_infra
-from anklume.engine.destroy import DestroyResult, destroy
-from anklume.engine.incus_driver import IncusDriver
+from anklume.cli._common import get_driver, load_infra
+from anklume.engine.destroy import DESTROY_JOBS, DestroyResult, destroy
 from anklume.engine.nesting import detect_nesting_context
 
 
-def run_destroy(*, force: bool = False) -> None:
+def run_destroy(*, force: bool = False, jobs: int = DESTROY_JOBS) -> None:
     """Pipeline destroy : parse → validate → destroy."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
-    result = destroy(infra, driver, force=force, nesting_context=ctx)
+    result = destroy(infra, driver, force=force, nesting_context=ctx, jobs=jobs)
     _print_result(result, force=force)
 
     if not result.success:
@@ -6,6 +6,7 @@ import subprocess
 
 import typer
 
+from anklume.cli._common import get_driver
 from anklume.engine.disposable import (
     DISP_PROJECT,
     cleanup_disposables,
@@ -23,7 +24,7 @@ def run_disp(
     cleanup: bool = False,
 ) -> None:
     """Lance un conteneur jetable."""
-    driver = IncusDriver()
+    driver = get_driver()
 
     if list_all:
         _run_list(driver)
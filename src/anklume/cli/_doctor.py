@@ -7,7 +7,7 @@ import json
 import typer
 
 from anklume.engine.doctor import run_doctor
-from anklume.engine.incus_driver import IncusDriver
+from anklume.engine.incus_driver import make_driver
 
 
 def run_doctor_cmd(
@@ -28,7 +28,7 @@ def run_doctor_cmd(
     # Driver optionnel
     driver = None
     try:  # noqa: SIM105
-        driver = IncusDriver()
+        driver = make_driver(infra.config.incus_backend if infra else None)
     except Exception:  # noqa: S110
         pass  # Driver optionnel — checks système uniquement
 
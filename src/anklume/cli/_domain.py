@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import typer
 
-from anklume.cli._common import load_infra, resolve_project_dir
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.cli._common import get_driver, load_infra, resolve_project_dir
+from anklume.engine.incus_driver import IncusError
 from anklume.engine.nesting import detect_nesting_context
 from anklume.engine.ops import list_domains
 from anklume.engine.parser import ParseError, parse_project
@@ -72,7 +72,7 @@ def run_domain_check(name: str) -> None:
 def run_domain_exec(name: str, cmd: list[str]) -> None:
     """Exécute une commande dans toutes les instances running d'un domaine."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     if name not in infra.domains:
         typer.echo(f"Domaine inconnu : {name}", err=True)
@@ -102,7 +102,7 @@ def run_domain_exec(name: str, cmd: list[str]) -> None:
 def run_domain_status(name: str) -> None:
     """Affiche l'état détaillé d'un seul domaine."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
     if name not in infra.domains:
@@ -76,16 +76,16 @@ def run_setup_gui_fix() -> None:
         typer.echo("GUI non détecté — rien à réparer.", err=True)
         raise typer.Exit(1)
 
-    from anklume.cli._common import load_infra
+    from anklume.cli._common import get_driver, load_infra
     from anklume.engine.gui import (
         create_gui_profile,
         prepare_gui_dirs,
     )
-    from anklume.engine.incus_driver import IncusDriver, IncusError
+    from anklume.engine.incus_driver import IncusError
     from anklume.engine.nesting import detect_nesting_context, prefix_name
 
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
     fixed = 0
 
@@ -573,8 +573,8 @@ def run_instance_gui(instance: str, app: str) -> None:
         typer.echo("GUI non détecté sur l'hôte.", err=True)
         raise typer.Exit(1)
 
-    from anklume.cli._common import load_infra
-    from anklume.engine.incus_driver import IncusDriver, IncusError
+    from anklume.cli._common import get_driver, load_infra
+    from anklume.engine.incus_driver import IncusError
     from anklume.engine.nesting import detect_nesting_context, prefix_name
 
     infra = load_infra()
@@ -625,7 +625,7 @@ def run_instance_gui(instance: str, app: str) -> None:
 
     import shlex
 
-    driver = IncusDriver()
+    driver = get_driver(infra)
     uid_str = str(int(gui.uid))  # force int → str, refuse non-numériques
     gid_str = str(int(gui.gid))
     rd = shlex.quote(gui.runtime_dir)
@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import typer
 
-from anklume.cli._common import load_infra
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.cli._common import get_driver, load_infra
+from anklume.engine.incus_driver import IncusError
 from anklume.engine.nesting import detect_nesting_context
 from anklume.engine.ops import InstanceInfo, get_instance_info, list_instances
 from anklume.engine.snapshot import resolve_instance_project
@@ -14,7 +14,7 @@ from anklume.engine.snapshot import resolve_instance_project
 def run_instance_list() -> None:
     """Affiche le tableau de toutes les instances."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
     instances = list_instances(infra, driver, nesting_context=ctx)
@@ -46,7 +46,7 @@ def run_instance_list() -> None:
 def run_instance_exec(instance: str, cmd: list[str]) -> None:
     """Exécute une commande dans une instance."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     project = resolve_instance_project(infra, instance)
     if not project:
@@ -67,7 +67,7 @@ def run_instance_exec(instance: str, cmd: list[str]) -> None:
 def run_instance_info(instance: str) -> None:
     """Affiche les détails d'une instance."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
     info = get_instance_info(infra, driver, instance, nesting_context=ctx)
@@ -102,7 +102,7 @@ def run_instance_clipboard(instance: str, *, pull: bool = False) -> None:
     from anklume.engine.clipboard import clipboard_pull, clipboard_push
 
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     try:
         if pull:
@@ -20,6 +20,12 @@ def run_llm_status() -> None:
             f"GPU : {status.gpu.model} — "
             f"{status.gpu.vram_used_mib} / {status.gpu.vram_total_mib} MiB"
         )
+        sample = status.telemetry
+        if sample is not None:
+            power = f", {sample.power_w:.0f} W" if sample.power_w is not None else ""
+            typer.echo(f"      utilisation {sample.utilization_pct} %{power}")
+            for proc in sample.processes:
+                typer.echo(f"      {proc.name or '?'} ({proc.pid}) — {proc.vram_mib} MiB")
     else:
         typer.echo("GPU : aucun détecté")
 
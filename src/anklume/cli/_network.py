@@ -2,21 +2,40 @@
 
 from __future__ import annotations
 
+import json
+import logging
 import shutil
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import typer
 import yaml
 
-from anklume.cli._common import load_infra
-from anklume.engine.nftables import generate_ruleset
+from anklume.cli._common import get_driver, load_infra
+from anklume.engine.nftables import build_ruleset, generate_ruleset
+from anklume.engine.nftables_diff import (
+    LiveTable,
+    NftablesDelta,
+    compute_delta,
+    parse_live_table,
+)
+from anklume.engine.nftables_stats import (
+    SORT_KEYS,
+    CounterValue,
+    compute_rates,
+    format_rate,
+    parse_counters,
+    sort_rates,
+)
 
 if TYPE_CHECKING:
     from anklume.engine.models import Infrastructure
 
+log = logging.getLogger(__name__)
+
 
 def run_network_rules() -> None:
     """Génère et affiche les règles nftables sur stdout."""
@@ -25,9 +44,35 @@ def run_network_rules() -> None:
     typer.echo(ruleset)
 
 
-def deploy_nftables(infra: Infrastructure) -> None:
+def run_network_analyze() -> None:
+    """Signale les politiques masquées, en doublon ou fusionnables."""
+    from anklume.engine.policy_analysis import analyze_policies
+
+    infra = load_infra()
+    analysis = analyze_policies(infra)
+    if not analysis.findings:
+        typer.echo(f"Aucun masquage ni doublon ({len(infra.policies)} politique(s)).")
+        return
+    for finding in analysis.findings:
+        typer.echo(f"  - {finding}")
+    typer.echo(
+        f"\nRègles des politiques : {analysis.rules_before} → {analysis.rules_after} "
+        f"({len(analysis.policies)}/{len(infra.policies)} politique(s) gardée(s))."
+    )
+    if not infra.config.nftables.merge_policies:
+        typer.echo(
+            "Activer `nftables: {merge_policies: true}` dans anklume.yml pour les fusionner."
+        )
+
+
+def deploy_nftables(infra: Infrastructure, *, full: bool = False) -> NftablesDelta:
     """Applique les règles nftables sur l'hôte via nft -f.
 
+    Seul le delta avec la table vivante est appliqué (une transaction,
+    compteurs conservés) ; `full=True` force le rechargement complet.
+    Si le delta échoue (table modifiée entre-temps), la table est
+    rechargée en entier.
+
     Raises:
         RuntimeError: si nft est introuvable ou si l'application échoue.
     """
@@ -35,10 +80,42 @@ def deploy_nftables(infra: Infrastructure) -> None:
         msg = "nft introuvable. Installer nftables sur l'hôte."
         raise RuntimeError(msg)
 
-    ruleset = generate_ruleset(infra)
+    ruleset = build_ruleset(infra)
+    live = None if full else _read_live_table()
+    delta = NftablesDelta.reload("demandé") if full else compute_delta(ruleset, live)
+    if delta.empty:
+        return delta
+
+    try:
+        _run_nft_script(delta.script(ruleset))
+    except RuntimeError as e:
+        if delta.full_reload:
+            raise
+        log.warning("Delta nftables refusé, rechargement complet : %s", e)
+        delta = NftablesDelta.reload("delta refusé")
+        _run_nft_script(ruleset.render())
+    return delta
+
 
+def _read_live_table() -> LiveTable | None:
+    """Table `inet anklume` vivante, None si absente ou illisible."""
+    result = subprocess.run(
+        ["nft", "-j", "list", "table", "inet", "anklume"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return parse_live_table(json.loads(result.stdout))
+    except (ValueError, KeyError, TypeError, StopIteration) as e:
+        log.warning("Sortie JSON de nft illisible : %s", e)
+        return None
+
+
+def _run_nft_script(script: str) -> None:
     with tempfile.NamedTemporaryFile(mode="w", suffix=".nft", delete=False) as tmp:
-        tmp.write(ruleset)
+        tmp.write(script)
         tmp_path = tmp.name
 
     try:
@@ -54,26 +131,86 @@ def deploy_nftables(infra: Infrastructure) -> None:
         Path(tmp_path).unlink(missing_ok=True)
 
 
-def run_network_deploy() -> None:
+def run_network_deploy(*, full: bool = False) -> None:
     """Applique les règles nftables sur l'hôte via nft -f."""
     infra = load_infra()
 
     try:
-        deploy_nftables(infra)
-        typer.echo("Règles nftables appliquées.")
+        delta = deploy_nftables(infra, full=full)
     except RuntimeError as e:
         typer.echo(f"Erreur : {e}", err=True)
         raise typer.Exit(1) from None
+    if delta.empty:
+        typer.echo("Règles nftables à jour (aucun changement).")
+    else:
+        typer.echo(f"Règles nftables appliquées ({delta.summary()}).")
+
+
+def _read_counters() -> dict[str, CounterValue] | None:
+    """Compteurs nommés de la table (un appel nft), None si table absente."""
+    result = subprocess.run(
+        ["nft", "-j", "list", "counters", "table", "inet", "anklume"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        return parse_counters(json.loads(result.stdout))
+    except (ValueError, TypeError, AttributeError) as e:
+        log.warning("Sortie JSON de nft illisible : %s", e)
+        return None
+
+
+def run_network_stats(*, interval: float, sort: str) -> None:
+    """Affiche le trafic par politique et par bridge (compteurs nommés)."""
+    from anklume.engine.nftables import counter_labels
+
+    if sort not in SORT_KEYS:
+        typer.echo(f"Erreur : tri '{sort}' invalide ({', '.join(SORT_KEYS)}).", err=True)
+        raise typer.Exit(1)
+    if not shutil.which("nft"):
+        typer.echo("Erreur : nft introuvable. Installer nftables sur l'hôte.", err=True)
+        raise typer.Exit(1)
+
+    infra = load_infra()
+    before = _read_counters()
+    start = time.monotonic()
+    if before is None:
+        typer.echo("Erreur : table inet anklume absente (anklume network deploy).", err=True)
+        raise typer.Exit(1)
+    if not before:
+        typer.echo("Aucun compteur nommé dans la table inet anklume.")
+        typer.echo("Activer `nftables: {counters: true}` dans anklume.yml puis :")
+        typer.echo("  anklume network deploy")
+        return
+
+    time.sleep(interval)
+    after = _read_counters() or {}
+    elapsed = time.monotonic() - start
+
+    rates = sort_rates(compute_rates(before, after, elapsed, counter_labels(infra)), sort)
+    typer.echo(
+        f"{'COMPTEUR':<16s} {'PAQUETS':>12s} {'OCTETS':>14s} {'PAQ/S':>10s} {'DÉBIT':>12s}  CIBLE"
+    )
+    for rate in rates:
+        typer.echo(
+            f"{rate.name:<16s} {rate.packets:>12d} {rate.bytes:>14d} "
+            f"{format_rate(rate.pps, 'p/s'):>10s} {format_rate(rate.bps, 'b/s'):>12s}  "
+            f"{rate.label or '-'}"
+        )
+    idle = sum(1 for r in rates if not r.packets)
+    if idle:
+        typer.echo(f"\n{idle} compteur(s) sans trafic depuis le dernier rechargement.")
 
 
 def run_network_status() -> None:
     """Affiche l'état réseau : bridges, IPs, nftables."""
-    from anklume.engine.incus_driver import IncusDriver
     from anklume.engine.nesting import detect_nesting_context
     from anklume.engine.ops import compute_network_status
 
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
     status = compute_network_status(infra, driver, nesting_context=ctx)
@@ -0,0 +1,153 @@
+"""Plugins CLI externes — registre paresseux et cache disque.
+
+Les plugins s'enregistrent dans le groupe d'entry points
+`anklume.commands` (voir pyproject.toml). Lire les métadonnées des
+paquets installés coûte plus que le reste du démarrage de la CLI : la
+liste (nom → `module:attribut`) est donc mise en cache dans
+`~/.cache/anklume/plugins.json`, invalidée dès qu'un répertoire de
+`sys.path` change (installation ou suppression d'un paquet).
+
+Un plugin n'est importé que lorsque sa sous-commande est exécutée ;
+`--help` n'affiche qu'une entrée de substitution.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict, dataclass
+from importlib import import_module
+from pathlib import Path
+
+import click
+from typer.core import TyperGroup
+
+log = logging.getLogger(__name__)
+
+PLUGIN_GROUP = "anklume.commands"
+CACHE_VERSION = 1
+
+
+@dataclass
+class PluginSpec:
+    """Plugin déclaré : nom de sous-commande et cible `module:attribut`."""
+
+    name: str
+    value: str
+
+
+# Plugins enregistrés, pas encore importés (nom → spec).
+_registry: dict[str, PluginSpec] = {}
+
+
+def cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "anklume" / "plugins.json"
+
+
+def _environment_key() -> list[list[str | int]]:
+    """Empreinte de sys.path : un paquet installé modifie son répertoire.
+
+    sys.path[0] (répertoire du script ou courant) est exclu : il change
+    entre `anklume` et `python -m anklume` sans changer les plugins.
+    """
+    key: list[list[str | int]] = []
+    for entry in sys.path[1:]:
+        try:
+            key.append([entry, os.stat(entry or ".").st_mtime_ns])
+        except OSError:
+            continue
+    return key
+
+
+def scan_plugins() -> list[PluginSpec]:
+    """Lit les entry points installés (lent : importe importlib.metadata)."""
+    from importlib.metadata import entry_points
+
+    return [PluginSpec(name=ep.name, value=ep.value) for ep in entry_points(group=PLUGIN_GROUP)]
+
+
+def load_plugin_specs(*, refresh: bool = False) -> list[PluginSpec]:
+    """Liste des plugins, depuis le cache si sys.path n'a pas changé."""
+    path = cache_path()
+    key = _environment_key()
+    if not refresh:
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") == CACHE_VERSION and data.get("key") == key:
+                return [PluginSpec(**p) for p in data["plugins"]]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    specs = scan_plugins()
+    data = {"version": CACHE_VERSION, "key": key, "plugins": [asdict(s) for s in specs]}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
+    except OSError as e:
+        log.debug("Cache des plugins non écrit (%s) : %s", path, e)
+    return specs
+
+
+def register(specs: list[PluginSpec], reserved: set[str]) -> None:
+    """Enregistre les plugins sans les importer."""
+    for spec in specs:
+        if spec.name in reserved:
+            log.warning("Plugin '%s' entre en conflit avec une commande intégrée", spec.name)
+            continue
+        _registry[spec.name] = spec
+
+
+def _load(spec: PluginSpec) -> click.Command | None:
+    """Importe le plugin et le convertit en commande click."""
+    import typer
+
+    module_name, _, attr = spec.value.partition(":")
+    try:
+        obj = import_module(module_name.strip())
+        for part in filter(None, attr.strip().split(".")):
+            obj = getattr(obj, part)
+        if isinstance(obj, typer.Typer):
+            return typer.main.get_group(obj)
+        return typer.main.get_command(obj)
+    except Exception:
+        log.warning("Échec chargement plugin '%s' (%s)", spec.name, spec.value, exc_info=True)
+        return None
+
+
+class _PluginStub(click.Command):
+    """Entrée d'aide d'un plugin non importé."""
+
+    def __init__(self, spec: PluginSpec) -> None:
+        super().__init__(spec.name, help=f"Plugin externe ({spec.value}).")
+
+
+class LazyGroup(TyperGroup):
+    """Groupe racine : les plugins ne sont importés qu'à leur exécution."""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        names = super().list_commands(ctx)
+        return names + [n for n in sorted(_registry) if n not in names]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in _registry:
+            return _PluginStub(_registry[cmd_name])
+        return command
+
+    def resolve_command(
+        self, ctx: click.Context, args: list[str]
+    ) -> tuple[str | None, click.Command | None, list[str]]:
+        name, command, rest = super().resolve_command(ctx, args)
+        if isinstance(command, _PluginStub):
+            spec = _registry[command.name]
+            loaded = _load(spec)
+            if loaded is None:
+                ctx.fail(f"Plugin '{spec.name}' indisponible (voir les logs).")
+            self.add_command(loaded, spec.name)
+            command = loaded
+        return name, command, rest
@@ -1,17 +1,22 @@
-"""Commande CLI : anklume resource show."""
+"""Commandes CLI : anklume resource show/rebalance."""
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
 import typer
 
+from anklume.engine.drift import describe_config
+from anklume.engine.models import Infrastructure
 from anklume.engine.parser import ParseError, parse_project
 from anklume.engine.resources import (
+    REBALANCE_JOBS,
     ResourceAllocation,
     compute_resource_allocation,
     detect_hardware,
 )
+from anklume.engine.usage import InstanceUsage
 from anklume.engine.validator import validate
 
 
@@ -33,8 +38,10 @@ def run_resource_show(project_dir: str) -> None:
         typer.echo("Aucune resource_policy configurée dans anklume.yml")
         raise typer.Exit(0) from None
 
-    hardware = detect_hardware()
-    allocations = compute_resource_allocation(infra, hardware)
+    from anklume.cli._common import get_driver
+
+    hardware = detect_hardware(get_driver(infra))
+    allocations = compute_resource_allocation(infra, hardware, _measured_usage(path, infra))
 
     if not allocations:
         typer.echo("Aucune instance active.")
@@ -52,6 +59,28 @@ def run_resource_show(project_dir: str) -> None:
     _print_table(allocations)
 
 
+def _measured_usage(path: Path, infra: Infrastructure) -> dict[str, InstanceUsage] | None:
+    """Mode adaptive : une passe de mesures (non enregistrée), None sinon."""
+    if infra.config.resource_policy.mode != "adaptive":
+        return None
+    from anklume.cli._common import get_driver
+    from anklume.engine.incus_driver import IncusError
+    from anklume.engine.nesting import detect_nesting_context
+    from anklume.engine.usage import refresh_usage
+
+    try:
+        return refresh_usage(
+            path,
+            infra,
+            get_driver(infra),
+            nesting_context=detect_nesting_context(),
+            persist=False,
+        )
+    except IncusError as e:
+        typer.echo(f"⚠ Consommation non mesurée, répartition par poids : {e}", err=True)
+        return None
+
+
 def _print_table(allocations: list[ResourceAllocation]) -> None:
     """Affiche le tableau des allocations."""
     header = f"{'Instance':<30} {'CPU':<15} {'Mémoire':<15} {'Source':<10}"
@@ -62,3 +91,96 @@ def _print_table(allocations: list[ResourceAllocation]) -> None:
         cpu = f"{a.cpu_value} ({a.cpu_key.split('.')[-1]})"
         mem = f"{a.memory_value} ({a.memory_key.split('.')[-1]})"
         typer.echo(f"{a.instance_name:<30} {cpu:<15} {mem:<15} {a.source:<10}")
+
+
+def run_resource_rebalance(
+    project_dir: str,
+    *,
+    dry_run: bool = False,
+    jobs: int = REBALANCE_JOBS,
+    interval: int = 0,
+) -> None:
+    """Pousse l'allocation recalculée sur les instances existantes.
+
+    Avec `interval` > 0, recommence toutes les `interval` secondes
+    (projet relu à chaque passe) jusqu'à Ctrl-C.
+    """
+    if interval <= 0:
+        if not _rebalance_once(Path(project_dir), dry_run=dry_run, jobs=jobs):
+            raise typer.Exit(1)
+        return
+
+    try:
+        while True:
+            _rebalance_once(Path(project_dir), dry_run=dry_run, jobs=jobs)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        typer.echo("\nRééquilibrage interrompu.")
+
+
+def _rebalance_once(path: Path, *, dry_run: bool, jobs: int) -> bool:
+    """Une passe de rééquilibrage. Retourne False en cas d'erreur."""
+    from anklume.cli._common import get_driver, load_infra
+    from anklume.engine.incus_driver import IncusError
+    from anklume.engine.nesting import detect_nesting_context
+    from anklume.engine.resources import OvercommitError, rebalance
+
+    try:
+        # Projet invalide (anklume.yml à moitié enregistré) ou backend
+        # injoignable : erreur déjà affichée, le mode périodique continue
+        infra = load_infra(path)
+        if infra.config.resource_policy is None:
+            typer.echo("Aucune resource_policy configurée dans anklume.yml")
+            return True
+        driver = get_driver(infra)
+    except typer.Exit:
+        return False
+
+    ctx = detect_nesting_context()
+    try:
+        # Erreur Incus transitoire (redémarrage du démon) : passe en échec,
+        # le mode périodique continue
+        state = driver.state_snapshot()
+        usage = None
+        if infra.config.resource_policy.mode == "adaptive":
+            from anklume.engine.usage import refresh_usage
+
+            usage = refresh_usage(
+                path, infra, driver, state=state, nesting_context=ctx, persist=not dry_run
+            )
+        result = rebalance(
+            infra,
+            driver,
+            detect_hardware(driver),
+            dry_run=dry_run,
+            jobs=jobs,
+            state=state,
+            nesting_context=ctx,
+            usage=usage,
+        )
+    except (OvercommitError, IncusError) as e:
+        typer.echo(f"Erreur : {e}", err=True)
+        return False
+
+    if not result.changes:
+        typer.echo("Limites à jour, rien à rééquilibrer.")
+        return True
+
+    prefix = "[dry-run] " if dry_run else ""
+    for change in result.changes:
+        typer.echo(f"{prefix}  {change.instance} : {describe_config(change.changes)}")
+    for change, error in result.errors:
+        typer.echo(f"  {change.instance} — erreur : {error}", err=True)
+
+    done = len(result.changes) if dry_run else len(result.applied)
+    typer.echo(f"\n{prefix}{done} instance(s) mise(s) à jour.")
+    if result.restart_required:
+        typer.echo(
+            f"{len(result.restart_required)} VM(s) à redémarrer pour appliquer les limites :"
+        )
+        for change in result.restart_required:
+            typer.echo(f"  {change.instance}")
+    if result.errors:
+        typer.echo(f"{len(result.errors)} erreur(s).", err=True)
+        return False
+    return True
@@ -8,8 +8,9 @@ from pathlib import Path
 
 import typer
 
+from anklume.cli._common import get_driver
 from anklume.engine.import_infra import import_infrastructure
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.engine.incus_driver import IncusError
 
 # Shells supportés et leurs fichiers rc
 _SHELL_RC: dict[str, str] = {
@@ -136,7 +137,7 @@ def run_setup_import(output_dir: str = ".") -> None:
     """Scanne Incus et génère les fichiers domaine."""
     from anklume.engine.import_infra import IMPORT_LIMITATIONS
 
-    driver = IncusDriver()
+    driver = get_driver()
 
     try:
         result = import_infrastructure(driver, Path(output_dir))
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import json
+
 import typer
 
-from anklume.cli._common import load_infra
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.cli._common import get_driver, load_infra
+from anklume.engine.incus_driver import IncusError
+from anklume.engine.retention import PRUNE_JOBS, prune_snapshots
 from anklume.engine.snapshot import (
+    ROLLBACK_JOBS,
     create_auto_snapshots,
-    list_all_snapshots,
+    iter_snapshots,
     resolve_instance_project,
     rollback_pre_apply,
     rollback_snapshot,
@@ -27,7 +31,7 @@ def run_snapshot_create(
 ) -> None:
     """Crée des snapshots manuels."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     if instance:
         project = resolve_instance_project(infra, instance)
@@ -51,30 +55,40 @@ def run_snapshot_create(
         typer.echo(f"\n{len(created)} snapshot(s) créé(s).")
 
 
-def run_snapshot_list(instance: str | None = None) -> None:
-    """Liste les snapshots."""
-    infra = load_infra()
-    driver = IncusDriver()
-
-    snapshots = list_all_snapshots(driver, infra, instance_name=instance)
-
-    if not snapshots:
-        typer.echo("Aucun snapshot trouvé.")
-        return
+def run_snapshot_list(instance: str | None = None, *, json_output: bool = False) -> None:
+    """Liste les snapshots.
 
-    for inst_name, snaps in snapshots.items():
+    En JSON, une ligne par instance (JSON Lines), émise dès qu'elle est lue.
+    """
+    infra = load_infra()
+    driver = get_driver(infra)
+
+    found = False
+    for inst_name, project, snaps in iter_snapshots(driver, infra, instance_name=instance):
+        if json_output:
+            line = {
+                "instance": inst_name,
+                "project": project,
+                "snapshots": [{"name": s.name, "created_at": s.created_at} for s in snaps],
+            }
+            typer.echo(json.dumps(line, ensure_ascii=False))
+            continue
         if not snaps:
             continue
+        found = True
         typer.echo(f"{inst_name}:")
         for s in snaps:
             date_str = f"  ({s.created_at})" if s.created_at else ""
             typer.echo(f"  {s.name}{date_str}")
 
+    if not found and not json_output:
+        typer.echo("Aucun snapshot trouvé.")
+
 
 def run_snapshot_restore(instance: str, snapshot: str) -> None:
     """Restaure un snapshot."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     project = resolve_instance_project(infra, instance)
     if not project:
@@ -92,7 +106,7 @@ def run_snapshot_restore(instance: str, snapshot: str) -> None:
 def run_snapshot_delete(instance: str, snapshot: str) -> None:
     """Supprime un snapshot."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     project = resolve_instance_project(infra, instance)
     if not project:
@@ -111,7 +125,7 @@ def run_snapshot_rollback(instance: str, snapshot: str) -> None:
     """Rollback destructif : restaure + supprime les snapshots postérieurs."""
 
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     project = resolve_instance_project(infra, instance)
     if not project:
@@ -127,20 +141,49 @@ def run_snapshot_rollback(instance: str, snapshot: str) -> None:
         raise typer.Exit(1) from None
 
 
-def run_rollback(dry_run: bool = False) -> None:
+def run_rollback(dry_run: bool = False, jobs: int = ROLLBACK_JOBS) -> None:
     """Rollback global : restaure les snapshots anklume-pre-* les plus récents."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
 
     prefix = "[dry-run] " if dry_run else ""
 
-    restored = rollback_pre_apply(driver, infra, dry_run=dry_run)
+    result = rollback_pre_apply(driver, infra, dry_run=dry_run, jobs=jobs)
 
-    if not restored:
+    if not result.restored and not result.errors:
         typer.echo(f"{prefix}Aucun snapshot anklume-pre-* trouvé.")
         return
 
-    for inst_name, project, snap_name in restored:
-        typer.echo(f"{prefix}  {inst_name} ({project}) → {snap_name}")
+    for inst_name, project, snap_name in result.restored:
+        timing = f"  ({result.timings[inst_name]:.1f}s)" if inst_name in result.timings else ""
+        typer.echo(f"{prefix}  {inst_name} ({project}) → {snap_name}{timing}")
+    for inst_name, project, error in result.errors:
+        typer.echo(f"  {inst_name} ({project}) : erreur — {error}", err=True)
 
-    typer.echo(f"\n{prefix}{len(restored)} instance(s) restaurée(s).")
+    typer.echo(f"\n{prefix}{len(result.restored)} instance(s) restaurée(s).")
+    if result.errors:
+        typer.echo(f"{len(result.errors)} erreur(s).", err=True)
+        raise typer.Exit(1)
+
+
+def run_snapshot_prune(dry_run: bool = False, jobs: int = PRUNE_JOBS) -> None:
+    """Élague les snapshots selon `snapshots.retention` (anklume.yml)."""
+    infra = load_infra()
+    if not infra.config.snapshots.retention.enabled:
+        typer.echo("Aucune politique de rétention (snapshots.retention dans anklume.yml).")
+        return
+
+    driver = get_driver(infra)
+    prefix = "[dry-run] " if dry_run else ""
+
+    result = prune_snapshots(driver, infra, dry_run=dry_run, jobs=jobs)
+
+    for inst_name, _project, snap_name in result.deleted:
+        typer.echo(f"{prefix}  {inst_name} : {snap_name}")
+    for (inst_name, _project, snap_name), error in result.errors:
+        typer.echo(f"  {inst_name} : {snap_name} — erreur : {error}", err=True)
+
+    typer.echo(f"\n{prefix}{len(result.deleted)} snapshot(s) supprimé(s).")
+    if result.errors:
+        typer.echo(f"{len(result.errors)} erreur(s).", err=True)
+        raise typer.Exit(1)
@@ -4,8 +4,7 @@ from __future__ import annotations
 
 import typer
 
-from anklume.cli._common import load_infra
-from anklume.engine.incus_driver import IncusDriver
+from anklume.cli._common import get_driver, load_infra
 from anklume.engine.nesting import detect_nesting_context
 from anklume.engine.status import InfraStatus, compute_status
 
@@ -13,7 +12,7 @@ from anklume.engine.status import InfraStatus, compute_status
 def run_status() -> None:
     """Affiche l'état de l'infrastructure : déclaré vs réel."""
     infra = load_infra()
-    driver = IncusDriver()
+    driver = get_driver(infra)
     ctx = detect_nesting_context()
 
     status = compute_status(infra, driver, nesting_context=ctx)
@@ -16,6 +16,7 @@ from pathlib import Path
 from urllib.request import Request, urlopen
 
 from anklume.engine.gpu import GpuInfo, detect_gpu
+from anklume.engine.gpu_telemetry import GpuProcess, GpuSample, GpuTelemetry
 from anklume.engine.models import Infrastructure
 
 log = logging.getLogger(__name__)
@@ -99,6 +100,11 @@ class AiStatus:
 
     gpu: GpuInfo
     services: list[AiServiceStatus] = field(default_factory=list)
+    samples: list[GpuSample] = field(default_factory=list)  # télémétrie GPU
+
+    @property
+    def latest_sample(self) -> GpuSample | None:
+        return self.samples[-1] if self.samples else None
 
 
 @dataclass
@@ -109,6 +115,7 @@ class FlushResult:
     llama_server_stopped: bool
     vram_before_mib: int
     vram_after_mib: int
+    processes_remaining: list[GpuProcess] = field(default_factory=list)
 
 
 @dataclass
@@ -125,13 +132,20 @@ class AiAccessState:
 # ---------------------------------------------------------------------------
 
 
-def compute_ai_status(infra: Infrastructure) -> AiStatus:
+def compute_ai_status(
+    infra: Infrastructure,
+    *,
+    telemetry: GpuTelemetry | None = None,
+) -> AiStatus:
     """Calcule l'état des services IA.
 
     Détecte le GPU, puis vérifie la joignabilité d'Ollama et Speaches
-    sur les machines ayant les rôles correspondants.
+    sur les machines ayant les rôles correspondants. Les échantillons
+    déjà présents dans `telemetry` sont repris ; à défaut, un
+    échantillon est pris.
     """
     gpu_info = detect_gpu()
+    samples = _gpu_samples(telemetry) if gpu_info.detected else []
     services: list[AiServiceStatus] = []
 
     for domain in infra.enabled_domains:
@@ -158,7 +172,14 @@ def compute_ai_status(infra: Infrastructure) -> AiStatus:
                     )
                 )
 
-    return AiStatus(gpu=gpu_info, services=services)
+    return AiStatus(gpu=gpu_info, services=services, samples=samples)
+
+
+def _gpu_samples(telemetry: GpuTelemetry | None) -> list[GpuSample]:
+    telemetry = telemetry or GpuTelemetry()
+    if not telemetry.samples():
+        telemetry.sample_once()
+    return telemetry.samples()
 
 
 # ---------------------------------------------------------------------------
@@ -166,10 +187,17 @@ def compute_ai_status(infra: Infrastructure) -> AiStatus:
 # ---------------------------------------------------------------------------
 
 
-def flush_vram(infra: Infrastructure) -> FlushResult:
+def flush_vram(
+    infra: Infrastructure,
+    *,
+    telemetry: GpuTelemetry | None = None,
+) -> FlushResult:
     """Libère la VRAM GPU — décharge les modèles Ollama, arrête llama-server.
 
-    Best-effort : chaque étape est indépendante.
+    Best-effort : chaque étape est indépendante. Après un déchargement,
+    la VRAM est relue par télémétrie jusqu'à stabilisation (le pilote
+    la libère de façon asynchrone) ; les processus qui la retiennent
+    encore sont rapportés.
     """
     gpu_before = detect_gpu()
 
@@ -198,13 +226,16 @@ def flush_vram(infra: Infrastructure) -> FlushResult:
             instance_name,
         )
 
-    gpu_after = detect_gpu()
+    settled = None
+    if models_unloaded or llama_stopped:
+        settled = (telemetry or GpuTelemetry()).wait_settled()
 
     return FlushResult(
         models_unloaded=models_unloaded,
         llama_server_stopped=llama_stopped,
         vram_before_mib=gpu_before.vram_used_mib,
-        vram_after_mib=gpu_after.vram_used_mib,
+        vram_after_mib=settled.vram_used_mib if settled else detect_gpu().vram_used_mib,
+        processes_remaining=settled.processes if settled else [],
     )
 
 
@@ -290,8 +321,12 @@ def switch_ai_access(
         msg = f"Domaine '{target_domain}' désactivé"
         raise ValueError(msg)
 
-    # Flush VRAM
-    flush_vram(infra)
+    # Flush VRAM — en politique exclusive, un processus qui retient encore
+    # de la VRAM garde l'accès au GPU malgré la bascule
+    flushed = flush_vram(infra)
+    if flushed.processes_remaining:
+        names = ", ".join(f"{p.name or '?'} ({p.pid})" for p in flushed.processes_remaining)
+        log.warning("VRAM encore utilisée après le flush par : %s", names)
 
     # Écrire le nouvel état
     return write_ai_access(target_domain, state_path=DEFAULT_STATE_PATH)
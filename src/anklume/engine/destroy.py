@@ -1,26 +1,44 @@
-"""Destroy — suppression de l'infrastructure avec protection ephemeral."""
+"""Destroy — suppression de l'infrastructure avec protection ephemeral.
+
+Le plan est un graphe : chaque instance forme une chaîne courte
+(déprotection → suppression) indépendante des autres, et les chaînes
+s'exécutent en parallèle. Le réseau puis le projet d'un domaine
+attendent la suppression de toutes ses instances. Une instance en cours
+d'exécution est supprimée avec arrêt forcé (`incus delete --force`),
+sans aller-retour `stop` séparé : elle est détruite de toute façon.
+"""
 
 from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
 
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.engine.incus_driver import IncusDriver, IncusError, IncusStateSnapshot
 from anklume.engine.models import Infrastructure
 from anklume.engine.nesting import NestingContext, prefix_name
+from anklume.engine.scheduler import run_dag
 
 log = logging.getLogger(__name__)
 
+DESTROY_JOBS = 4  # chaînes d'instances supprimées simultanément par défaut
+
 
 @dataclass
 class DestroyAction:
     """Une action de destruction à exécuter."""
 
-    verb: str  # "stop", "unprotect", "delete"
+    verb: str  # "unprotect", "delete"
     resource: str  # "instance", "network", "project"
     target: str
     project: str
     detail: str
+    deps: list[str] = field(default_factory=list)  # clés des actions préalables
+    force: bool = False  # suppression d'une instance en cours d'exécution
+
+    @property
+    def key(self) -> str:
+        """Identifiant unique de l'action dans un plan."""
+        return f"{self.verb}:{self.resource}:{self.project}/{self.target}"
 
 
 @dataclass
@@ -48,25 +66,32 @@ def destroy(
     force: bool = False,
     dry_run: bool = False,
     nesting_context: NestingContext | None = None,
+    state: IncusStateSnapshot | None = None,
+    jobs: int = DESTROY_JOBS,
 ) -> DestroyResult:
-    """Détruit l'infrastructure. Respecte la protection ephemeral sauf avec --force."""
+    """Détruit l'infrastructure. Respecte la protection ephemeral sauf avec --force.
+
+    Les instances sont supprimées en parallèle (au plus ``jobs`` à la
+    fois). Un échec n'ignore que les actions qui en dépendent : le
+    réseau et le projet du domaine, jamais les autres instances.
+    """
     ctx = nesting_context or NestingContext()
     nesting_cfg = infra.config.nesting
     result = DestroyResult()
 
-    existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
 
     for domain in infra.enabled_domains:
         project_name = prefix_name(domain.name, ctx, nesting_cfg)
 
-        if project_name not in existing_projects:
+        if not state.project_exists(project_name):
             continue
 
-        existing = {i.name: i for i in driver.instance_list(project_name)}
+        existing = {i.name: i for i in state.instance_list(project_name)}
         network_name = prefix_name(domain.network_name, ctx, nesting_cfg)
 
         domain_actions: list[DestroyAction] = []
-        domain_skipped: list[tuple[str, str]] = []
         all_deleted = True
 
         for machine in domain.sorted_machines:
@@ -79,57 +104,55 @@ def destroy(
             is_ephemeral = machine.ephemeral if machine.ephemeral is not None else domain.ephemeral
 
             if not is_ephemeral and not force:
-                domain_skipped.append((incus_name, "protégée (utiliser --force)"))
+                result.skipped.append((incus_name, "protégée (utiliser --force)"))
                 all_deleted = False
                 continue
 
-            # Arrêter si running
-            if incus_inst.status == "Running":
-                domain_actions.append(
-                    DestroyAction(
-                        verb="stop",
-                        resource="instance",
-                        target=incus_name,
-                        project=project_name,
-                        detail=f"Arrêter {incus_name}",
-                    )
-                )
+            delete_deps: list[str] = []
 
             # Retirer la protection si non-éphémère et --force
             if not is_ephemeral and force:
-                domain_actions.append(
-                    DestroyAction(
-                        verb="unprotect",
-                        resource="instance",
-                        target=incus_name,
-                        project=project_name,
-                        detail=f"Déprotéger {incus_name}",
-                    )
+                unprotect = DestroyAction(
+                    verb="unprotect",
+                    resource="instance",
+                    target=incus_name,
+                    project=project_name,
+                    detail=f"Déprotéger {incus_name}",
                 )
+                domain_actions.append(unprotect)
+                delete_deps.append(unprotect.key)
 
-            # Supprimer
+            # Supprimer (arrêt forcé si running)
+            running = incus_inst.status == "Running"
             domain_actions.append(
                 DestroyAction(
                     verb="delete",
                     resource="instance",
                     target=incus_name,
                     project=project_name,
-                    detail=f"Supprimer {incus_name}",
+                    detail=f"Supprimer {incus_name}" + (" (arrêt forcé)" if running else ""),
+                    deps=delete_deps,
+                    force=running,
                 )
             )
 
         # Réseau et projet si toutes les instances sont supprimées
         if all_deleted:
-            if driver.network_exists(network_name, project_name):
-                domain_actions.append(
-                    DestroyAction(
-                        verb="delete",
-                        resource="network",
-                        target=network_name,
-                        project=project_name,
-                        detail=f"Supprimer réseau {network_name}",
-                    )
+            instance_keys = [
+                a.key for a in domain_actions if a.verb == "delete" and a.resource == "instance"
+            ]
+            project_deps = list(instance_keys)
+            if state.network_exists(network_name, project_name):
+                network = DestroyAction(
+                    verb="delete",
+                    resource="network",
+                    target=network_name,
+                    project=project_name,
+                    detail=f"Supprimer réseau {network_name}",
+                    deps=instance_keys,
                 )
+                domain_actions.append(network)
+                project_deps.append(network.key)
             domain_actions.append(
                 DestroyAction(
                     verb="delete",
@@ -137,45 +160,28 @@ def destroy(
                     target=project_name,
                     project=project_name,
                     detail=f"Supprimer projet {project_name}",
+                    deps=project_deps,
                 )
             )
 
         result.actions.extend(domain_actions)
-        result.skipped.extend(domain_skipped)
 
-        if not dry_run:
-            _execute_domain_actions(domain_actions, driver, result)
+    if not dry_run and result.actions:
+        schedule = run_dag(
+            result.actions,
+            lambda action: _execute_action(action, driver),
+            jobs=jobs,
+            errors=(IncusError, ValueError),
+        )
+        result.executed = schedule.executed
+        result.errors = schedule.errors
 
     return result
 
 
-def _execute_domain_actions(
-    actions: list[DestroyAction],
-    driver: IncusDriver,
-    result: DestroyResult,
-) -> None:
-    """Exécute les actions de destruction d'un domaine. Best-effort."""
-    domain_failed = False
-
-    for action in actions:
-        if domain_failed:
-            result.errors.append((action, "Ignoré suite à une erreur précédente"))
-            continue
-
-        try:
-            _execute_action(action, driver)
-            result.executed.append(action)
-        except (IncusError, ValueError) as e:
-            result.errors.append((action, str(e)))
-            domain_failed = True
-
-
 def _execute_action(action: DestroyAction, driver: IncusDriver) -> None:
     """Exécute une action de destruction unique."""
-    if action.verb == "stop" and action.resource == "instance":
-        driver.instance_stop(action.target, action.project)
-
-    elif action.verb == "unprotect" and action.resource == "instance":
+    if action.verb == "unprotect" and action.resource == "instance":
         driver.instance_config_set(
             action.target,
             action.project,
@@ -184,7 +190,7 @@ def _execute_action(action: DestroyAction, driver: IncusDriver) -> None:
         )
 
     elif action.verb == "delete" and action.resource == "instance":
-        driver.instance_delete(action.target, action.project)
+        driver.instance_delete(action.target, action.project, force=action.force)
 
     elif action.verb == "delete" and action.resource == "network":
         driver.network_delete(action.target, action.project)
@@ -0,0 +1,102 @@
+"""Dérive — diff champ par champ entre instance désirée et instance réelle.
+
+Compare la config et les profils désirés d'une machine à la config
+locale et aux profils de l'instance Incus. Seules les clés qui
+diffèrent sont retenues : la mise à jour correspondante s'applique à
+chaud, sans recréer l'instance.
+
+Le désiré est `Machine.config` (limites de ressources comprises) : la
+config de sécurité posée à la création (nesting, protection delete,
+voir `reconciler.instance_spec`) n'est pas comparée. Une clé absente
+du désiré n'est retirée que si anklume l'écrit lui-même : les clés
+d'allocation (`ALLOCATION_KEYS`), quand `resource_policy` est défini.
+Les clés posées par Incus (`volatile.*`, `image.*`) ou à la main
+(`limits.processes`…) ne sont jamais touchées.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from anklume.engine.incus_driver import IncusInstance
+
+# Clés posées par l'allocation `resource_policy` (voir engine/resources.py)
+ALLOCATION_KEYS = frozenset(
+    {"limits.cpu", "limits.cpu.allowance", "limits.memory", "limits.memory.enforce"}
+)
+
+
+@dataclass
+class InstanceDrift:
+    """Écarts d'une instance : clés de config minimales et profils."""
+
+    config: dict[str, str | None] = field(default_factory=dict)  # None = clé à retirer
+    profiles: list[str] | None = None  # liste complète désirée, si différente
+
+    @property
+    def empty(self) -> bool:
+        return not self.config and self.profiles is None
+
+
+def config_value(value: object) -> str:
+    """Valeur de config telle qu'Incus la stocke (booléens en minuscules)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def config_drift(
+    desired: dict,
+    live: dict[str, str],
+    managed: Iterable[str] = (),
+) -> dict[str, str | None]:
+    """Clés à poser (valeur) ou à retirer (None) pour atteindre `desired`.
+
+    Seules les clés de `managed` absentes de `desired` sont retirées.
+    """
+    managed = set(managed)
+    changes: dict[str, str | None] = {}
+    for key, value in desired.items():
+        wanted = config_value(value)
+        if live.get(key) != wanted:
+            changes[key] = wanted
+    for key in sorted(live):
+        if key not in desired and key in managed:
+            changes[key] = None
+    return changes
+
+
+def profiles_drift(
+    desired: list[str],
+    live: list[str],
+    keep: Iterable[str] = (),
+) -> list[str] | None:
+    """Liste de profils à appliquer, ou None si rien ne change.
+
+    Les profils de `keep` déjà présents sont conservés même s'ils ne
+    sont pas désirés (profils GPU/GUI non détectés lors de cet apply).
+    """
+    kept = [p for p in live if p in set(keep) and p not in desired]
+    wanted = desired + kept
+    return None if wanted == live else wanted
+
+
+def instance_drift(
+    config: dict,
+    profiles: list[str],
+    instance: IncusInstance,
+    *,
+    keep_profiles: Iterable[str] = (),
+    managed: Iterable[str] = (),
+) -> InstanceDrift:
+    """Écarts entre la spécification désirée et l'instance réelle."""
+    return InstanceDrift(
+        config=config_drift(config, instance.config, managed),
+        profiles=profiles_drift(profiles, instance.profiles, keep_profiles),
+    )
+
+
+def describe_config(changes: dict[str, str | None]) -> str:
+    """Résumé lisible : `limits.cpu=2, -limits.memory`."""
+    return ", ".join(f"-{k}" if v is None else f"{k}={v}" for k, v in changes.items())
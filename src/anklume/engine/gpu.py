@@ -1,6 +1,7 @@
 """GPU passthrough — détection, validation et profils.
 
-Détecte le GPU hôte via nvidia-smi, valide la cohérence gpu: true
+Détecte le GPU hôte via nvidia-smi (totaux mis en cache, VRAM
+utilisée via NVML si disponible), valide la cohérence gpu: true
 sur les machines, et enrichit les profils Incus pour le passthrough.
 """
 
@@ -10,6 +11,8 @@ import logging
 import subprocess
 from dataclasses import dataclass
 
+from anklume.engine.gpu_telemetry import load_nvml
+from anklume.engine.hwcache import load_cached, store_cached
 from anklume.engine.models import Infrastructure
 
 log = logging.getLogger(__name__)
@@ -32,8 +35,48 @@ class GpuInfo:
         return cls(detected=False, model="", vram_total_mib=0, vram_used_mib=0)
 
 
-def detect_gpu() -> GpuInfo:
-    """Détecte la présence d'un GPU NVIDIA via nvidia-smi."""
+def detect_gpu(*, refresh: bool = False) -> GpuInfo:
+    """Détecte le GPU NVIDIA de l'hôte.
+
+    Modèle et VRAM totale viennent du cache matériel (engine/hwcache.py) ;
+    seule la VRAM utilisée est relue, via NVML si disponible. `refresh`
+    force une détection complète par nvidia-smi.
+    """
+    cached = None if refresh else load_cached("gpu")
+    if cached is not None:
+        try:
+            if not cached["detected"]:
+                return GpuInfo.none()
+            used = vram_used_mib()
+            if used is not None:
+                return GpuInfo(
+                    detected=True,
+                    model=cached["model"],
+                    vram_total_mib=cached["vram_total_mib"],
+                    vram_used_mib=used,
+                )
+        except (KeyError, TypeError):
+            pass
+
+    info, cacheable = _query_nvidia_smi()
+    if cacheable:
+        store_cached(
+            "gpu",
+            {
+                "detected": info.detected,
+                "model": info.model,
+                "vram_total_mib": info.vram_total_mib,
+            },
+        )
+    return info
+
+
+def _query_nvidia_smi() -> tuple[GpuInfo, bool]:
+    """Détection complète. Le booléen indique si le résultat peut être caché.
+
+    nvidia-smi absent : négatif durable (l'installation du pilote change
+    l'empreinte matérielle). Erreur ou sortie illisible : non caché.
+    """
     try:
         result = subprocess.run(
             [
@@ -45,12 +88,47 @@ def detect_gpu() -> GpuInfo:
             text=True,
         )
     except FileNotFoundError:
-        return GpuInfo.none()
+        return GpuInfo.none(), True
 
     if result.returncode != 0:
-        return GpuInfo.none()
+        return GpuInfo.none(), False
+
+    info = _parse_nvidia_smi(result.stdout)
+    return info, info.detected
+
 
-    return _parse_nvidia_smi(result.stdout)
+def vram_used_mib() -> int | None:
+    """VRAM utilisée du premier GPU : NVML, sinon nvidia-smi. None si illisible."""
+    used = _nvml_vram_used_mib()
+    if used is not None:
+        return used
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=memory.used", "--format=csv,noheader,nounits"],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        return int(result.stdout.strip().splitlines()[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _nvml_vram_used_mib() -> int | None:
+    """VRAM utilisée via les bindings NVML (paquet nvidia-ml-py, optionnel)."""
+    nvml = load_nvml()
+    if nvml is None:
+        return None
+    try:
+        handle = nvml.nvmlDeviceGetHandleByIndex(0)
+        return int(nvml.nvmlDeviceGetMemoryInfo(handle).used) // (1024 * 1024)
+    except nvml.NVMLError as e:
+        log.debug("NVML indisponible : %s", e)
+        return None
 
 
 def _parse_nvidia_smi(stdout: str) -> GpuInfo:
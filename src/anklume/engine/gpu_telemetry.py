@@ -0,0 +1,316 @@
+"""Télémétrie GPU — échantillons périodiques dans un tampon circulaire.
+
+Un échantillon porte l'utilisation du GPU, la VRAM (utilisée/totale),
+la puissance et la mémoire de chaque processus GPU. Deux sources :
+
+- NVML (`pynvml`, extra optionnel `anklume[gpu]`) : appels directs à
+  la bibliothèque du pilote, sans sous-processus ;
+- nvidia-smi (repli) : deux requêtes CSV par échantillon.
+
+`GpuTelemetry` garde les N derniers échantillons (`deque` bornée) et
+peut échantillonner en tâche de fond à intervalle fixe. Le
+`GpuSampler` est injectable : les tests utilisent un faux sampler.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Protocol
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 120  # échantillons gardés
+DEFAULT_INTERVAL = 1.0  # secondes entre deux échantillons
+SETTLE_TOLERANCE_MIB = 64  # écart de VRAM considéré comme stable
+SETTLE_TIMEOUT = 10.0  # secondes max d'attente de libération de la VRAM
+
+_MIB = 1024 * 1024
+
+
+@dataclass
+class GpuProcess:
+    """Processus utilisant le GPU."""
+
+    pid: int
+    name: str
+    vram_mib: int
+
+
+@dataclass
+class GpuSample:
+    """Mesure instantanée du premier GPU."""
+
+    timestamp: float  # time.time()
+    utilization_pct: int
+    vram_used_mib: int
+    vram_total_mib: int
+    power_w: float | None = None  # None si non rapportée
+    processes: list[GpuProcess] = field(default_factory=list)
+
+
+class GpuSampler(Protocol):
+    """Source d'échantillons. `sample()` retourne None si le GPU est illisible."""
+
+    name: str
+
+    def sample(self) -> GpuSample | None: ...
+
+
+# ---------------------------------------------------------------------------
+# NVML
+# ---------------------------------------------------------------------------
+
+_nvml: ModuleType | None = None
+_nvml_lock = threading.Lock()
+
+
+def load_nvml() -> ModuleType | None:
+    """Module pynvml initialisé (une fois par processus), None si indisponible."""
+    global _nvml
+    with _nvml_lock:
+        if _nvml is not None:
+            return _nvml
+        try:
+            import pynvml
+        except ImportError:
+            return None
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError as e:
+            log.debug("NVML indisponible : %s", e)
+            return None
+        _nvml = pynvml
+        return _nvml
+
+
+class NvmlSampler:
+    """Échantillons via NVML."""
+
+    name = "nvml"
+
+    def __init__(self, nvml: ModuleType) -> None:
+        self._nvml = nvml
+
+    def sample(self) -> GpuSample | None:
+        nvml = self._nvml
+        try:
+            handle = nvml.nvmlDeviceGetHandleByIndex(0)
+            memory = nvml.nvmlDeviceGetMemoryInfo(handle)
+            utilization = nvml.nvmlDeviceGetUtilizationRates(handle)
+            try:
+                power: float | None = nvml.nvmlDeviceGetPowerUsage(handle) / 1000
+            except nvml.NVMLError:
+                power = None
+            processes = [
+                GpuProcess(
+                    pid=p.pid,
+                    name=self._process_name(p.pid),
+                    vram_mib=(p.usedGpuMemory or 0) // _MIB,
+                )
+                for p in nvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            ]
+        except nvml.NVMLError as e:
+            log.debug("Échantillon NVML échoué : %s", e)
+            return None
+        return GpuSample(
+            timestamp=time.time(),
+            utilization_pct=int(utilization.gpu),
+            vram_used_mib=int(memory.used) // _MIB,
+            vram_total_mib=int(memory.total) // _MIB,
+            power_w=power,
+            processes=processes,
+        )
+
+    def _process_name(self, pid: int) -> str:
+        try:
+            name = self._nvml.nvmlSystemGetProcessName(pid)
+        except self._nvml.NVMLError:
+            return ""
+        return name.decode() if isinstance(name, bytes) else str(name)
+
+
+# ---------------------------------------------------------------------------
+# nvidia-smi
+# ---------------------------------------------------------------------------
+
+
+def _smi_query(args: list[str]) -> list[list[str]] | None:
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", *args, "--format=csv,noheader,nounits"],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return [[p.strip() for p in line.split(",")] for line in result.stdout.strip().splitlines()]
+
+
+def _smi_float(value: str) -> float | None:
+    try:
+        return float(value)
+    except ValueError:  # "[N/A]"
+        return None
+
+
+class NvidiaSmiSampler:
+    """Échantillons via nvidia-smi (repli sans NVML)."""
+
+    name = "nvidia-smi"
+
+    def sample(self) -> GpuSample | None:
+        rows = _smi_query(["--query-gpu=utilization.gpu,memory.used,memory.total,power.draw"])
+        if not rows or len(rows[0]) < 4:
+            return None
+        utilization, used, total, power = rows[0][:4]
+        try:
+            sample = GpuSample(
+                timestamp=time.time(),
+                utilization_pct=int(float(utilization)),
+                vram_used_mib=int(used),
+                vram_total_mib=int(total),
+                power_w=_smi_float(power),
+            )
+        except ValueError:
+            return None
+
+        for row in _smi_query(["--query-compute-apps=pid,process_name,used_memory"]) or []:
+            if len(row) < 3:
+                continue
+            try:
+                sample.processes.append(GpuProcess(int(row[0]), row[1], int(row[2])))
+            except ValueError:
+                continue
+        return sample
+
+
+def default_sampler() -> GpuSampler:
+    """NVML si les bindings sont installés et le pilote répond, sinon nvidia-smi."""
+    nvml = load_nvml()
+    if nvml is not None:
+        return NvmlSampler(nvml)
+    return NvidiaSmiSampler()
+
+
+# ---------------------------------------------------------------------------
+# Tampon circulaire
+# ---------------------------------------------------------------------------
+
+
+class GpuTelemetry:
+    """Derniers échantillons GPU, remplis à la demande ou en tâche de fond."""
+
+    def __init__(
+        self,
+        sampler: GpuSampler | None = None,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.sampler = sampler or default_sampler()
+        self.interval = interval
+        self._buffer: deque[GpuSample] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample_once(self) -> GpuSample | None:
+        """Prend un échantillon et l'ajoute au tampon (None si illisible)."""
+        sample = self.sampler.sample()
+        if sample is not None:
+            with self._lock:
+                self._buffer.append(sample)
+        return sample
+
+    def collect(self, count: int) -> list[GpuSample]:
+        """Prend `count` échantillons espacés de `interval` (appel bloquant)."""
+        taken: list[GpuSample] = []
+        for i in range(count):
+            if i:
+                time.sleep(self.interval)
+            sample = self.sample_once()
+            if sample is not None:
+                taken.append(sample)
+        return taken
+
+    # --- Tâche de fond ---
+
+    def start(self) -> None:
+        """Échantillonne toutes les `interval` secondes jusqu'à `stop()`."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gpu-telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sample_once()
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> GpuTelemetry:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    # --- Lecture ---
+
+    def samples(self) -> list[GpuSample]:
+        with self._lock:
+            return list(self._buffer)
+
+    def latest(self) -> GpuSample | None:
+        with self._lock:
+            return self._buffer[-1] if self._buffer else None
+
+    def mean_utilization(self) -> float | None:
+        samples = self.samples()
+        if not samples:
+            return None
+        return sum(s.utilization_pct for s in samples) / len(samples)
+
+    def peak_vram_mib(self) -> int:
+        return max((s.vram_used_mib for s in self.samples()), default=0)
+
+    def wait_settled(
+        self,
+        *,
+        timeout: float = SETTLE_TIMEOUT,
+        tolerance_mib: int = SETTLE_TOLERANCE_MIB,
+    ) -> GpuSample | None:
+        """Échantillonne jusqu'à ce que la VRAM utilisée se stabilise.
+
+        Le pilote libère la VRAM de façon asynchrone après le
+        déchargement d'un modèle : une lecture immédiate la surestime.
+        Retourne le dernier échantillon (None si le GPU est illisible).
+        """
+        deadline = time.monotonic() + timeout
+        previous = self.sample_once()
+        if previous is None:
+            return None
+        while time.monotonic() < deadline:
+            time.sleep(self.interval)
+            current = self.sample_once()
+            if current is None:
+                return previous
+            if abs(current.vram_used_mib - previous.vram_used_mib) <= tolerance_mib:
+                return current
+            previous = current
+        return previous
@@ -259,44 +259,35 @@ def create_gui_profile(
     """Crée le profil GUI complet dans un projet Incus.
 
     Ajoute les proxy devices pour chaque socket détecté,
-    le GPU intégré, et le mapping UID/GID.
+    le GPU intégré, et le mapping UID/GID — en un seul appel.
     """
-    driver.profile_create(GUI_PROFILE_NAME, project)
-
     uid_str = str(gui_info.uid)
     gid_str = str(gui_info.gid)
+    devices: dict[str, dict[str, str]] = {}
 
     # iGPU (si détecté)
     if gui_info.igpu_pci:
-        driver.profile_device_add(
-            GUI_PROFILE_NAME,
-            "igpu",
-            "gpu",
-            {
-                "pci": gui_info.igpu_pci,
-                "gid": str(gui_info.video_gid) if gui_info.video_gid else gid_str,
-            },
-            project=project,
-        )
+        devices["igpu"] = {
+            "type": "gpu",
+            "pci": gui_info.igpu_pci,
+            "gid": str(gui_info.video_gid) if gui_info.video_gid else gid_str,
+        }
 
     # Proxy devices pour chaque socket
     for sock in gui_info.sockets:
-        driver.profile_device_add(
-            GUI_PROFILE_NAME,
-            sock.name,
-            "proxy",
-            {
-                "bind": "instance",
-                "connect": f"unix:{sock.host_path}",
-                "listen": f"unix:{sock.container_path}",
-                "uid": uid_str,
-                "gid": gid_str,
-                "security.uid": uid_str,
-                "security.gid": gid_str,
-                "mode": "0700",
-            },
-            project=project,
-        )
+        devices[sock.name] = {
+            "type": "proxy",
+            "bind": "instance",
+            "connect": f"unix:{sock.host_path}",
+            "listen": f"unix:{sock.container_path}",
+            "uid": uid_str,
+            "gid": gid_str,
+            "security.uid": uid_str,
+            "security.gid": gid_str,
+            "mode": "0700",
+        }
+
+    driver.profile_create(GUI_PROFILE_NAME, project, devices=devices)
 
 
 def prepare_gui_dirs(
@@ -0,0 +1,110 @@
+"""Cache des caractéristiques matérielles de l'hôte.
+
+`incus info --resources` (document JSON volumineux) et `nvidia-smi`
+coûtent cher alors que leurs totaux ne changent qu'avec le matériel.
+Les valeurs statiques (threads CPU, mémoire totale, modèle et VRAM
+totale du GPU) sont gardées dans `/var/cache/anklume/hardware.json`
+(`~/.cache/anklume/` si le répertoire système n'est pas accessible en
+écriture, `ANKLUME_CACHE_DIR` pour forcer un autre répertoire).
+
+Le cache est valide tant que la clé est identique :
+- boot ID du noyau (`/proc/sys/kernel/random/boot_id`) : un
+  redémarrage invalide tout (ajout de RAM, changement de carte) ;
+- empreinte matérielle bon marché (nombre de CPU, `MemTotal`,
+  périphériques `/dev/nvidia*`, version du pilote NVIDIA) : couvre le
+  hotplug et le chargement du pilote sans redémarrage.
+
+Les valeurs dynamiques (VRAM utilisée) ne sont jamais mises en cache.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+CACHE_ENV = "ANKLUME_CACHE_DIR"
+SYSTEM_CACHE_DIR = Path("/var/cache/anklume")
+CACHE_FILE = "hardware.json"
+CACHE_VERSION = 1
+
+_BOOT_ID = Path("/proc/sys/kernel/random/boot_id")
+_MEMINFO = Path("/proc/meminfo")
+_NVIDIA_VERSION = Path("/proc/driver/nvidia/version")
+
+
+def cache_path() -> Path:
+    override = os.environ.get(CACHE_ENV)
+    if override:
+        return Path(override) / CACHE_FILE
+    system = SYSTEM_CACHE_DIR
+    if os.access(system, os.W_OK) or (not system.exists() and os.access(system.parent, os.W_OK)):
+        return system / CACHE_FILE
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "anklume" / CACHE_FILE
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text()
+    except OSError:
+        return ""
+
+
+def boot_id() -> str:
+    return _read(_BOOT_ID).strip()
+
+
+def hardware_fingerprint() -> str:
+    """Empreinte du matériel visible, sans appel à Incus ni au GPU."""
+    memtotal = next(
+        (line for line in _read(_MEMINFO).splitlines() if line.startswith("MemTotal:")),
+        "",
+    )
+    data = [
+        os.cpu_count(),
+        memtotal.split(),
+        sorted(glob.glob("/dev/nvidia[0-9]*")),
+        _read(_NVIDIA_VERSION).partition("\n")[0],
+    ]
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+
+def cache_key() -> dict[str, str]:
+    return {"boot_id": boot_id(), "fingerprint": hardware_fingerprint()}
+
+
+def _load_sections(key: dict[str, str]) -> dict[str, dict]:
+    try:
+        data = json.loads(cache_path().read_text())
+        if data.get("version") == CACHE_VERSION and data.get("key") == key:
+            return dict(data["sections"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return {}
+
+
+def load_cached(section: str) -> dict | None:
+    """Section du cache (`host`, `gpu`), None si absente ou périmée."""
+    return _load_sections(cache_key()).get(section)
+
+
+def store_cached(section: str, value: dict) -> None:
+    """Enregistre une section ; les autres sections valides sont gardées."""
+    key = cache_key()
+    sections = _load_sections(key)
+    sections[section] = value
+    path = cache_path()
+    data = {"version": CACHE_VERSION, "key": key, "sections": sections}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=2) + "\n")
+        tmp.replace(path)
+    except OSError as e:
+        log.debug("Cache matériel non écrit (%s) : %s", path, e)
@@ -0,0 +1,175 @@
+"""Apply incrémental — saute les domaines inchangés depuis le dernier apply.
+
+Le fichier `.anklume/state.json` du projet garde, par domaine :
+- le hash du `Domain` résolu (adresses, profils GPU/GUI, allocation
+  de ressources déjà appliqués) et des réglages globaux qui changent
+  le plan (image par défaut, nesting) ;
+- l'empreinte de l'état Incus réel du domaine après le dernier apply
+  réussi (projet, réseau, profils, instances et leur statut).
+
+Un domaine dont le hash et l'empreinte live n'ont pas bougé n'a rien
+à réconcilier : `anklume apply` le saute. `--full` force le plan complet.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from anklume.engine.incus_driver import IncusStateSnapshot
+from anklume.engine.models import Domain, Infrastructure
+from anklume.engine.nesting import NestingContext, prefix_name
+
+log = logging.getLogger(__name__)
+
+STATE_DIR = ".anklume"
+STATE_FILE = "state.json"
+STATE_VERSION = 1
+
+
+@dataclass
+class DomainApplyState:
+    """Trace du dernier apply réussi d'un domaine."""
+
+    hash: str
+    fingerprint: str
+    applied_at: str = ""
+    actions: int = 0  # actions exécutées lors de cet apply
+
+
+def state_path(project_dir: Path) -> Path:
+    return project_dir / STATE_DIR / STATE_FILE
+
+
+def _digest(data: object) -> str:
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def domain_hash(domain: Domain, infra: Infrastructure) -> str:
+    """Hash du domaine résolu et des réglages globaux qui influencent son plan."""
+    return _digest(
+        {
+            "domain": dataclasses.asdict(domain),
+            "os_image": infra.config.defaults.os_image,
+            "nesting": dataclasses.asdict(infra.config.nesting),
+        }
+    )
+
+
+def live_fingerprint(
+    domain: Domain,
+    infra: Infrastructure,
+    state: IncusStateSnapshot,
+    ctx: NestingContext | None = None,
+) -> str:
+    """Empreinte de l'état Incus réel d'un domaine.
+
+    Les clés `volatile.*` (UUID, MAC, dernier état) sont ignorées :
+    Incus les réécrit sans changement déclaratif.
+    """
+    ctx = ctx or NestingContext()
+    nesting_cfg = infra.config.nesting
+    project = prefix_name(domain.name, ctx, nesting_cfg)
+    network = prefix_name(domain.network_name, ctx, nesting_cfg)
+
+    instances = [
+        {
+            "name": i.name,
+            "status": i.status,
+            "type": i.type,
+            "profiles": i.profiles,
+            "config": {k: v for k, v in i.config.items() if not k.startswith("volatile.")},
+            "devices": i.devices,
+        }
+        for i in sorted(state.instance_list(project), key=lambda i: i.name)
+    ]
+    return _digest(
+        {
+            "project": state.project_exists(project),
+            "network": state.network_exists(network, project),
+            "profiles": sorted(state.profile_list(project)),
+            "instances": instances,
+        }
+    )
+
+
+def load_apply_state(project_dir: Path) -> dict[str, DomainApplyState]:
+    """Lit `.anklume/state.json`. Fichier absent ou illisible → état vide."""
+    path = state_path(project_dir)
+    if not path.exists():
+        return {}
+    try:
+        raw = json.loads(path.read_text())
+        if not isinstance(raw, dict) or raw.get("version") != STATE_VERSION:
+            return {}
+        return {name: DomainApplyState(**entry) for name, entry in raw["domains"].items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.warning("État d'apply illisible (%s) : %s — apply complet", path, e)
+        return {}
+
+
+def save_apply_state(project_dir: Path, domains: dict[str, DomainApplyState]) -> None:
+    """Écrit `.anklume/state.json` (remplacement atomique)."""
+    path = state_path(project_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": STATE_VERSION,
+        "domains": {name: dataclasses.asdict(domains[name]) for name in sorted(domains)},
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2) + "\n")
+    tmp.replace(path)
+
+
+def unchanged_domains(
+    infra: Infrastructure,
+    state: IncusStateSnapshot,
+    previous: dict[str, DomainApplyState],
+    ctx: NestingContext | None = None,
+) -> set[str]:
+    """Domaines activés dont le hash et l'empreinte live sont inchangés."""
+    unchanged: set[str] = set()
+    for domain in infra.enabled_domains:
+        entry = previous.get(domain.name)
+        if entry is None or entry.hash != domain_hash(domain, infra):
+            continue
+        if entry.fingerprint == live_fingerprint(domain, infra, state, ctx):
+            unchanged.add(domain.name)
+    return unchanged
+
+
+def record_apply(
+    previous: dict[str, DomainApplyState],
+    infra: Infrastructure,
+    state: IncusStateSnapshot,
+    failed: set[str],
+    executed: dict[str, int],
+    ctx: NestingContext | None = None,
+) -> dict[str, DomainApplyState]:
+    """Met à jour l'état après un apply.
+
+    Args:
+        infra: domaines réconciliés lors de cet apply.
+        state: état Incus réel après l'apply.
+        failed: domaines en erreur — retirés, ils seront replanifiés.
+        executed: nombre d'actions exécutées par domaine.
+    """
+    now = datetime.now(tz=UTC).isoformat(timespec="seconds")
+    updated = dict(previous)
+    for domain in infra.enabled_domains:
+        if domain.name in failed:
+            updated.pop(domain.name, None)
+            continue
+        updated[domain.name] = DomainApplyState(
+            hash=domain_hash(domain, infra),
+            fingerprint=live_fingerprint(domain, infra, state, ctx),
+            applied_at=now,
+            actions=executed.get(domain.name, 0),
+        )
+    return updated
@@ -7,13 +7,18 @@ utilise ce driver, jamais subprocess directement.
 from __future__ import annotations
 
 import json
+import os
 import re
 import subprocess
 from dataclasses import dataclass, field
+from typing import Any
 
 _SAFE_NAME = re.compile(r"^[a-z0-9]([a-z0-9._-]*[a-z0-9])?$")
 _SAFE_IMAGE_REF = re.compile(r"^[a-z0-9][a-z0-9./:_-]*$")
 
+INCUS_BACKENDS = ("cli", "rest")
+INCUS_BACKEND_ENV = "ANKLUME_INCUS_BACKEND"
+
 
 def _validate_name(value: str) -> None:
     """Rejette les noms contenant des caractères dangereux."""
@@ -22,6 +27,15 @@ def _validate_name(value: str) -> None:
         raise ValueError(msg)
 
 
+def _device_entries(devices: dict[str, dict]) -> dict[str, dict[str, str]]:
+    """Devices au format Incus : valeurs en chaînes, `type` obligatoire."""
+    return {
+        name: {"type": str(cfg.get("type", "none"))}
+        | {k: str(v) for k, v in cfg.items() if k != "type"}
+        for name, cfg in devices.items()
+    }
+
+
 class IncusError(Exception):
     """Erreur lors d'un appel à la CLI Incus."""
 
@@ -79,6 +93,135 @@ class IncusInstance:
     profiles: list[str] = field(default_factory=list)
     config: dict = field(default_factory=dict)
     devices: dict = field(default_factory=dict)
+    expanded_devices: dict = field(default_factory=dict)  # devices + profils
+    # Snapshots embarqués (lecture `recursion=2`) ; None = non lus.
+    snapshots: list[IncusSnapshot] | None = None
+
+    @property
+    def storage_pool(self) -> str:
+        """Pool de stockage du disque racine ("" si inconnu)."""
+        for device in {**self.expanded_devices, **self.devices}.values():
+            if device.get("type") == "disk" and device.get("path") == "/":
+                return device.get("pool", "")
+        return ""
+
+
+@dataclass
+class IncusOperation:
+    """Handle d'une opération Incus lancée en arrière-plan.
+
+    `id` est le chemin `/1.0/operations/<uuid>` ; vide si l'opération
+    était déjà terminée à la soumission (backend CLI, réponse synchrone).
+    """
+
+    description: str
+    id: str = ""
+    status: str = "Success"  # "Running" | "Success" | "Failure" | "Cancelled"
+    err: str = ""
+
+    @property
+    def done(self) -> bool:
+        return self.status != "Running"
+
+    @property
+    def success(self) -> bool:
+        return self.status == "Success"
+
+
+@dataclass
+class IncusStateSnapshot:
+    """Photo de l'état Incus (projets, réseaux, profils, instances) en une passe.
+
+    Les planificateurs lisent cette photo au lieu d'interroger le driver
+    domaine par domaine. Les méthodes reprennent celles du driver :
+    `network_list(project)` retourne ce que `incus network list --project`
+    afficherait (réseaux du projet default si `features.networks` est off).
+    """
+
+    projects: list[IncusProject] = field(default_factory=list)
+    networks: dict[str, list[IncusNetwork]] = field(default_factory=dict)
+    profiles: dict[str, list[str]] = field(default_factory=dict)
+    instances: dict[str, list[IncusInstance]] = field(default_factory=dict)
+
+    @property
+    def project_names(self) -> set[str]:
+        return {p.name for p in self.projects}
+
+    def project_exists(self, name: str) -> bool:
+        return any(p.name == name for p in self.projects)
+
+    def network_list(self, project: str) -> list[IncusNetwork]:
+        return self.networks.get(project, [])
+
+    def network_exists(self, name: str, project: str) -> bool:
+        return any(n.name == name for n in self.network_list(project))
+
+    def profile_list(self, project: str) -> list[str]:
+        return self.profiles.get(project, [])
+
+    def profile_exists(self, name: str, project: str) -> bool:
+        return name in self.profile_list(project)
+
+    def instance_list(self, project: str) -> list[IncusInstance]:
+        return self.instances.get(project, [])
+
+
+def _feature_scope(project: dict, feature: str) -> str:
+    """Projet effectif d'une ressource : le projet lui-même ou default."""
+    name = project["name"]
+    if name == "default" or project.get("config", {}).get(feature) == "true":
+        return name
+    return "default"
+
+
+def build_state_snapshot(
+    projects: list[dict],
+    networks: list[dict],
+    profiles: list[dict],
+    instances: list[dict],
+) -> IncusStateSnapshot:
+    """Construit un IncusStateSnapshot depuis les réponses brutes de l'API.
+
+    Les listes réseaux/profils/instances proviennent de requêtes
+    `all-projects=true` : chaque objet porte son champ `project`.
+    """
+    own_networks: dict[str, list[IncusNetwork]] = {}
+    for n in networks:
+        own_networks.setdefault(n.get("project") or "default", []).append(
+            IncusNetwork(name=n["name"], type=n.get("type", "bridge"), config=n.get("config", {}))
+        )
+
+    own_profiles: dict[str, list[str]] = {}
+    for p in profiles:
+        own_profiles.setdefault(p.get("project") or "default", []).append(p["name"])
+
+    snapshot = IncusStateSnapshot()
+    for i in instances:
+        project = i.get("project") or "default"
+        snapshot.instances.setdefault(project, []).append(
+            IncusInstance(
+                name=i["name"],
+                status=i.get("status", "Unknown"),
+                type=i.get("type", "container"),
+                project=project,
+                profiles=i.get("profiles", []),
+                config=i.get("config", {}),
+                devices=i.get("devices", {}),
+                expanded_devices=i.get("expanded_devices", {}),
+                snapshots=[
+                    IncusSnapshot(name=snap["name"], created_at=snap.get("created_at", ""))
+                    for snap in i.get("snapshots") or []
+                ],
+            )
+        )
+
+    for p in projects:
+        name = p["name"]
+        snapshot.projects.append(IncusProject(name=name, description=p.get("description", "")))
+        snapshot.networks[name] = own_networks.get(_feature_scope(p, "features.networks"), [])
+        snapshot.profiles[name] = own_profiles.get(_feature_scope(p, "features.profiles"), [])
+
+    return snapshot
 
 
 class IncusDriver:
@@ -87,6 +230,9 @@ class IncusDriver:
     Toutes les méthodes encapsulent un appel subprocess vers `incus`.
     """
 
+    # Les méthodes *_async rendent la main avant la fin de l'opération
+    supports_async = False
+
     def _run(
         self,
         args: list[str],
@@ -119,6 +265,27 @@ class IncusDriver:
                 ["incus", *cmd], 0, f"JSON invalide: {e}\nSortie: {result.stdout[:500]}"
             ) from None
 
+    def query(self, path: str) -> Any:
+        """GET brut sur l'API Incus via `incus query` (retourne les métadonnées)."""
+        result = self._run(["query", path])
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError as e:
+            raise IncusError(
+                ["incus", "query", path],
+                0,
+                f"JSON invalide: {e}\nSortie: {result.stdout[:500]}",
+            ) from None
+
+    def state_snapshot(self) -> IncusStateSnapshot:
+        """Lit tout l'état Incus en quatre requêtes, tous projets confondus."""
+        return build_state_snapshot(
+            self.query("/1.0/projects?recursion=1"),
+            self.query("/1.0/networks?recursion=1&all-projects=true"),
+            self.query("/1.0/profiles?recursion=1&all-projects=true"),
+            self.query("/1.0/instances?recursion=2&all-projects=true"),
+        )
+
     # --- Projets ---
 
     def project_list(self) -> list[IncusProject]:
@@ -180,10 +347,17 @@ class IncusDriver:
                 profiles=i.get("profiles", []),
                 config=i.get("config", {}),
                 devices=i.get("devices", {}),
+                expanded_devices=i.get("expanded_devices", {}),
             )
             for i in data
         ]
 
+    def instance_state(self, name: str, project: str) -> dict:
+        """État d'exécution d'une instance (cpu, memory, network — API state)."""
+        _validate_name(name)
+        _validate_name(project)
+        return self.query(f"/1.0/instances/{name}/state?project={project}")
+
     def instance_create(
         self,
         name: str,
@@ -193,7 +367,14 @@ class IncusDriver:
         profiles: list[str] | None = None,
         config: dict | None = None,
         network: str | None = None,
+        *,
+        devices: dict[str, dict] | None = None,
     ) -> None:
+        """Crée une instance complète (config, devices, profils, réseau) en un appel.
+
+        Config et devices sont passés sur stdin (JSON, lu comme du YAML
+        par `incus init`) plutôt qu'en `-c clé=valeur` répétés.
+        """
         _validate_name(name)
         _validate_name(project)
         if not _SAFE_IMAGE_REF.match(image):
@@ -206,9 +387,15 @@ class IncusDriver:
             args.extend(["--network", network])
         for profile in profiles or []:
             args.extend(["-p", profile])
-        for key, value in (config or {}).items():
-            args.extend(["-c", f"{key}={value}"])
-        self._run(args)
+        body = None
+        if config or devices:
+            body = json.dumps(
+                {
+                    "config": {k: str(v) for k, v in (config or {}).items()},
+                    "devices": _device_entries(devices or {}),
+                }
+            )
+        self._run(args, input=body)
 
     def instance_start(self, name: str, project: str) -> None:
         self._run(["start", name, "--project", project])
@@ -216,9 +403,54 @@ class IncusDriver:
     def instance_stop(self, name: str, project: str) -> None:
         self._run(["stop", name, "--project", project])
 
-    def instance_delete(self, name: str, project: str) -> None:
+    def instance_delete(self, name: str, project: str, *, force: bool = False) -> None:
+        """Supprime une instance. `force` : arrêt forcé si elle tourne (`delete --force`)."""
         _validate_name(name)
-        self._run(["delete", name, "--project", project])
+        cmd = ["delete", name, "--project", project]
+        if force:
+            cmd.append("--force")
+        self._run(cmd)
+
+    # --- Opérations asynchrones ---
+
+    def instance_create_async(
+        self,
+        name: str,
+        project: str,
+        image: str,
+        instance_type: str = "container",
+        profiles: list[str] | None = None,
+        config: dict | None = None,
+        network: str | None = None,
+        *,
+        devices: dict[str, dict] | None = None,
+    ) -> IncusOperation:
+        """Lance la création d'une instance et retourne son opération.
+
+        Le backend CLI attend la fin de `incus init` : l'opération
+        retournée est déjà terminée.
+        """
+        self.instance_create(
+            name, project, image, instance_type, profiles, config, network, devices=devices
+        )
+        return IncusOperation(description=f"create {project}/{name}")
+
+    def instance_start_async(self, name: str, project: str) -> IncusOperation:
+        """Lance le démarrage d'une instance et retourne son opération."""
+        self.instance_start(name, project)
+        return IncusOperation(description=f"start {project}/{name}")
+
+    def wait_all(
+        self,
+        operations: list[IncusOperation],
+        timeout: float | None = None,
+    ) -> list[IncusOperation]:
+        """Attend un lot d'opérations (délai global `timeout` en secondes).
+
+        Met à jour `status`/`err` de chaque opération et retourne la liste.
+        Une opération encore en cours à l'échéance garde `status="Running"`.
+        """
+        return operations
 
     # --- Snapshots ---
 
@@ -237,7 +469,20 @@ class IncusDriver:
         self._run(["snapshot", "delete", instance, name, "--project", project])
 
     def instance_config_set(self, instance: str, project: str, key: str, value: str) -> None:
-        self._run(["config", "set", instance, f"{key}={value}", "--project", project])
+        self.instance_config_update(instance, project, {key: value})
+
+    def instance_config_update(
+        self, instance: str, project: str, config: dict[str, str | None]
+    ) -> None:
+        """Positionne plusieurs clés de config d'une instance en un appel.
+
+        Une valeur None retire la clé (`incus config unset`, une par clé).
+        """
+        pairs = [f"{k}={v}" for k, v in config.items() if v is not None]
+        if pairs:
+            self._run(["config", "set", instance, *pairs, "--project", project])
+        for key in (k for k, v in config.items() if v is None):
+            self._run(["config", "unset", instance, key, "--project", project])
 
     def network_delete(self, name: str, project: str) -> None:
         self._run(["network", "delete", name, "--project", project])
@@ -255,9 +500,29 @@ class IncusDriver:
     def profile_exists(self, name: str, project: str) -> bool:
         return name in self.profile_list(project)
 
-    def profile_create(self, name: str, project: str) -> None:
+    def profile_create(
+        self,
+        name: str,
+        project: str,
+        *,
+        config: dict[str, str] | None = None,
+        devices: dict[str, dict] | None = None,
+    ) -> None:
+        """Crée un profil, config et devices compris, en un seul appel.
+
+        Les devices sont des dicts de config contenant leur `type`.
+        Le contenu est passé sur stdin (JSON, lu comme du YAML par Incus).
+        """
         _validate_name(name)
-        self._run(["profile", "create", name, "--project", project])
+        body = None
+        if config or devices:
+            body = json.dumps(
+                {
+                    "config": {k: str(v) for k, v in (config or {}).items()},
+                    "devices": _device_entries(devices or {}),
+                }
+            )
+        self._run(["profile", "create", name, "--project", project], input=body)
 
     def profile_device_add(
         self,
@@ -273,15 +538,42 @@ class IncusDriver:
             args.append(f"{key}={value}")
         self._run(args)
 
+    def profile_devices_add(
+        self,
+        profile: str,
+        devices: dict[str, dict],
+        *,
+        project: str,
+    ) -> None:
+        """Ajoute plusieurs devices à un profil : une lecture, une écriture.
+
+        Les devices sont des dicts de config contenant leur `type`.
+        """
+        if not devices:
+            return
+        current = self.profile_show(profile, project)
+        existing = current.get("devices") or {}
+        for name in devices:
+            if name in existing:
+                raise IncusError(["profile", "edit", profile], 1, f"Le device {name} existe déjà")
+        body = {
+            "description": current.get("description", ""),
+            "config": current.get("config") or {},
+            "devices": existing | _device_entries(devices),
+        }
+        self._run(["profile", "edit", profile, "--project", project], input=json.dumps(body))
+
     def profile_config_set(
         self,
         profile: str,
         project: str,
         config: dict[str, str],
     ) -> None:
-        """Positionne des clés de config sur un profil."""
-        for key, value in config.items():
-            self._run(["profile", "set", profile, key, value, "--project", project])
+        """Positionne des clés de config sur un profil (un seul appel)."""
+        if not config:
+            return
+        pairs = [f"{k}={v}" for k, v in config.items()]
+        self._run(["profile", "set", profile, *pairs, "--project", project])
 
     def instance_profile_add(
         self,
@@ -292,6 +584,10 @@ class IncusDriver:
         """Ajoute un profil à une instance existante."""
         self._run(["profile", "add", instance, profile, "--project", project])
 
+    def instance_profiles_set(self, instance: str, project: str, profiles: list[str]) -> None:
+        """Remplace la liste ordonnée des profils d'une instance (un appel)."""
+        self._run(["profile", "assign", instance, ",".join(profiles), "--project", project])
+
     def instance_profile_remove(
         self,
         instance: str,
@@ -309,15 +605,7 @@ class IncusDriver:
         """Retourne la config complète d'un profil (JSON via API)."""
         _validate_name(name)
         _validate_name(project)
-        result = self._run(["query", f"/1.0/profiles/{name}?project={project}"])
-        try:
-            return json.loads(result.stdout)
-        except json.JSONDecodeError as e:
-            raise IncusError(
-                ["incus", "query", f"/1.0/profiles/{name}"],
-                0,
-                f"JSON invalide: {e}\nSortie: {result.stdout[:500]}",
-            ) from None
+        return self.query(f"/1.0/profiles/{name}?project={project}")
 
     def storage_pool_list(self) -> list[str]:
         """Liste les noms des storage pools."""
@@ -487,3 +775,20 @@ class IncusDriver:
         """
         args = ["exec", instance, "--project", project, "--", *command]
         return self._run(args, input=input, check=check, timeout=timeout)
+
+
+def make_driver(backend: str | None = None) -> IncusDriver:
+    """Instancie le driver Incus du backend demandé.
+
+    ``ANKLUME_INCUS_BACKEND`` prime sur ``backend`` (champ ``incus_backend``
+    de anklume.yml). Défaut : "cli".
+    """
+    chosen = os.environ.get(INCUS_BACKEND_ENV) or backend or "cli"
+    if chosen == "cli":
+        return IncusDriver()
+    if chosen == "rest":
+        from anklume.engine.incus_rest import IncusRestDriver
+
+        return IncusRestDriver()
+    msg = f"Backend Incus inconnu : {chosen!r} (valeurs : {', '.join(INCUS_BACKENDS)})"
+    raise ValueError(msg)
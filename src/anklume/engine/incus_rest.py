@@ -0,0 +1,573 @@
+"""Driver Incus REST — API /1.0 sur le socket unix local.
+
+Alternative au driver CLI : mêmes méthodes publiques que IncusDriver,
+mais chaque appel est une requête HTTP sur une connexion keep-alive
+vers ``/var/lib/incus/unix.socket`` au lieu d'un fork de ``incus``.
+
+Les opérations à flux (exec, file push/pull, publish) restent déléguées
+à la CLI via la classe parente.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import math
+import os
+import socket
+import threading
+import time
+from typing import Any
+from urllib.parse import quote, urlencode
+
+from anklume.engine.incus_driver import (
+    _SAFE_IMAGE_REF,
+    IncusDriver,
+    IncusError,
+    IncusImage,
+    IncusInstance,
+    IncusNetwork,
+    IncusOperation,
+    IncusProject,
+    IncusSnapshot,
+    _device_entries,
+    _validate_name,
+)
+
+DEFAULT_SOCKET = "/var/lib/incus/unix.socket"
+
+# Champs modifiables d'une instance, renvoyés tels quels lors d'un PUT.
+_INSTANCE_WRITABLE = (
+    "architecture",
+    "config",
+    "devices",
+    "ephemeral",
+    "profiles",
+    "stateful",
+    "description",
+)
+
+# Méthodes rejouables sans effet de bord après une coupure de connexion.
+_IDEMPOTENT_METHODS = frozenset({"GET", "PUT"})
+
+# Connexion keep-alive fermée par Incus entre deux requêtes.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+# Remotes d'images connus de la CLI par défaut (incus remote list).
+# Une image sur un remote absent de cette table passe par la CLI.
+_IMAGE_REMOTES: dict[str, tuple[str, str]] = {
+    "images": ("https://images.linuxcontainers.org", "simplestreams"),
+}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Connexion HTTP/1.1 (keep-alive) sur un socket unix."""
+
+    def __init__(self, socket_path: str, timeout: float | None = None) -> None:
+        super().__init__("incus", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def _url(*segments: str, **query: str | int | None) -> str:
+    """Construit un chemin /1.0/... avec segments échappés et query string."""
+    path = "/1.0/" + "/".join(quote(s, safe="") for s in segments)
+    params = {k.replace("_", "-"): v for k, v in query.items() if v is not None}
+    if params:
+        path += "?" + urlencode(params)
+    return path
+
+
+def _image_source(image: str) -> dict | None:
+    """Traduit une référence `remote:alias` en source d'image REST.
+
+    Retourne None si le remote n'est pas connu (délégation à la CLI).
+    """
+    remote, sep, alias = image.partition(":")
+    if not sep:
+        return {"type": "image", "alias": image}
+    if remote not in _IMAGE_REMOTES:
+        return None
+    server, protocol = _IMAGE_REMOTES[remote]
+    return {
+        "type": "image",
+        "mode": "pull",
+        "server": server,
+        "protocol": protocol,
+        "alias": alias,
+    }
+
+
+class IncusRestDriver(IncusDriver):
+    """Interface typée vers l'API REST Incus (socket unix local).
+
+    Une connexion keep-alive par thread : les appels concurrents ne
+    partagent jamais un même flux HTTP.
+    """
+
+    supports_async = True
+
+    def __init__(self, socket_path: str | None = None, *, timeout: float | None = None) -> None:
+        self.socket_path = socket_path or os.environ.get("INCUS_SOCKET") or DEFAULT_SOCKET
+        self.timeout = timeout
+        self._local = threading.local()
+
+    # --- Transport ---
+
+    def _connection(self) -> _UnixHTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Ferme la connexion du thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _send(self, method: str, path: str, payload: str | None) -> tuple[int, str, bytes]:
+        """Envoie une requête brute ; rouvre une fois une connexion keep-alive expirée.
+
+        La requête n'est rejouée que si elle n'a pas pu partir, ou si la
+        méthode est idempotente : un POST/PATCH/DELETE peut avoir été
+        exécuté par Incus avant la coupure.
+        """
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        retry = True
+        while True:
+            conn = self._connection()
+            sent = False
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                return response.status, response.reason, response.read()
+            except OSError as e:
+                self.close()
+                stale = isinstance(e, _STALE_CONNECTION_ERRORS)
+                if stale and retry and (not sent or method in _IDEMPOTENT_METHODS):
+                    retry = False
+                    continue
+                if sent:
+                    message = f"Connexion Incus interrompue, requête non rejouée : {e}"
+                else:
+                    message = f"Socket Incus injoignable ({self.socket_path}) : {e}"
+                raise IncusError([method, path], 1, message) from None
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> dict:
+        """Envoie une requête et retourne l'enveloppe JSON de la réponse."""
+        payload = json.dumps(body) if body is not None else None
+        status, reason, raw = self._send(method, path, payload)
+
+        try:
+            envelope = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            raise IncusError(
+                [method, path], status, f"JSON invalide: {e}\nSortie: {raw[:500]!r}"
+            ) from None
+
+        if envelope.get("type") == "error" or status >= 400:
+            code = envelope.get("error_code") or status
+            raise IncusError([method, path], code, envelope.get("error") or reason)
+        return envelope
+
+    def _wait_operation(self, operation: str) -> dict:
+        """Attend la fin d'une opération asynchrone et retourne ses métadonnées."""
+        envelope = self._request("GET", f"{operation}/wait?timeout=-1")
+        op = envelope.get("metadata") or {}
+        if op.get("status") != "Success":
+            raise IncusError(["WAIT", operation], 1, op.get("err") or op.get("status", ""))
+        return op
+
+    def _call(self, method: str, path: str, body: dict | None = None) -> Any:
+        """Requête synchrone ; une opération asynchrone est attendue jusqu'au bout."""
+        envelope = self._request(method, path, body)
+        if envelope.get("type") == "async":
+            return self._wait_operation(envelope["operation"])
+        return envelope.get("metadata") or {}
+
+    def query(self, path: str) -> Any:
+        """GET brut sur l'API Incus (retourne les métadonnées)."""
+        return self._call("GET", path)
+
+    # --- Projets ---
+
+    def project_list(self) -> list[IncusProject]:
+        data = self._call("GET", _url("projects", recursion=1))
+        return [IncusProject(name=p["name"], description=p.get("description", "")) for p in data]
+
+    def project_create(self, name: str, description: str = "") -> None:
+        _validate_name(name)
+        body = {
+            "name": name,
+            "description": description,
+            "config": {"features.images": "false", "features.profiles": "false"},
+        }
+        self._call("POST", _url("projects"), body)
+
+    def project_delete(self, name: str) -> None:
+        self._call("DELETE", _url("projects", name))
+
+    # --- Réseaux ---
+
+    def network_list(self, project: str) -> list[IncusNetwork]:
+        data = self._call("GET", _url("networks", recursion=1, project=project))
+        return [
+            IncusNetwork(
+                name=n["name"],
+                type=n.get("type", "bridge"),
+                config=n.get("config", {}),
+            )
+            for n in data
+        ]
+
+    def network_create(self, name: str, project: str, config: dict | None = None) -> None:
+        _validate_name(name)
+        _validate_name(project)
+        body = {
+            "name": name,
+            "type": "bridge",
+            "config": {k: str(v) for k, v in (config or {}).items()},
+        }
+        self._call("POST", _url("networks", project=project), body)
+
+    def network_delete(self, name: str, project: str) -> None:
+        self._call("DELETE", _url("networks", name, project=project))
+
+    # --- Instances ---
+
+    def instance_list(self, project: str) -> list[IncusInstance]:
+        data = self._call("GET", _url("instances", recursion=1, project=project))
+        return [
+            IncusInstance(
+                name=i["name"],
+                status=i.get("status", "Unknown"),
+                type=i.get("type", "container"),
+                project=project,
+                profiles=i.get("profiles", []),
+                config=i.get("config", {}),
+                devices=i.get("devices", {}),
+                expanded_devices=i.get("expanded_devices", {}),
+            )
+            for i in data
+        ]
+
+    def _instance_create_body(
+        self,
+        name: str,
+        project: str,
+        image: str,
+        instance_type: str,
+        profiles: list[str] | None,
+        config: dict | None,
+        network: str | None,
+        devices: dict[str, dict] | None = None,
+    ) -> dict | None:
+        """Corps de POST /1.0/instances ; None si l'image exige la CLI.
+
+        Le corps décrit l'instance complète : l'instance est créée
+        configurée en une seule opération.
+        """
+        _validate_name(name)
+        _validate_name(project)
+        if not _SAFE_IMAGE_REF.match(image):
+            msg = f"Référence image invalide : {image!r}"
+            raise ValueError(msg)
+        source = _image_source(image)
+        if source is None:
+            return None
+        entries: dict[str, dict] = {}
+        if network:
+            entries["eth0"] = {"type": "nic", "network": network, "name": "eth0"}
+        entries |= _device_entries(devices or {})
+        return {
+            "name": name,
+            "type": instance_type,
+            "source": source,
+            "profiles": profiles or ["default"],
+            "config": {k: str(v) for k, v in (config or {}).items()},
+            "devices": entries,
+        }
+
+    def instance_create(
+        self,
+        name: str,
+        project: str,
+        image: str,
+        instance_type: str = "container",
+        profiles: list[str] | None = None,
+        config: dict | None = None,
+        network: str | None = None,
+        *,
+        devices: dict[str, dict] | None = None,
+    ) -> None:
+        args = (name, project, image, instance_type, profiles, config, network)
+        body = self._instance_create_body(*args, devices)
+        if body is None:
+            super().instance_create(*args, devices=devices)
+            return
+        self._call("POST", _url("instances", project=project), body)
+
+    def _instance_state(self, name: str, project: str, action: str, *, force: bool = False) -> None:
+        body = {"action": action, "timeout": -1, "force": force}
+        self._call("PUT", _url("instances", name, "state", project=project), body)
+
+    def instance_start(self, name: str, project: str) -> None:
+        self._instance_state(name, project, "start")
+
+    def instance_stop(self, name: str, project: str) -> None:
+        self._instance_state(name, project, "stop")
+
+    def instance_delete(self, name: str, project: str, *, force: bool = False) -> None:
+        """Supprime une instance. `force` : arrêt forcé préalable, comme `incus delete --force`."""
+        _validate_name(name)
+        if force:
+            data = self._call("GET", _url("instances", name, project=project))
+            if data.get("status") != "Stopped":
+                self._instance_state(name, project, "stop", force=True)
+        self._call("DELETE", _url("instances", name, project=project))
+
+    def instance_config_update(
+        self, instance: str, project: str, config: dict[str, str | None]
+    ) -> None:
+        """Positionne plusieurs clés de config d'une instance (une seule écriture).
+
+        Une valeur None retire la clé : PATCH fusionne sans supprimer,
+        l'instance est alors relue puis réécrite (PUT).
+        """
+        if not config:
+            return
+        path = _url("instances", instance, project=project)
+        if all(v is not None for v in config.values()):
+            self._call("PATCH", path, {"config": {k: str(v) for k, v in config.items()}})
+            return
+        current = self._call("GET", path)
+        merged = dict(current.get("config", {}))
+        for key, value in config.items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = str(value)
+        body = {k: current[k] for k in _INSTANCE_WRITABLE if k in current}
+        body["config"] = merged
+        self._call("PUT", path, body)
+
+    def instance_profiles_set(self, instance: str, project: str, profiles: list[str]) -> None:
+        """Remplace la liste ordonnée des profils d'une instance (un PATCH)."""
+        self._call("PATCH", _url("instances", instance, project=project), {"profiles": profiles})
+
+    def _instance_profiles(self, instance: str, project: str) -> list[str]:
+        data = self._call("GET", _url("instances", instance, project=project))
+        return list(data.get("profiles", []))
+
+    def instance_profile_add(self, instance: str, profile: str, project: str) -> None:
+        """Ajoute un profil à une instance existante."""
+        profiles = self._instance_profiles(instance, project)
+        if profile in profiles:
+            return
+        body = {"profiles": [*profiles, profile]}
+        self._call("PATCH", _url("instances", instance, project=project), body)
+
+    def instance_profile_remove(self, instance: str, profile: str, project: str) -> None:
+        """Retire un profil d'une instance existante."""
+        profiles = self._instance_profiles(instance, project)
+        if profile not in profiles:
+            raise IncusError(
+                ["PATCH", _url("instances", instance, project=project)],
+                1,
+                f"Profil {profile} absent de l'instance {instance}",
+            )
+        body = {"profiles": [p for p in profiles if p != profile]}
+        self._call("PATCH", _url("instances", instance, project=project), body)
+
+    # --- Opérations asynchrones ---
+
+    def _submit(self, method: str, path: str, body: dict, description: str) -> IncusOperation:
+        """Soumet une requête sans attendre l'opération qu'elle lance."""
+        envelope = self._request(method, path, body)
+        if envelope.get("type") == "async":
+            return IncusOperation(description, id=envelope["operation"], status="Running")
+        return IncusOperation(description)
+
+    def instance_create_async(
+        self,
+        name: str,
+        project: str,
+        image: str,
+        instance_type: str = "container",
+        profiles: list[str] | None = None,
+        config: dict | None = None,
+        network: str | None = None,
+        *,
+        devices: dict[str, dict] | None = None,
+    ) -> IncusOperation:
+        args = (name, project, image, instance_type, profiles, config, network)
+        body = self._instance_create_body(*args, devices)
+        if body is None:
+            return super().instance_create_async(*args, devices=devices)
+        path = _url("instances", project=project)
+        return self._submit("POST", path, body, f"create {project}/{name}")
+
+    def instance_start_async(self, name: str, project: str) -> IncusOperation:
+        body = {"action": "start", "timeout": -1, "force": False}
+        path = _url("instances", name, "state", project=project)
+        return self._submit("PUT", path, body, f"start {project}/{name}")
+
+    def wait_all(
+        self,
+        operations: list[IncusOperation],
+        timeout: float | None = None,
+    ) -> list[IncusOperation]:
+        """Attend chaque opération via /1.0/operations/<id>/wait.
+
+        Les opérations tournent en parallèle côté Incus : attendre la
+        première couvre déjà une partie des suivantes, le total est borné
+        par la plus lente (ou par `timeout`).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for op in operations:
+            if op.done:
+                continue
+            wait_timeout = -1
+            if deadline is not None:
+                wait_timeout = max(0, math.ceil(deadline - time.monotonic()))
+            try:
+                envelope = self._request("GET", f"{op.id}/wait?timeout={wait_timeout}")
+            except IncusError as e:
+                op.status, op.err = "Failure", e.stderr
+                continue
+            meta = envelope.get("metadata") or {}
+            op.status = meta.get("status", "Failure")
+            op.err = meta.get("err", "")
+            if op.status == "Running":
+                op.err = f"Délai d'attente dépassé ({timeout}s)"
+        return operations
+
+    # --- Snapshots ---
+
+    def snapshot_create(self, instance: str, project: str, name: str) -> None:
+        _validate_name(name)
+        body = {"name": name}
+        self._call("POST", _url("instances", instance, "snapshots", project=project), body)
+
+    def snapshot_restore(self, instance: str, project: str, name: str) -> None:
+        body = {"restore": name}
+        self._call("PUT", _url("instances", instance, project=project), body)
+
+    def snapshot_list(self, instance: str, project: str) -> list[IncusSnapshot]:
+        data = self._call(
+            "GET", _url("instances", instance, "snapshots", recursion=1, project=project)
+        )
+        return [IncusSnapshot(name=s["name"], created_at=s.get("created_at", "")) for s in data]
+
+    def snapshot_delete(self, instance: str, project: str, name: str) -> None:
+        self._call("DELETE", _url("instances", instance, "snapshots", name, project=project))
+
+    # --- Profils ---
+
+    def profile_list(self, project: str) -> list[str]:
+        """Liste les noms de profils dans un projet."""
+        data = self._call("GET", _url("profiles", recursion=1, project=project))
+        return [p["name"] for p in data]
+
+    def profile_create(
+        self,
+        name: str,
+        project: str,
+        *,
+        config: dict[str, str] | None = None,
+        devices: dict[str, dict] | None = None,
+    ) -> None:
+        """Crée un profil, config et devices compris (une seule requête)."""
+        _validate_name(name)
+        body: dict[str, Any] = {"name": name}
+        if config:
+            body["config"] = {k: str(v) for k, v in config.items()}
+        if devices:
+            body["devices"] = _device_entries(devices)
+        self._call("POST", _url("profiles", project=project), body)
+
+    def profile_device_add(
+        self,
+        profile: str,
+        device: str,
+        dtype: str,
+        config: dict[str, str] | None = None,
+        *,
+        project: str,
+    ) -> None:
+        self.profile_devices_add(
+            profile, {device: {**(config or {}), "type": dtype}}, project=project
+        )
+
+    def profile_devices_add(
+        self,
+        profile: str,
+        devices: dict[str, dict],
+        *,
+        project: str,
+    ) -> None:
+        """Ajoute plusieurs devices à un profil : une lecture, un PATCH."""
+        if not devices:
+            return
+        path = _url("profiles", profile, project=project)
+        current = self._call("GET", path)
+        for name in devices:
+            if name in current.get("devices", {}):
+                raise IncusError(["PATCH", path], 1, f"Le device {name} existe déjà")
+        self._call("PATCH", path, {"devices": _device_entries(devices)})
+
+    def profile_config_set(
+        self,
+        profile: str,
+        project: str,
+        config: dict[str, str],
+    ) -> None:
+        """Positionne des clés de config sur un profil (une seule requête)."""
+        if not config:
+            return
+        body = {"config": {k: str(v) for k, v in config.items()}}
+        self._call("PATCH", _url("profiles", profile, project=project), body)
+
+    def profile_delete(self, name: str, project: str) -> None:
+        """Supprime un profil d'un projet."""
+        self._call("DELETE", _url("profiles", name, project=project))
+
+    def storage_pool_list(self) -> list[str]:
+        """Liste les noms des storage pools."""
+        data = self._call("GET", _url("storage-pools", recursion=1))
+        return [p["name"] for p in data]
+
+    # --- Info ---
+
+    def host_resources(self) -> dict:
+        """Retourne les ressources hardware de l'hôte (GET /1.0/resources)."""
+        return self._call("GET", _url("resources"))
+
+    # --- Images ---
+
+    def image_list(self, project: str = "default") -> list[IncusImage]:
+        """Liste les images Incus du projet."""
+        data = self._call("GET", _url("images", recursion=1, project=project))
+        return [
+            IncusImage(
+                fingerprint=img.get("fingerprint", ""),
+                aliases=[a.get("name", "") for a in img.get("aliases") or []],
+                size=img.get("size", 0),
+                created_at=img.get("created_at", ""),
+            )
+            for img in data
+        ]
+
+    def image_delete(self, fingerprint: str, project: str = "default") -> None:
+        """Supprime une image par fingerprint."""
+        self._call("DELETE", _url("images", fingerprint, project=project))
@@ -17,6 +17,7 @@ from anklume.engine.ai import (
     find_ollama_machine,
 )
 from anklume.engine.gpu import GpuInfo, detect_gpu
+from anklume.engine.gpu_telemetry import GpuSample, GpuTelemetry
 from anklume.engine.llm_routing import (
     LLM_CONSUMER_ROLES,
     resolve_llm_endpoint,
@@ -42,6 +43,7 @@ class LlmStatus:
     machines: list[LlmMachineStatus] = field(default_factory=list)
     ollama_status: str = "injoignable"
     ollama_models: list[str] = field(default_factory=list)
+    telemetry: GpuSample | None = None  # utilisation, puissance, processus GPU
 
 
 @dataclass
@@ -55,9 +57,17 @@ class BenchResult:
     tokens_per_s: float
 
 
-def compute_llm_status(infra: Infrastructure) -> LlmStatus:
+def compute_llm_status(
+    infra: Infrastructure,
+    *,
+    telemetry: GpuTelemetry | None = None,
+) -> LlmStatus:
     """Vue LLM dédiée : GPU, machines consommatrices, état Ollama."""
     gpu_info = detect_gpu()
+    sample = None
+    if gpu_info.detected:
+        telemetry = telemetry or GpuTelemetry()
+        sample = telemetry.latest() or telemetry.sample_once()
     machines: list[LlmMachineStatus] = []
 
     for domain in infra.enabled_domains:
@@ -94,6 +104,7 @@ def compute_llm_status(infra: Infrastructure) -> LlmStatus:
         machines=machines,
         ollama_status=ollama_status,
         ollama_models=models,
+        telemetry=sample,
     )
 
 
@@ -63,6 +63,70 @@ if set(TRUST_COLORS) != set(TRUST_LEVELS):
 MACHINE_TYPES = {"lxc", "vm"}
 PROTOCOLS = {"tcp", "udp"}
 
+PortInterval = tuple[int, int]
+
+
+def port_range(entry: object) -> PortInterval | None:
+    """Bornes d'une entrée de `ports` : 80 -> (80, 80), "8000-8100" -> (8000, 8100).
+
+    None si l'entrée n'est ni un port ni une plage valide (1-65535).
+    """
+    if isinstance(entry, bool):
+        return None
+    if isinstance(entry, int):
+        low = high = entry
+    elif isinstance(entry, str) and entry.count("-") == 1:
+        first, last = (part.strip() for part in entry.split("-"))
+        if not (first.isdigit() and last.isdigit()):
+            return None
+        low, high = int(first), int(last)
+    else:
+        return None
+    if not 1 <= low <= high <= 65535:
+        return None
+    return (low, high)
+
+
+def merge_port_intervals(intervals: list[PortInterval]) -> list[PortInterval]:
+    """Union triée ; les intervalles qui se chevauchent ou se touchent fusionnent."""
+    merged: list[PortInterval] = []
+    for low, high in sorted(intervals):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def subtract_port_intervals(
+    intervals: list[PortInterval], covered: list[PortInterval]
+) -> list[PortInterval]:
+    """Parties de `intervals` hors de `covered` (union triée)."""
+    rest: list[PortInterval] = []
+    for low, high in intervals:
+        for c_low, c_high in covered:
+            if c_high < low or c_low > high:
+                continue
+            if c_low > low:
+                rest.append((low, c_low - 1))
+            low = c_high + 1
+            if low > high:
+                break
+        if low <= high:
+            rest.append((low, high))
+    return rest
+
+
+def format_port_intervals(intervals: list[PortInterval]) -> str:
+    """Syntaxe nft : `22, 80-81, 443`."""
+    return ", ".join(str(low) if low == high else f"{low}-{high}" for low, high in intervals)
+
+
+def port_entries(intervals: list[PortInterval]) -> list[int | str]:
+    """Entrées de `ports` équivalentes : entiers et plages `"8000-8100"`."""
+    return [low if low == high else f"{low}-{high}" for low, high in intervals]
+
+
 SCHEMA_VERSION = 1
 
 
@@ -133,10 +197,18 @@ class Policy:
     description: str
     from_target: str
     to_target: str
-    ports: list[int] | str = field(default_factory=list)
+    ports: list[int | str] | str = field(default_factory=list)  # 80, "8000-8100" ou "all"
     protocol: str = "tcp"
     bidirectional: bool = False
 
+    @property
+    def port_intervals(self) -> list[PortInterval]:
+        """Ports de la liste en intervalles fusionnés (vide pour `all` et `[]`)."""
+        if not isinstance(self.ports, list):
+            return []
+        ranges = [port_range(entry) for entry in self.ports]
+        return merge_port_intervals([r for r in ranges if r is not None])
+
 
 @dataclass
 class AddressingConfig:
@@ -186,6 +258,36 @@ class ResourcePolicyConfig:
     overcommit: bool = False
 
 
+@dataclass
+class SnapshotRetention:
+    """Rétention des snapshots anklume-* (0 = règle désactivée).
+
+    Règles appliquées par instance et par phase (pre, post, snap).
+    """
+
+    keep_last: int = 0  # N plus récents
+    keep_daily: int = 0  # le plus récent de chacun des N derniers jours
+    keep_weekly: int = 0  # le plus récent de chacune des N dernières semaines
+    max_age_days: int = 0  # supprimés au-delà, même s'ils sont gardés par une règle
+
+    @property
+    def has_keep_rules(self) -> bool:
+        return bool(self.keep_last or self.keep_daily or self.keep_weekly)
+
+    @property
+    def enabled(self) -> bool:
+        return self.has_keep_rules or bool(self.max_age_days)
+
+
+@dataclass
+class SnapshotConfig:
+    """Configuration des snapshots automatiques."""
+
+    pool_concurrency: int = 4  # snapshots simultanés par pool de stockage
+    retention: SnapshotRetention = field(default_factory=SnapshotRetention)
+    auto_prune: bool = False  # élaguer après les snapshots post-apply
+
+
 @dataclass
 class GpuPolicyConfig:
     """Configuration de la politique GPU."""
@@ -193,6 +295,15 @@ class GpuPolicyConfig:
     policy: str = "exclusive"  # "exclusive" ou "shared"
 
 
+@dataclass
+class NftablesConfig:
+    """Configuration de la génération nftables."""
+
+    mode: str = "linear"  # "linear" (une règle par allow) | "optimized" (maps)
+    counters: bool = False  # compteurs nommés par politique et par bridge
+    merge_policies: bool = False  # générer depuis les politiques minimales
+
+
 @dataclass
 class GlobalConfig:
     """Configuration globale du projet anklume."""
@@ -205,7 +316,10 @@ class GlobalConfig:
     gpu_policy: GpuPolicyConfig | None = None
     ai_access_policy: str = "exclusive"  # "exclusive" | "open"
     network_passthrough: bool = False  # laisser passer le trafic non-anklume
+    nftables: NftablesConfig = field(default_factory=NftablesConfig)
     requires_anklume: str | None = None  # version minimale requise (ex: "0.2.0")
+    incus_backend: str = "cli"  # "cli" (subprocess) | "rest" (socket unix)
+    snapshots: SnapshotConfig = field(default_factory=SnapshotConfig)
 
 
 @dataclass
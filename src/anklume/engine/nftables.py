@@ -4,18 +4,45 @@ Produit un ruleset nftables complet :
 - Table dédiée `inet anklume` (isolée des autres règles)
 - Forward chain drop-all + allow sélectif
 - Intra-domaine autorisé, inter-domaines bloqué sauf politiques
+
+Deux modes (`nftables.mode` dans anklume.yml) :
+- `linear` : une règle par domaine et par sens de politique ;
+- `optimized` : les allows sont compilés en verdict maps nommées,
+  une recherche par famille de clé au lieu d'un parcours linéaire.
+
+Avec `nftables.counters: true`, chaque politique et chaque bridge
+intra-domaine compte son trafic dans un compteur nommé
+(`policy_<n>`, `intra_<domaine>`), lu par `anklume network stats`.
+
+Avec `nftables.merge_policies: true`, les politiques masquées ou en
+doublon sont omises et celles de mêmes extrémités fusionnées
+(`engine/policy_analysis.py`) ; les numéros restent ceux de policies.yml.
 """
 
 from __future__ import annotations
 
+import itertools
 import logging
-from dataclasses import dataclass
-
-from anklume.engine.models import Infrastructure, Policy
+from dataclasses import dataclass, field
+
+from anklume.engine.models import (
+    Infrastructure,
+    Policy,
+    PortInterval,
+    format_port_intervals,
+    merge_port_intervals,
+    subtract_port_intervals,
+)
+from anklume.engine.policy_analysis import merged_policies
 from anklume.engine.tor import find_tor_gateways
 
 log = logging.getLogger(__name__)
 
+NFTABLES_MODES = ("linear", "optimized")
+
+_ANY_IPV4 = "0.0.0.0/0"
+_ANY_PORT = "0-65535"
+
 
 @dataclass
 class _ResolvedTarget:
@@ -28,61 +55,243 @@ class _ResolvedTarget:
     domain_name: str | None = None
 
 
-def generate_ruleset(infra: Infrastructure) -> str:
+@dataclass
+class NftMap:
+    """Map nommée : clés formatées en syntaxe nft -> verdict ou nom de compteur."""
+
+    name: str
+    types: tuple[str, ...]
+    interval: bool = False
+    value: str = "verdict"  # "verdict" ou "counter" (map d'objets)
+    elements: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class NftChain:
+    """Chaîne de base : en-tête et lignes (règles, commentaires, vides)."""
+
+    name: str
+    type: str
+    hook: str
+    priority: str  # valeur ou nom symbolique ("0", "dstnat")
+    policy: str
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def rules(self) -> list[str]:
+        """Règles effectives, sans commentaires ni lignes vides."""
+        return [line for line in self.lines if line and not line.startswith("#")]
+
+
+@dataclass
+class NftRuleset:
+    """Contenu de la table `inet anklume`."""
+
+    counters: list[str] = field(default_factory=list)
+    maps: list[NftMap] = field(default_factory=list)
+    chains: list[NftChain] = field(default_factory=list)
+
+    def render(self) -> str:
+        """Script `nft -f` complet : suppression puis recréation de la table.
+
+        `delete table` (et non `flush`) retire aussi les chaînes, maps et
+        compteurs nommés qui ne sont plus désirés. La déclaration vide
+        qui précède rend la suppression valide si la table est absente.
+        """
+        lines: list[str] = []
+
+        lines.append("#!/usr/sbin/nft -f")
+        lines.append("# Généré par anklume — sera écrasé au prochain deploy")
+        lines.append("")
+        lines.append("table inet anklume")
+        lines.append("delete table inet anklume")
+        lines.append("")
+        lines.append("table inet anklume {")
+        for name in self.counters:
+            lines.append(f"    counter {name} {{}}")
+        if self.counters:
+            lines.append("")
+        for nft_map in self.maps:
+            lines.append(f"    map {nft_map.name} {{")
+            lines.append(f"        type {' . '.join(nft_map.types)} : {nft_map.value}")
+            if nft_map.interval:
+                lines.append("        flags interval")
+            lines.append("        elements = {")
+            for i, (key, value) in enumerate(nft_map.elements.items()):
+                sep = "," if i < len(nft_map.elements) - 1 else ""
+                lines.append(f"            {key} : {value}{sep}")
+            lines.append("        }")
+            lines.append("    }")
+            lines.append("")
+        for i, chain in enumerate(self.chains):
+            if i:
+                lines.append("")
+            lines.append(f"    chain {chain.name} {{")
+            lines.append(
+                f"        type {chain.type} hook {chain.hook} priority {chain.priority}; "
+                f"policy {chain.policy};"
+            )
+            lines.extend(f"        {line}" if line else "" for line in chain.lines)
+            lines.append("    }")
+        lines.append("}")
+        lines.append("")
+
+        return "\n".join(lines)
+
+
+def generate_ruleset(
+    infra: Infrastructure,
+    *,
+    mode: str | None = None,
+    counters: bool | None = None,
+) -> str:
     """Génère le ruleset nftables complet depuis l'infrastructure.
 
     Fonction pure : prend une Infrastructure (avec adresses assignées),
-    retourne le ruleset nftables sous forme de string.
+    retourne le ruleset nftables sous forme de string. `mode` et
+    `counters` remplacent `infra.config.nftables`.
     """
-    lines: list[str] = []
+    return build_ruleset(infra, mode=mode, counters=counters).render()
 
-    lines.append("#!/usr/sbin/nft -f")
-    lines.append("# Généré par anklume — sera écrasé au prochain deploy")
-    lines.append("")
-    lines.append("table inet anklume")
-    lines.append("flush table inet anklume")
-    lines.append("")
-    lines.append("table inet anklume {")
-    lines.append("    chain forward {")
-    lines.append("        type filter hook forward priority 0; policy drop;")
+
+def policy_counter(index: int) -> str:
+    """Nom du compteur de la politique n° `index` (1-based, ordre de policies.yml)."""
+    return f"policy_{index}"
+
+
+def intra_counter(domain: str) -> str:
+    """Nom du compteur intra-domaine (`-` interdit hors guillemets dans nft)."""
+    return f"intra_{domain.replace('-', '_')}"
+
+
+def _counter_order(name: str) -> tuple[int, int, str]:
+    """intra_* par nom, puis policy_<n> dans l'ordre de policies.yml."""
+    prefix, _, suffix = name.partition("_")
+    if prefix == "policy" and suffix.isdigit():
+        return (1, int(suffix), "")
+    return (0, 0, name)
+
+
+def effective_policies(infra: Infrastructure) -> dict[int, Policy]:
+    """Politiques générées, par numéro (1-based) dans policies.yml."""
+    if infra.config.nftables.merge_policies:
+        return merged_policies(infra)
+    return dict(enumerate(infra.policies, start=1))
+
+
+def counter_labels(infra: Infrastructure) -> dict[str, str]:
+    """Nom de compteur -> libellé lisible (domaine ou politique)."""
+    labels = {intra_counter(d.name): f"intra-domaine {d.name}" for d in infra.enabled_domains}
+    for index, policy in effective_policies(infra).items():
+        arrow = "↔" if policy.bidirectional else "→"
+        labels[policy_counter(index)] = (
+            f"{policy.from_target} {arrow} {policy.to_target} ({policy.description})"
+        )
+    return labels
+
+
+def build_ruleset(
+    infra: Infrastructure,
+    *,
+    mode: str | None = None,
+    counters: bool | None = None,
+) -> NftRuleset:
+    """Construit le contenu structuré de la table (compteurs, maps, chaînes).
+
+    `counters` remplace `infra.config.nftables.counters`.
+    """
+    mode = mode or infra.config.nftables.mode
+    if mode not in NFTABLES_MODES:
+        msg = f"Mode nftables inconnu : {mode!r} (valeurs : {', '.join(NFTABLES_MODES)})"
+        raise ValueError(msg)
+    optimized = mode == "optimized"
+    counted = infra.config.nftables.counters if counters is None else counters
+    declared: dict[str, None] = {}  # compteurs référencés, ordre d'apparition
+
+    forward = NftChain("forward", "filter", "forward", "0", "drop")
+    lines = forward.lines
     lines.append("")
-    lines.append("        # Connexions établies/reliées")
-    lines.append("        ct state established,related accept")
+    lines.append("# Connexions établies/reliées")
+    lines.append("ct state established,related accept")
 
     # Passthrough pour le trafic non-anklume (Docker, libvirt, bridges manuels)
     if infra.config.network_passthrough:
         lines.append("")
-        lines.append("        # Trafic hors anklume : ne pas interférer")
-        lines.append('        iifname != "net-*" oifname != "net-*" accept')
+        lines.append("# Trafic hors anklume : ne pas interférer")
+        lines.append('iifname != "net-*" oifname != "net-*" accept')
 
     # Index full_name -> resolved target (O(1) au lieu de O(M*K) par policy)
     machine_index = _build_machine_index(infra)
+    enabled = infra.enabled_domains
+    maps = _VerdictMaps()
 
     # Intra-domaine
-    enabled = infra.enabled_domains
-    if enabled:
+    if optimized:
+        for domain in enabled:
+            counter = intra_counter(domain.name) if counted else None
+            maps.bridges.setdefault((domain.network_name, domain.network_name), counter)
+    elif enabled:
         lines.append("")
-        lines.append("        # --- Trafic intra-domaine ---")
+        lines.append("# --- Trafic intra-domaine ---")
         for domain in enabled:
             net = domain.network_name
-            lines.append(f'        iifname "{net}" oifname "{net}" accept')
+            counter = intra_counter(domain.name) if counted else None
+            lines.append(f'iifname "{net}" oifname "{net}" {_accept(counter)}')
+            if counter:
+                declared[counter] = None
 
     # Politiques inter-domaines
-    if infra.policies:
+    policies = effective_policies(infra)
+    # Sans compteurs, un seul set de ports par (source, destination, protocole)
+    port_sets: dict[tuple, tuple[int, list[PortInterval]]] = {}
+    if policies:
         lines.append("")
-        lines.append("        # --- Politiques inter-domaines ---")
-        for policy in infra.policies:
-            _append_policy_rules(policy, infra, lines, machine_index)
-
-    lines.append("    }")
+        lines.append("# --- Politiques inter-domaines ---")
+        for index, policy in policies.items():
+            counter = policy_counter(index) if counted else None
+            directions = _resolve_policy(policy, infra, lines, machine_index)
+            for src, dst in directions:
+                if optimized:
+                    maps.add(src, dst, policy, counter)
+                    continue
+                key = (src.bridge, src.ip, dst.bridge, dst.ip, policy.protocol)
+                mergeable = counter is None and isinstance(policy.ports, list) and policy.ports
+                if mergeable and key in port_sets:
+                    position, ports = port_sets[key]
+                    ports = merge_port_intervals(ports + policy.port_intervals)
+                    port_sets[key] = (position, ports)
+                    lines[position] = _build_forward_rule(src, dst, policy, ports=ports)
+                    lines.append("# [fusionnée] ports ajoutés au set de même source et destination")
+                    continue
+                lines.append(_build_forward_rule(src, dst, policy, counter))
+                if mergeable:
+                    port_sets[key] = (len(lines) - 1, policy.port_intervals)
+                if counter:
+                    declared[counter] = None
+
+    compiled: list[NftMap] = []
+    if optimized and maps:
+        compiled = maps.to_maps(counters=counted)
+        lines.append("")
+        lines.append("# --- Allows compilés (intra-domaine et politiques) ---")
+        for name, key in maps.lookups():
+            if counted:
+                lines.append(f"counter name {key} map @{_COUNTER_MAP_PREFIX}{name}")
+            lines.append(f"{key} vmap @{name}")
+        for nft_map in compiled:
+            if nft_map.value == "counter":
+                declared.update(dict.fromkeys(v.strip('"') for v in nft_map.elements.values()))
+
+    ruleset = NftRuleset(
+        counters=sorted(declared, key=_counter_order), maps=compiled, chains=[forward]
+    )
 
     # Routage transparent Tor (DNAT prerouting)
-    _append_tor_rules(infra, lines, machine_index)
-
-    lines.append("}")
-    lines.append("")
+    prerouting = _tor_chain(infra, machine_index)
+    if prerouting is not None:
+        ruleset.chains.append(prerouting)
 
-    return "\n".join(lines)
+    return ruleset
 
 
 def _build_machine_index(infra: Infrastructure) -> dict[str, _ResolvedTarget]:
@@ -121,54 +330,68 @@ def _resolve_target(
     return machine_index.get(target)
 
 
-def _append_policy_rules(
+def _resolve_policy(
     policy: Policy,
     infra: Infrastructure,
     lines: list[str],
     machine_index: dict[str, _ResolvedTarget],
-) -> None:
-    """Ajoute les règles nftables d'une politique aux lignes."""
+) -> list[tuple[_ResolvedTarget, _ResolvedTarget]]:
+    """Résout une politique en sens (source, destination) à autoriser.
+
+    Ajoute aux lignes la description de la politique et, si elle n'est
+    pas appliquée, la raison en commentaire.
+    """
     src = _resolve_target(policy.from_target, infra, machine_index)
     dst = _resolve_target(policy.to_target, infra, machine_index)
 
-    lines.append(f"        # {policy.description}")
+    lines.append(f"# {policy.description}")
 
     # Cible non résolue : commentaire d'avertissement + log warning
     if src is None:
         log.warning("Politique ignorée : cible '%s' (from) non résolue", policy.from_target)
-        lines.append(f"        # [erreur] cible '{policy.from_target}' non résolue")
-        return
+        lines.append(f"# [erreur] cible '{policy.from_target}' non résolue")
+        return []
     if dst is None:
         log.warning("Politique ignorée : cible '%s' (to) non résolue", policy.to_target)
-        lines.append(f"        # [erreur] cible '{policy.to_target}' non résolue")
-        return
+        lines.append(f"# [erreur] cible '{policy.to_target}' non résolue")
+        return []
 
     # Politiques hôte : commentaire informatif uniquement
     if src.is_host or dst.is_host:
         direction = f"{policy.from_target} → {policy.to_target}"
-        lines.append(f"        # [hôte] {direction} — trafic hôte libre, règle non appliquée")
-        return
+        lines.append(f"# [hôte] {direction} — trafic hôte libre, règle non appliquée")
+        return []
 
     # Domaine désactivé : commentaire informatif
     if src.is_disabled:
-        lines.append(f"        # [ignoré] domaine '{src.domain_name}' désactivé")
-        return
+        lines.append(f"# [ignoré] domaine '{src.domain_name}' désactivé")
+        return []
     if dst.is_disabled:
-        lines.append(f"        # [ignoré] domaine '{dst.domain_name}' désactivé")
-        return
+        lines.append(f"# [ignoré] domaine '{dst.domain_name}' désactivé")
+        return []
 
-    # Règle forward
-    rule = _build_forward_rule(src, dst, policy)
-    lines.append(f"        {rule}")
-
-    # Bidirectionnel : règle inverse
+    # Bidirectionnel : sens inverse
     if policy.bidirectional:
-        reverse = _build_forward_rule(dst, src, policy)
-        lines.append(f"        {reverse}")
+        return [(src, dst), (dst, src)]
+    return [(src, dst)]
+
+
+def _accept(counter: str | None) -> str:
+    return f'counter name "{counter}" accept' if counter else "accept"
+
 
+def _build_forward_rule(
+    src: _ResolvedTarget,
+    dst: _ResolvedTarget,
+    policy: Policy,
+    counter: str | None = None,
+    *,
+    ports: list[PortInterval] | None = None,
+) -> str:
+    """Construit une règle nftables forward.
 
-def _build_forward_rule(src: _ResolvedTarget, dst: _ResolvedTarget, policy: Policy) -> str:
-    """Construit une règle nftables forward."""
+    `ports` remplace les ports de la politique (set fusionné).
+    """
     parts: list[str] = []
 
     if src.bridge:
@@ -181,28 +404,229 @@ def _build_forward_rule(src: _ResolvedTarget, dst: _ResolvedTarget, policy: Poli
         parts.append(f"ip daddr {dst.ip}")
 
     if isinstance(policy.ports, list) and policy.ports:
-        port_list = ", ".join(str(p) for p in sorted(policy.ports))
-        parts.append(f"{policy.protocol} dport {{ {port_list} }}")
+        port_set = format_port_intervals(ports or policy.port_intervals)
+        parts.append(f"{policy.protocol} dport {{ {port_set} }}")
     elif policy.ports == "all":
         parts.append(f"meta l4proto {policy.protocol}")
 
-    parts.append("accept")
+    parts.append(_accept(counter))
     return " ".join(parts)
 
 
-def _append_tor_rules(
+# Verdict maps du mode optimisé : (nom, type des clés, sélecteur).
+# Les politiques ciblant une machine filtrent sur `ip saddr/daddr` (IPv4
+# uniquement, comme en mode linéaire) : elles ont leurs propres maps pour
+# que le trafic IPv6 entre bridges reste couvert par les maps sans IP.
+# Sans port, pas de `th dport` : tous les protocoles sont acceptés.
+_MAP_SPECS = (
+    ("fwd_bridges", ("ifname", "ifname"), "iifname . oifname"),
+    (
+        "fwd_ports",
+        ("ifname", "ifname", "inet_proto", "inet_service"),
+        "iifname . oifname . meta l4proto . th dport",
+    ),
+    (
+        "fwd_hosts",
+        ("ifname", "ifname", "ipv4_addr", "ipv4_addr"),
+        "iifname . oifname . ip saddr . ip daddr",
+    ),
+    (
+        "fwd_host_ports",
+        ("ifname", "ifname", "ipv4_addr", "ipv4_addr", "inet_proto", "inet_service"),
+        "iifname . oifname . ip saddr . ip daddr . meta l4proto . th dport",
+    ),
+)
+
+# Maps d'objets (clé -> compteur) parallèles aux verdict maps
+_COUNTER_MAP_PREFIX = "cnt_"
+
+# Champs pouvant valoir None (joker : tout réseau IPv4, tout port)
+_WILDCARD_TYPES = {"ipv4_addr": _ANY_IPV4, "inet_service": _ANY_PORT}
+
+_MapKey = tuple[str | PortInterval | None, ...]
+
+
+@dataclass
+class _VerdictMaps:
+    """Éléments des verdict maps -> compteur du premier allow qui les produit."""
+
+    bridges: dict[_MapKey, str | None] = field(default_factory=dict)
+    ports: dict[_MapKey, str | None] = field(default_factory=dict)
+    hosts: dict[_MapKey, str | None] = field(default_factory=dict)
+    host_ports: dict[_MapKey, str | None] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any(self._elements())
+
+    def _elements(self) -> tuple[dict[_MapKey, str | None], ...]:
+        return (self.bridges, self.ports, self.hosts, self.host_ports)
+
+    def add(
+        self,
+        src: _ResolvedTarget,
+        dst: _ResolvedTarget,
+        policy: Policy,
+        counter: str | None = None,
+    ) -> None:
+        """Ajoute un sens de politique (mêmes correspondances que `_build_forward_rule`)."""
+        dports: list[PortInterval | None] | None
+        if isinstance(policy.ports, list) and policy.ports:
+            dports = list(policy.port_intervals)
+        elif policy.ports == "all":
+            dports = [None]
+        else:
+            dports = None  # aucun filtre de protocole
+
+        bridges = (src.bridge, dst.bridge)
+        if src.ip or dst.ip:
+            if dports is None:
+                self.hosts.setdefault((*bridges, src.ip, dst.ip), counter)
+            for port in dports or []:
+                key = (*bridges, src.ip, dst.ip, policy.protocol, port)
+                self.host_ports.setdefault(key, counter)
+        else:
+            if dports is None:
+                self.bridges.setdefault(bridges, counter)
+            for port in dports or []:
+                self.ports.setdefault((*bridges, policy.protocol, port), counter)
+
+    def lookups(self) -> list[tuple[str, str]]:
+        """(nom, sélecteur) des maps non vides, dans l'ordre de déclaration."""
+        return [
+            (name, selector)
+            for (name, _, selector), elements in zip(_MAP_SPECS, self._elements(), strict=True)
+            if elements
+        ]
+
+    def to_maps(self, *, counters: bool = False) -> list[NftMap]:
+        """Maps non vides, ports compactés, éléments couverts retirés.
+
+        Avec `counters`, chaque verdict map a sa map d'objets `cnt_<nom>`
+        (mêmes clés -> compteur nommé).
+        """
+        maps: list[NftMap] = []
+        for (name, types, _), elements in zip(_MAP_SPECS, self._elements(), strict=True):
+            if not elements:
+                continue
+            elements = _prune_covered(_compact_ports(elements, types), types)
+            kept = {_format_key(k, types): k for k in elements}
+            interval = any(t in _WILDCARD_TYPES for t in types)
+            maps.append(NftMap(name, types, interval, elements=dict.fromkeys(kept, "accept")))
+            if counters:
+                values = {text: f'"{elements[key]}"' for text, key in kept.items()}
+                maps.append(
+                    NftMap(f"{_COUNTER_MAP_PREFIX}{name}", types, interval, "counter", values)
+                )
+        return maps
+
+
+def _format_key(key: _MapKey, types: tuple[str, ...]) -> str:
+    parts: list[str] = []
+    for value, kind in zip(key, types, strict=True):
+        if value is None:
+            parts.append(_WILDCARD_TYPES[kind])
+        elif isinstance(value, tuple):
+            parts.append(format_port_intervals([value]))
+        elif kind == "ifname":
+            parts.append(f'"{value}"')
+        else:
+            parts.append(str(value))
+    return " . ".join(parts)
+
+
+def _compact_ports(
+    elements: dict[_MapKey, str | None], types: tuple[str, ...]
+) -> dict[_MapKey, str | None]:
+    """Fusionne les intervalles de ports d'une même clé en intervalles disjoints.
+
+    Seuls les intervalles d'un même compteur sont fusionnés ; une partie
+    déjà couverte compte pour le premier allow qui la produit.
+    """
+    if "inet_service" not in types:
+        return elements
+    slot = types.index("inet_service")
+    claimed: dict[_MapKey, list[PortInterval]] = {}  # préfixe -> ports déjà placés
+    pieces: dict[tuple[_MapKey, str | None], list[PortInterval]] = {}
+    compacted: dict[_MapKey, str | None] = {}
+    for key, counter in elements.items():
+        port = key[slot]
+        if port is None:
+            compacted[key] = counter
+            continue
+        prefix = key[:slot] + key[slot + 1 :]
+        taken = claimed.setdefault(prefix, [])
+        rest = subtract_port_intervals([port], taken)
+        claimed[prefix] = merge_port_intervals([*taken, port])
+        pieces.setdefault((prefix, counter), []).extend(rest)
+    for (prefix, counter), intervals in pieces.items():
+        for interval in merge_port_intervals(intervals):
+            compacted[(*prefix[:slot], interval, *prefix[slot:])] = counter
+    return compacted
+
+
+def _prune_covered(
+    elements: dict[_MapKey, str | None], types: tuple[str, ...]
+) -> dict[_MapKey, str | None]:
+    """Retire les éléments couverts par un élément plus large de la map.
+
+    Le noyau refuse un intervalle dont une borne tombe dans un élément
+    existant : un port précis et `ports: all` entre les mêmes bridges
+    ne peuvent pas coexister. L'élément le plus large suffit. Une plage
+    de ports en partie couverte par un élément sans IP est réduite à la
+    partie restante.
+    """
+    present = set(elements)
+    slots = [i for i, kind in enumerate(types) if kind in _WILDCARD_TYPES]
+    port = types.index("inet_service") if "inet_service" in types else None
+    # Préfixe (clé sans port) -> intervalles de ports présents
+    ranges: dict[_MapKey, list[PortInterval]] = {}
+    if port is not None:
+        for key in elements:
+            if key[port] is not None:
+                ranges.setdefault(key[:port] + key[port + 1 :], []).append(key[port])
+
+    kept: dict[_MapKey, str | None] = {}
+    for key, counter in elements.items():
+        concrete = [i for i in slots if key[i] is not None]
+        if any(_widen(key, widened) in present for widened in _subsets(concrete)):
+            continue
+        if port is None or key[port] is None:
+            kept[key] = counter
+            continue
+        # Plages couvertes par une clé élargie sur les adresses
+        addresses = [i for i in concrete if i != port]
+        covering = [
+            interval
+            for widened in _subsets(addresses)
+            for interval in ranges.get(_widen(key, widened)[:port] + key[port + 1 :], [])
+        ]
+        for interval in subtract_port_intervals([key[port]], merge_port_intervals(covering)):
+            kept[(*key[:port], interval, *key[port + 1 :])] = counter
+    return kept
+
+
+def _subsets(slots: list[int]) -> itertools.chain[tuple[int, ...]]:
+    """Sous-ensembles non vides des champs à élargir."""
+    return itertools.chain.from_iterable(
+        itertools.combinations(slots, n) for n in range(1, len(slots) + 1)
+    )
+
+
+def _widen(key: _MapKey, widened: tuple[int, ...]) -> _MapKey:
+    return tuple(None if i in widened else v for i, v in enumerate(key))
+
+
+def _tor_chain(
     infra: Infrastructure,
-    lines: list[str],
     machine_index: dict[str, _ResolvedTarget],
-) -> None:
-    """Ajoute les règles DNAT prerouting pour le routage transparent Tor."""
+) -> NftChain | None:
+    """Chaîne DNAT prerouting pour le routage transparent Tor."""
     gateways = find_tor_gateways(infra)
     if not gateways:
-        return
+        return None
 
-    lines.append("")
-    lines.append("    chain prerouting {")
-    lines.append("        type nat hook prerouting priority dstnat; policy accept;")
+    chain = NftChain("prerouting", "nat", "prerouting", "dstnat", "accept")
+    lines = chain.lines
 
     for gw in gateways:
         resolved = machine_index.get(gw.instance)
@@ -212,7 +636,7 @@ def _append_tor_rules(
                 "Tor gateway '%s' : pas d'IP assignée, règles DNAT ignorées",
                 gw.instance,
             )
-            lines.append(f"        # [erreur] Tor gateway '{gw.instance}' sans IP")
+            lines.append(f"# [erreur] Tor gateway '{gw.instance}' sans IP")
             continue
 
         domain = infra.domains.get(gw.domain)
@@ -220,14 +644,12 @@ def _append_tor_rules(
             continue
 
         net = domain.network_name
-        lines.append(f"        # Tor transparent : {gw.domain} -> {gw.instance}")
+        lines.append(f"# Tor transparent : {gw.domain} -> {gw.instance}")
         lines.append(
-            f'        iifname "{net}" ip saddr != {gw_ip} '
-            f"tcp dport 1-65535 dnat to {gw_ip}:{gw.trans_port}"
+            f'iifname "{net}" ip saddr != {gw_ip} tcp dport 1-65535 dnat to {gw_ip}:{gw.trans_port}'
         )
         lines.append(
-            f'        iifname "{net}" ip saddr != {gw_ip} '
-            f"udp dport 53 dnat to {gw_ip}:{gw.dns_port}"
+            f'iifname "{net}" ip saddr != {gw_ip} udp dport 53 dnat to {gw_ip}:{gw.dns_port}'
         )
 
-    lines.append("    }")
+    return chain
@@ -0,0 +1,340 @@
+"""Déploiement différentiel de la table `inet anklume`.
+
+Le ruleset complet commence par `delete table inet anklume` : chaque
+deploy reconstruit la table et remet ses compteurs à zéro, pour un
+coût qui croît avec le nombre de règles. Ici, la table vivante
+(`nft -j list table inet anklume`) est comparée au ruleset désiré :
+
+- règles : texte décodé depuis les expressions JSON, comparé comme un
+  multi-ensemble par chaîne ; les règles en trop sont supprimées par
+  handle, les manquantes insérées à leur position dans le rendu
+  (`insert rule ... position <handle>` avant la règle gardée suivante,
+  sinon en fin de chaîne). Toutes les règles générées sont des
+  `accept` : l'ordre ne change pas le verdict, mais il décide du
+  compteur nommé qui compte un paquet quand des politiques se
+  recouvrent. Si les règles gardées ne sont plus dans l'ordre du rendu,
+  la table est rechargée ;
+- éléments des maps : clés ajoutées, retirées ou dont la valeur change ;
+- compteurs nommés : ajoutés ou retirés, les autres gardent leur valeur.
+
+Le delta est appliqué en une seule transaction `nft -f` (atomique).
+Une règle dont une expression n'est pas reconnue est simplement
+remplacée. Si la structure diffère (table absente, chaînes ou maps
+ajoutées, retirées ou modifiées, objets inconnus), le delta est un
+rechargement complet.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from anklume.engine.nftables import NftRuleset
+
+TABLE = "inet anklume"
+
+_SINGLE_SET = re.compile(r"\{ ([^,{}]+) \}")
+
+# Sélecteurs décodés depuis le JSON (left d'un match, clés de vmap)
+_META_KEYS = {"iifname": "iifname", "oifname": "oifname", "l4proto": "meta l4proto"}
+_QUOTED = {"iifname", "oifname"}
+
+
+@dataclass
+class LiveTable:
+    """Table `inet anklume` lue depuis `nft -j`."""
+
+    chains: dict[str, tuple[str, str, int, str]] = field(default_factory=dict)
+    counters: list[str] = field(default_factory=list)
+    # map -> (types, intervalle, "verdict" | "counter")
+    maps: dict[str, tuple[tuple[str, ...], bool, str]] = field(default_factory=dict)
+    elements: dict[str, dict[str, str]] = field(default_factory=dict)  # map -> clé -> valeur
+    # chaîne -> [(règle décodée ou None, handle)]
+    rules: dict[str, list[tuple[str | None, int]]] = field(default_factory=dict)
+    unknown: list[str] = field(default_factory=list)  # objets non gérés
+
+
+@dataclass
+class NftablesDelta:
+    """Changements à appliquer pour passer de la table vivante au désiré."""
+
+    full_reload: bool = False
+    reason: str = ""
+    rules_added: list[tuple[str, str]] = field(default_factory=list)  # (chaîne, règle)
+    # (chaîne, handle de la règle gardée qui suit, règle)
+    rules_inserted: list[tuple[str, int, str]] = field(default_factory=list)
+    rules_removed: list[tuple[str, int]] = field(default_factory=list)  # (chaîne, handle)
+    elements_added: list[tuple[str, str, str]] = field(default_factory=list)  # (map, clé, valeur)
+    elements_removed: list[tuple[str, str]] = field(default_factory=list)  # (map, clé)
+    counters_added: list[str] = field(default_factory=list)
+    counters_removed: list[str] = field(default_factory=list)
+
+    @classmethod
+    def reload(cls, reason: str) -> NftablesDelta:
+        return cls(full_reload=True, reason=reason)
+
+    @property
+    def empty(self) -> bool:
+        return not (
+            self.full_reload
+            or self.rules_added
+            or self.rules_inserted
+            or self.rules_removed
+            or self.elements_added
+            or self.elements_removed
+            or self.counters_added
+            or self.counters_removed
+        )
+
+    def script(self, ruleset: NftRuleset) -> str:
+        """Script `nft -f` : ruleset complet ou delta (une transaction)."""
+        if self.full_reload:
+            return ruleset.render()
+        lines = ["#!/usr/sbin/nft -f", "# Delta anklume — appliqué en une transaction"]
+        # Retraits d'abord : un élément élargi ne doit pas chevaucher l'ancien,
+        # un compteur n'est supprimé qu'une fois plus référencé
+        for chain, handle in self.rules_removed:
+            lines.append(f"delete rule {TABLE} {chain} handle {handle}")
+        for name, key in self.elements_removed:
+            lines.append(f"delete element {TABLE} {name} {{ {key} }}")
+        for name in self.counters_removed:
+            lines.append(f"delete counter {TABLE} {name}")
+        for name in self.counters_added:
+            lines.append(f"add counter {TABLE} {name}")
+        for name, key, value in self.elements_added:
+            lines.append(f"add element {TABLE} {name} {{ {key} : {value} }}")
+        for chain, handle, rule in self.rules_inserted:
+            lines.append(f"insert rule {TABLE} {chain} position {handle} {rule}")
+        for chain, rule in self.rules_added:
+            lines.append(f"add rule {TABLE} {chain} {rule}")
+        lines.append("")
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        if self.empty:
+            return "aucun changement"
+        if self.full_reload:
+            return f"rechargement complet ({self.reason})"
+        summary = (
+            f"delta : +{len(self.rules_added) + len(self.rules_inserted)}"
+            f"/-{len(self.rules_removed)} règle(s), "
+            f"+{len(self.elements_added)}/-{len(self.elements_removed)} élément(s)"
+        )
+        if self.counters_added or self.counters_removed:
+            summary += f", +{len(self.counters_added)}/-{len(self.counters_removed)} compteur(s)"
+        return summary
+
+
+# ---------------------------------------------------------------------------
+# Lecture de `nft -j list table inet anklume`
+# ---------------------------------------------------------------------------
+
+
+def parse_live_table(data: dict) -> LiveTable:
+    """Décode la sortie JSON de nft (objets `chain`, `counter`, `map`, `rule`)."""
+    live = LiveTable()
+    for obj in data.get("nftables", []):
+        kind, body = next(iter(obj.items()))
+        if kind in ("metainfo", "table"):
+            continue
+        if kind == "chain":
+            live.chains[body["name"]] = (
+                body.get("type", ""),
+                body.get("hook", ""),
+                int(body.get("prio", 0)),
+                body.get("policy", ""),
+            )
+            live.rules.setdefault(body["name"], [])
+        elif kind == "counter":
+            live.counters.append(body["name"])
+        elif kind == "map" and body.get("map") in ("verdict", "counter"):
+            types = body["type"]
+            types = tuple(types) if isinstance(types, list) else (types,)
+            live.maps[body["name"]] = (types, "interval" in body.get("flags", []), body["map"])
+            live.elements[body["name"]] = dict(
+                _format_elem(item, types) for item in body.get("elem", [])
+            )
+        elif kind == "rule":
+            rule = _decode_rule(body.get("expr", []))
+            live.rules.setdefault(body["chain"], []).append((rule, int(body["handle"])))
+        else:
+            live.unknown.append(f"{kind} {body.get('name', '')}".strip())
+    return live
+
+
+def _format_elem(item: list, types: tuple[str, ...]) -> tuple[str, str]:
+    """(clé, valeur) d'un élément de map `[clé, verdict ou compteur]`."""
+    key, data = item
+    if isinstance(key, dict) and "elem" in key:  # élément avec attributs
+        key = key["elem"]["val"]
+    values = key["concat"] if isinstance(key, dict) and "concat" in key else [key]
+    parts = []
+    for value, kind in zip(values, types, strict=False):
+        text = _format_value(value)
+        parts.append(f'"{text}"' if kind == "ifname" else text)
+    # Verdict ({"accept": null}) ou nom de compteur
+    value = next(iter(data)) if isinstance(data, dict) else f'"{data}"'
+    return " . ".join(parts), value
+
+
+def _format_value(value: object) -> str:
+    if isinstance(value, dict):
+        if "range" in value:
+            low, high = value["range"]
+            return f"{_format_value(low)}-{_format_value(high)}"
+        if "prefix" in value:
+            return f"{value['prefix']['addr']}/{value['prefix']['len']}"
+        if "set" in value:
+            return "{ " + ", ".join(_format_value(v) for v in value["set"]) + " }"
+    if isinstance(value, list):  # drapeaux (ct state)
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+
+def _selector(left: dict) -> str | None:
+    if "meta" in left:
+        return _META_KEYS.get(left["meta"].get("key"))
+    if "payload" in left:
+        payload = left["payload"]
+        if "protocol" in payload:
+            return f"{payload['protocol']} {payload['field']}"
+    if "ct" in left:
+        return f"ct {left['ct']['key']}"
+    return None
+
+
+def _decode_statement(stmt: dict) -> str | None:
+    kind, body = next(iter(stmt.items()))
+    if kind == "accept":
+        return "accept"
+    if kind == "counter":
+        if isinstance(body, str):
+            return f'counter name "{body}"'
+        if "map" in body:  # compteur choisi par une map d'objets
+            lookup = _decode_lookup(body["map"])
+            return f"counter name {lookup}" if lookup else None
+        return "counter"  # anonyme
+    if kind == "match":
+        selector = _selector(body["left"])
+        if selector is None:
+            return None
+        right = _format_value(body["right"])
+        if selector in _QUOTED:
+            right = f'"{right}"'
+        op = "!= " if body.get("op") == "!=" else ""
+        return f"{selector} {op}{right}"
+    if kind == "vmap":
+        lookup = _decode_lookup(body)
+        return lookup.replace(" map @", " vmap @", 1) if lookup else None
+    if kind == "dnat" and "addr" in body:
+        port = f":{body['port']}" if "port" in body else ""
+        return f"dnat to {body['addr']}{port}"
+    return None
+
+
+def _decode_lookup(body: dict) -> str | None:
+    """`<sélecteurs> map @<nom>` depuis `{"key": ..., "data": "@nom"}`."""
+    key = body["key"]
+    lefts = key["concat"] if "concat" in key else [key]
+    selectors: list[str] = []
+    for left in lefts:
+        selector = _selector(left)
+        if selector is None:
+            return None
+        selectors.append(selector)
+    return f"{' . '.join(selectors)} map {body['data']}"
+
+
+def _decode_rule(expr: list[dict]) -> str | None:
+    """Texte nft d'une règle, None si une expression n'est pas reconnue."""
+    parts: list[str] = []
+    for stmt in expr:
+        text = _decode_statement(stmt)
+        if text is None:
+            return None
+        parts.append(text)
+    return _canonical(" ".join(parts))
+
+
+def _canonical(rule: str) -> str:
+    """`tcp dport { 80 }` et `tcp dport 80` : nft liste le set à un élément sans accolades."""
+    return _SINGLE_SET.sub(r"\1", rule)
+
+
+# ---------------------------------------------------------------------------
+# Calcul du delta
+# ---------------------------------------------------------------------------
+
+
+def compute_delta(ruleset: NftRuleset, live: LiveTable | None) -> NftablesDelta:
+    """Delta entre la table vivante et le ruleset désiré."""
+    if live is None:
+        return NftablesDelta.reload("table absente")
+    if live.unknown:
+        return NftablesDelta.reload(f"objets non gérés : {', '.join(live.unknown)}")
+
+    desired_chains = {
+        c.name: (c.type, c.hook, _priority(c.priority), c.policy) for c in ruleset.chains
+    }
+    if desired_chains != live.chains:
+        return NftablesDelta.reload("chaînes modifiées")
+    desired_maps = {m.name: (m.types, m.interval, m.value) for m in ruleset.maps}
+    if desired_maps != live.maps:
+        return NftablesDelta.reload("maps modifiées")
+
+    delta = NftablesDelta()
+    for chain in ruleset.chains:
+        live_rules = live.rules.get(chain.name, [])
+        # Multi-ensemble : une règle vivante ne satisfait qu'une règle désirée
+        available: dict[str | None, list[int]] = defaultdict(list)
+        for rule, handle in live_rules:
+            available[rule].append(handle)
+        placed: list[int | str] = []  # handle gardé ou règle à ajouter, ordre du rendu
+        for rule in chain.rules:
+            handles = available.get(_canonical(rule))
+            placed.append(handles.pop(0) if handles else rule)
+
+        position = {handle: i for i, (_, handle) in enumerate(live_rules)}
+        kept = [p for p in placed if isinstance(p, int)]
+        if kept != sorted(kept, key=position.__getitem__):
+            return NftablesDelta.reload("ordre des règles modifié")
+
+        # Règle gardée qui suit chaque position (None : fin de chaîne)
+        following: list[int | None] = []
+        after: int | None = None
+        for item in reversed(placed):
+            following.append(after)
+            if isinstance(item, int):
+                after = item
+        following.reverse()
+        for item, handle in zip(placed, following, strict=True):
+            if isinstance(item, int):
+                continue
+            if handle is None:
+                delta.rules_added.append((chain.name, item))
+            else:
+                delta.rules_inserted.append((chain.name, handle, item))
+        for handles in available.values():
+            delta.rules_removed.extend((chain.name, h) for h in handles)
+
+    for nft_map in ruleset.maps:
+        current = live.elements.get(nft_map.name, {})
+        wanted = nft_map.elements
+        for key, value in current.items():
+            if wanted.get(key) != value:
+                delta.elements_removed.append((nft_map.name, key))
+        for key, value in wanted.items():
+            if current.get(key) != value:
+                delta.elements_added.append((nft_map.name, key, value))
+
+    delta.counters_removed = [c for c in live.counters if c not in ruleset.counters]
+    delta.counters_added = [c for c in ruleset.counters if c not in live.counters]
+    return delta
+
+
+_PRIORITIES = {"filter": 0, "dstnat": -100, "srcnat": 100}
+
+
+def _priority(value: str) -> int:
+    return _PRIORITIES[value] if value in _PRIORITIES else int(value)
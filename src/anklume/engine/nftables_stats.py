@@ -0,0 +1,97 @@
+"""Trafic par politique — compteurs nommés de la table `inet anklume`.
+
+Avec `nftables.counters: true`, chaque politique (`policy_<n>`) et
+chaque bridge intra-domaine (`intra_<domaine>`) compte paquets et
+octets. Deux lectures (`nft -j list counters table inet anklume`)
+séparées d'un intervalle donnent les débits (paquets/s, bits/s).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+SORT_KEYS = ("bps", "pps", "bytes", "packets", "name")
+
+
+@dataclass
+class CounterValue:
+    """Valeur cumulée d'un compteur nommé."""
+
+    packets: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class CounterRate:
+    """Trafic d'un compteur entre deux lectures."""
+
+    name: str
+    label: str
+    packets: int  # cumul à la deuxième lecture
+    bytes: int
+    pps: float
+    bps: float  # bits/s
+
+
+def parse_counters(data: dict) -> dict[str, CounterValue]:
+    """Compteurs de la sortie `nft -j list counters` (ou `list table`)."""
+    counters: dict[str, CounterValue] = {}
+    for obj in data.get("nftables", []):
+        body = obj.get("counter")
+        if isinstance(body, dict) and "name" in body:
+            counters[body["name"]] = CounterValue(
+                packets=int(body.get("packets", 0)),
+                bytes=int(body.get("bytes", 0)),
+            )
+    return counters
+
+
+def compute_rates(
+    before: dict[str, CounterValue],
+    after: dict[str, CounterValue],
+    elapsed: float,
+    labels: dict[str, str] | None = None,
+) -> list[CounterRate]:
+    """Débits entre deux lectures.
+
+    Un compteur absent de la première lecture ou remis à zéro entre les
+    deux (rechargement de la table) compte depuis zéro.
+    """
+    labels = labels or {}
+    rates: list[CounterRate] = []
+    for name, value in after.items():
+        previous = before.get(name, CounterValue())
+        if value.packets < previous.packets or value.bytes < previous.bytes:
+            previous = CounterValue()
+        packets = value.packets - previous.packets
+        octets = value.bytes - previous.bytes
+        rates.append(
+            CounterRate(
+                name=name,
+                label=labels.get(name, ""),
+                packets=value.packets,
+                bytes=value.bytes,
+                pps=packets / elapsed if elapsed > 0 else 0.0,
+                bps=octets * 8 / elapsed if elapsed > 0 else 0.0,
+            )
+        )
+    return rates
+
+
+def sort_rates(rates: list[CounterRate], key: str = "bps") -> list[CounterRate]:
+    """Tri décroissant par trafic (`name` : ordre alphabétique)."""
+    if key not in SORT_KEYS:
+        msg = f"Clé de tri inconnue : {key!r} (valeurs : {', '.join(SORT_KEYS)})"
+        raise ValueError(msg)
+    if key == "name":
+        return sorted(rates, key=lambda r: r.name)
+    return sorted(rates, key=lambda r: (-getattr(r, key), r.name))
+
+
+def format_rate(value: float, unit: str) -> str:
+    """Débit lisible : 1234567 bits/s -> `1.2 M<unit>`."""
+    for prefix in ("", "k", "M"):
+        if value < 1000:
+            return f"{value:.1f} {prefix}{unit}" if prefix else f"{value:.0f} {unit}"
+        value /= 1000
+    return f"{value:.1f} G{unit}"
@@ -9,7 +9,7 @@ from __future__ import annotations
 import subprocess
 from dataclasses import dataclass, field
 
-from anklume.engine.incus_driver import IncusDriver
+from anklume.engine.incus_driver import IncusDriver, IncusStateSnapshot
 from anklume.engine.models import Infrastructure
 from anklume.engine.nesting import NestingContext, prefix_name
 
@@ -66,33 +66,31 @@ def list_instances(
     infra: Infrastructure,
     driver: IncusDriver,
     nesting_context: NestingContext | None = None,
+    state: IncusStateSnapshot | None = None,
 ) -> list[InstanceInfo]:
     """Liste toutes les instances avec état réel combiné."""
     ctx = nesting_context or NestingContext()
     nesting_cfg = infra.config.nesting
     results: list[InstanceInfo] = []
 
-    existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
 
     for domain in infra.enabled_domains:
         project_name = prefix_name(domain.name, ctx, nesting_cfg)
-
-        if project_name in existing_projects:
-            real_instances = {i.name: i for i in driver.instance_list(project_name)}
-        else:
-            real_instances = {}
+        real_instances = {i.name: i for i in state.instance_list(project_name)}
 
         for machine in domain.sorted_machines:
             incus_name = prefix_name(machine.full_name, ctx, nesting_cfg)
             real = real_instances.get(incus_name)
-            state = real.status if real else "Absent"
+            status = real.status if real else "Absent"
 
             results.append(
                 InstanceInfo(
                     name=machine.full_name,
                     domain=domain.name,
                     machine_type=machine.type,
-                    state=state,
+                    state=status,
                     ip=machine.ip,
                     trust_level=domain.trust_level,
                     gpu=machine.gpu,
@@ -175,21 +173,23 @@ def compute_network_status(
     infra: Infrastructure,
     driver: IncusDriver,
     nesting_context: NestingContext | None = None,
+    state: IncusStateSnapshot | None = None,
 ) -> NetworkStatus:
     """État réseau complet : bridges et nftables."""
     ctx = nesting_context or NestingContext()
     nesting_cfg = infra.config.nesting
     networks: list[NetworkInfo] = []
 
-    existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
 
     for domain in infra.enabled_domains:
         project_name = prefix_name(domain.name, ctx, nesting_cfg)
         bridge_name = prefix_name(domain.network_name, ctx, nesting_cfg)
 
-        exists = False
-        if project_name in existing_projects:
-            exists = driver.network_exists(bridge_name, project_name)
+        exists = state.project_exists(project_name) and state.network_exists(
+            bridge_name, project_name
+        )
 
         networks.append(
             NetworkInfo(
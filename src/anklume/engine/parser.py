@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import logging
+import os
+import pickle
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 import yaml
 
@@ -17,9 +21,12 @@ from anklume.engine.models import (
     Infrastructure,
     Machine,
     NestingConfig,
+    NftablesConfig,
     Policy,
     Profile,
     ResourcePolicyConfig,
+    SnapshotConfig,
+    SnapshotRetention,
 )
 
 log = logging.getLogger(__name__)
@@ -35,7 +42,10 @@ _GLOBAL_KEYS = {
     "gpu_policy",
     "ai_access_policy",
     "network_passthrough",
+    "nftables",
     "requires_anklume",
+    "incus_backend",
+    "snapshots",
 }
 _DEFAULTS_KEYS = {"os_image", "trust_level"}
 _ADDRESSING_KEYS = {"base", "zone_step"}
@@ -48,6 +58,9 @@ _RESOURCE_POLICY_KEYS = {
     "overcommit",
 }
 _HOST_RESERVE_KEYS = {"cpu", "memory"}
+_NFTABLES_KEYS = {"mode", "counters", "merge_policies"}
+_SNAPSHOTS_KEYS = {"pool_concurrency", "retention", "auto_prune"}
+_RETENTION_KEYS = {"keep_last", "keep_daily", "keep_weekly", "max_age_days"}
 _DOMAIN_KEYS = {
     "description",
     "trust_level",
@@ -81,6 +94,92 @@ _POLICY_KEYS = {
 }
 
 
+# libyaml (CSafeLoader) quand PyYAML a été compilé avec, sinon le loader pur Python.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Cache des documents YAML chargés — voir _YamlCache.
+CACHE_DIR = ".anklume"
+CACHE_FILE = "parse-cache.pickle"
+CACHE_VERSION = 1
+
+
+def _load_yaml(text: str) -> Any:
+    return yaml.load(text, Loader=_YamlLoader)  # noqa: S506 — loader sûr (Safe/CSafe)
+
+
+class _YamlCache:
+    """Cache disque des documents YAML d'un projet, invalidé fichier par fichier.
+
+    Chaque entrée est indexée par chemin et validée par (mtime_ns, taille) :
+    seuls les fichiers modifiés sont relus. Le cache garde les documents
+    bruts, pas les modèles : la validation et les avertissements de clés
+    inconnues restent identiques à un parsing complet.
+
+    Le fichier n'est relu que s'il appartient à l'utilisateur courant et
+    n'est modifiable par personne d'autre (pickle).
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._entries: dict[str, tuple[int, int, Any]] = {}
+        self._dirty = False
+        if path is not None:
+            self._entries = self._read(path)
+
+    @staticmethod
+    def _read(path: Path) -> dict[str, tuple[int, int, Any]]:
+        try:
+            st = path.stat()
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                log.debug("Cache de parsing ignoré (permissions) : %s", path)
+                return {}
+            # Fichier privé écrit par anklume lui-même (voir ci-dessus).
+            data = pickle.loads(path.read_bytes())  # noqa: S301
+        except FileNotFoundError:
+            return {}
+        except Exception as e:  # cache corrompu ou d'une autre version de Python
+            log.debug("Cache de parsing illisible (%s) : %s", path, e)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def load(self, path: Path) -> Any:
+        """Document YAML de `path`, relu seulement si le fichier a changé."""
+        key = str(path)
+        st = path.stat()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        raw = _load_yaml(path.read_text())
+        if self.path is not None:
+            self._entries[key] = (st.st_mtime_ns, st.st_size, raw)
+            self._dirty = True
+        return raw
+
+    def save(self, seen: set[str]) -> None:
+        """Écrit le cache (entrées de `seen` uniquement) si quelque chose a changé."""
+        stale = set(self._entries) - seen
+        if self.path is None or not (self._dirty or stale):
+            return
+        entries = {k: v for k, v in self._entries.items() if k in seen}
+        payload = pickle.dumps({"version": CACHE_VERSION, "entries": entries})
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            tmp.replace(self.path)
+        except OSError as e:  # projet en lecture seule : le cache est facultatif
+            log.debug("Cache de parsing non écrit (%s) : %s", self.path, e)
+
+
+def cache_path(project_dir: Path) -> Path:
+    return project_dir / CACHE_DIR / CACHE_FILE
+
+
 def _warn_unknown_keys(raw: dict, known: set[str], location: str) -> None:
     """Log un warning pour chaque clé inconnue dans raw."""
     unknown = set(raw.keys()) - known
@@ -96,23 +195,39 @@ class ParseError(Exception):
         super().__init__(f"{path}: {message}")
 
 
-def parse_project(project_dir: str | Path) -> Infrastructure:
-    """Parser un répertoire projet anklume complet."""
+def parse_project(project_dir: str | Path, *, cache: bool = True) -> Infrastructure:
+    """Parser un répertoire projet anklume complet.
+
+    Avec `cache`, les documents YAML sont mémorisés dans
+    `.anklume/parse-cache.pickle` : seuls les fichiers modifiés depuis
+    le dernier appel sont relus.
+    """
     project_dir = Path(project_dir)
+    yaml_cache = _YamlCache(cache_path(project_dir) if cache else None)
+    seen: set[str] = set()
+
+    def load(path: Path) -> Any:
+        seen.add(str(path))
+        return yaml_cache.load(path)
 
-    config = _parse_global_config(project_dir / "anklume.yml")
-    domains = _parse_domains(project_dir / "domains", config.defaults)
-    policies = _parse_policies(project_dir / "policies.yml")
+    config = _parse_global_config(project_dir / "anklume.yml", load)
+    domains = _parse_domains(project_dir / "domains", config.defaults, load)
+    policies = _parse_policies(project_dir / "policies.yml", load)
 
+    yaml_cache.save(seen)
     return Infrastructure(config=config, domains=domains, policies=policies)
 
 
-def _parse_global_config(path: Path) -> GlobalConfig:
+def _read_yaml(path: Path) -> Any:
+    return _load_yaml(path.read_text())
+
+
+def _parse_global_config(path: Path, load: Callable[[Path], Any] = _read_yaml) -> GlobalConfig:
     """Parser anklume.yml."""
     if not path.exists():
         raise ParseError(path, "fichier introuvable. Lancer 'anklume init' d'abord.")
 
-    raw = yaml.safe_load(path.read_text()) or {}
+    raw = load(path) or {}
     if not isinstance(raw, dict):
         raise ParseError(path, "le fichier doit contenir un mapping YAML (clé: valeur).")
 
@@ -161,9 +276,32 @@ def _parse_global_config(path: Path) -> GlobalConfig:
 
     ai_access_policy = raw.get("ai_access_policy", "exclusive")
     network_passthrough = raw.get("network_passthrough", False)
+    nftables_raw = raw.get("nftables") or {}
+    _warn_unknown_keys(nftables_raw, _NFTABLES_KEYS, f"{path} > nftables")
+    nftables = NftablesConfig(
+        mode=str(nftables_raw.get("mode", "linear")),
+        counters=nftables_raw.get("counters", False),
+        merge_policies=nftables_raw.get("merge_policies", False),
+    )
     requires_anklume = raw.get("requires_anklume")
     if requires_anklume is not None:
         requires_anklume = str(requires_anklume)
+    incus_backend = str(raw.get("incus_backend", "cli"))
+
+    snapshots_raw = raw.get("snapshots") or {}
+    _warn_unknown_keys(snapshots_raw, _SNAPSHOTS_KEYS, f"{path} > snapshots")
+    retention_raw = snapshots_raw.get("retention") or {}
+    _warn_unknown_keys(retention_raw, _RETENTION_KEYS, f"{path} > snapshots > retention")
+    snapshots = SnapshotConfig(
+        pool_concurrency=snapshots_raw.get("pool_concurrency", 4),
+        retention=SnapshotRetention(
+            keep_last=retention_raw.get("keep_last", 0),
+            keep_daily=retention_raw.get("keep_daily", 0),
+            keep_weekly=retention_raw.get("keep_weekly", 0),
+            max_age_days=retention_raw.get("max_age_days", 0),
+        ),
+        auto_prune=snapshots_raw.get("auto_prune", False),
+    )
 
     return GlobalConfig(
         schema_version=raw.get("schema_version", SCHEMA_VERSION),
@@ -174,26 +312,37 @@ def _parse_global_config(path: Path) -> GlobalConfig:
         gpu_policy=gpu_policy,
         ai_access_policy=ai_access_policy,
         network_passthrough=network_passthrough,
+        nftables=nftables,
         requires_anklume=requires_anklume,
+        incus_backend=incus_backend,
+        snapshots=snapshots,
     )
 
 
-def _parse_domains(domains_dir: Path, defaults: Defaults) -> dict[str, Domain]:
+def _parse_domains(
+    domains_dir: Path,
+    defaults: Defaults,
+    load: Callable[[Path], Any] = _read_yaml,
+) -> dict[str, Domain]:
     """Parser tous les fichiers domaine."""
     if not domains_dir.is_dir():
         return {}
 
     domains = {}
     for yml_path in sorted(domains_dir.glob("*.yml")):
-        domain = _parse_domain(yml_path, defaults)
+        domain = _parse_domain(yml_path, defaults, load)
         domains[domain.name] = domain
 
     return domains
 
 
-def _parse_domain(path: Path, defaults: Defaults) -> Domain:
+def _parse_domain(
+    path: Path,
+    defaults: Defaults,
+    load: Callable[[Path], Any] = _read_yaml,
+) -> Domain:
     """Parser un fichier domaine individuel."""
-    raw = yaml.safe_load(path.read_text())
+    raw = load(path)
     if not raw:
         raise ParseError(path, "fichier domaine vide.")
     if not isinstance(raw, dict):
@@ -263,12 +412,12 @@ def _parse_domain(path: Path, defaults: Defaults) -> Domain:
     )
 
 
-def _parse_policies(path: Path) -> list[Policy]:
+def _parse_policies(path: Path, load: Callable[[Path], Any] = _read_yaml) -> list[Policy]:
     """Parser policies.yml."""
     if not path.exists():
         return []
 
-    raw = yaml.safe_load(path.read_text())
+    raw = load(path)
     if not raw:
         return []
 
@@ -287,7 +436,9 @@ def _parse_policies(path: Path) -> list[Policy]:
         ports = p.get("ports", [])
         if isinstance(ports, str) and ports != "all":
             raise ParseError(
-                path, f"politique #{i + 1}: 'ports' doit être une liste d'entiers ou \"all\"."
+                path,
+                f"politique #{i + 1}: 'ports' doit être une liste de ports "
+                f'(80, "8000-8100") ou "all".',
             )
 
         policies.append(
@@ -0,0 +1,294 @@
+"""Analyse des politiques réseau — masquages, doublons, fusions.
+
+La validation ne vérifie que la forme de policies.yml. Ici, chaque
+politique appliquée est dépliée en sens autorisés (source,
+destination, protocole, intervalles de ports), rangés dans un index
+par (source, destination, protocole). Une politique est couverte si,
+dans chacun de ses sens, l'union des intervalles des autres
+politiques englobantes contient ses ports :
+
+- une machine est englobée par son domaine ;
+- `ports: []` (tout protocole) englobe tcp et udp ;
+- `ports: all` englobe tous les ports du protocole.
+
+Constats (`PolicyFinding.kind`) :
+
+- `duplicate` : chaque sens existe à l'identique dans une autre politique ;
+- `shadowed` : couverte par une ou plusieurs politiques plus larges
+  (ou par le trafic intra-domaine, toujours autorisé) ;
+- `overlap` : une partie de ses ports est déjà couverte ;
+- `adjacent` / `mergeable` : mêmes extrémités qu'une autre politique,
+  ports contigus ou non, fusionnables en un seul set.
+
+Les politiques sont examinées de la dernière à la première : entre
+deux doublons, la première déclarée est gardée. Chaque retrait ne
+s'appuie que sur des politiques encore actives, l'union des allows
+est donc préservée. Avec `nftables.merge_policies: true`, la
+génération nftables utilise les politiques minimales.
+"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field, replace
+
+from anklume.engine.models import (
+    Infrastructure,
+    Policy,
+    PortInterval,
+    format_port_intervals,
+    merge_port_intervals,
+    port_entries,
+    subtract_port_intervals,
+)
+
+FINDING_KINDS = ("duplicate", "shadowed", "overlap", "adjacent", "mergeable")
+
+_KIND_LABELS = {
+    "duplicate": "doublon",
+    "shadowed": "masquée",
+    "overlap": "chevauchement",
+    "adjacent": "adjacente",
+    "mergeable": "fusionnable",
+}
+
+_ALL_PORTS = (0, 65535)
+
+_Scope = tuple[str, str | None]  # (domaine, machine ou None = domaine entier)
+
+
+@dataclass
+class PolicyFinding:
+    """Constat sur une politique (numéro 1-based, ordre de policies.yml)."""
+
+    kind: str
+    policy: int
+    others: list[int] = field(default_factory=list)
+    message: str = ""
+
+    def __str__(self) -> str:
+        return f"politique #{self.policy} ({_KIND_LABELS[self.kind]}) : {self.message}"
+
+
+@dataclass
+class PolicyAnalysis:
+    """Constats et politiques minimales équivalentes."""
+
+    findings: list[PolicyFinding] = field(default_factory=list)
+    policies: dict[int, Policy] = field(default_factory=dict)  # numéro -> politique
+    rules_before: int = 0  # sens autorisés (règles forward en mode linear)
+    rules_after: int = 0
+
+
+@dataclass(frozen=True)
+class _Allow:
+    """Sens autorisé d'une politique."""
+
+    src: _Scope
+    dst: _Scope
+    protocol: str | None  # None : tout protocole
+    ports: tuple[PortInterval, ...]
+
+
+def _port_intervals(policy: Policy) -> tuple[PortInterval, ...]:
+    if not isinstance(policy.ports, list) or not policy.ports:
+        return (_ALL_PORTS,)
+    return tuple(policy.port_intervals)
+
+
+# ---------------------------------------------------------------------------
+# Index (source, destination, protocole) -> intervalles triés
+# ---------------------------------------------------------------------------
+
+
+class _PolicyIndex:
+    """Intervalles de ports autorisés, triés par borne basse, par clé."""
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[_Scope, _Scope, str | None], list[tuple[int, int, int]]] = {}
+
+    def add(self, number: int, allow: _Allow) -> None:
+        entries = self._entries.setdefault((allow.src, allow.dst, allow.protocol), [])
+        for low, high in allow.ports:
+            bisect.insort(entries, (low, high, number))
+
+    def remove(self, number: int) -> None:
+        for key, entries in self._entries.items():
+            self._entries[key] = [e for e in entries if e[2] != number]
+
+    def covering(self, allow: _Allow, exclude: int) -> tuple[list[PortInterval], set[int]]:
+        """Union des intervalles des autres politiques qui englobent `allow`."""
+        sources = {allow.src, (allow.src[0], None)}
+        destinations = {allow.dst, (allow.dst[0], None)}
+        protocols = {allow.protocol, None}
+        highest = max(high for _, high in allow.ports)
+        lowest = min(low for low, _ in allow.ports)
+        found: list[PortInterval] = []
+        owners: set[int] = set()
+        for src in sources:
+            for dst in destinations:
+                for protocol in protocols:
+                    entries = self._entries.get((src, dst, protocol), [])
+                    # Bornes basses <= plus haut port demandé
+                    stop = bisect.bisect_right(entries, (highest, _ALL_PORTS[1] + 1, 0))
+                    for low, high, number in entries[:stop]:
+                        if number != exclude and high >= lowest:
+                            found.append((low, high))
+                            owners.add(number)
+        return merge_port_intervals(found), owners
+
+
+# ---------------------------------------------------------------------------
+# Analyse
+# ---------------------------------------------------------------------------
+
+
+def _scopes(infra: Infrastructure) -> dict[str, _Scope | None]:
+    """Cible -> portée ; None pour un domaine désactivé (règle non générée).
+
+    Une machine sans IP est filtrée sur son bridge : portée du domaine.
+    """
+    scopes: dict[str, _Scope | None] = {}
+    for domain in infra.domains.values():
+        scopes[domain.name] = (domain.name, None) if domain.enabled else None
+        for machine in domain.machines.values():
+            scope = (domain.name, machine.full_name if machine.ip else None)
+            scopes[machine.full_name] = scope if domain.enabled else None
+    return scopes
+
+
+def _allows(policy: Policy, scopes: dict[str, _Scope | None]) -> list[_Allow]:
+    """Sens autorisés ; vide pour une politique hôte, non résolue ou désactivée."""
+    src = scopes.get(policy.from_target)
+    dst = scopes.get(policy.to_target)
+    if src is None or dst is None:
+        return []
+    protocol = None if policy.ports == [] else policy.protocol
+    ports = _port_intervals(policy)
+    allows = [_Allow(src, dst, protocol, ports)]
+    if policy.bidirectional:
+        allows.append(_Allow(dst, src, protocol, ports))
+    return allows
+
+
+def analyze_policies(infra: Infrastructure) -> PolicyAnalysis:
+    """Constats sur policies.yml et politiques minimales équivalentes."""
+    scopes = _scopes(infra)
+    analysis = PolicyAnalysis(policies=dict(enumerate(infra.policies, start=1)))
+    directions = {n: _allows(p, scopes) for n, p in analysis.policies.items()}
+    directions = {n: allows for n, allows in directions.items() if allows}
+    analysis.rules_before = sum(len(allows) for allows in directions.values())
+
+    index = _PolicyIndex()
+    for number, allows in directions.items():
+        for allow in allows:
+            index.add(number, allow)
+
+    for number in sorted(directions, reverse=True):
+        finding = _examine(number, directions, index, analysis.policies)
+        if finding is not None:
+            analysis.findings.append(finding)
+
+    _merge_same_endpoints(analysis, directions)
+    analysis.findings.sort(key=lambda f: (f.policy, FINDING_KINDS.index(f.kind)))
+    analysis.rules_after = sum(len(directions[n]) for n in analysis.policies if n in directions)
+    return analysis
+
+
+def merged_policies(infra: Infrastructure) -> dict[int, Policy]:
+    """Politiques minimales, indexées par leur numéro dans policies.yml."""
+    return analyze_policies(infra).policies
+
+
+def _examine(
+    number: int,
+    directions: dict[int, list[_Allow]],
+    index: _PolicyIndex,
+    policies: dict[int, Policy],
+) -> PolicyFinding | None:
+    """Retire ou réduit la politique `number` si d'autres la couvrent."""
+    allows = directions[number]
+    if all(a.src[0] == a.dst[0] for a in allows):
+        index.remove(number)
+        del policies[number]
+        return PolicyFinding("shadowed", number, [], "déjà couverte par le trafic intra-domaine")
+
+    owners: set[int] = set()
+    rests: list[list[PortInterval]] = []
+    for allow in allows:
+        covered, by = index.covering(allow, exclude=number)
+        rest = subtract_port_intervals(list(allow.ports), covered)
+        if rest != list(allow.ports):
+            owners |= by
+        rests.append(rest)
+    if not owners:
+        return None
+    others = sorted(owners)
+
+    if not any(rests):
+        index.remove(number)
+        del policies[number]
+        twin = _twin(allows, others, directions)
+        if twin is not None:
+            return PolicyFinding("duplicate", number, [twin], f"doublon de #{twin}")
+        refs = ", ".join(f"#{o}" for o in others)
+        return PolicyFinding("shadowed", number, others, f"couverte par {refs}")
+
+    # Ports couverts dans tous les sens : retirés d'une liste explicite
+    # (`all` et `[]` ne se découpent pas en liste de ports)
+    policy = policies[number]
+    needed = merge_port_intervals([i for rest in rests for i in rest])
+    covered_ports = subtract_port_intervals(list(allows[0].ports), needed)
+    if not covered_ports or not isinstance(policy.ports, list) or not policy.ports:
+        return None
+    policies[number] = replace(policy, ports=port_entries(needed))
+    reduced = [replace(a, ports=tuple(needed)) for a in allows]
+    directions[number] = reduced
+    index.remove(number)
+    for allow in reduced:
+        index.add(number, allow)
+    refs = ", ".join(f"#{o}" for o in others)
+    message = f"ports {format_port_intervals(covered_ports)} déjà couverts par {refs}"
+    return PolicyFinding("overlap", number, others, message)
+
+
+def _twin(
+    allows: list[_Allow], others: list[int], directions: dict[int, list[_Allow]]
+) -> int | None:
+    """Politique qui contient chacun des sens à l'identique, s'il y en a une."""
+    for other in others:
+        if all(a in directions[other] for a in allows):
+            return other
+    return None
+
+
+def _merge_same_endpoints(analysis: PolicyAnalysis, directions: dict[int, list[_Allow]]) -> None:
+    """Fusionne en un set les ports des politiques de mêmes extrémités."""
+    groups: dict[tuple[str, str, str, bool], list[int]] = {}
+    for number, policy in analysis.policies.items():
+        if number not in directions or not isinstance(policy.ports, list) or not policy.ports:
+            continue
+        key = (policy.from_target, policy.to_target, policy.protocol, policy.bidirectional)
+        groups.setdefault(key, []).append(number)
+
+    for numbers in groups.values():
+        if len(numbers) < 2:
+            continue
+        first, *rest = numbers
+        kept = analysis.policies[first]
+        ports = kept.port_intervals
+        descriptions = [kept.description]
+        for number in rest:
+            policy = analysis.policies.pop(number)
+            added = policy.port_intervals
+            merged = merge_port_intervals(ports + added)
+            kind = "adjacent" if len(merged) < len(ports) + len(added) else "mergeable"
+            message = f"ports {format_port_intervals(added)} fusionnables avec #{first}"
+            analysis.findings.append(PolicyFinding(kind, number, [first], message))
+            ports = merged
+            if policy.description not in descriptions:
+                descriptions.append(policy.description)
+        analysis.policies[first] = replace(
+            kept, description=" + ".join(descriptions), ports=port_entries(ports)
+        )
+        directions[first] = [replace(a, ports=tuple(ports)) for a in directions[first]]
@@ -7,16 +7,25 @@ IncusDriver, produit un plan d'actions ordonnées, et l'exécute
 
 from __future__ import annotations
 
+import dataclasses
 import logging
 from dataclasses import dataclass, field
+from typing import Any
 
+from anklume.engine.drift import ALLOCATION_KEYS, describe_config, instance_drift
 from anklume.engine.gpu import GPU_PROFILE_NAME
 from anklume.engine.gui import (
     GUI_PROFILE_NAME,
     GuiInfo,
     create_gui_profile,
 )
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from anklume.engine.incus_driver import (
+    IncusDriver,
+    IncusError,
+    IncusInstance,
+    IncusOperation,
+    IncusStateSnapshot,
+)
 from anklume.engine.models import Domain, Infrastructure, Machine, NestingConfig
 from anklume.engine.nesting import (
     NestingContext,
@@ -25,6 +34,7 @@ from anklume.engine.nesting import (
     prefix_name,
     unprefix_name,
 )
+from anklume.engine.scheduler import critical_path_length, run_dag
 
 log = logging.getLogger(__name__)
 
@@ -33,11 +43,32 @@ log = logging.getLogger(__name__)
 class Action:
     """Une action de réconciliation à exécuter."""
 
-    verb: str  # "create" | "start" | "stop" | "delete" | "skip"
-    resource: str  # "project" | "network" | "instance" | "profile"
+    verb: str  # "create" | "start" | "stop" | "delete" | "update" | "skip"
+    resource: str  # "project" | "network" | "instance" | "profile" | "config"
     target: str  # nom de la ressource (préfixé si nesting)
     project: str  # projet Incus concerné (préfixé si nesting)
     detail: str  # description lisible
+    deps: list[str] = field(default_factory=list)  # clés des actions préalables
+    changes: dict[str, Any] = field(default_factory=dict)  # update : écarts minimaux
+
+    @property
+    def key(self) -> str:
+        """Identifiant unique de l'action dans un plan."""
+        return f"{self.verb}:{self.resource}:{self.project}/{self.target}"
+
+
+@dataclass
+class InstanceSpec:
+    """Spécification complète d'une instance, créée en une seule opération.
+
+    Les champs reprennent les paramètres de `IncusDriver.instance_create`.
+    """
+
+    image: str
+    instance_type: str
+    profiles: list[str]
+    config: dict[str, str]
+    network: str
 
 
 @dataclass
@@ -47,6 +78,7 @@ class ReconcileResult:
     actions: list[Action] = field(default_factory=list)
     executed: list[Action] = field(default_factory=list)
     errors: list[tuple[Action, str]] = field(default_factory=list)
+    critical_path: int = 0  # actions de la plus longue chaîne de dépendances
 
     @property
     def success(self) -> bool:
@@ -60,54 +92,91 @@ def reconcile(
     dry_run: bool = False,
     nesting_context: NestingContext | None = None,
     gui_info: GuiInfo | None = None,
+    state: IncusStateSnapshot | None = None,
+    jobs: int = 1,
 ) -> ReconcileResult:
     """Réconcilie l'infrastructure désirée avec l'état réel Incus.
 
     Produit un plan d'actions ordonnées. En dry-run, retourne le plan
     sans l'exécuter. Sinon, exécute action par action.
-    Best-effort par domaine : si un domaine échoue, les autres continuent.
+
+    L'état réel est lu une seule fois (``state``, sinon
+    ``driver.state_snapshot()``) puis partagé par tous les domaines.
+
+    Chaque action déclare ses dépendances (``Action.deps``) : le plan
+    est exécuté comme un graphe, au plus ``jobs`` actions à la fois.
+    Un échec n'ignore que les actions qui en dépendent ; les domaines,
+    indépendants, continuent. ``executed``/``errors`` suivent l'ordre du plan.
     """
     ctx = nesting_context or NestingContext()
     result = ReconcileResult()
 
-    existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
 
+    domains_by_project: dict[str, Domain] = {}
     for domain_name in sorted(infra.domains):
         domain = infra.domains[domain_name]
         if not domain.enabled:
             continue
 
-        domain_actions = _plan_domain(domain, infra, driver, existing_projects, ctx)
-        result.actions.extend(domain_actions)
-
-        if not dry_run:
-            _execute_domain_actions(
-                domain_actions,
-                domain,
-                infra,
-                driver,
-                result,
-                ctx,
-                gui_info,
-            )
-
+        result.actions.extend(_plan_domain(domain, infra, state, ctx))
+        domains_by_project[prefix_name(domain.name, ctx, infra.config.nesting)] = domain
+
+    if dry_run:
+        result.critical_path = critical_path_length(result.actions)
+        return result
+
+    created: dict[str, Machine] = {}
+    # Backend asynchrone : les créations d'instances prêtes partent
+    # ensemble, leurs opérations sont attendues en lot (wait_all).
+    use_async = driver.supports_async is True
+
+    def run(action: Action) -> IncusOperation | None:
+        domain = domains_by_project[action.project]
+        operation = _execute_action(action, domain, infra, driver, ctx, gui_info, use_async)
+
+        if action.resource == "instance" and action.verb == "create":
+            created[action.target] = _find_machine(action.target, domain, infra.config.nesting, ctx)
+        elif action.resource == "instance" and action.verb == "start" and action.target in created:
+            machine = created[action.target]
+            _inject_context_files(action.target, action.project, machine, driver, ctx)
+        return operation
+
+    def wait(operations: list[IncusOperation]) -> list[str | None]:
+        return [None if op.success else op.err or op.status for op in driver.wait_all(operations)]
+
+    schedule = run_dag(
+        result.actions,
+        run,
+        jobs=jobs,
+        errors=(IncusError, ValueError),
+        wait=wait if use_async else None,
+    )
+    result.executed = schedule.executed
+    result.errors = schedule.errors
+    result.critical_path = schedule.critical_path
     return result
 
 
 def _plan_domain(
     domain: Domain,
     infra: Infrastructure,
-    driver: IncusDriver,
-    existing_projects: set[str],
+    state: IncusStateSnapshot,
     ctx: NestingContext,
 ) -> list[Action]:
     """Calcule les actions nécessaires pour un domaine."""
     actions: list[Action] = []
     nesting_cfg = infra.config.nesting
+    # Sans resource_policy, anklume ne retire aucune clé de config
+    managed = ALLOCATION_KEYS if infra.config.resource_policy else frozenset()
 
     project_name = prefix_name(domain.name, ctx, nesting_cfg)
     network_name = prefix_name(domain.network_name, ctx, nesting_cfg)
-    project_is_new = project_name not in existing_projects
+    project_is_new = not state.project_exists(project_name)
+    # Clés des actions préalables : projet, profils créés, réseau
+    project_deps: list[str] = []
+    profile_keys: dict[str, str] = {}
 
     # 1. Projet
     if project_is_new:
@@ -120,6 +189,7 @@ def _plan_domain(
                 detail=f"Créer projet {project_name}",
             )
         )
+        project_deps.append(actions[-1].key)
 
     # 1b. Profil GPU (si des machines GPU dans ce domaine)
     has_gpu_machines = any(GPU_PROFILE_NAME in m.profiles for m in domain.machines.values())
@@ -127,7 +197,7 @@ def _plan_domain(
         if project_is_new:
             gpu_profile_exists = False
         else:
-            gpu_profile_exists = driver.profile_exists(GPU_PROFILE_NAME, project_name)
+            gpu_profile_exists = state.profile_exists(GPU_PROFILE_NAME, project_name)
 
         if not gpu_profile_exists:
             actions.append(
@@ -137,8 +207,10 @@ def _plan_domain(
                     target=GPU_PROFILE_NAME,
                     project=project_name,
                     detail=f"Créer profil {GPU_PROFILE_NAME} (GPU passthrough)",
+                    deps=list(project_deps),
                 )
             )
+            profile_keys[GPU_PROFILE_NAME] = actions[-1].key
 
     # 1c. Profil GUI (si des machines GUI dans ce domaine)
     has_gui_machines = any(GUI_PROFILE_NAME in m.profiles for m in domain.machines.values())
@@ -146,10 +218,7 @@ def _plan_domain(
         if project_is_new:
             gui_profile_exists = False
         else:
-            gui_profile_exists = driver.profile_exists(
-                GUI_PROFILE_NAME,
-                project_name,
-            )
+            gui_profile_exists = state.profile_exists(GUI_PROFILE_NAME, project_name)
 
         if not gui_profile_exists:
             actions.append(
@@ -159,8 +228,10 @@ def _plan_domain(
                     target=GUI_PROFILE_NAME,
                     project=project_name,
                     detail=f"Créer profil {GUI_PROFILE_NAME} (Wayland + PipeWire + iGPU)",
+                    deps=list(project_deps),
                 )
             )
+            profile_keys[GUI_PROFILE_NAME] = actions[-1].key
 
     # 1d. Profils custom du domaine
     for profile_name, _profile in domain.profiles.items():
@@ -169,7 +240,7 @@ def _plan_domain(
         if project_is_new:
             custom_exists = False
         else:
-            custom_exists = driver.profile_exists(profile_name, project_name)
+            custom_exists = state.profile_exists(profile_name, project_name)
 
         if not custom_exists:
             actions.append(
@@ -179,11 +250,14 @@ def _plan_domain(
                     target=profile_name,
                     project=project_name,
                     detail=f"Créer profil custom {profile_name}",
+                    deps=list(project_deps),
                 )
             )
+            profile_keys[profile_name] = actions[-1].key
 
     # 2. Réseau
-    net_exists = False if project_is_new else driver.network_exists(network_name, project_name)
+    net_exists = False if project_is_new else state.network_exists(network_name, project_name)
+    infra_deps = list(project_deps)
 
     if not net_exists:
         gateway = domain.gateway or "auto"
@@ -194,14 +268,16 @@ def _plan_domain(
                 target=network_name,
                 project=project_name,
                 detail=f"Créer réseau {network_name} ({gateway}/24, nat=true)",
+                deps=list(project_deps),
             )
         )
+        infra_deps.append(actions[-1].key)
 
     # 3. Instances
     if project_is_new:
-        existing_instances: dict[str, object] = {}
+        existing_instances: dict[str, IncusInstance] = {}
     else:
-        existing_instances = {i.name: i for i in driver.instance_list(project_name)}
+        existing_instances = {i.name: i for i in state.instance_list(project_name)}
 
     for machine_name in sorted(domain.machines):
         machine = domain.machines[machine_name]
@@ -209,7 +285,9 @@ def _plan_domain(
 
         if incus_name in existing_instances:
             instance = existing_instances[incus_name]
+            update_keys = _plan_drift(actions, machine, instance, infra_deps, profile_keys, managed)
             if instance.status == "Stopped":
+                # Écarts appliqués avant le démarrage
                 actions.append(
                     Action(
                         verb="start",
@@ -217,23 +295,14 @@ def _plan_domain(
                         target=incus_name,
                         project=project_name,
                         detail=f"Démarrer instance {incus_name}",
+                        deps=list(infra_deps) + update_keys,
                     )
                 )
-            # Profil GUI manquant sur instance existante
-            if GUI_PROFILE_NAME in machine.profiles:
-                real_profiles = getattr(instance, "profiles", [])
-                if GUI_PROFILE_NAME not in real_profiles:
-                    actions.append(
-                        Action(
-                            verb="update",
-                            resource="profile",
-                            target=incus_name,
-                            project=project_name,
-                            detail=f"Appliquer profil {GUI_PROFILE_NAME} à {incus_name}",
-                        )
-                    )
         else:
             detail = _instance_create_detail(machine, infra, incus_name)
+            create_deps = infra_deps + [
+                profile_keys[p] for p in machine.profiles if p in profile_keys
+            ]
             actions.append(
                 Action(
                     verb="create",
@@ -241,6 +310,7 @@ def _plan_domain(
                     target=incus_name,
                     project=project_name,
                     detail=detail,
+                    deps=create_deps,
                 )
             )
             actions.append(
@@ -250,12 +320,72 @@ def _plan_domain(
                     target=incus_name,
                     project=project_name,
                     detail=f"Démarrer instance {incus_name}",
+                    deps=[actions[-1].key],
                 )
             )
 
     return actions
 
 
+def _plan_drift(
+    actions: list[Action],
+    machine: Machine,
+    instance: IncusInstance,
+    infra_deps: list[str],
+    profile_keys: dict[str, str],
+    managed: frozenset[str],
+) -> list[str]:
+    """Ajoute les actions `update` d'une instance existante ; retourne leurs clés.
+
+    Seules les clés de config qui diffèrent sont portées par l'action
+    (`changes`) : la mise à jour s'applique à chaud, sans recréation.
+    Seules les clés de `managed` peuvent être retirées.
+    """
+    # Profils GPU/GUI non détectés lors de cet apply : conservés
+    keep = [
+        name
+        for name, on in ((GPU_PROFILE_NAME, machine.gpu), (GUI_PROFILE_NAME, machine.gui))
+        if on
+    ]
+    drift = instance_drift(
+        machine.config, machine.profiles, instance, keep_profiles=keep, managed=managed
+    )
+    keys: list[str] = []
+
+    if drift.config:
+        actions.append(
+            Action(
+                verb="update",
+                resource="config",
+                target=instance.name,
+                project=instance.project,
+                detail=f"Mettre à jour {instance.name} : {describe_config(drift.config)}",
+                deps=list(infra_deps),
+                changes=drift.config,
+            )
+        )
+        keys.append(actions[-1].key)
+
+    if drift.profiles is not None:
+        added = [p for p in drift.profiles if p not in instance.profiles]
+        removed = [p for p in instance.profiles if p not in drift.profiles]
+        summary = " ".join([f"+{p}" for p in added] + [f"-{p}" for p in removed])
+        actions.append(
+            Action(
+                verb="update",
+                resource="profile",
+                target=instance.name,
+                project=instance.project,
+                detail=f"Profils {instance.name} : {summary or 'ordre'}",
+                deps=list(infra_deps) + [profile_keys[p] for p in added if p in profile_keys],
+                changes={"profiles": drift.profiles},
+            )
+        )
+        keys.append(actions[-1].key)
+
+    return keys
+
+
 def _instance_create_detail(
     machine: Machine,
     infra: Infrastructure,
@@ -277,47 +407,39 @@ def _instance_create_detail(
     return " ".join(parts)
 
 
-def _execute_domain_actions(
-    actions: list[Action],
+def instance_spec(
+    machine: Machine,
     domain: Domain,
     infra: Infrastructure,
-    driver: IncusDriver,
-    result: ReconcileResult,
     ctx: NestingContext,
-    gui_info: GuiInfo | None = None,
-) -> None:
-    """Exécute les actions d'un domaine. Best-effort par instance."""
-    failed_instances: set[str] = set()
-    created_machines: dict[str, Machine] = {}
-
-    for action in actions:
-        # Skip les actions sur une instance déjà en erreur
-        if action.resource == "instance" and action.target in failed_instances:
-            result.errors.append((action, "Ignoré suite à une erreur précédente"))
-            continue
+) -> InstanceSpec:
+    """Spécification désirée d'une instance : config, profils, réseau.
 
-        try:
-            _execute_action(action, domain, infra, driver, ctx, gui_info)
-            result.executed.append(action)
-
-            if action.verb == "create" and action.resource == "instance":
-                machine = _find_machine(action.target, domain, infra.config.nesting, ctx)
-                created_machines[action.target] = machine
-
-            if action.verb == "start" and action.resource == "instance":
-                machine = created_machines.get(action.target)
-                if machine is not None:
-                    _inject_context_files(action.target, action.project, machine, driver, ctx)
+    Les limites de ressources (`apply_resource_config`) et les profils
+    GPU/GUI sont déjà portés par la machine : l'instance est créée
+    entièrement configurée, sans mise à jour après coup.
+    """
+    # Config de sécurité nesting (base), puis config explicite (override)
+    config = dict(nesting_security_config(ctx.absolute_level))
+    if not machine.ephemeral:
+        config["security.protection.delete"] = "true"
+    for k, v in machine.config.items():
+        if k.startswith("security.") and k in config and v != config[k]:
+            log.warning(
+                "machine.config override nesting : %s=%s (nesting: %s)",
+                k,
+                v,
+                config[k],
+            )
+        config[k] = v
 
-        except (IncusError, ValueError) as e:
-            result.errors.append((action, str(e)))
-            if action.resource == "instance":
-                failed_instances.add(action.target)
-            elif action.resource in ("project", "network"):
-                # Projet/réseau en erreur = tout le domaine KO
-                for remaining in actions[actions.index(action) + 1 :]:
-                    result.errors.append((remaining, "Ignoré suite à une erreur précédente"))
-                return
+    return InstanceSpec(
+        image=infra.config.defaults.os_image,
+        instance_type=machine.incus_type,
+        profiles=list(machine.profiles),
+        config=config,
+        network=prefix_name(domain.network_name, ctx, infra.config.nesting),
+    )
 
 
 def _execute_action(
@@ -327,8 +449,13 @@ def _execute_action(
     driver: IncusDriver,
     ctx: NestingContext,
     gui_info: GuiInfo | None = None,
-) -> None:
-    """Exécute une action unique."""
+    use_async: bool = False,
+) -> IncusOperation | None:
+    """Exécute une action unique.
+
+    Avec `use_async`, la création d'instance retourne son opération
+    Incus sans l'attendre ; les autres actions sont synchrones.
+    """
     if action.verb == "create" and action.resource == "project":
         driver.project_create(action.target, description=domain.description)
 
@@ -339,30 +466,20 @@ def _execute_action(
         elif action.target == GUI_PROFILE_NAME and gui_info and gui_info.detected:
             create_gui_profile(driver, action.project, gui_info)
         elif action.target == GPU_PROFILE_NAME:
-            driver.profile_create(action.target, action.project)
-            driver.profile_device_add(
+            driver.profile_create(
                 action.target,
-                "gpu",
-                "gpu",
-                {"gid": "44", "uid": "0"},
-                project=action.project,
+                action.project,
+                devices={"gpu": {"type": "gpu", "gid": "44", "uid": "0"}},
             )
         elif action.target in domain.profiles:
-            # Profil custom défini dans le domaine
+            # Profil custom défini dans le domaine : config et devices en un appel
             profile = domain.profiles[action.target]
-            driver.profile_create(action.target, action.project)
-            for dev_name, dev_cfg in profile.devices.items():
-                cfg = dict(dev_cfg)  # copie pour ne pas modifier l'original
-                dtype = cfg.pop("type", "none")
-                driver.profile_device_add(
-                    action.target,
-                    dev_name,
-                    dtype,
-                    cfg,
-                    project=action.project,
-                )
-            if profile.config:
-                driver.profile_config_set(action.target, action.project, profile.config)
+            driver.profile_create(
+                action.target,
+                action.project,
+                config=profile.config,
+                devices=profile.devices,
+            )
         else:
             driver.profile_create(action.target, action.project)
 
@@ -375,32 +492,10 @@ def _execute_action(
 
     elif action.verb == "create" and action.resource == "instance":
         machine = _find_machine(action.target, domain, infra.config.nesting, ctx)
+        spec = instance_spec(machine, domain, infra, ctx)
 
-        # Config de sécurité nesting (base), puis config explicite (override)
-        config = dict(nesting_security_config(ctx.absolute_level))
-        if not machine.ephemeral:
-            config["security.protection.delete"] = "true"
-        for k, v in machine.config.items():
-            if k.startswith("security.") and k in config and v != config[k]:
-                log.warning(
-                    "machine.config override nesting : %s=%s (nesting: %s)",
-                    k,
-                    v,
-                    config[k],
-                )
-            config[k] = v
-
-        network_name = prefix_name(domain.network_name, ctx, infra.config.nesting)
-
-        driver.instance_create(
-            name=action.target,
-            project=action.project,
-            image=infra.config.defaults.os_image,
-            instance_type=machine.incus_type,
-            profiles=machine.profiles,
-            config=config,
-            network=network_name,
-        )
+        create = driver.instance_create_async if use_async else driver.instance_create
+        return create(name=action.target, project=action.project, **dataclasses.asdict(spec))
 
     elif action.verb == "start" and action.resource == "instance":
         # Préparer les répertoires GUI avant le start si profil GUI présent
@@ -416,18 +511,24 @@ def _execute_action(
     elif action.verb == "delete" and action.resource == "instance":
         driver.instance_delete(action.target, action.project)
 
+    elif action.verb == "update" and action.resource == "config":
+        driver.instance_config_update(action.target, action.project, action.changes)
+
     elif action.verb == "update" and action.resource == "profile":
-        # Appliquer un profil GUI à une instance existante
-        from anklume.engine.gui import prepare_gui_dirs
+        profiles = action.changes["profiles"]
+        # Profil GUI ajouté à une instance existante : répertoires d'abord
+        if GUI_PROFILE_NAME in profiles and gui_info and gui_info.detected:
+            from anklume.engine.gui import prepare_gui_dirs
 
-        if gui_info and gui_info.detected:
             prepare_gui_dirs(driver, action.target, action.project, gui_info)
-        driver.instance_profile_add(action.target, GUI_PROFILE_NAME, action.project)
+        driver.instance_profiles_set(action.target, action.project, profiles)
 
     else:
         msg = f"Action inconnue : {action.verb}/{action.resource}"
         raise ValueError(msg)
 
+    return None
+
 
 def _find_machine(
     incus_name: str,
@@ -2,20 +2,42 @@
 
 Détecte le hardware, calcule la répartition selon la politique
 configurée dans anklume.yml, et enrichit le config des machines.
+
+`rebalance()` pousse la répartition recalculée sur les instances
+existantes : seules les clés `limits.*` qui diffèrent sont écrites.
+Les limites cgroup d'un conteneur s'appliquent à chaud ; une VM en
+cours d'exécution doit être redémarrée pour les prendre en compte.
 """
 
 from __future__ import annotations
 
+import dataclasses
 import logging
 import math
 import os
-from dataclasses import dataclass
-
-from anklume.engine.incus_driver import IncusDriver, IncusError
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from anklume.engine.drift import ALLOCATION_KEYS, config_drift
+from anklume.engine.hwcache import load_cached, store_cached
+from anklume.engine.incus_driver import (
+    IncusDriver,
+    IncusError,
+    IncusStateSnapshot,
+    make_driver,
+)
 from anklume.engine.models import Infrastructure, Machine, ResourcePolicyConfig
+from anklume.engine.nesting import NestingContext, prefix_name
+from anklume.engine.usage import InstanceUsage
 
 log = logging.getLogger(__name__)
 
+REBALANCE_JOBS = 4  # instances mises à jour simultanément par défaut
+
+# Mode adaptive : part du pool répartie selon les poids (plancher garanti),
+# le reste suit la consommation mesurée (engine/usage.py).
+ADAPTIVE_FLOOR = 0.5
+
 # Suffixes mémoire (puissances de 1024)
 _MEMORY_UNITS = {
     "KB": 1024,
@@ -50,19 +72,64 @@ class ResourceAllocation:
     source: str  # "auto", "explicit" ou "mixed"
 
 
+@dataclass
+class RebalanceChange:
+    """Limites à mettre à jour sur une instance existante."""
+
+    instance: str
+    project: str
+    type: str  # "container" ou "virtual-machine"
+    status: str
+    changes: dict[str, str | None]  # None = clé à retirer
+
+    @property
+    def restart_required(self) -> bool:
+        """Une VM en cours d'exécution ne prend ses limites qu'au prochain démarrage."""
+        return self.type == "virtual-machine" and self.status == "Running"
+
+
+@dataclass
+class RebalanceResult:
+    """Résultat d'un rééquilibrage."""
+
+    changes: list[RebalanceChange] = field(default_factory=list)
+    applied: list[RebalanceChange] = field(default_factory=list)
+    restart_required: list[RebalanceChange] = field(default_factory=list)  # VM à redémarrer
+    errors: list[tuple[RebalanceChange, str]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return len(self.errors) == 0
+
+
 # ---------------------------------------------------------------------------
 # Détection hardware
 # ---------------------------------------------------------------------------
 
 
-def detect_hardware(driver: IncusDriver | None = None) -> HardwareInfo:
-    """Détecte le hardware via IncusDriver, fallback sur os/proc."""
+def detect_hardware(driver: IncusDriver | None = None, *, refresh: bool = False) -> HardwareInfo:
+    """Détecte le hardware via IncusDriver, fallback sur os/proc.
+
+    Le résultat Incus est gardé dans le cache matériel (engine/hwcache.py)
+    tant que le boot ID et l'empreinte matérielle ne changent pas ;
+    `refresh` force la relecture.
+    """
+    cached = None if refresh else load_cached("host")
+    if cached is not None:
+        try:
+            return HardwareInfo(
+                cpu_threads=int(cached["cpu_threads"]),
+                memory_bytes=int(cached["memory_bytes"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+
     if driver is None:
-        driver = IncusDriver()
+        driver = make_driver()
 
     try:
         data = driver.host_resources()
-        return HardwareInfo(
+        hardware = HardwareInfo(
             cpu_threads=data["cpu"]["total"],
             memory_bytes=data["memory"]["total"],
         )
@@ -70,6 +137,9 @@ def detect_hardware(driver: IncusDriver | None = None) -> HardwareInfo:
         log.warning("Détection hardware via Incus échouée, fallback sur os/proc")
         return detect_hardware_fallback()
 
+    store_cached("host", dataclasses.asdict(hardware))
+    return hardware
+
 
 def detect_hardware_fallback() -> HardwareInfo:
     """Détecte le hardware depuis os.cpu_count() et /proc/meminfo."""
@@ -133,10 +203,13 @@ def parse_memory_value(value: str) -> int:
 def compute_resource_allocation(
     infra: Infrastructure,
     hardware: HardwareInfo,
+    usage: dict[str, InstanceUsage] | None = None,
 ) -> list[ResourceAllocation]:
     """Calcule l'allocation de ressources pour toutes les instances.
 
-    Retourne une liste vide si resource_policy est None.
+    Retourne une liste vide si resource_policy est None. `usage`
+    (consommation lissée par `full_name`) n'est lu qu'en mode adaptive ;
+    sans mesure, ce mode se comporte comme proportional.
     """
     policy = infra.config.resource_policy
     if policy is None:
@@ -182,8 +255,12 @@ def compute_resource_allocation(
     allocatable_mem = max(0, available_mem - explicit_mem_total)
 
     # Calculer les parts
-    cpu_parts = _distribute(cpu_auto, allocatable_cpu, policy.mode)
-    mem_parts = _distribute(mem_auto, allocatable_mem, policy.mode)
+    cpu_demand = mem_demand = None
+    if policy.mode == "adaptive" and usage:
+        cpu_demand = {name: u.cpu for name, u in usage.items()}
+        mem_demand = {name: u.memory for name, u in usage.items()}
+    cpu_parts = _distribute(cpu_auto, allocatable_cpu, policy.mode, cpu_demand)
+    mem_parts = _distribute(mem_auto, allocatable_mem, policy.mode, mem_demand)
 
     # Construire les allocations
     cpu_key = "limits.cpu.allowance" if policy.cpu_mode == "allowance" else "limits.cpu"
@@ -242,8 +319,13 @@ def _distribute(
     machines: list[Machine],
     total: int,
     mode: str,
+    demand: dict[str, float] | None = None,
 ) -> dict[str, float]:
-    """Distribue une quantité totale entre les machines."""
+    """Distribue une quantité totale entre les machines.
+
+    En mode adaptive, `ADAPTIVE_FLOOR` du total est réparti selon les
+    poids et le reste au prorata de `demand` (consommation mesurée).
+    """
     if not machines:
         return {}
 
@@ -251,7 +333,15 @@ def _distribute(
         part = total / len(machines)
         return {m.full_name: part for m in machines}
 
-    # proportional
+    if mode == "adaptive" and demand:
+        busy = {m.full_name: max(0.0, demand.get(m.full_name, 0.0)) for m in machines}
+        total_demand = sum(busy.values())
+        if total_demand > 0:
+            floors = _distribute(machines, total * ADAPTIVE_FLOOR, "proportional")
+            pool = total - sum(floors.values())
+            return {name: floors[name] + pool * busy[name] / total_demand for name in busy}
+
+    # proportional (et adaptive sans mesure)
     total_weight = sum(m.weight for m in machines)
     if total_weight == 0:
         return {m.full_name: 0.0 for m in machines}
@@ -325,3 +415,90 @@ def apply_resource_config(
                 machine.config[alloc.memory_key] = alloc.memory_value
                 if alloc.memory_enforce:
                     machine.config["limits.memory.enforce"] = alloc.memory_enforce
+
+
+# ---------------------------------------------------------------------------
+# Rééquilibrage à chaud
+# ---------------------------------------------------------------------------
+
+
+def plan_rebalance(
+    infra: Infrastructure,
+    state: IncusStateSnapshot,
+    ctx: NestingContext | None = None,
+) -> list[RebalanceChange]:
+    """Écarts `limits.*` entre machine.config et les instances existantes.
+
+    `machine.config` doit déjà contenir l'allocation (`apply_resource_config`).
+    Les instances absentes (pas encore créées) sont ignorées.
+    """
+    ctx = ctx or NestingContext()
+    nesting_cfg = infra.config.nesting
+    managed = ALLOCATION_KEYS if infra.config.resource_policy else frozenset()
+    plan: list[RebalanceChange] = []
+    for domain in infra.enabled_domains:
+        project = prefix_name(domain.name, ctx, nesting_cfg)
+        live = {i.name: i for i in state.instance_list(project)}
+        for machine in domain.machines.values():
+            instance = live.get(prefix_name(machine.full_name, ctx, nesting_cfg))
+            if instance is None:
+                continue
+            desired = {k: v for k, v in machine.config.items() if k.startswith("limits.")}
+            changes = config_drift(desired, instance.config, managed)
+            if changes:
+                plan.append(
+                    RebalanceChange(
+                        instance=instance.name,
+                        project=project,
+                        type=instance.type,
+                        status=instance.status,
+                        changes=changes,
+                    )
+                )
+    return plan
+
+
+def rebalance(
+    infra: Infrastructure,
+    driver: IncusDriver,
+    hardware: HardwareInfo,
+    *,
+    dry_run: bool = False,
+    jobs: int = REBALANCE_JOBS,
+    state: IncusStateSnapshot | None = None,
+    nesting_context: NestingContext | None = None,
+    usage: dict[str, InstanceUsage] | None = None,
+) -> RebalanceResult:
+    """Recalcule l'allocation et pousse les limites modifiées.
+
+    Toutes les instances sont mises à jour (en parallèle). Une VM en
+    cours d'exécution ne prend ses nouvelles limites qu'au prochain
+    démarrage : elle est listée dans `restart_required`.
+    """
+    apply_resource_config(infra, compute_resource_allocation(infra, hardware, usage))
+    plan = plan_rebalance(infra, state or driver.state_snapshot(), nesting_context)
+
+    result = RebalanceResult(changes=plan)
+    if dry_run or not plan:
+        result.restart_required = [c for c in plan if c.restart_required]
+        return result
+
+    def update(change: RebalanceChange) -> str | None:
+        try:
+            driver.instance_config_update(change.instance, change.project, change.changes)
+        except IncusError as e:
+            log.warning("Mise à jour des limites de %s échouée : %s", change.instance, e)
+            return str(e)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(plan)))) as pool:
+        outcomes = list(pool.map(update, plan))
+
+    for change, error in zip(plan, outcomes, strict=True):
+        if error is None:
+            result.applied.append(change)
+            if change.restart_required:
+                result.restart_required.append(change)
+        else:
+            result.errors.append((change, error))
+    return result
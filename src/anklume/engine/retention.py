@@ -0,0 +1,173 @@
+"""Rétention des snapshots — élagage générationnel des anklume-*.
+
+Seuls les snapshots automatiques et manuels sans nom (`anklume-pre-*`,
+`anklume-post-*`, `anklume-snap-*`) sont concernés ; un snapshot nommé
+par l'utilisateur n'est jamais supprimé. Les règles s'appliquent par
+instance et par phase :
+
+- un snapshot gardé par au moins une règle `keep_*` est conservé
+  (sans règle `keep_*`, tout est conservé sauf `max_age_days`) ;
+- au-delà de `max_age_days`, un snapshot est supprimé ;
+- le plus récent de chaque phase est toujours conservé (rollback).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import get_args
+
+from anklume.engine.incus_driver import (
+    IncusDriver,
+    IncusError,
+    IncusSnapshot,
+    IncusStateSnapshot,
+)
+from anklume.engine.models import Infrastructure, SnapshotRetention
+from anklume.engine.snapshot import SnapshotPhase, iter_snapshots, snapshot_prefix_for_phase
+
+logger = logging.getLogger(__name__)
+
+PRUNE_JOBS = 4  # suppressions simultanées par défaut
+
+_NAME_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+
+@dataclass
+class PruneResult:
+    """Résultat d'un élagage : (instance, projet, snapshot)."""
+
+    deleted: list[tuple[str, str, str]] = field(default_factory=list)
+    errors: list[tuple[tuple[str, str, str], str]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return len(self.errors) == 0
+
+
+def snapshot_time(snapshot: IncusSnapshot, prefix: str) -> datetime | None:
+    """Date du snapshot : horodatage du nom, sinon `created_at` (None si inconnue)."""
+    try:
+        return datetime.strptime(snapshot.name.removeprefix(prefix), _NAME_TIME_FORMAT).replace(
+            tzinfo=UTC
+        )
+    except ValueError:
+        pass
+    if snapshot.created_at:
+        try:
+            created = datetime.fromisoformat(snapshot.created_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return created if created.tzinfo else created.replace(tzinfo=UTC)
+    return None
+
+
+def _generations(
+    dated: list[tuple[datetime, IncusSnapshot]],
+    count: int,
+    period: Callable[[datetime], Hashable],
+) -> set[str]:
+    """Le plus récent de chacune des `count` dernières périodes."""
+    kept: set[str] = set()
+    seen: set[Hashable] = set()
+    for when, snap in dated:
+        if len(seen) >= count:
+            break
+        key = period(when)
+        if key not in seen:
+            seen.add(key)
+            kept.add(snap.name)
+    return kept
+
+
+def select_prunable(
+    snapshots: list[IncusSnapshot],
+    policy: SnapshotRetention,
+    now: datetime | None = None,
+) -> list[IncusSnapshot]:
+    """Snapshots d'une instance à supprimer selon la politique (plus anciens d'abord)."""
+    if not policy.enabled:
+        return []
+    now = now or datetime.now(tz=UTC)
+    cutoff = now - timedelta(days=policy.max_age_days) if policy.max_age_days else None
+
+    prunable: list[IncusSnapshot] = []
+    for phase in get_args(SnapshotPhase):
+        prefix = snapshot_prefix_for_phase(phase)
+        dated = [
+            (when, snap)
+            for snap in snapshots
+            if snap.name.startswith(prefix) and (when := snapshot_time(snap, prefix)) is not None
+        ]
+        dated.sort(key=lambda item: item[0], reverse=True)
+
+        kept: set[str] | None = None
+        if policy.has_keep_rules:
+            kept = {snap.name for _, snap in dated[: policy.keep_last]}
+            kept |= _generations(dated, policy.keep_daily, lambda t: t.date())
+            kept |= _generations(dated, policy.keep_weekly, lambda t: t.isocalendar()[:2])
+
+        # dated[0] : le plus récent de la phase, toujours conservé ;
+        # suppressions du plus ancien au plus récent
+        for when, snap in reversed(dated[1:]):
+            expired = cutoff is not None and when < cutoff
+            if expired or (kept is not None and snap.name not in kept):
+                prunable.append(snap)
+    return prunable
+
+
+def plan_prune(
+    driver: IncusDriver,
+    infra: Infrastructure,
+    *,
+    state: IncusStateSnapshot | None = None,
+    now: datetime | None = None,
+) -> list[tuple[str, str, str]]:
+    """Suppressions à faire, calculées sur une seule lecture groupée."""
+    policy = infra.config.snapshots.retention
+    if not policy.enabled:
+        return []
+    return [
+        (instance, project, snap.name)
+        for instance, project, snapshots in iter_snapshots(driver, infra, state=state)
+        for snap in select_prunable(snapshots, policy, now)
+    ]
+
+
+def prune_snapshots(
+    driver: IncusDriver,
+    infra: Infrastructure,
+    *,
+    dry_run: bool = False,
+    jobs: int = PRUNE_JOBS,
+    state: IncusStateSnapshot | None = None,
+    now: datetime | None = None,
+) -> PruneResult:
+    """Applique la politique `snapshots.retention` ; suppressions en parallèle."""
+    plan = plan_prune(driver, infra, state=state, now=now)
+    result = PruneResult()
+    if dry_run:
+        result.deleted = plan
+        return result
+
+    def delete(entry: tuple[str, str, str]) -> str | None:
+        instance, project, snap = entry
+        try:
+            driver.snapshot_delete(instance, project, snap)
+        except IncusError as e:
+            logger.warning("Suppression snapshot %s/%s échouée : %s", instance, snap, e)
+            return str(e)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(plan) or 1))) as pool:
+        outcomes = list(pool.map(delete, plan))
+
+    for entry, error in zip(plan, outcomes, strict=True):
+        if error is None:
+            result.deleted.append(entry)
+        else:
+            result.errors.append((entry, error))
+    return result
@@ -0,0 +1,244 @@
+"""Ordonnanceur d'actions en graphe de dépendances (DAG).
+
+Chaque action porte une clé (`key`) et la liste des clés dont elle
+dépend (`deps`). L'ordonnanceur lance toutes les actions prêtes en
+parallèle (au plus `jobs` à la fois) ; un échec n'ignore que les
+actions qui en dépendent, directement ou transitivement.
+
+Les dépendances vers une clé absente du plan sont considérées comme
+satisfaites (ressource déjà présente dans Incus).
+
+Une action peut rendre la main avant d'être terminée en retournant un
+handle (opération Incus asynchrone) : `wait` attend alors un lot de
+handles d'un coup. En séquentiel, toutes les actions prêtes sont
+soumises avant d'attendre leurs opérations ensemble.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Generic, Protocol, TypeVar
+
+SKIPPED_MESSAGE = "Ignoré suite à une erreur précédente"
+
+
+class Schedulable(Protocol):
+    """Action ordonnançable : une clé unique et ses dépendances."""
+
+    @property
+    def key(self) -> str: ...
+
+    @property
+    def deps(self) -> list[str]: ...
+
+
+T = TypeVar("T", bound=Schedulable)
+
+
+@dataclass
+class ScheduleResult(Generic[T]):
+    """Résultat d'une exécution, dans l'ordre du plan."""
+
+    executed: list[T] = field(default_factory=list)
+    errors: list[tuple[T, str]] = field(default_factory=list)
+    critical_path: int = 0
+
+
+def _build_graph(actions: Sequence[T]) -> tuple[list[list[int]], list[list[int]]]:
+    """Retourne (dépendances, dépendants) par index d'action."""
+    index = {a.key: i for i, a in enumerate(actions)}
+    if len(index) != len(actions):
+        msg = "Clés d'action dupliquées dans le plan"
+        raise ValueError(msg)
+
+    parents: list[list[int]] = [[] for _ in actions]
+    children: list[list[int]] = [[] for _ in actions]
+    for i, action in enumerate(actions):
+        for dep in action.deps:
+            j = index.get(dep)
+            if j is not None:
+                parents[i].append(j)
+                children[j].append(i)
+    return parents, children
+
+
+def _topological_order(parents: list[list[int]], children: list[list[int]]) -> list[int]:
+    """Ordre topologique stable (plus petit index prêt d'abord)."""
+    pending = [len(p) for p in parents]
+    ready = [i for i, n in enumerate(pending) if n == 0]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(i)
+        for child in children[i]:
+            pending[child] -= 1
+            if pending[child] == 0:
+                heapq.heappush(ready, child)
+    if len(order) != len(parents):
+        msg = "Dépendances cycliques dans le plan"
+        raise ValueError(msg)
+    return order
+
+
+def _longest_chain(parents: list[list[int]], order: list[int]) -> int:
+    depth = [0] * len(parents)
+    for i in order:
+        depth[i] = 1 + max((depth[p] for p in parents[i]), default=0)
+    return max(depth, default=0)
+
+
+def critical_path_length(actions: Sequence[T]) -> int:
+    """Nombre d'actions de la plus longue chaîne de dépendances."""
+    parents, children = _build_graph(actions)
+    return _longest_chain(parents, _topological_order(parents, children))
+
+
+WaitFn = Callable[[list[Any]], list[str | None]]
+
+
+def run_dag(
+    actions: Sequence[T],
+    run: Callable[[T], Any],
+    *,
+    jobs: int = 1,
+    errors: tuple[type[Exception], ...] = (Exception,),
+    wait: WaitFn | None = None,
+) -> ScheduleResult[T]:
+    """Exécute les actions en respectant leurs dépendances.
+
+    Args:
+        run: exécute une action ; lève une exception de `errors` en cas d'échec.
+            Avec `wait`, peut retourner un handle d'opération en cours.
+        jobs: nombre maximal d'actions simultanées (1 = séquentiel, ordre du plan).
+        errors: exceptions rapportées comme échec de l'action (les autres remontent).
+        wait: attend une liste de handles ; retourne, pour chacun, None
+            (succès) ou le message d'erreur.
+    """
+    parents, children = _build_graph(actions)
+    order = _topological_order(parents, children)
+    outcome: dict[int, str | None] = {}  # None = succès, sinon message d'erreur
+
+    def fail(i: int, message: str) -> None:
+        outcome[i] = message
+        stack = list(children[i])
+        while stack:
+            j = stack.pop()
+            if j not in outcome:
+                outcome[j] = SKIPPED_MESSAGE
+                stack.extend(children[j])
+
+    def submit(i: int) -> Any:
+        """Lance l'action ; retourne son handle si elle reste en attente."""
+        try:
+            handle = run(actions[i])
+        except errors as e:
+            fail(i, str(e))
+            return None
+        if handle is None or wait is None:
+            outcome[i] = None
+            return None
+        return handle
+
+    def settle(pending: list[tuple[int, Any]]) -> None:
+        """Attend un lot de handles et enregistre leur issue."""
+        handles = [handle for _, handle in pending]
+        try:
+            messages = wait(handles) if wait else [None] * len(handles)
+        except errors as e:
+            messages = [str(e)] * len(pending)
+        for (i, _), message in zip(pending, messages, strict=True):
+            if message is None:
+                outcome[i] = None
+            else:
+                fail(i, message)
+
+    def execute(i: int) -> None:
+        handle = submit(i)
+        if handle is not None:
+            settle([(i, handle)])
+
+    if jobs > 1:
+        _run_parallel(parents, children, execute, outcome, jobs)
+    elif wait is None:
+        for i in order:
+            if i not in outcome:
+                execute(i)
+    else:
+        _run_waves(parents, children, submit, settle, outcome)
+
+    result: ScheduleResult[T] = ScheduleResult(critical_path=_longest_chain(parents, order))
+    for i, action in enumerate(actions):
+        message = outcome[i]
+        if message is None:
+            result.executed.append(action)
+        else:
+            result.errors.append((action, message))
+    return result
+
+
+def _run_waves(
+    parents: list[list[int]],
+    children: list[list[int]],
+    submit: Callable[[int], Any],
+    settle: Callable[[list[tuple[int, Any]]], None],
+    outcome: dict[int, str | None],
+) -> None:
+    """Soumet toutes les actions prêtes, attend leurs opérations en lot, recommence."""
+    pending = [len(p) for p in parents]
+    ready = [i for i, n in enumerate(pending) if n == 0]
+    while ready:
+        batch = []
+        for i in ready:
+            if i not in outcome:
+                handle = submit(i)
+                if handle is not None:
+                    batch.append((i, handle))
+        if batch:
+            settle(batch)
+
+        next_ready: list[int] = []
+        for i in ready:
+            if i not in outcome or outcome[i] is not None:
+                continue
+            for child in children[i]:
+                pending[child] -= 1
+                if pending[child] == 0 and child not in outcome:
+                    next_ready.append(child)
+        ready = sorted(next_ready)
+
+
+def _run_parallel(
+    parents: list[list[int]],
+    children: list[list[int]],
+    execute: Callable[[int], None],
+    outcome: dict[int, str | None],
+    jobs: int,
+) -> None:
+    """Lance chaque action dès que ses dépendances ont réussi."""
+    pending = [len(p) for p in parents]
+    ready = sorted(i for i, n in enumerate(pending) if n == 0)
+    running: dict[Future[None], int] = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while ready or running:
+            while ready and len(running) < jobs:
+                i = ready.pop(0)
+                if i not in outcome:
+                    running[pool.submit(execute, i)] = i
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.__getitem__):
+                i = running.pop(future)
+                future.result()  # propage les exceptions non rapportées
+                if outcome[i] is not None:
+                    continue
+                for child in children[i]:
+                    pending[child] -= 1
+                    if pending[child] == 0 and child not in outcome:
+                        ready.append(child)
+            ready.sort()
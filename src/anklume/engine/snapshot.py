@@ -3,10 +3,19 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Literal
 
-from anklume.engine.incus_driver import IncusDriver, IncusError, IncusSnapshot
+from anklume.engine.incus_driver import (
+    IncusDriver,
+    IncusError,
+    IncusSnapshot,
+    IncusStateSnapshot,
+)
 from anklume.engine.models import Infrastructure
 
 logger = logging.getLogger(__name__)
@@ -16,6 +25,21 @@ SnapshotPhase = Literal["pre", "post", "snap"]
 
 SNAPSHOT_PREFIX = "anklume-"
 
+ROLLBACK_JOBS = 4  # restaurations simultanées par défaut
+
+
+@dataclass
+class RollbackResult:
+    """Résultat d'un rollback global, dans l'ordre domaines/machines."""
+
+    restored: list[tuple[str, str, str]] = field(default_factory=list)  # (inst, projet, snap)
+    errors: list[tuple[str, str, str]] = field(default_factory=list)  # (inst, projet, erreur)
+    timings: dict[str, float] = field(default_factory=dict)  # instance → secondes
+
+    @property
+    def success(self) -> bool:
+        return len(self.errors) == 0
+
 
 def snapshot_prefix_for_phase(phase: SnapshotPhase) -> str:
     """Retourne le préfixe complet pour une phase donnée."""
@@ -45,39 +69,94 @@ def create_auto_snapshots(
     infra: Infrastructure,
     phase: SnapshotPhase,
     *,
-    existing_projects: set[str] | None = None,
+    state: IncusStateSnapshot | None = None,
+    pool_concurrency: int | None = None,
 ) -> list[tuple[str, str, str]]:
     """Crée des snapshots automatiques pour les instances existantes.
 
+    Les snapshots sont lancés en parallèle, au plus `pool_concurrency`
+    à la fois par pool de stockage (disque racine de l'instance).
+
     Args:
         phase: "pre", "post" ou "snap"
-        existing_projects: projets Incus existants (évite un appel subprocess).
+        state: état Incus déjà lu (sinon une lecture groupée est faite).
+        pool_concurrency: limite par pool (défaut : `snapshots.pool_concurrency`).
 
     Returns:
-        Liste de (instance, project, snapshot_name) créés avec succès.
+        Liste de (instance, project, snapshot_name) créés avec succès,
+        dans l'ordre des domaines et des machines.
     """
-    if existing_projects is None:
-        existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
+    if pool_concurrency is None:
+        pool_concurrency = infra.config.snapshots.pool_concurrency
     snap_name = generate_name(phase)
-    created: list[tuple[str, str, str]] = []
 
+    targets: list[tuple[str, str]] = []
+    by_pool: dict[str, list[int]] = {}
     for domain in infra.enabled_domains:
-        if domain.name not in existing_projects:
-            continue
-
-        instances = {i.name for i in driver.instance_list(domain.name)}
+        instances = {i.name: i for i in state.instance_list(domain.name)}
 
         for machine in domain.sorted_machines:
-            if machine.full_name not in instances:
+            inst = instances.get(machine.full_name)
+            if inst is None:
                 continue
+            by_pool.setdefault(inst.storage_pool, []).append(len(targets))
+            targets.append((machine.full_name, domain.name))
+
+    def snapshot(index: int) -> bool:
+        instance, project = targets[index]
+        try:
+            driver.snapshot_create(instance, project, snap_name)
+        except IncusError as e:
+            logger.warning("Snapshot %s/%s échoué : %s", project, instance, e)
+            return False
+        return True
+
+    futures: dict[int, Future[bool]] = {}
+    executors = [
+        (ThreadPoolExecutor(max_workers=max(1, min(pool_concurrency, len(indexes)))), indexes)
+        for indexes in by_pool.values()
+    ]
+    try:
+        for executor, indexes in executors:
+            for i in indexes:
+                futures[i] = executor.submit(snapshot, i)
+    finally:
+        for executor, _ in executors:
+            executor.shutdown(wait=True)
+
+    return [
+        (instance, project, snap_name)
+        for i, (instance, project) in enumerate(targets)
+        if futures[i].result()
+    ]
+
+
+def iter_snapshots(
+    driver: IncusDriver,
+    infra: Infrastructure,
+    instance_name: str | None = None,
+    *,
+    state: IncusStateSnapshot | None = None,
+) -> Iterator[tuple[str, str, list[IncusSnapshot]]]:
+    """Parcourt les snapshots instance par instance : (instance, project, snapshots).
 
-            try:
-                driver.snapshot_create(machine.full_name, domain.name, snap_name)
-                created.append((machine.full_name, domain.name, snap_name))
-            except IncusError as e:
-                logger.warning("Snapshot %s/%s échoué : %s", domain.name, machine.full_name, e)
+    Les snapshots viennent de la lecture groupée (`recursion=2`) ; le
+    driver n'est interrogé instance par instance que si l'état fourni
+    ne les embarque pas.
+    """
+    if state is None:
+        state = driver.state_snapshot()
 
-    return created
+    for domain in infra.enabled_domains:
+        for inst in state.instance_list(domain.name):
+            if instance_name and inst.name != instance_name:
+                continue
+            snapshots = inst.snapshots
+            if snapshots is None:
+                snapshots = driver.snapshot_list(inst.name, domain.name)
+            yield inst.name, domain.name, snapshots
 
 
 def list_all_snapshots(
@@ -85,29 +164,16 @@ def list_all_snapshots(
     infra: Infrastructure,
     instance_name: str | None = None,
     *,
-    existing_projects: set[str] | None = None,
+    state: IncusStateSnapshot | None = None,
 ) -> dict[str, list[IncusSnapshot]]:
     """Liste les snapshots, groupés par instance.
 
     Si instance_name est fourni, filtre sur cette instance uniquement.
     """
-    if existing_projects is None:
-        existing_projects = {p.name for p in driver.project_list()}
-    result: dict[str, list[IncusSnapshot]] = {}
-
-    for domain in infra.enabled_domains:
-        if domain.name not in existing_projects:
-            continue
-
-        instances = driver.instance_list(domain.name)
-
-        for inst in instances:
-            if instance_name and inst.name != instance_name:
-                continue
-            snapshots = driver.snapshot_list(inst.name, domain.name)
-            result[inst.name] = snapshots
-
-    return result
+    return {
+        inst: snapshots
+        for inst, _project, snapshots in iter_snapshots(driver, infra, instance_name, state=state)
+    }
 
 
 def restore_snapshot(
@@ -115,12 +181,17 @@ def restore_snapshot(
     instance: str,
     project: str,
     snapshot_name: str,
+    *,
+    was_running: bool | None = None,
 ) -> None:
-    """Restaure un snapshot. Arrête l'instance si running, restaure, redémarre."""
-    instances = driver.instance_list(project)
-    inst = next((i for i in instances if i.name == instance), None)
+    """Restaure un snapshot. Arrête l'instance si running, restaure, redémarre.
 
-    was_running = inst is not None and inst.status == "Running"
+    `was_running` évite de relire l'état de l'instance quand l'appelant le connaît.
+    """
+    if was_running is None:
+        instances = driver.instance_list(project)
+        inst = next((i for i in instances if i.name == instance), None)
+        was_running = inst is not None and inst.status == "Running"
 
     if was_running:
         driver.instance_stop(instance, project)
@@ -190,27 +261,32 @@ def rollback_pre_apply(
     infra: Infrastructure,
     *,
     dry_run: bool = False,
-) -> list[tuple[str, str, str]]:
+    jobs: int = ROLLBACK_JOBS,
+) -> RollbackResult:
     """Restaure les snapshots anklume-pre-* les plus récents de toutes les instances.
 
-    Returns:
-        list of (instance, project, snapshot_name) restored.
+    L'état Incus (instances, statuts, snapshots) est lu une seule fois.
+    Chaque instance suit sa séquence stop → restore → start ; jusqu'à
+    `jobs` instances sont restaurées en parallèle.
     """
-    existing_projects = {p.name for p in driver.project_list()}
-    restored: list[tuple[str, str, str]] = []
+    state = driver.state_snapshot()
+    pre_prefix = snapshot_prefix_for_phase("pre")
+    plan: list[tuple[str, str, str, bool]] = []  # (instance, projet, snapshot, running)
 
     for domain in infra.enabled_domains:
-        if domain.name not in existing_projects:
+        if not state.project_exists(domain.name):
             continue
 
-        instances = {i.name for i in driver.instance_list(domain.name)}
+        instances = {i.name: i for i in state.instance_list(domain.name)}
 
         for machine in domain.sorted_machines:
-            if machine.full_name not in instances:
+            inst = instances.get(machine.full_name)
+            if inst is None:
                 continue
 
-            snapshots = driver.snapshot_list(machine.full_name, domain.name)
-            pre_prefix = snapshot_prefix_for_phase("pre")
+            snapshots = inst.snapshots
+            if snapshots is None:
+                snapshots = driver.snapshot_list(machine.full_name, domain.name)
             pre_snaps = [s for s in snapshots if s.name.startswith(pre_prefix)]
 
             if not pre_snaps:
@@ -218,23 +294,33 @@ def rollback_pre_apply(
 
             # Le plus récent par nom (format anklume-pre-YYYYMMDD-HHMMSS, tri lexicographique)
             latest = max(pre_snaps, key=lambda s: s.name)
-
-            if dry_run:
-                restored.append((machine.full_name, domain.name, latest.name))
-                continue
-
-            try:
-                restore_snapshot(driver, machine.full_name, domain.name, latest.name)
-                restored.append((machine.full_name, domain.name, latest.name))
-            except IncusError as e:
-                logger.warning(
-                    "Rollback %s/%s échoué : %s",
-                    domain.name,
-                    machine.full_name,
-                    e,
-                )
-
-    return restored
+            plan.append((machine.full_name, domain.name, latest.name, inst.status == "Running"))
+
+    result = RollbackResult()
+    if dry_run:
+        result.restored = [(inst, project, snap) for inst, project, snap, _ in plan]
+        return result
+
+    def restore(entry: tuple[str, str, str, bool]) -> tuple[str | None, float]:
+        instance, project, snap, running = entry
+        start = time.monotonic()
+        try:
+            restore_snapshot(driver, instance, project, snap, was_running=running)
+        except IncusError as e:
+            logger.warning("Rollback %s/%s échoué : %s", project, instance, e)
+            return str(e), time.monotonic() - start
+        return None, time.monotonic() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(plan) or 1))) as pool:
+        outcomes = list(pool.map(restore, plan))
+
+    for (instance, project, snap, _), (error, seconds) in zip(plan, outcomes, strict=True):
+        result.timings[instance] = seconds
+        if error is None:
+            result.restored.append((instance, project, snap))
+        else:
+            result.errors.append((instance, project, error))
+    return result
 
 
 def resolve_instance_project(
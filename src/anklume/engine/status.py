@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
-from anklume.engine.incus_driver import IncusDriver
+from anklume.engine.incus_driver import IncusDriver, IncusStateSnapshot
 from anklume.engine.models import Infrastructure
 from anklume.engine.nesting import NestingContext, prefix_name
 
@@ -68,17 +68,19 @@ def compute_status(
     driver: IncusDriver,
     nesting_context: NestingContext | None = None,
     domain_name: str | None = None,
+    state: IncusStateSnapshot | None = None,
 ) -> InfraStatus:
     """Compare l'état déclaré avec l'état réel Incus.
 
-    Si domain_name est fourni, filtre sur ce seul domaine
-    (évite les requêtes Incus pour les autres domaines).
+    Si domain_name est fourni, filtre sur ce seul domaine.
+    L'état réel est lu en une passe (``driver.state_snapshot()``).
     """
     ctx = nesting_context or NestingContext()
     nesting_cfg = infra.config.nesting
     result = InfraStatus()
 
-    existing_projects = {p.name for p in driver.project_list()}
+    if state is None:
+        state = driver.state_snapshot()
 
     for domain in infra.enabled_domains:
         if domain_name and domain.name != domain_name:
@@ -86,11 +88,11 @@ def compute_status(
         project_name = prefix_name(domain.name, ctx, nesting_cfg)
         network_name = prefix_name(domain.network_name, ctx, nesting_cfg)
 
-        project_exists = project_name in existing_projects
+        project_exists = state.project_exists(project_name)
 
         if project_exists:
-            network_exists = driver.network_exists(network_name, project_name)
-            existing = {i.name: i for i in driver.instance_list(project_name)}
+            network_exists = state.network_exists(network_name, project_name)
+            existing = {i.name: i for i in state.instance_list(project_name)}
         else:
             network_exists = False
             existing = {}
@@ -100,13 +102,13 @@ def compute_status(
             incus_name = prefix_name(machine.full_name, ctx, nesting_cfg)
             incus_inst = existing.get(incus_name)
 
-            state = "Absent" if incus_inst is None else incus_inst.status
+            status = "Absent" if incus_inst is None else incus_inst.status
 
             instances.append(
                 InstanceStatus(
                     name=machine.full_name,
                     machine_type=machine.type,
-                    state=state,
+                    state=status,
                 )
             )
 
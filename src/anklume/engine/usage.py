@@ -0,0 +1,210 @@
+"""Consommation réelle des instances — échantillons lissés (EWMA).
+
+Alimente le mode `adaptive` de `resource_policy` : à chaque passe
+(apply, `resource show`, `resource rebalance`), l'état de chaque
+instance active est lu via `/1.0/instances/<nom>/state` :
+
+- CPU : compteur cumulé `cpu.usage` (ns) ; le débit entre deux passes
+  donne le nombre de cœurs occupés ;
+- mémoire : `memory.usage` (octets).
+
+Chaque mesure est lissée par une moyenne mobile exponentielle, gardée
+dans `.anklume/usage.json` du projet. Une instance arrêtée compte pour
+zéro : sa part décroît au fil des passes et revient aux instances
+actives.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from anklume.engine.incremental import STATE_DIR
+from anklume.engine.incus_driver import IncusDriver, IncusError, IncusStateSnapshot
+from anklume.engine.models import Infrastructure
+from anklume.engine.nesting import NestingContext, prefix_name
+
+log = logging.getLogger(__name__)
+
+USAGE_FILE = "usage.json"
+USAGE_VERSION = 1
+EWMA_ALPHA = 0.3  # poids de la dernière mesure
+SAMPLE_JOBS = 4  # lectures d'état simultanées
+
+
+@dataclass
+class InstanceUsage:
+    """Consommation lissée d'une instance et dernier compteur CPU lu."""
+
+    cpu: float = 0.0  # cœurs occupés (EWMA)
+    memory: float = 0.0  # octets (EWMA)
+    cpu_ns: int = 0  # compteur cpu.usage de la dernière passe
+    sampled_at: float = 0.0  # horodatage de la dernière passe (epoch)
+
+
+def usage_path(project_dir: Path) -> Path:
+    return project_dir / STATE_DIR / USAGE_FILE
+
+
+def load_usage(project_dir: Path) -> dict[str, InstanceUsage]:
+    """Lit `.anklume/usage.json`. Fichier absent ou illisible → vide."""
+    path = usage_path(project_dir)
+    if not path.exists():
+        return {}
+    try:
+        raw = json.loads(path.read_text())
+        if not isinstance(raw, dict) or raw.get("version") != USAGE_VERSION:
+            return {}
+        return {name: InstanceUsage(**entry) for name, entry in raw["instances"].items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.warning("Historique de consommation illisible (%s) : %s", path, e)
+        return {}
+
+
+def save_usage(project_dir: Path, usage: dict[str, InstanceUsage]) -> None:
+    """Écrit `.anklume/usage.json` (remplacement atomique)."""
+    path = usage_path(project_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": USAGE_VERSION,
+        "instances": {name: dataclasses.asdict(usage[name]) for name in sorted(usage)},
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2) + "\n")
+    tmp.replace(path)
+
+
+def ewma(previous: float, sample: float, alpha: float = EWMA_ALPHA) -> float:
+    return alpha * sample + (1 - alpha) * previous
+
+
+def update_usage(
+    previous: InstanceUsage | None,
+    cpu_ns: int,
+    memory: int,
+    now: float,
+    alpha: float = EWMA_ALPHA,
+) -> InstanceUsage:
+    """Intègre une mesure. Le débit CPU exige une passe précédente."""
+    if previous is None:
+        return InstanceUsage(cpu=0.0, memory=float(memory), cpu_ns=cpu_ns, sampled_at=now)
+
+    cpu = previous.cpu
+    elapsed = now - previous.sampled_at
+    # Compteur remis à zéro (redémarrage) : pas de débit pour cette passe
+    if elapsed > 0 and cpu_ns >= previous.cpu_ns:
+        cores = (cpu_ns - previous.cpu_ns) / 1e9 / elapsed
+        cpu = ewma(previous.cpu, cores, alpha)
+    return InstanceUsage(
+        cpu=cpu,
+        memory=ewma(previous.memory, memory, alpha),
+        cpu_ns=cpu_ns,
+        sampled_at=now,
+    )
+
+
+def idle_usage(
+    previous: InstanceUsage | None, now: float, alpha: float = EWMA_ALPHA
+) -> InstanceUsage:
+    """Instance arrêtée : mesure nulle, le compteur CPU repartira de zéro."""
+    if previous is None:
+        return InstanceUsage(sampled_at=now)
+    return InstanceUsage(
+        cpu=ewma(previous.cpu, 0.0, alpha),
+        memory=ewma(previous.memory, 0.0, alpha),
+        cpu_ns=0,
+        sampled_at=now,
+    )
+
+
+def sample_usage(
+    infra: Infrastructure,
+    driver: IncusDriver,
+    previous: dict[str, InstanceUsage],
+    *,
+    state: IncusStateSnapshot | None = None,
+    nesting_context: NestingContext | None = None,
+    now: float | None = None,
+    jobs: int = SAMPLE_JOBS,
+) -> dict[str, InstanceUsage]:
+    """Mesure les instances des domaines actifs et met à jour l'historique.
+
+    Clés : `machine.full_name` (sans préfixe de nesting). Les machines
+    sans instance sont retirées ; une lecture d'état en échec garde
+    l'historique précédent.
+    """
+    ctx = nesting_context or NestingContext()
+    nesting_cfg = infra.config.nesting
+    state = state or driver.state_snapshot()
+    now = time.time() if now is None else now
+
+    # (full_name, instance, projet, en cours d'exécution)
+    targets: list[tuple[str, str, str, bool]] = []
+    for domain in infra.enabled_domains:
+        project = prefix_name(domain.name, ctx, nesting_cfg)
+        live = {i.name: i for i in state.instance_list(project)}
+        for machine in domain.sorted_machines:
+            name = prefix_name(machine.full_name, ctx, nesting_cfg)
+            if name in live:
+                targets.append((machine.full_name, name, project, live[name].status == "Running"))
+
+    def read(target: tuple[str, str, str, bool]) -> dict | None:
+        _, name, project, running = target
+        if not running:
+            return {}
+        try:
+            return driver.instance_state(name, project)
+        except IncusError as e:
+            log.warning("Lecture de l'état de %s échouée : %s", name, e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(targets) or 1))) as pool:
+        states = list(pool.map(read, targets))
+
+    usage: dict[str, InstanceUsage] = {}
+    for (full_name, *_), data in zip(targets, states, strict=True):
+        before = previous.get(full_name)
+        if data is None:
+            if before is not None:
+                usage[full_name] = before
+            continue
+        if not data:
+            usage[full_name] = idle_usage(before, now)
+            continue
+        cpu_ns = int((data.get("cpu") or {}).get("usage", 0))
+        memory = int((data.get("memory") or {}).get("usage", 0))
+        usage[full_name] = update_usage(before, cpu_ns, memory, now)
+    return usage
+
+
+def refresh_usage(
+    project_dir: Path,
+    infra: Infrastructure,
+    driver: IncusDriver,
+    *,
+    state: IncusStateSnapshot | None = None,
+    nesting_context: NestingContext | None = None,
+    persist: bool = True,
+) -> dict[str, InstanceUsage]:
+    """Charge l'historique, ajoute une passe de mesures et l'enregistre.
+
+    Avec `persist=False` (dry-run), la passe n'est pas enregistrée.
+    """
+    usage = sample_usage(
+        infra,
+        driver,
+        load_usage(project_dir),
+        state=state,
+        nesting_context=nesting_context,
+    )
+    if persist:
+        try:
+            save_usage(project_dir, usage)
+        except OSError as e:
+            log.warning("Historique de consommation non écrit : %s", e)
+    return usage
@@ -7,6 +7,7 @@ from dataclasses import dataclass, field
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as pkg_version
 
+from anklume.engine.incus_driver import INCUS_BACKENDS
 from anklume.engine.models import (
     MACHINE_TYPES,
     PROTOCOLS,
@@ -14,7 +15,9 @@ from anklume.engine.models import (
     TRUST_LEVELS,
     Infrastructure,
     Policy,
+    port_range,
 )
+from anklume.engine.nftables import NFTABLES_MODES
 from anklume.engine.workspace import VALID_TILES
 
 _DNS_SAFE = re.compile(r"^[a-z0-9]([a-z0-9-]*[a-z0-9])?$")
@@ -64,6 +67,9 @@ def validate(infra: Infrastructure) -> ValidationResult:
 
     _check_schema_version(infra, result)
     _check_requires_anklume(infra, result)
+    _check_incus_backend(infra, result)
+    _check_nftables(infra, result)
+    _check_snapshots(infra, result)
     _check_domain_names(infra, result)
     _check_trust_levels(infra, result)
     _check_machine_names(infra, result)
@@ -122,6 +128,64 @@ def _check_requires_anklume(infra: Infrastructure, result: ValidationResult) ->
         )
 
 
+def _check_incus_backend(infra: Infrastructure, result: ValidationResult) -> None:
+    backend = infra.config.incus_backend
+    if backend not in INCUS_BACKENDS:
+        result.add(
+            "anklume.yml",
+            f"incus_backend '{backend}' invalide.",
+            f"Valeurs possibles : {', '.join(INCUS_BACKENDS)}",
+        )
+
+
+def _check_nftables(infra: Infrastructure, result: ValidationResult) -> None:
+    nftables = infra.config.nftables
+    if nftables.mode not in NFTABLES_MODES:
+        result.add(
+            "anklume.yml",
+            f"nftables.mode '{nftables.mode}' invalide.",
+            f"Valeurs possibles : {', '.join(NFTABLES_MODES)}",
+        )
+    for key in ("counters", "merge_policies"):
+        value = getattr(nftables, key)
+        if not isinstance(value, bool):
+            result.add(
+                "anklume.yml",
+                f"nftables.{key} '{value}' invalide.",
+                "Valeurs possibles : true, false",
+            )
+
+
+def _is_int(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_snapshots(infra: Infrastructure, result: ValidationResult) -> None:
+    snapshots = infra.config.snapshots
+    concurrency = snapshots.pool_concurrency
+    if not _is_int(concurrency) or concurrency < 1:
+        result.add(
+            "anklume.yml",
+            f"snapshots.pool_concurrency '{concurrency}' invalide.",
+            "Entier >= 1 (snapshots simultanés par pool de stockage).",
+        )
+    retention = snapshots.retention
+    for key in ("keep_last", "keep_daily", "keep_weekly", "max_age_days"):
+        value = getattr(retention, key)
+        if not _is_int(value) or value < 0:
+            result.add(
+                "anklume.yml",
+                f"snapshots.retention.{key} '{value}' invalide.",
+                "Entier >= 0 (0 = règle désactivée).",
+            )
+    if not isinstance(snapshots.auto_prune, bool):
+        result.add(
+            "anklume.yml",
+            f"snapshots.auto_prune '{snapshots.auto_prune}' invalide.",
+            "Valeurs possibles : true, false",
+        )
+
+
 _MAX_DOMAIN_NAME_LEN = 11  # net-{name} <= 15 chars (limite interface Linux)
 
 
@@ -266,15 +330,16 @@ def _check_policies(infra: Infrastructure, result: ValidationResult) -> None:
 
 
 def _check_policy_ports(policy: Policy, loc: str, result: ValidationResult) -> None:
-    """Valide les ports d'une politique (entiers, range 1-65535)."""
+    """Valide les ports d'une politique (entiers ou plages, range 1-65535)."""
     if not isinstance(policy.ports, list):
         return
     for port in policy.ports:
-        if not isinstance(port, int) or port < 1 or port > 65535:
+        if port_range(port) is None:
             result.add(
                 loc,
                 f"port {port!r} invalide.",
-                "Les ports doivent être des entiers entre 1 et 65535.",
+                "Les ports doivent être des entiers entre 1 et 65535 "
+                'ou des plages croissantes ("8000-8100").',
             )
 
 
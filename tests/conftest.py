@@ -4,14 +4,17 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock
 
+import pytest
 import yaml
 
+from anklume.engine.hwcache import CACHE_ENV
 from anklume.engine.incus_driver import (
     IncusDriver,
     IncusInstance,
     IncusNetwork,
     IncusProject,
     IncusSnapshot,
+    IncusStateSnapshot,
 )
 from anklume.engine.models import (
     AddressingConfig,
@@ -24,6 +27,12 @@ from anklume.engine.models import (
 from anklume.provisioner import BUILTIN_ROLES_DIR
 
 
+@pytest.fixture(autouse=True)
+def _isolated_hardware_cache(tmp_path_factory, monkeypatch):
+    """Cache matériel propre à chaque test (jamais /var/cache/anklume)."""
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path_factory.mktemp("hwcache")))
+
+
 def make_infra(
     domains: dict[str, Domain] | None = None,
     os_image: str = "images:debian/13",
@@ -92,8 +101,13 @@ def mock_driver(
     networks: dict[str, list[IncusNetwork]] | None = None,
     instances: dict[str, list[IncusInstance]] | None = None,
     snapshots: dict[str, list[IncusSnapshot]] | None = None,
+    profiles: dict[str, list[str]] | None = None,
 ) -> IncusDriver:
-    """Crée un IncusDriver mocké."""
+    """Crée un IncusDriver mocké.
+
+    `state_snapshot()` est reconstruit à chaque appel depuis les méthodes
+    mockées, pour suivre les side_effect redéfinis par les tests.
+    """
     driver = MagicMock(spec=IncusDriver)
     driver.project_list.return_value = projects or []
     driver.project_exists.side_effect = lambda n: any(p.name == n for p in (projects or []))
@@ -110,6 +124,20 @@ def mock_driver(
     _snapshots = snapshots or {}
     driver.snapshot_list.side_effect = lambda inst, proj: _snapshots.get(inst, [])
 
+    _profiles = profiles or {}
+    driver.profile_list.side_effect = lambda p: _profiles.get(p, ["default"])
+
+    def _state() -> IncusStateSnapshot:
+        names = [p.name for p in driver.project_list()]
+        return IncusStateSnapshot(
+            projects=list(driver.project_list()),
+            networks={n: driver.network_list(n) for n in names},
+            profiles={n: driver.profile_list(n) for n in names},
+            instances={n: driver.instance_list(n) for n in names},
+        )
+
+    driver.state_snapshot.side_effect = _state
+
     # Méthodes destroy — noop par défaut
     driver.instance_config_set.return_value = None
     driver.network_delete.return_value = None
@@ -119,11 +147,15 @@ def mock_driver(
 
 
 def running_instance(name: str, project: str) -> IncusInstance:
-    return IncusInstance(name=name, status="Running", type="container", project=project)
+    return IncusInstance(
+        name=name, status="Running", type="container", project=project, profiles=["default"]
+    )
 
 
 def stopped_instance(name: str, project: str) -> IncusInstance:
-    return IncusInstance(name=name, status="Stopped", type="container", project=project)
+    return IncusInstance(
+        name=name, status="Stopped", type="container", project=project, profiles=["default"]
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -15,6 +15,7 @@ from anklume.engine.incus_driver import (
     IncusDriver,
     IncusNetwork,
     IncusProject,
+    IncusStateSnapshot,
 )
 
 
@@ -91,6 +92,15 @@ def _setup_driver_mock(context):
     def instance_start(name, project):
         context.started_instances.append({"name": name, "project": project})
 
+    def state_snapshot():
+        return IncusStateSnapshot(
+            projects=project_list(),
+            networks={p: network_list(p) for p in context.existing_projects},
+            profiles={p: ["default"] for p in context.existing_projects},
+            instances={p: instance_list(p) for p in context.existing_projects},
+        )
+
+    driver.state_snapshot.side_effect = state_snapshot
     driver.project_list.side_effect = project_list
     driver.project_exists.side_effect = project_exists
     driver.project_create.side_effect = project_create
@@ -92,14 +92,22 @@ def step_reseau_existe(context, name, project):
 def step_instance_running(context, name, project):
     """Simule une instance en cours d'exécution."""
     instances = context.existing_instances.setdefault(project, [])
-    instances.append(IncusInstance(name=name, status="Running", type="container", project=project))
+    instances.append(
+        IncusInstance(
+            name=name, status="Running", type="container", project=project, profiles=["default"]
+        )
+    )
 
 
 @given('l\'instance "{name}" existe et est arrêtée dans le projet "{project}"')
 def step_instance_stopped(context, name, project):
     """Simule une instance arrêtée."""
     instances = context.existing_instances.setdefault(project, [])
-    instances.append(IncusInstance(name=name, status="Stopped", type="container", project=project))
+    instances.append(
+        IncusInstance(
+            name=name, status="Stopped", type="container", project=project, profiles=["default"]
+        )
+    )
 
 
 @given('la création du projet "{name}" échoue')
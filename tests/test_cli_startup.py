@@ -0,0 +1,68 @@
+"""Budget de démarrage de la CLI (`python -X importtime -m anklume --help`)."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Somme des temps d'import (µs) sur `--help`, rendu rich compris.
+# ~200 ms mesurés en local : la marge absorbe les machines de CI lentes.
+IMPORT_BUDGET_US = 600_000
+
+# Modules qu'aucune commande ne doit payer avant d'être exécutée.
+FORBIDDEN_AT_STARTUP = ("anklume.engine", "anklume.provisioner", "anklume.tui", "yaml")
+
+
+def _importtime(tmp_path: Path, *args: str) -> dict[str, int]:
+    """Lance l'interpréteur avec -X importtime ; retourne {module: temps propre µs}."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])),
+        "XDG_CACHE_HOME": str(tmp_path),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+        check=True,
+    )
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+@pytest.fixture
+def warm_cache(tmp_path: Path) -> Path:
+    """Premier lancement : remplit le cache des plugins."""
+    _importtime(tmp_path, "-m", "anklume", "--help")
+    return tmp_path
+
+
+class TestStartup:
+    def test_help_within_budget(self, warm_cache: Path) -> None:
+        modules = _importtime(warm_cache, "-m", "anklume", "--help")
+        total = sum(modules.values())
+        assert total < IMPORT_BUDGET_US, f"imports --help : {total / 1000:.0f} ms"
+
+    def test_help_imports_no_engine(self, warm_cache: Path) -> None:
+        modules = _importtime(warm_cache, "-m", "anklume", "--help")
+        loaded = [m for m in modules if m.startswith(FORBIDDEN_AT_STARTUP)]
+        assert loaded == []
+
+    def test_cli_import_skips_package_metadata(self, warm_cache: Path) -> None:
+        """Cache des plugins chaud : importlib.metadata n'est pas importé."""
+        modules = _importtime(warm_cache, "-c", "import anklume.cli")
+        assert "importlib.metadata" not in modules
@@ -119,14 +119,14 @@ EXPECTED_SUBCOMMANDS = {
     "dev": {"setup", "lint", "test", "env", "test-real", "molecule"},
     "instance": {"list", "exec", "info", "gui", "clipboard"},
     "domain": {"list", "check", "exec", "status"},
-    "snapshot": {"create", "list", "restore", "delete", "rollback"},
-    "network": {"rules", "deploy", "status"},
+    "snapshot": {"create", "list", "restore", "delete", "rollback", "prune"},
+    "network": {"rules", "analyze", "deploy", "status", "stats"},
     "ai": {"status", "flush", "switch", "test"},
     "stt": {"setup", "start", "stop", "status"},
     "llm": {"status", "bench", "sanitize"},
     "setup": {"import", "aliases", "gui"},
     "tor": {"status"},
-    "resource": {"show"},
+    "resource": {"show", "rebalance"},
     "workspace": {"load", "status", "grid"},
     "console": {"kill"},
 }
@@ -6,6 +6,8 @@ avec/sans --force et la protection ephemeral.
 
 from __future__ import annotations
 
+import threading
+
 from anklume.engine.destroy import destroy
 from anklume.engine.incus_driver import (
     IncusError,
@@ -14,6 +16,7 @@ from anklume.engine.incus_driver import (
     IncusProject,
 )
 from anklume.engine.nesting import NestingContext
+from anklume.engine.scheduler import SKIPPED_MESSAGE
 
 from .conftest import make_domain, make_infra, make_machine, mock_driver
 
@@ -45,7 +48,7 @@ class TestEmptyInfra:
 
 class TestDestroyNoForce:
     def test_ephemeral_instance_deleted(self) -> None:
-        """Instance éphémère → arrêtée et supprimée."""
+        """Instance éphémère en cours d'exécution → supprimée avec arrêt forcé."""
         machine = make_machine("dev", "pro", ephemeral=True)
         domain = make_domain("pro", machines={"dev": machine}, ephemeral=True)
         infra = make_infra(domains={"pro": domain})
@@ -68,8 +71,10 @@ class TestDestroyNoForce:
         result = destroy(infra, driver)
 
         verbs = [a.verb for a in result.executed]
-        assert "stop" in verbs
+        assert "stop" not in verbs
         assert "delete" in verbs
+        driver.instance_stop.assert_not_called()
+        driver.instance_delete.assert_called_once_with("pro-dev", "pro", force=True)
         # Projet et réseau supprimés aussi (toutes instances supprimées)
         resources = [a.resource for a in result.executed]
         assert "network" in resources
@@ -177,6 +182,7 @@ class TestDestroyNoForce:
         verbs = [a.verb for a in result.executed if a.resource == "instance"]
         assert "stop" not in verbs
         assert "delete" in verbs
+        driver.instance_delete.assert_called_once_with("pro-dev", "pro", force=False)
 
     def test_absent_instance_no_action(self) -> None:
         """Instance absente dans Incus → rien à faire."""
@@ -230,7 +236,6 @@ class TestDestroyForce:
         result = destroy(infra, driver, force=True)
 
         verbs = [a.verb for a in result.executed]
-        assert "stop" in verbs
         assert "unprotect" in verbs
         assert "delete" in verbs
         assert len(result.skipped) == 0
@@ -264,9 +269,10 @@ class TestDestroyForce:
 
         instance_actions = [a for a in result.executed if a.resource == "instance"]
         verbs = [a.verb for a in instance_actions]
-        # L'ordre doit être : stop → unprotect → delete
-        assert verbs.index("stop") < verbs.index("unprotect")
+        # L'ordre doit être : unprotect → delete
         assert verbs.index("unprotect") < verbs.index("delete")
+        delete = next(a for a in instance_actions if a.verb == "delete")
+        assert delete.deps == ["unprotect:instance:pro/pro-dev"]
 
     def test_force_ephemeral_no_unprotect(self) -> None:
         """--force + éphémère → pas de unprotect (pas de protection)."""
@@ -338,8 +344,8 @@ class TestDestroyDryRun:
 
 
 class TestDestroyErrors:
-    def test_error_on_stop_reported(self) -> None:
-        """Si l'arrêt échoue → rapporté dans errors."""
+    def test_error_on_delete_reported(self) -> None:
+        """Si la suppression échoue → rapportée, réseau et projet ignorés."""
         machine = make_machine("dev", "pro", ephemeral=True)
         domain = make_domain("pro", machines={"dev": machine}, ephemeral=True)
         infra = make_infra(domains={"pro": domain})
@@ -358,14 +364,20 @@ class TestDestroyErrors:
                 ]
             },
         )
-        driver.instance_stop.side_effect = IncusError(
-            command=["incus", "stop"], returncode=1, stderr="timeout"
+        driver.instance_delete.side_effect = IncusError(
+            command=["incus", "delete"], returncode=1, stderr="timeout"
         )
 
         result = destroy(infra, driver)
 
         assert not result.success
-        assert len(result.errors) > 0
+        assert [(a.resource, msg) for a, msg in result.errors] == [
+            ("instance", str(driver.instance_delete.side_effect)),
+            ("network", SKIPPED_MESSAGE),
+            ("project", SKIPPED_MESSAGE),
+        ]
+        driver.network_delete.assert_not_called()
+        driver.project_delete.assert_not_called()
 
     def test_project_missing_no_error(self) -> None:
         """Si le projet n'existe pas dans Incus → rien à faire, pas d'erreur."""
@@ -387,13 +399,9 @@ class TestDestroyErrors:
         d2 = make_domain("beta", machines={"web": m2}, ephemeral=True)
         infra = make_infra(domains={"alpha": d1, "beta": d2})
 
-        call_count = 0
-
-        def fail_first_stop(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise IncusError(command=["incus", "stop"], returncode=1, stderr="failed")
+        def fail_alpha(name, *args, **kwargs):
+            if name == "alpha-dev":
+                raise IncusError(command=["incus", "delete"], returncode=1, stderr="failed")
 
         driver = mock_driver(
             projects=[IncusProject(name="alpha"), IncusProject(name="beta")],
@@ -420,14 +428,14 @@ class TestDestroyErrors:
                 ],
             },
         )
-        driver.instance_stop.side_effect = fail_first_stop
+        driver.instance_delete.side_effect = fail_alpha
 
         result = destroy(infra, driver)
 
         # Il y a des erreurs pour alpha
-        assert len(result.errors) > 0
-        # Mais beta a été traité (au moins des actions exécutées)
-        assert len(result.executed) > 0
+        assert {a.project for a, _ in result.errors} == {"alpha"}
+        # Mais beta a été entièrement détruit
+        driver.project_delete.assert_called_once_with("beta")
 
 
 # ============================================================
@@ -462,9 +470,9 @@ class TestDestroyNesting:
         result = destroy(infra, driver, nesting_context=ctx)
 
         # Les actions ciblent les noms préfixés
-        stop_action = next(a for a in result.executed if a.verb == "stop")
-        assert stop_action.target == "001-pro-dev"
-        assert stop_action.project == "001-pro"
+        delete_action = next(a for a in result.executed if a.resource == "instance")
+        assert delete_action.target == "001-pro-dev"
+        assert delete_action.project == "001-pro"
 
 
 # ============================================================
@@ -504,6 +512,89 @@ class TestDestroyOrder:
         assert last_instance < network_idx < project_idx
 
 
+# ============================================================
+# Exécution parallèle
+# ============================================================
+
+
+def _lab(count: int, status: str = "Running"):
+    machines = {f"m{i}": make_machine(f"m{i}", "lab", ephemeral=True) for i in range(count)}
+    infra = make_infra(domains={"lab": make_domain("lab", machines=machines, ephemeral=True)})
+    driver = mock_driver(
+        projects=[IncusProject(name="lab")],
+        networks={"lab": [IncusNetwork(name="net-lab")]},
+        instances={
+            "lab": [
+                IncusInstance(name=f"lab-m{i}", status=status, type="container", project="lab")
+                for i in range(count)
+            ]
+        },
+    )
+    return infra, driver
+
+
+class TestDestroyParallel:
+    def test_instances_deleted_concurrently(self) -> None:
+        infra, driver = _lab(3)
+        barrier = threading.Barrier(3, timeout=5)
+        driver.instance_delete.side_effect = lambda *a, **kw: barrier.wait()
+
+        result = destroy(infra, driver, jobs=3)
+
+        assert result.success
+        assert result.instances_deleted == 3
+
+    def test_network_and_project_gated_on_all_instances(self) -> None:
+        infra, driver = _lab(4)
+        deleted: list[str] = []
+        lock = threading.Lock()
+
+        def delete(name, *args, **kwargs):
+            with lock:
+                deleted.append(name)
+
+        def network_delete(*args, **kwargs):
+            assert len(deleted) == 4
+
+        driver.instance_delete.side_effect = delete
+        driver.network_delete.side_effect = network_delete
+
+        result = destroy(infra, driver, jobs=4)
+
+        assert result.success
+        project = next(a for a in result.actions if a.resource == "project")
+        assert "delete:network:lab/net-lab" in project.deps
+        assert len(project.deps) == 5
+
+    def test_one_failure_does_not_block_other_instances(self) -> None:
+        infra, driver = _lab(3)
+
+        error = IncusError(command=["incus", "delete"], returncode=1, stderr="busy")
+
+        def delete(name, *args, **kwargs):
+            if name == "lab-m1":
+                raise error
+
+        driver.instance_delete.side_effect = delete
+
+        result = destroy(infra, driver, jobs=3)
+
+        assert result.instances_deleted == 2
+        assert [(a.target, msg) for a, msg in result.errors] == [
+            ("lab-m1", str(error)),
+            ("net-lab", SKIPPED_MESSAGE),
+            ("lab", SKIPPED_MESSAGE),
+        ]
+
+    def test_no_separate_stop_round_trip(self) -> None:
+        infra, driver = _lab(2)
+
+        destroy(infra, driver)
+
+        driver.instance_stop.assert_not_called()
+        assert driver.instance_delete.call_count == 2
+
+
 # ============================================================
 # DestroyResult
 # ============================================================
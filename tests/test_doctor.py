@@ -18,7 +18,7 @@ from anklume.engine.doctor import (
     check_nftables,
     run_doctor,
 )
-from anklume.engine.incus_driver import IncusProject
+from anklume.engine.incus_driver import IncusNetwork, IncusProject
 from anklume.engine.reconciler import Action, ReconcileResult
 from tests.conftest import make_domain, make_infra, make_machine, mock_driver
 
@@ -173,9 +173,10 @@ class TestCheckNetworks:
             subnet="10.100.20.0/24",
         )
         infra = make_infra(domains={"pro": domain})
-        driver = mock_driver(projects=[IncusProject(name="pro")])
-        driver.network_exists.side_effect = None
-        driver.network_exists.return_value = True
+        driver = mock_driver(
+            projects=[IncusProject(name="pro")],
+            networks={"pro": [IncusNetwork(name="net-pro")]},
+        )
 
         results = check_networks(infra, driver)
 
@@ -0,0 +1,164 @@
+"""Tests pour engine/drift.py — diff champ par champ désiré vs réel."""
+
+from __future__ import annotations
+
+from anklume.engine.drift import (
+    ALLOCATION_KEYS,
+    config_drift,
+    config_value,
+    describe_config,
+    instance_drift,
+    profiles_drift,
+)
+from anklume.engine.incus_driver import IncusInstance, IncusNetwork, IncusProject
+from anklume.engine.models import ResourcePolicyConfig
+from anklume.engine.reconciler import reconcile
+
+from .conftest import make_domain, make_infra, make_machine, mock_driver
+
+
+def _instance(config: dict | None = None, profiles: list[str] | None = None, status="Running"):
+    return IncusInstance(
+        name="pro-dev",
+        status=status,
+        type="container",
+        project="pro",
+        profiles=profiles if profiles is not None else ["default"],
+        config=config or {},
+    )
+
+
+class TestConfigDrift:
+    def test_identical(self) -> None:
+        assert config_drift({"limits.cpu": "2"}, {"limits.cpu": "2"}) == {}
+
+    def test_changed_and_missing_keys_only(self) -> None:
+        live = {"limits.cpu": "2", "limits.memory": "1GiB", "boot.autostart": "true"}
+        desired = {"limits.cpu": "4", "limits.memory": "1GiB", "limits.processes": "500"}
+        assert config_drift(desired, live) == {"limits.cpu": "4", "limits.processes": "500"}
+
+    def test_managed_key_removed(self) -> None:
+        """Clé gérée absente du désiré → retirée ; volatile.* et autres ignorées."""
+        live = {"limits.cpu.allowance": "50%", "volatile.uuid": "x", "user.note": "a"}
+        assert config_drift({}, live, ALLOCATION_KEYS) == {"limits.cpu.allowance": None}
+
+    def test_nothing_removed_without_managed_keys(self) -> None:
+        live = {"limits.cpu.allowance": "50%", "limits.processes": "500"}
+        assert config_drift({}, live) == {}
+
+    def test_hand_set_limit_kept(self) -> None:
+        live = {"limits.cpu": "2", "limits.processes": "500"}
+        assert config_drift({}, live, ALLOCATION_KEYS) == {"limits.cpu": None}
+
+    def test_values_normalized(self) -> None:
+        assert config_value(True) == "true"
+        assert config_value(2) == "2"
+        live = {"boot.autostart": "true", "limits.cpu": "2"}
+        assert config_drift({"boot.autostart": True, "limits.cpu": 2}, live) == {}
+
+    def test_describe(self) -> None:
+        assert describe_config({"limits.cpu": "2", "limits.memory": None}) == (
+            "limits.cpu=2, -limits.memory"
+        )
+
+
+class TestProfilesDrift:
+    def test_identical(self) -> None:
+        assert profiles_drift(["default", "gui"], ["default", "gui"]) is None
+
+    def test_added(self) -> None:
+        assert profiles_drift(["default", "gui"], ["default"]) == ["default", "gui"]
+
+    def test_removed(self) -> None:
+        assert profiles_drift(["default"], ["default", "heavy"]) == ["default"]
+
+    def test_order_matters(self) -> None:
+        assert profiles_drift(["default", "a", "b"], ["default", "b", "a"]) == [
+            "default",
+            "a",
+            "b",
+        ]
+
+    def test_kept_profile_not_removed(self) -> None:
+        """Profil GPU non détecté lors de cet apply : conservé."""
+        live = ["default", "gpu-passthrough"]
+        assert profiles_drift(["default"], live, keep=["gpu-passthrough"]) is None
+
+
+class TestInstanceDrift:
+    def test_empty(self) -> None:
+        assert instance_drift({}, ["default"], _instance()).empty
+
+    def test_config_and_profiles(self) -> None:
+        drift = instance_drift({"limits.cpu": "2"}, ["default", "gui"], _instance())
+        assert drift.config == {"limits.cpu": "2"}
+        assert drift.profiles == ["default", "gui"]
+        assert not drift.empty
+
+
+class TestReconcileDrift:
+    def _setup(self, machine_config: dict, instance: IncusInstance, **machine_kwargs):
+        machine = make_machine("dev", "pro", config=machine_config, **machine_kwargs)
+        infra = make_infra(domains={"pro": make_domain("pro", machines={"dev": machine})})
+        driver = mock_driver(
+            projects=[IncusProject(name="pro")],
+            networks={"pro": [IncusNetwork(name="net-pro")]},
+            instances={"pro": [instance]},
+            profiles={"pro": ["default", "new", "old"]},
+        )
+        return infra, driver
+
+    def test_no_drift_no_action(self) -> None:
+        infra, driver = self._setup({"limits.cpu": "2"}, _instance({"limits.cpu": "2"}))
+        assert reconcile(infra, driver, dry_run=True).actions == []
+
+    def test_limits_updated_with_minimal_keys(self) -> None:
+        live = {"limits.cpu": "2", "limits.memory": "2GiB", "volatile.uuid": "x"}
+        infra, driver = self._setup({"limits.cpu": "2", "limits.memory": "4GiB"}, _instance(live))
+
+        result = reconcile(infra, driver)
+
+        [action] = result.actions
+        assert (action.verb, action.resource) == ("update", "config")
+        assert action.changes == {"limits.memory": "4GiB"}
+        assert "limits.memory=4GiB" in action.detail
+        driver.instance_config_update.assert_called_once_with(
+            "pro-dev", "pro", {"limits.memory": "4GiB"}
+        )
+        driver.instance_create.assert_not_called()
+        driver.instance_delete.assert_not_called()
+
+    def test_hand_set_limit_not_removed(self) -> None:
+        """limits.processes posée à la main, sans resource_policy : conservée."""
+        live = {"limits.cpu": "2", "limits.processes": "500"}
+        infra, driver = self._setup({"limits.cpu": "2"}, _instance(live))
+
+        assert reconcile(infra, driver, dry_run=True).actions == []
+
+    def test_allocation_key_removed_with_policy(self) -> None:
+        live = {"limits.cpu": "2", "limits.cpu.allowance": "50%", "limits.processes": "500"}
+        infra, driver = self._setup({"limits.cpu": "2"}, _instance(live))
+        infra.config.resource_policy = ResourcePolicyConfig()
+
+        [action] = reconcile(infra, driver, dry_run=True).actions
+        assert action.changes == {"limits.cpu.allowance": None}
+
+    def test_profile_change_single_call(self) -> None:
+        infra, driver = self._setup(
+            {}, _instance(profiles=["default", "old"]), profiles=["default", "new"]
+        )
+
+        result = reconcile(infra, driver)
+
+        [action] = result.actions
+        assert (action.verb, action.resource) == ("update", "profile")
+        assert action.detail == "Profils pro-dev : +new -old"
+        driver.instance_profiles_set.assert_called_once_with("pro-dev", "pro", ["default", "new"])
+
+    def test_stopped_instance_updated_before_start(self) -> None:
+        infra, driver = self._setup({"limits.cpu": "4"}, _instance(status="Stopped"))
+
+        result = reconcile(infra, driver, dry_run=True)
+
+        by_key = {a.key: a for a in result.actions}
+        assert by_key["start:instance:pro/pro-dev"].deps == ["update:config:pro/pro-dev"]
@@ -160,6 +160,75 @@ class TestDetectGpu:
         assert info.detected is False
 
 
+class TestDetectGpuCache:
+    def _smi(self, stdout: str) -> MagicMock:
+        result = MagicMock()
+        result.returncode = 0
+        result.stdout = stdout
+        return result
+
+    def test_totals_cached_only_used_vram_requeried(self):
+        with patch(
+            "anklume.engine.gpu.subprocess.run",
+            return_value=self._smi("NVIDIA RTX PRO 5000, 24576, 512\n"),
+        ):
+            detect_gpu()
+
+        with patch(
+            "anklume.engine.gpu.subprocess.run", return_value=self._smi("2048\n")
+        ) as mock_run:
+            info = detect_gpu()
+
+        assert info == GpuInfo(True, "NVIDIA RTX PRO 5000", 24576, 2048)
+        [call] = mock_run.call_args_list
+        assert call.args[0][1] == "--query-gpu=memory.used"
+
+    def test_nvml_preferred(self):
+        with patch(
+            "anklume.engine.gpu.subprocess.run",
+            return_value=self._smi("NVIDIA RTX PRO 5000, 24576, 512\n"),
+        ):
+            detect_gpu()
+
+        with (
+            patch("anklume.engine.gpu._nvml_vram_used_mib", return_value=4096),
+            patch("anklume.engine.gpu.subprocess.run") as mock_run,
+        ):
+            info = detect_gpu()
+
+        assert info.vram_used_mib == 4096
+        mock_run.assert_not_called()
+
+    def test_absent_nvidia_smi_cached(self):
+        with patch("anklume.engine.gpu.subprocess.run", side_effect=FileNotFoundError):
+            detect_gpu()
+        with patch("anklume.engine.gpu.subprocess.run") as mock_run:
+            assert detect_gpu().detected is False
+        mock_run.assert_not_called()
+
+    def test_error_not_cached(self):
+        failed = MagicMock(returncode=1, stdout="")
+        with patch("anklume.engine.gpu.subprocess.run", return_value=failed):
+            detect_gpu()
+        with patch(
+            "anklume.engine.gpu.subprocess.run",
+            return_value=self._smi("NVIDIA RTX 4090, 24576, 100\n"),
+        ):
+            assert detect_gpu().detected is True
+
+    def test_refresh_bypasses_cache(self):
+        with patch(
+            "anklume.engine.gpu.subprocess.run",
+            return_value=self._smi("NVIDIA RTX 4090, 24576, 100\n"),
+        ):
+            detect_gpu()
+        with patch(
+            "anklume.engine.gpu.subprocess.run",
+            return_value=self._smi("NVIDIA RTX 5090, 32768, 100\n"),
+        ):
+            assert detect_gpu(refresh=True).model == "NVIDIA RTX 5090"
+
+
 # ---------------------------------------------------------------------------
 # validate_gpu_machines
 # ---------------------------------------------------------------------------
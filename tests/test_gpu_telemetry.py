@@ -0,0 +1,221 @@
+"""Tests pour engine/gpu_telemetry.py — échantillons GPU et tampon circulaire."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from anklume.engine.ai import compute_ai_status, flush_vram, switch_ai_access
+from anklume.engine.gpu import GpuInfo
+from anklume.engine.gpu_telemetry import (
+    GpuProcess,
+    GpuSample,
+    GpuTelemetry,
+    NvidiaSmiSampler,
+    NvmlSampler,
+    default_sampler,
+)
+from anklume.engine.llm_ops import compute_llm_status
+
+from .conftest import make_domain, make_infra, make_machine
+
+
+class FakeSampler:
+    """Rejoue une séquence de VRAM utilisée ; None = GPU illisible."""
+
+    name = "fake"
+
+    def __init__(self, vram: list[int | None], processes: list[GpuProcess] | None = None):
+        self.vram = list(vram)
+        self.processes = processes or []
+        self.calls = 0
+
+    def sample(self) -> GpuSample | None:
+        self.calls += 1
+        used = self.vram.pop(0) if len(self.vram) > 1 else self.vram[0]
+        if used is None:
+            return None
+        return GpuSample(
+            timestamp=float(self.calls),
+            utilization_pct=10 * self.calls,
+            vram_used_mib=used,
+            vram_total_mib=24576,
+            power_w=120.0,
+            processes=list(self.processes),
+        )
+
+
+def _smi(stdout: str, returncode: int = 0) -> MagicMock:
+    return MagicMock(returncode=returncode, stdout=stdout)
+
+
+def _ollama_infra():
+    machine = make_machine("gpu", "ai", ip="10.100.3.1", roles=["ollama_server"])
+    return make_infra(
+        domains={
+            "ai": make_domain("ai", machines={"gpu": machine}),
+            "pro": make_domain("pro"),
+        }
+    )
+
+
+class TestRingBuffer:
+    def test_capacity_bounds_buffer(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([1, 2, 3, 4, 5]), capacity=3, interval=0)
+
+        telemetry.collect(5)
+
+        assert [s.vram_used_mib for s in telemetry.samples()] == [3, 4, 5]
+        assert telemetry.latest().vram_used_mib == 5
+        assert telemetry.peak_vram_mib() == 5
+
+    def test_unreadable_samples_skipped(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([None]), interval=0)
+        assert telemetry.sample_once() is None
+        assert telemetry.samples() == []
+        assert telemetry.mean_utilization() is None
+
+    def test_mean_utilization(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([1, 1, 1]), interval=0)
+        telemetry.collect(3)
+        assert telemetry.mean_utilization() == 20.0
+
+    def test_background_sampling(self) -> None:
+        sampler = FakeSampler([100])
+        with GpuTelemetry(sampler, interval=0.001) as telemetry:
+            while sampler.calls < 3:
+                time.sleep(0.001)
+        count = len(telemetry.samples())
+        assert count >= 3
+        assert len(telemetry.samples()) == count  # arrêté
+
+    def test_wait_settled(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([8000, 4000, 600, 590]), interval=0)
+        assert telemetry.wait_settled().vram_used_mib == 590
+
+    def test_wait_settled_timeout(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([8000, 4000, 600, 590]), interval=0)
+        assert telemetry.wait_settled(timeout=0).vram_used_mib == 8000
+
+
+class TestNvidiaSmiSampler:
+    def test_sample_with_processes(self) -> None:
+        outputs = [
+            _smi("87, 9000, 24576, 215.40\n"),
+            _smi("4242, /usr/bin/ollama, 8800\n"),
+        ]
+        with patch("anklume.engine.gpu_telemetry.subprocess.run", side_effect=outputs):
+            sample = NvidiaSmiSampler().sample()
+
+        assert (sample.utilization_pct, sample.vram_used_mib, sample.vram_total_mib) == (
+            87,
+            9000,
+            24576,
+        )
+        assert sample.power_w == 215.4
+        assert sample.processes == [GpuProcess(4242, "/usr/bin/ollama", 8800)]
+
+    def test_power_not_available(self) -> None:
+        outputs = [_smi("0, 10, 24576, [N/A]\n"), _smi("")]
+        with patch("anklume.engine.gpu_telemetry.subprocess.run", side_effect=outputs):
+            sample = NvidiaSmiSampler().sample()
+        assert sample.power_w is None
+        assert sample.processes == []
+
+    def test_absent(self) -> None:
+        with patch("anklume.engine.gpu_telemetry.subprocess.run", side_effect=FileNotFoundError):
+            assert NvidiaSmiSampler().sample() is None
+
+
+class TestNvmlSampler:
+    def test_sample(self) -> None:
+        nvml = MagicMock()
+        nvml.NVMLError = RuntimeError
+        nvml.nvmlDeviceGetMemoryInfo.return_value = MagicMock(
+            used=2048 * 1024**2, total=24576 * 1024**2
+        )
+        nvml.nvmlDeviceGetUtilizationRates.return_value = MagicMock(gpu=42)
+        nvml.nvmlDeviceGetPowerUsage.return_value = 150000
+        nvml.nvmlDeviceGetComputeRunningProcesses.return_value = [
+            MagicMock(pid=7, usedGpuMemory=1024 * 1024**2)
+        ]
+        nvml.nvmlSystemGetProcessName.return_value = b"ollama"
+
+        sample = NvmlSampler(nvml).sample()
+
+        assert (sample.utilization_pct, sample.vram_used_mib, sample.power_w) == (42, 2048, 150.0)
+        assert sample.processes == [GpuProcess(7, "ollama", 1024)]
+
+    def test_default_falls_back_to_nvidia_smi(self) -> None:
+        with patch("anklume.engine.gpu_telemetry.load_nvml", return_value=None):
+            assert isinstance(default_sampler(), NvidiaSmiSampler)
+
+
+class TestConsumers:
+    def test_ai_status_samples(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([512]), interval=0)
+        telemetry.collect(2)
+        gpu = GpuInfo(True, "RTX", 24576, 512)
+        with (
+            patch("anklume.engine.ai.detect_gpu", return_value=gpu),
+            patch("anklume.engine.ai._check_service", return_value=("", False)),
+        ):
+            status = compute_ai_status(make_infra(), telemetry=telemetry)
+        assert len(status.samples) == 2
+        assert status.latest_sample.utilization_pct == 20
+
+    def test_ai_status_no_gpu_no_sample(self) -> None:
+        sampler = FakeSampler([512])
+        with patch("anklume.engine.ai.detect_gpu", return_value=GpuInfo.none()):
+            status = compute_ai_status(make_infra(), telemetry=GpuTelemetry(sampler))
+        assert status.samples == []
+        assert sampler.calls == 0
+
+    def test_llm_status_sample(self) -> None:
+        gpu = GpuInfo(True, "RTX", 24576, 512)
+        with (
+            patch("anklume.engine.llm_ops.detect_gpu", return_value=gpu),
+            patch("anklume.engine.llm_ops._fetch_ollama_ps", return_value=(False, [])),
+        ):
+            status = compute_llm_status(
+                make_infra(), telemetry=GpuTelemetry(FakeSampler([700]), interval=0)
+            )
+        assert status.telemetry.vram_used_mib == 700
+
+    def _flush(self, telemetry: GpuTelemetry):
+        ps = MagicMock(status=200)
+        ps.read.return_value = json.dumps({"models": [{"name": "qwen"}]}).encode()
+        generate = MagicMock(status=200)
+        generate.read.return_value = b"{}"
+        with (
+            patch("anklume.engine.ai.detect_gpu", return_value=GpuInfo(True, "RTX", 24576, 9000)),
+            patch("anklume.engine.ai.urlopen", side_effect=[ps, generate]),
+            patch("anklume.engine.ai._stop_llama_server", return_value=False),
+        ):
+            return flush_vram(_ollama_infra(), telemetry=telemetry)
+
+    def test_flush_waits_for_release(self) -> None:
+        telemetry = GpuTelemetry(FakeSampler([9000, 3000, 500, 480]), interval=0)
+
+        result = self._flush(telemetry)
+
+        assert (result.vram_before_mib, result.vram_after_mib) == (9000, 480)
+        assert result.processes_remaining == []
+
+    def test_flush_reports_remaining_processes(self) -> None:
+        holder = GpuProcess(99, "python3", 2000)
+        telemetry = GpuTelemetry(FakeSampler([2000], [holder]), interval=0)
+
+        result = self._flush(telemetry)
+
+        assert result.processes_remaining == [holder]
+
+    def test_switch_warns_on_remaining_vram(self, tmp_path, caplog) -> None:
+        flushed = MagicMock(processes_remaining=[GpuProcess(99, "python3", 2000)])
+        with (
+            patch("anklume.engine.ai.flush_vram", return_value=flushed),
+            patch("anklume.engine.ai.DEFAULT_STATE_PATH", tmp_path / "ai-access.json"),
+        ):
+            switch_ai_access(_ollama_infra(), "pro")
+        assert "python3 (99)" in caplog.text
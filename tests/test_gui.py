@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import socket
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
 from anklume.engine.gui import (
     GUI_PROFILE_NAME,
@@ -330,9 +330,12 @@ class TestCreateGuiProfile:
 
         create_gui_profile(driver, "perso", gui_info)
 
-        driver.profile_create.assert_called_once_with(GUI_PROFILE_NAME, "perso")
-        # iGPU device + 2 proxy devices = 3 appels
-        assert driver.profile_device_add.call_count == 3
+        # iGPU device + 2 proxy devices, créés avec le profil en un appel
+        driver.profile_create.assert_called_once()
+        args, kwargs = driver.profile_create.call_args
+        assert args == (GUI_PROFILE_NAME, "perso")
+        assert list(kwargs["devices"]) == ["igpu", "wayland-0", "pipewire-0"]
+        driver.profile_device_add.assert_not_called()
 
     def test_igpu_device_config(self):
         """Le device iGPU contient le PCI address et le GID vidéo."""
@@ -345,14 +348,8 @@ class TestCreateGuiProfile:
 
         create_gui_profile(driver, "perso", gui_info)
 
-        igpu_call = driver.profile_device_add.call_args_list[0]
-        assert igpu_call == call(
-            GUI_PROFILE_NAME,
-            "igpu",
-            "gpu",
-            {"pci": "0000:00:02.0", "gid": "44"},
-            project="perso",
-        )
+        devices = driver.profile_create.call_args.kwargs["devices"]
+        assert devices["igpu"] == {"type": "gpu", "pci": "0000:00:02.0", "gid": "44"}
 
     def test_proxy_device_config(self):
         """Les proxy devices contiennent connect/listen/uid/gid."""
@@ -365,8 +362,8 @@ class TestCreateGuiProfile:
 
         create_gui_profile(driver, "perso", gui_info)
 
-        proxy_call = driver.profile_device_add.call_args_list[1]
-        config = proxy_call[0][3]
+        config = driver.profile_create.call_args.kwargs["devices"]["wayland-0"]
+        assert config["type"] == "proxy"
         assert config["connect"] == "unix:/run/user/1000/wayland-0"
         assert config["listen"] == "unix:/run/user/1000/wayland-0"
         assert config["uid"] == "1000"
@@ -386,9 +383,9 @@ class TestCreateGuiProfile:
         create_gui_profile(driver, "perso", gui_info)
 
         # Uniquement 1 proxy device, pas de GPU
-        assert driver.profile_device_add.call_count == 1
-        device_types = [c[0][2] for c in driver.profile_device_add.call_args_list]
-        assert "gpu" not in device_types
+        devices = driver.profile_create.call_args.kwargs["devices"]
+        assert len(devices) == 1
+        assert "gpu" not in [d["type"] for d in devices.values()]
 
 
 # --- prepare_gui_dirs ---
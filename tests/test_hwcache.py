@@ -0,0 +1,79 @@
+"""Tests pour engine/hwcache.py — cache matériel (boot ID + empreinte)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+from anklume.engine import hwcache
+from anklume.engine.hwcache import (
+    CACHE_ENV,
+    cache_path,
+    hardware_fingerprint,
+    load_cached,
+    store_cached,
+)
+
+
+class TestCachePath:
+    def test_env_override(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setenv(CACHE_ENV, str(tmp_path))
+        assert cache_path() == tmp_path / "hardware.json"
+
+    def test_user_cache_when_system_not_writable(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.delenv(CACHE_ENV)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        with patch("anklume.engine.hwcache.os.access", return_value=False):
+            assert cache_path() == tmp_path / "anklume" / "hardware.json"
+
+
+class TestSections:
+    def test_round_trip(self) -> None:
+        store_cached("host", {"cpu_threads": 16})
+        store_cached("gpu", {"detected": False})
+        assert load_cached("host") == {"cpu_threads": 16}
+        assert load_cached("gpu") == {"detected": False}
+
+    def test_missing(self) -> None:
+        assert load_cached("host") is None
+
+    def test_invalidated_by_reboot(self) -> None:
+        with patch("anklume.engine.hwcache.boot_id", return_value="boot-a"):
+            store_cached("host", {"cpu_threads": 16})
+        with patch("anklume.engine.hwcache.boot_id", return_value="boot-b"):
+            assert load_cached("host") is None
+
+    def test_invalidated_by_hardware_change(self) -> None:
+        store_cached("host", {"cpu_threads": 16})
+        with patch("anklume.engine.hwcache.os.cpu_count", return_value=1024):
+            assert load_cached("host") is None
+
+    def test_stale_sections_dropped_on_write(self) -> None:
+        with patch("anklume.engine.hwcache.boot_id", return_value="boot-a"):
+            store_cached("gpu", {"detected": False})
+        with patch("anklume.engine.hwcache.boot_id", return_value="boot-b"):
+            store_cached("host", {"cpu_threads": 16})
+            assert load_cached("gpu") is None
+
+    def test_corrupt_file_ignored(self) -> None:
+        cache_path().write_text("{pas du json")
+        assert load_cached("host") is None
+        store_cached("host", {"cpu_threads": 2})
+        assert load_cached("host") == {"cpu_threads": 2}
+
+    def test_unwritable_cache_ignored(self, tmp_path: Path, monkeypatch) -> None:
+        blocker = tmp_path / "fichier"
+        blocker.write_text("")
+        monkeypatch.setenv(CACHE_ENV, str(blocker / "sous-dossier"))
+        store_cached("host", {"cpu_threads": 2})
+        assert load_cached("host") is None
+
+
+class TestFingerprint:
+    def test_stable(self) -> None:
+        assert hardware_fingerprint() == hardware_fingerprint()
+
+    def test_nvidia_devices_change_fingerprint(self) -> None:
+        before = hardware_fingerprint()
+        with patch.object(hwcache.glob, "glob", return_value=["/dev/nvidia99"]):
+            assert hardware_fingerprint() != before
@@ -0,0 +1,222 @@
+"""Tests pour engine/incremental.py — apply incrémental (.anklume/state.json)."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from anklume.engine.incremental import (
+    DomainApplyState,
+    domain_hash,
+    live_fingerprint,
+    load_apply_state,
+    record_apply,
+    save_apply_state,
+    state_path,
+    unchanged_domains,
+)
+from anklume.engine.incus_driver import (
+    IncusInstance,
+    IncusNetwork,
+    IncusProject,
+    IncusStateSnapshot,
+)
+from anklume.engine.nesting import NestingContext
+
+from .conftest import make_domain, make_infra, make_machine, mock_driver, write_test_project
+
+
+def _infra():
+    return make_infra(
+        domains={
+            "pro": make_domain("pro", machines={"dev": make_machine("dev", "pro")}),
+            "perso": make_domain("perso", machines={"web": make_machine("web", "perso")}),
+        }
+    )
+
+
+def _live(status: str = "Running", config: dict | None = None) -> IncusStateSnapshot:
+    return IncusStateSnapshot(
+        projects=[IncusProject(name="pro"), IncusProject(name="perso")],
+        networks={"pro": [IncusNetwork(name="net-pro")], "perso": []},
+        profiles={"pro": ["default"], "perso": ["default"]},
+        instances={
+            "pro": [
+                IncusInstance(
+                    name="pro-dev",
+                    status=status,
+                    type="container",
+                    project="pro",
+                    profiles=["default"],
+                    config=config or {},
+                )
+            ]
+        },
+    )
+
+
+class TestDomainHash:
+    def test_stable(self) -> None:
+        infra = _infra()
+        assert domain_hash(infra.domains["pro"], infra) == domain_hash(infra.domains["pro"], infra)
+
+    def test_machine_config_changes_hash(self) -> None:
+        infra = _infra()
+        before = domain_hash(infra.domains["pro"], infra)
+        infra.domains["pro"].machines["dev"].config["limits.cpu"] = "2"
+        assert domain_hash(infra.domains["pro"], infra) != before
+
+    def test_os_image_changes_hash(self) -> None:
+        infra = _infra()
+        before = domain_hash(infra.domains["pro"], infra)
+        infra.config.defaults.os_image = "images:debian/12"
+        assert domain_hash(infra.domains["pro"], infra) != before
+
+
+class TestLiveFingerprint:
+    def test_status_change(self) -> None:
+        domain = _infra().domains["pro"]
+        infra = _infra()
+        assert live_fingerprint(domain, infra, _live("Running")) != live_fingerprint(
+            domain, infra, _live("Stopped")
+        )
+
+    def test_volatile_keys_ignored(self) -> None:
+        infra = _infra()
+        domain = infra.domains["pro"]
+        a = live_fingerprint(domain, infra, _live(config={"volatile.uuid": "1"}))
+        b = live_fingerprint(domain, infra, _live(config={"volatile.uuid": "2"}))
+        assert a == b
+
+    def test_nesting_prefix(self) -> None:
+        """Le projet lu est le projet préfixé du niveau courant."""
+        infra = _infra()
+        ctx = NestingContext(absolute_level=1)
+        domain = infra.domains["pro"]
+        assert live_fingerprint(domain, infra, _live(), ctx) != live_fingerprint(
+            domain, infra, _live()
+        )
+
+
+class TestStateFile:
+    def test_roundtrip(self, tmp_path) -> None:
+        entries = {"pro": DomainApplyState(hash="h", fingerprint="f", actions=3)}
+        save_apply_state(tmp_path, entries)
+        assert load_apply_state(tmp_path) == entries
+        assert state_path(tmp_path) == tmp_path / ".anklume" / "state.json"
+
+    def test_missing(self, tmp_path) -> None:
+        assert load_apply_state(tmp_path) == {}
+
+    @pytest.mark.parametrize("content", ["pas du json", '{"version": 99, "domains": {}}', "[]"])
+    def test_unreadable_is_empty(self, tmp_path, content: str) -> None:
+        path = state_path(tmp_path)
+        path.parent.mkdir()
+        path.write_text(content)
+        assert load_apply_state(tmp_path) == {}
+
+
+class TestUnchangedDomains:
+    def test_recorded_then_unchanged(self) -> None:
+        infra = _infra()
+        live = _live()
+        recorded = record_apply({}, infra, live, failed=set(), executed={"pro": 2})
+
+        assert recorded["pro"].actions == 2
+        assert unchanged_domains(infra, live, recorded) == {"pro", "perso"}
+
+    def test_failed_domain_dropped(self) -> None:
+        infra = _infra()
+        live = _live()
+        previous = record_apply({}, infra, live, failed=set(), executed={})
+        recorded = record_apply(previous, infra, live, failed={"pro"}, executed={})
+        assert "pro" not in recorded
+        assert unchanged_domains(infra, live, recorded) == {"perso"}
+
+    def test_yaml_change(self) -> None:
+        infra = _infra()
+        live = _live()
+        recorded = record_apply({}, infra, live, failed=set(), executed={})
+        infra.domains["perso"].machines["web"].ip = "10.100.1.20"
+        assert unchanged_domains(infra, live, recorded) == {"pro"}
+
+    def test_live_drift(self) -> None:
+        infra = _infra()
+        recorded = record_apply({}, infra, _live(), failed=set(), executed={})
+        assert unchanged_domains(infra, _live("Stopped"), recorded) == {"perso"}
+
+    def test_disabled_domain_never_listed(self) -> None:
+        infra = _infra()
+        live = _live()
+        recorded = record_apply({}, infra, live, failed=set(), executed={})
+        infra.domains["pro"].enabled = False
+        assert unchanged_domains(infra, live, recorded) == {"perso"}
+
+
+class TestRunApplyIncremental:
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        write_test_project(
+            tmp_path,
+            {
+                "pro": {
+                    "description": "Pro",
+                    "machines": {"dev": {"description": "Dev", "type": "lxc"}},
+                },
+                "perso": {
+                    "description": "Perso",
+                    "machines": {"web": {"description": "Web", "type": "lxc"}},
+                },
+            },
+        )
+        monkeypatch.setenv("ANKLUME_INFRA_DIR", str(tmp_path))
+        return tmp_path
+
+    def _apply(self, driver, **kwargs) -> None:
+        from anklume.cli._apply import run_apply
+
+        with (
+            patch("anklume.cli._apply.get_driver", return_value=driver),
+            patch("anklume.cli._apply.detect_nesting_context", return_value=NestingContext()),
+            patch("anklume.cli._network.deploy_nftables"),
+        ):
+            run_apply(no_provision=True, **kwargs)
+
+    def test_second_apply_skips_unchanged(self, project) -> None:
+        driver = mock_driver()
+        self._apply(driver)
+        assert driver.project_create.call_count == 2
+        saved = json.loads(state_path(project).read_text())
+        assert sorted(saved["domains"]) == ["perso", "pro"]
+
+        driver.project_create.reset_mock()
+        self._apply(driver)
+        driver.project_create.assert_not_called()
+
+    def test_changed_domain_replanned(self, project) -> None:
+        driver = mock_driver()
+        self._apply(driver)
+
+        path = project / "domains" / "perso.yml"
+        data = yaml.safe_load(path.read_text())
+        data["machines"]["web"]["config"] = {"limits.cpu": "2"}
+        path.write_text(yaml.dump(data))
+
+        driver.project_create.reset_mock()
+        self._apply(driver)
+        driver.project_create.assert_called_once_with("perso", description="Perso")
+
+    def test_full_forces_all(self, project) -> None:
+        driver = mock_driver()
+        self._apply(driver)
+
+        driver.project_create.reset_mock()
+        self._apply(driver, full=True)
+        assert driver.project_create.call_count == 2
+
+    def test_dry_run_does_not_save(self, project) -> None:
+        self._apply(mock_driver(), dry_run=True)
+        assert not state_path(project).exists()
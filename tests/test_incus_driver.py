@@ -15,8 +15,13 @@ import pytest
 from anklume.engine.incus_driver import (
     IncusDriver,
     IncusError,
+    IncusInstance,
     IncusNetwork,
+    IncusOperation,
     IncusProject,
+    IncusSnapshot,
+    IncusStateSnapshot,
+    build_state_snapshot,
 )
 
 # --- Helpers ---
@@ -196,6 +201,31 @@ class TestInstanceList:
         with patch("subprocess.run", return_value=_json_ok([])):
             assert driver.instance_list("pro") == []
 
+    def test_storage_pool_from_expanded_devices(self, driver: IncusDriver) -> None:
+        raw = [
+            {
+                "name": "pro-dev",
+                "status": "Running",
+                "expanded_devices": {"root": {"type": "disk", "path": "/", "pool": "zfs"}},
+            },
+        ]
+        with patch("subprocess.run", return_value=_json_ok(raw)):
+            assert driver.instance_list("pro")[0].storage_pool == "zfs"
+
+    def test_storage_pool_local_device_wins(self) -> None:
+        inst = IncusInstance(
+            name="a",
+            status="Running",
+            type="container",
+            project="pro",
+            devices={"root": {"type": "disk", "path": "/", "pool": "fast"}},
+            expanded_devices={"root": {"type": "disk", "path": "/", "pool": "default"}},
+        )
+        assert inst.storage_pool == "fast"
+
+    def test_storage_pool_unknown(self) -> None:
+        assert IncusInstance(name="a", status="", type="", project="p").storage_pool == ""
+
 
 class TestInstanceCreate:
     def test_creates_container(self, driver: IncusDriver) -> None:
@@ -244,9 +274,32 @@ class TestInstanceCreate:
                 image="images:debian/13",
                 config={"security.protection.delete": "true"},
             )
-        cmd = mock.call_args[0][0]
-        cmd_str = " ".join(cmd)
-        assert "security.protection.delete=true" in cmd_str
+        # Un seul `incus init`, config sur stdin (pas de -c répétés)
+        mock.assert_called_once()
+        assert "-c" not in mock.call_args[0][0]
+        body = json.loads(mock.call_args.kwargs["input"])
+        assert body["config"] == {"security.protection.delete": "true"}
+
+    def test_with_devices(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_create(
+                name="pro-dev",
+                project="pro",
+                image="images:debian/13",
+                devices={"root": {"type": "disk", "path": "/", "pool": "fast", "size": "20GiB"}},
+            )
+        body = json.loads(mock.call_args.kwargs["input"])
+        assert body["devices"]["root"] == {
+            "type": "disk",
+            "path": "/",
+            "pool": "fast",
+            "size": "20GiB",
+        }
+
+    def test_no_spec_no_stdin(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_create("pro-dev", "pro", "images:debian/13")
+        assert mock.call_args.kwargs["input"] is None
 
     def test_with_network(self, driver: IncusDriver) -> None:
         with patch("subprocess.run", return_value=_ok()) as mock:
@@ -296,6 +349,12 @@ class TestInstanceDelete:
         cmd = mock.call_args[0][0]
         assert "delete" in cmd
         assert "pro-dev" in cmd
+        assert "--force" not in cmd
+
+    def test_force(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_delete("pro-dev", "pro", force=True)
+        assert "--force" in mock.call_args[0][0]
 
 
 # ============================================================
@@ -375,6 +434,111 @@ class TestSnapshotDelete:
         assert "--project" in cmd
 
 
+# ============================================================
+# Mutations de config groupées
+# ============================================================
+
+
+class TestBatchConfig:
+    def test_instance_config_update_single_call(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_config_update(
+                "pro-dev", "pro", {"limits.cpu": "2", "boot.autostart": "true"}
+            )
+        mock.assert_called_once()
+        cmd = mock.call_args[0][0]
+        assert cmd == [
+            "incus", "config", "set", "pro-dev",
+            "limits.cpu=2", "boot.autostart=true", "--project", "pro",
+        ]  # fmt: skip
+
+    def test_instance_config_update_unset(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_config_update(
+                "pro-dev", "pro", {"limits.cpu": "2", "limits.memory": None}
+            )
+        cmds = [c[0][0] for c in mock.call_args_list]
+        assert cmds == [
+            ["incus", "config", "set", "pro-dev", "limits.cpu=2", "--project", "pro"],
+            ["incus", "config", "unset", "pro-dev", "limits.memory", "--project", "pro"],
+        ]
+
+    def test_instance_profiles_set_single_call(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_profiles_set("pro-dev", "pro", ["default", "gui"])
+        assert mock.call_args[0][0] == [
+            "incus", "profile", "assign", "pro-dev", "default,gui", "--project", "pro",
+        ]  # fmt: skip
+
+    def test_instance_config_set_delegates(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.instance_config_set("pro-dev", "pro", "security.protection.delete", "false")
+        assert "security.protection.delete=false" in mock.call_args[0][0]
+
+    def test_profile_config_set_single_call(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.profile_config_set("heavy", "pro", {"limits.cpu": "4", "limits.memory": "8GiB"})
+        mock.assert_called_once()
+        cmd = mock.call_args[0][0]
+        assert cmd[:4] == ["incus", "profile", "set", "heavy"]
+        assert "limits.cpu=4" in cmd
+        assert "limits.memory=8GiB" in cmd
+
+    def test_empty_config_no_call(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run") as mock:
+            driver.profile_config_set("heavy", "pro", {})
+            driver.instance_config_update("pro-dev", "pro", {})
+        mock.assert_not_called()
+
+    def test_profile_create_with_content_on_stdin(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.profile_create(
+                "heavy",
+                "pro",
+                config={"limits.cpu": 4},
+                devices={"data": {"type": "disk", "path": "/data", "source": "/srv"}},
+            )
+        mock.assert_called_once()
+        assert mock.call_args[0][0] == ["incus", "profile", "create", "heavy", "--project", "pro"]
+        body = json.loads(mock.call_args.kwargs["input"])
+        assert body == {
+            "config": {"limits.cpu": "4"},
+            "devices": {"data": {"type": "disk", "path": "/data", "source": "/srv"}},
+        }
+
+    def test_profile_create_empty(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            driver.profile_create("heavy", "pro")
+        assert mock.call_args.kwargs["input"] is None
+
+    def test_profile_devices_add_one_edit(self, driver: IncusDriver) -> None:
+        current = {
+            "description": "GUI",
+            "config": {"raw.idmap": "both 1000 1000"},
+            "devices": {"igpu": {"type": "gpu"}},
+        }
+        with patch("subprocess.run", side_effect=[_json_ok(current), _ok()]) as mock:
+            driver.profile_devices_add(
+                "gui",
+                {"a": {"type": "proxy", "bind": "instance"}, "b": {"type": "proxy"}},
+                project="pro",
+            )
+        assert mock.call_count == 2
+        assert mock.call_args[0][0] == ["incus", "profile", "edit", "gui", "--project", "pro"]
+        body = json.loads(mock.call_args.kwargs["input"])
+        assert body["config"] == current["config"]
+        assert sorted(body["devices"]) == ["a", "b", "igpu"]
+
+    def test_profile_devices_add_existing_raises(self, driver: IncusDriver) -> None:
+        current = {"devices": {"a": {"type": "proxy"}}}
+        with (
+            patch("subprocess.run", return_value=_json_ok(current)) as mock,
+            pytest.raises(IncusError, match="existe déjà"),
+        ):
+            driver.profile_devices_add("gui", {"a": {"type": "proxy"}}, project="pro")
+        mock.assert_called_once()
+
+
 # ============================================================
 # ensure_default_root_disk
 # ============================================================
@@ -453,6 +617,151 @@ class TestEnsureDefaultRootDisk:
             assert driver.ensure_default_root_disk() is False
 
 
+# ============================================================
+# Opérations asynchrones (backend CLI : déjà terminées)
+# ============================================================
+
+
+class TestAsyncFallback:
+    def test_create_async_runs_init(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_ok()) as mock:
+            op = driver.instance_create_async("pro-dev", "pro", "images:debian/13")
+        assert mock.call_args[0][0][:2] == ["incus", "init"]
+        assert op.done and op.success
+        assert op.id == ""
+
+    def test_start_async_error_raised_at_submit(self, driver: IncusDriver) -> None:
+        with (
+            patch("subprocess.run", return_value=_fail(stderr="not found")),
+            pytest.raises(IncusError),
+        ):
+            driver.instance_start_async("pro-dev", "pro")
+
+    def test_wait_all_passthrough(self, driver: IncusDriver) -> None:
+        assert driver.supports_async is False
+        with patch("subprocess.run") as mock:
+            ops = [IncusOperation("create pro/pro-dev")]
+            assert driver.wait_all(ops, timeout=10) is ops
+        mock.assert_not_called()
+
+
+# ============================================================
+# Lecture groupée de l'état
+# ============================================================
+
+
+class TestQuery:
+    def test_returns_json(self, driver: IncusDriver) -> None:
+        with patch("subprocess.run", return_value=_json_ok({"name": "default"})) as mock:
+            result = driver.query("/1.0/profiles/default?project=pro")
+        assert result == {"name": "default"}
+        assert mock.call_args[0][0] == ["incus", "query", "/1.0/profiles/default?project=pro"]
+
+    def test_invalid_json(self, driver: IncusDriver) -> None:
+        with (
+            patch("subprocess.run", return_value=_ok(stdout="pas du json")),
+            pytest.raises(IncusError, match="JSON invalide"),
+        ):
+            driver.query("/1.0/projects")
+
+    def test_instance_state(self, driver: IncusDriver) -> None:
+        state = {"cpu": {"usage": 5}, "memory": {"usage": 1024}}
+        with patch("subprocess.run", return_value=_json_ok(state)) as mock:
+            assert driver.instance_state("pro-dev", "pro") == state
+        assert mock.call_args[0][0] == [
+            "incus",
+            "query",
+            "/1.0/instances/pro-dev/state?project=pro",
+        ]
+
+
+_PROJECTS = [
+    {"name": "default", "config": {"features.networks": "true"}},
+    {"name": "pro", "config": {"features.profiles": "false"}},
+    {"name": "lab", "config": {"features.networks": "true", "features.profiles": "true"}},
+]
+
+
+class TestBuildStateSnapshot:
+    def test_networks_scoped_by_feature(self) -> None:
+        networks = [
+            {"name": "net-pro", "type": "bridge", "project": "default"},
+            {"name": "net-lab", "type": "bridge", "project": "lab"},
+        ]
+        state = build_state_snapshot(_PROJECTS, networks, [], [])
+        assert state.network_exists("net-pro", "pro")
+        assert not state.network_exists("net-lab", "pro")
+        assert [n.name for n in state.network_list("lab")] == ["net-lab"]
+
+    def test_profiles_scoped_by_feature(self) -> None:
+        profiles = [
+            {"name": "default", "project": "default"},
+            {"name": "gpu-passthrough", "project": "default"},
+            {"name": "default", "project": "lab"},
+        ]
+        state = build_state_snapshot(_PROJECTS, [], profiles, [])
+        assert state.profile_exists("gpu-passthrough", "pro")
+        assert not state.profile_exists("gpu-passthrough", "lab")
+
+    def test_instances_grouped_by_project(self) -> None:
+        instances = [
+            {"name": "pro-dev", "status": "Running", "type": "container", "project": "pro"},
+            {
+                "name": "lab-vm",
+                "status": "Stopped",
+                "type": "virtual-machine",
+                "project": "lab",
+                "profiles": ["default"],
+                "config": {"limits.cpu": "2"},
+            },
+        ]
+        state = build_state_snapshot(_PROJECTS, [], [], instances)
+        assert [i.name for i in state.instance_list("pro")] == ["pro-dev"]
+        vm = state.instance_list("lab")[0]
+        assert vm.project == "lab"
+        assert vm.config == {"limits.cpu": "2"}
+        assert state.instance_list("absent") == []
+
+    def test_embedded_snapshots(self) -> None:
+        instances = [
+            {
+                "name": "pro-dev",
+                "project": "pro",
+                "snapshots": [{"name": "snap0", "created_at": "2026-03-07T14:30:00Z"}],
+            },
+            {"name": "pro-web", "project": "pro", "snapshots": None},
+        ]
+        state = build_state_snapshot(_PROJECTS, [], [], instances)
+        dev, web = state.instance_list("pro")
+        assert dev.snapshots == [IncusSnapshot(name="snap0", created_at="2026-03-07T14:30:00Z")]
+        assert web.snapshots == []
+
+    def test_project_helpers(self) -> None:
+        state = build_state_snapshot(_PROJECTS, [], [], [])
+        assert state.project_names == {"default", "pro", "lab"}
+        assert state.project_exists("pro")
+        assert not state.project_exists("perso")
+
+
+class TestStateSnapshot:
+    def test_four_queries(self, driver: IncusDriver) -> None:
+        responses = [
+            _json_ok([{"name": "default"}, {"name": "pro"}]),
+            _json_ok([{"name": "net-pro", "project": "default"}]),
+            _json_ok([{"name": "default", "project": "default"}]),
+            _json_ok([{"name": "pro-dev", "status": "Running", "project": "pro"}]),
+        ]
+        with patch("subprocess.run", side_effect=responses) as mock:
+            state = driver.state_snapshot()
+        assert mock.call_count == 4
+        paths = [c[0][0][2] for c in mock.call_args_list]
+        assert "/1.0/instances?recursion=2&all-projects=true" in paths
+        assert isinstance(state, IncusStateSnapshot)
+        assert state.network_exists("net-pro", "pro")
+        assert state.profile_exists("default", "pro")
+        assert state.instance_list("pro")[0].status == "Running"
+
+
 # ============================================================
 # IncusError
 # ============================================================
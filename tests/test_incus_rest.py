@@ -0,0 +1,611 @@
+"""Tests unitaires pour engine/incus_rest.py.
+
+Le driver REST est testé avec une fausse connexion HTTP (routes
+méthode + chemin → enveloppe Incus), plus un vrai serveur HTTP sur
+socket unix pour vérifier la réutilisation de la connexion.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import pytest
+
+from anklume.engine.incus_driver import (
+    IncusDriver,
+    IncusError,
+    IncusInstance,
+    IncusOperation,
+    IncusProject,
+    make_driver,
+)
+from anklume.engine.incus_rest import IncusRestDriver, _image_source, _url
+
+# --- Helpers ---
+
+
+def _sync(metadata: object) -> dict:
+    return {"type": "sync", "status_code": 200, "metadata": metadata}
+
+
+def _async(op_id: str = "op1") -> dict:
+    return {"type": "async", "status_code": 100, "operation": f"/1.0/operations/{op_id}"}
+
+
+def _error(message: str, code: int = 404) -> dict:
+    return {"type": "error", "error": message, "error_code": code}
+
+
+def _op_done(status: str = "Success", err: str = "") -> dict:
+    return _sync({"status": status, "err": err})
+
+
+class _FakeResponse:
+    def __init__(self, envelope: dict) -> None:
+        self.status = envelope.get("error_code") or 200
+        self.reason = "OK"
+        self._raw = json.dumps(envelope).encode()
+
+    def read(self) -> bytes:
+        return self._raw
+
+
+class FakeIncus:
+    """Fausse API : routes (méthode, chemin) → enveloppe JSON."""
+
+    def __init__(self, routes: dict[tuple[str, str], dict]) -> None:
+        self.routes = routes
+        self.calls: list[tuple[str, str, dict | None]] = []
+        self.connections = 0
+        # (étape "request" ou "response", erreur) : levées une fois, dans l'ordre
+        self.failures: list[tuple[str, OSError]] = []
+
+    def __call__(self, socket_path: str, timeout: float | None = None) -> FakeIncus:
+        self.connections += 1
+        return self
+
+    def _fail(self, step: str) -> None:
+        if self.failures and self.failures[0][0] == step:
+            raise self.failures.pop(0)[1]
+
+    def request(self, method, path, body=None, headers=None) -> None:
+        self._fail("request")
+        self.calls.append((method, path, json.loads(body) if body else None))
+        self._last = (method, path)
+
+    def getresponse(self) -> _FakeResponse:
+        self._fail("response")
+        envelope = self.routes.get(self._last)
+        if envelope is None:
+            envelope = _error(f"route inconnue : {self._last}")
+        return _FakeResponse(envelope)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake():
+    api = FakeIncus({})
+    with patch("anklume.engine.incus_rest._UnixHTTPConnection", api):
+        yield api
+
+
+@pytest.fixture
+def driver(fake) -> IncusRestDriver:
+    return IncusRestDriver("/tmp/incus-test.sock")
+
+
+# ============================================================
+# Helpers d'URL et d'image
+# ============================================================
+
+
+class TestUrl:
+    def test_segments_and_query(self) -> None:
+        assert _url("instances", "pro-dev", "state", project="pro") == (
+            "/1.0/instances/pro-dev/state?project=pro"
+        )
+
+    def test_none_params_dropped(self) -> None:
+        assert _url("projects", recursion=1, project=None) == "/1.0/projects?recursion=1"
+
+    def test_underscore_becomes_dash(self) -> None:
+        assert "all-projects=true" in _url("instances", all_projects="true")
+
+
+class TestImageSource:
+    def test_images_remote(self) -> None:
+        src = _image_source("images:debian/13")
+        assert src is not None
+        assert src["server"] == "https://images.linuxcontainers.org"
+        assert src["protocol"] == "simplestreams"
+        assert src["alias"] == "debian/13"
+
+    def test_local_alias(self) -> None:
+        assert _image_source("my-golden") == {"type": "image", "alias": "my-golden"}
+
+    def test_unknown_remote(self) -> None:
+        assert _image_source("custom:debian/13") is None
+
+
+# ============================================================
+# Lecture
+# ============================================================
+
+
+class TestReads:
+    def test_project_list(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/projects?recursion=1")] = _sync(
+            [{"name": "default", "description": "Default"}, {"name": "pro"}]
+        )
+        assert driver.project_list() == [
+            IncusProject(name="default", description="Default"),
+            IncusProject(name="pro"),
+        ]
+
+    def test_instance_list(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/instances?recursion=1&project=pro")] = _sync(
+            [
+                {
+                    "name": "pro-dev",
+                    "status": "Running",
+                    "type": "container",
+                    "profiles": ["default"],
+                    "config": {"limits.cpu": "2"},
+                }
+            ]
+        )
+        result = driver.instance_list("pro")
+        assert result == [
+            IncusInstance(
+                name="pro-dev",
+                status="Running",
+                type="container",
+                project="pro",
+                profiles=["default"],
+                config={"limits.cpu": "2"},
+            )
+        ]
+
+    def test_network_exists_uses_rest(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/networks?recursion=1&project=pro")] = _sync(
+            [{"name": "net-pro", "type": "bridge"}]
+        )
+        assert driver.network_exists("net-pro", "pro") is True
+        assert driver.network_exists("net-perso", "pro") is False
+
+    def test_profile_exists(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/profiles?recursion=1&project=pro")] = _sync(
+            [{"name": "default"}, {"name": "gpu-passthrough"}]
+        )
+        assert driver.profile_exists("gpu-passthrough", "pro") is True
+
+    def test_snapshot_list(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/instances/pro-dev/snapshots?recursion=1&project=pro")] = _sync(
+            [{"name": "anklume-pre-20260101-000000", "created_at": "2026-01-01T00:00:00Z"}]
+        )
+        snaps = driver.snapshot_list("pro-dev", "pro")
+        assert snaps[0].name == "anklume-pre-20260101-000000"
+        assert snaps[0].created_at == "2026-01-01T00:00:00Z"
+
+    def test_error_raises_incus_error(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/projects?recursion=1")] = _error("not authorized", 403)
+        with pytest.raises(IncusError) as exc_info:
+            driver.project_list()
+        assert exc_info.value.returncode == 403
+        assert "not authorized" in str(exc_info.value)
+
+
+# ============================================================
+# Écriture
+# ============================================================
+
+
+class TestWrites:
+    def test_project_create_features(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/projects")] = _sync({})
+        driver.project_create("pro", description="Domaine pro")
+        _method, _path, body = fake.calls[-1]
+        assert body["config"] == {"features.images": "false", "features.profiles": "false"}
+        assert body["description"] == "Domaine pro"
+
+    def test_instance_create_single_post(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/instances?project=pro")] = _async("create")
+        fake.routes[("GET", "/1.0/operations/create/wait?timeout=-1")] = _op_done()
+
+        driver.instance_create(
+            "pro-dev",
+            "pro",
+            "images:debian/13",
+            instance_type="virtual-machine",
+            profiles=["default", "gpu-passthrough"],
+            config={"security.protection.delete": "true"},
+            network="net-pro",
+        )
+
+        method, _path, body = fake.calls[0]
+        assert method == "POST"
+        assert body["type"] == "virtual-machine"
+        assert body["profiles"] == ["default", "gpu-passthrough"]
+        assert body["config"] == {"security.protection.delete": "true"}
+        assert body["devices"]["eth0"] == {"type": "nic", "network": "net-pro", "name": "eth0"}
+        assert body["source"]["alias"] == "debian/13"
+        # L'opération asynchrone est attendue
+        assert fake.calls[1][1] == "/1.0/operations/create/wait?timeout=-1"
+
+    def test_instance_create_with_devices(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/instances?project=pro")] = _sync({})
+
+        driver.instance_create(
+            "pro-dev",
+            "pro",
+            "images:debian/13",
+            network="net-pro",
+            devices={"root": {"type": "disk", "path": "/", "pool": "fast"}},
+        )
+
+        assert len(fake.calls) == 1
+        devices = fake.calls[0][2]["devices"]
+        assert sorted(devices) == ["eth0", "root"]
+        assert devices["root"] == {"type": "disk", "path": "/", "pool": "fast"}
+
+    def test_instance_create_rejects_bad_name(self, driver: IncusRestDriver) -> None:
+        with pytest.raises(ValueError, match="invalide"):
+            driver.instance_create("Bad;Name", "pro", "images:debian/13")
+
+    def test_instance_create_unknown_remote_falls_back_to_cli(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        with patch.object(IncusDriver, "instance_create") as cli_create:
+            driver.instance_create("pro-dev", "pro", "custom:debian/13")
+        cli_create.assert_called_once()
+        assert fake.calls == []
+
+    def test_failed_operation_raises(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("PUT", "/1.0/instances/pro-dev/state?project=pro")] = _async("start")
+        fake.routes[("GET", "/1.0/operations/start/wait?timeout=-1")] = _op_done(
+            "Failure", "Failed to start"
+        )
+        with pytest.raises(IncusError, match="Failed to start"):
+            driver.instance_start("pro-dev", "pro")
+
+    def test_instance_stop_body(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("PUT", "/1.0/instances/pro-dev/state?project=pro")] = _async("stop")
+        fake.routes[("GET", "/1.0/operations/stop/wait?timeout=-1")] = _op_done()
+        driver.instance_stop("pro-dev", "pro")
+        assert fake.calls[0][2] == {"action": "stop", "timeout": -1, "force": False}
+
+    def test_instance_delete_force_stops_running(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        fake.routes[("GET", "/1.0/instances/pro-dev?project=pro")] = _sync({"status": "Running"})
+        fake.routes[("PUT", "/1.0/instances/pro-dev/state?project=pro")] = _async("stop")
+        fake.routes[("GET", "/1.0/operations/stop/wait?timeout=-1")] = _op_done()
+        fake.routes[("DELETE", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_delete("pro-dev", "pro", force=True)
+        assert [c[0] for c in fake.calls] == ["GET", "PUT", "GET", "DELETE"]
+        assert fake.calls[1][2] == {"action": "stop", "timeout": -1, "force": True}
+
+    def test_instance_delete_force_stopped(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/instances/pro-dev?project=pro")] = _sync({"status": "Stopped"})
+        fake.routes[("DELETE", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_delete("pro-dev", "pro", force=True)
+        assert [c[0] for c in fake.calls] == ["GET", "DELETE"]
+
+    def test_profile_config_set_single_request(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        fake.routes[("PATCH", "/1.0/profiles/custom?project=pro")] = _sync({})
+        driver.profile_config_set("custom", "pro", {"limits.cpu": "2", "limits.memory": "2GiB"})
+        assert len(fake.calls) == 1
+        assert fake.calls[0][2] == {"config": {"limits.cpu": "2", "limits.memory": "2GiB"}}
+
+    def test_profile_create_single_request(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/profiles?project=pro")] = _sync({})
+        driver.profile_create(
+            "heavy",
+            "pro",
+            config={"limits.cpu": "4"},
+            devices={"data": {"type": "disk", "path": "/data"}},
+        )
+        assert fake.calls == [
+            (
+                "POST",
+                "/1.0/profiles?project=pro",
+                {
+                    "name": "heavy",
+                    "config": {"limits.cpu": "4"},
+                    "devices": {"data": {"type": "disk", "path": "/data"}},
+                },
+            )
+        ]
+
+    def test_profile_devices_add_single_patch(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        fake.routes[("GET", "/1.0/profiles/gui?project=pro")] = _sync({"devices": {}})
+        fake.routes[("PATCH", "/1.0/profiles/gui?project=pro")] = _sync({})
+        driver.profile_devices_add(
+            "gui", {"a": {"type": "proxy"}, "b": {"type": "proxy"}}, project="pro"
+        )
+        assert [c[0] for c in fake.calls] == ["GET", "PATCH"]
+        assert sorted(fake.calls[1][2]["devices"]) == ["a", "b"]
+
+    def test_instance_config_update_single_request(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        fake.routes[("PATCH", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_config_update("pro-dev", "pro", {"limits.cpu": 2, "limits.memory": "1GiB"})
+        assert fake.calls[0][2] == {"config": {"limits.cpu": "2", "limits.memory": "1GiB"}}
+
+    def test_instance_config_update_unset_rewrites(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        current = {
+            "name": "pro-dev",
+            "status": "Running",
+            "config": {"limits.cpu": "1", "limits.memory": "1GiB"},
+            "devices": {},
+            "profiles": ["default"],
+        }
+        fake.routes[("GET", "/1.0/instances/pro-dev?project=pro")] = _sync(current)
+        fake.routes[("PUT", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_config_update("pro-dev", "pro", {"limits.cpu": "2", "limits.memory": None})
+        method, _path, body = fake.calls[-1]
+        assert method == "PUT"
+        assert body == {"config": {"limits.cpu": "2"}, "devices": {}, "profiles": ["default"]}
+
+    def test_instance_profiles_set(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("PATCH", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_profiles_set("pro-dev", "pro", ["default", "gui"])
+        assert fake.calls == [
+            ("PATCH", "/1.0/instances/pro-dev?project=pro", {"profiles": ["default", "gui"]})
+        ]
+
+    def test_profile_device_add(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/profiles/gpu?project=pro")] = _sync({"devices": {}})
+        fake.routes[("PATCH", "/1.0/profiles/gpu?project=pro")] = _sync({})
+        driver.profile_device_add("gpu", "gpu", "gpu", {"gid": "44"}, project="pro")
+        assert fake.calls[-1][2] == {"devices": {"gpu": {"type": "gpu", "gid": "44"}}}
+
+    def test_profile_device_add_existing_raises(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        fake.routes[("GET", "/1.0/profiles/gpu?project=pro")] = _sync(
+            {"devices": {"gpu": {"type": "gpu"}}}
+        )
+        with pytest.raises(IncusError, match="existe déjà"):
+            driver.profile_device_add("gpu", "gpu", "gpu", project="pro")
+
+    def test_instance_profile_add(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/instances/pro-dev?project=pro")] = _sync(
+            {"profiles": ["default"]}
+        )
+        fake.routes[("PATCH", "/1.0/instances/pro-dev?project=pro")] = _sync({})
+        driver.instance_profile_add("pro-dev", "gui", "pro")
+        assert fake.calls[-1][2] == {"profiles": ["default", "gui"]}
+
+    def test_ensure_default_root_disk_inherited(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        """La logique métier héritée fonctionne sur le transport REST."""
+        fake.routes[("GET", "/1.0/profiles/default?project=default")] = _sync({"devices": {}})
+        fake.routes[("GET", "/1.0/storage-pools?recursion=1")] = _sync([{"name": "zfs"}])
+        fake.routes[("PATCH", "/1.0/profiles/default?project=default")] = _sync({})
+
+        assert driver.ensure_default_root_disk() is True
+        assert fake.calls[-1][2] == {
+            "devices": {"root": {"type": "disk", "path": "/", "pool": "zfs"}}
+        }
+
+    def test_connection_reused(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/projects?recursion=1")] = _sync([])
+        for _ in range(5):
+            driver.project_list()
+        assert fake.connections == 1
+
+
+# ============================================================
+# Opérations asynchrones
+# ============================================================
+
+
+class TestAsyncOperations:
+    def test_create_returns_running_handle(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/instances?project=pro")] = _async("create")
+
+        op = driver.instance_create_async("pro-dev", "pro", "images:debian/13")
+
+        assert op.id == "/1.0/operations/create"
+        assert op.status == "Running"
+        assert not op.done
+        # Aucune attente à la soumission
+        assert [c[1] for c in fake.calls] == ["/1.0/instances?project=pro"]
+
+    def test_start_returns_handle(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("PUT", "/1.0/instances/pro-dev/state?project=pro")] = _async("start")
+        op = driver.instance_start_async("pro-dev", "pro")
+        assert op.id == "/1.0/operations/start"
+        assert fake.calls[0][2] == {"action": "start", "timeout": -1, "force": False}
+
+    def test_wait_all(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        for name in ("a", "c"):
+            fake.routes[("GET", f"/1.0/operations/{name}/wait?timeout=-1")] = _op_done()
+        fake.routes[("GET", "/1.0/operations/b/wait?timeout=-1")] = _op_done(
+            "Failure", "image introuvable"
+        )
+        ops = [
+            IncusOperation(f"create pro/{n}", id=f"/1.0/operations/{n}", status="Running")
+            for n in ("a", "b", "c")
+        ]
+
+        result = driver.wait_all(ops)
+
+        assert result is ops
+        assert [op.status for op in ops] == ["Success", "Failure", "Success"]
+        assert ops[1].err == "image introuvable"
+        assert not ops[1].success
+
+    def test_wait_all_timeout(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/operations/slow/wait?timeout=5")] = _op_done("Running")
+        op = IncusOperation("create pro/pro-dev", id="/1.0/operations/slow", status="Running")
+
+        driver.wait_all([op], timeout=5)
+
+        assert fake.calls[0][1] == "/1.0/operations/slow/wait?timeout=5"
+        assert op.status == "Running"
+        assert "Délai" in op.err
+
+    def test_wait_all_skips_done(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        driver.wait_all([IncusOperation("create pro/pro-dev")])
+        assert fake.calls == []
+
+    def test_wait_all_unknown_operation(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        op = IncusOperation("start pro/pro-dev", id="/1.0/operations/gone", status="Running")
+        driver.wait_all([op])
+        assert op.status == "Failure"
+        assert "route inconnue" in op.err
+
+    def test_unknown_remote_completes_via_cli(
+        self, fake: FakeIncus, driver: IncusRestDriver
+    ) -> None:
+        with patch.object(IncusDriver, "instance_create") as cli_create:
+            op = driver.instance_create_async("pro-dev", "pro", "custom:debian/13")
+        cli_create.assert_called_once()
+        assert op.done and op.success
+
+
+# ============================================================
+# Connexion keep-alive fermée par Incus
+# ============================================================
+
+
+class TestStaleConnection:
+    def test_get_replayed_after_disconnect(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("GET", "/1.0/projects?recursion=1")] = _sync([{"name": "pro"}])
+        fake.failures = [("response", http.client.RemoteDisconnected("fermée"))]
+
+        assert driver.project_list() == [IncusProject(name="pro")]
+        assert len(fake.calls) == 2
+        assert fake.connections == 2
+
+    def test_unsent_post_replayed(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("POST", "/1.0/projects")] = _sync({})
+        fake.failures = [("request", BrokenPipeError())]
+
+        driver.project_create("pro")
+
+        assert [c[0] for c in fake.calls] == ["POST"]
+
+    @pytest.mark.parametrize("error", [http.client.RemoteDisconnected("fermée"), BrokenPipeError()])
+    def test_sent_post_not_replayed(
+        self, fake: FakeIncus, driver: IncusRestDriver, error: OSError
+    ) -> None:
+        fake.routes[("POST", "/1.0/projects")] = _sync({})
+        fake.failures = [("response", error)]
+
+        with pytest.raises(IncusError, match="non rejouée"):
+            driver.project_create("pro")
+        assert len(fake.calls) == 1
+
+    def test_sent_delete_not_replayed(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.routes[("DELETE", "/1.0/projects/pro")] = _sync({})
+        fake.failures = [("response", ConnectionResetError())]
+
+        with pytest.raises(IncusError, match="non rejouée"):
+            driver.project_delete("pro")
+        assert len(fake.calls) == 1
+
+    def test_single_replay(self, fake: FakeIncus, driver: IncusRestDriver) -> None:
+        fake.failures = [("request", BrokenPipeError()), ("request", BrokenPipeError())]
+
+        with pytest.raises(IncusError, match="injoignable"):
+            driver.project_list()
+        assert fake.failures == []
+
+
+# ============================================================
+# Vrai socket unix : keep-alive
+# ============================================================
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.server.peers.add(id(self.connection))  # type: ignore[attr-defined]
+        payload = json.dumps(_sync([{"name": "default"}])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _addr = super().get_request()
+        return request, ("local", 0)
+
+
+class TestUnixSocket:
+    def test_keep_alive_single_connection(self, tmp_path) -> None:
+        sock_path = str(tmp_path / "incus.sock")
+        server = _UnixServer(sock_path, _Handler)
+        server.peers = set()  # type: ignore[attr-defined]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            driver = IncusRestDriver(sock_path, timeout=5)
+            for _ in range(3):
+                assert driver.project_list() == [IncusProject(name="default")]
+            driver.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(server.peers) == 1  # type: ignore[attr-defined]
+
+    def test_missing_socket_raises(self, tmp_path) -> None:
+        driver = IncusRestDriver(str(tmp_path / "absent.sock"))
+        with pytest.raises(IncusError, match="injoignable"):
+            driver.project_list()
+
+
+# ============================================================
+# Sélection du backend
+# ============================================================
+
+
+class TestMakeDriver:
+    def test_default_is_cli(self, monkeypatch) -> None:
+        monkeypatch.delenv("ANKLUME_INCUS_BACKEND", raising=False)
+        driver = make_driver()
+        assert type(driver) is IncusDriver
+
+    def test_config_selects_rest(self, monkeypatch) -> None:
+        monkeypatch.delenv("ANKLUME_INCUS_BACKEND", raising=False)
+        assert isinstance(make_driver("rest"), IncusRestDriver)
+
+    def test_env_overrides_config(self, monkeypatch) -> None:
+        monkeypatch.setenv("ANKLUME_INCUS_BACKEND", "rest")
+        assert isinstance(make_driver("cli"), IncusRestDriver)
+
+    def test_unknown_backend(self, monkeypatch) -> None:
+        monkeypatch.delenv("ANKLUME_INCUS_BACKEND", raising=False)
+        with pytest.raises(ValueError, match="inconnu"):
+            make_driver("grpc")
+
+    def test_rest_driver_is_incus_driver(self) -> None:
+        """Les mocks spec=IncusDriver couvrent le backend REST."""
+        assert issubclass(IncusRestDriver, IncusDriver)
@@ -1,10 +1,13 @@
 """Tests du générateur de règles nftables."""
 
+import itertools
+import re
+
 import pytest
 
 from anklume.engine.addressing import assign_addresses
-from anklume.engine.models import Policy
-from anklume.engine.nftables import generate_ruleset
+from anklume.engine.models import NftablesConfig, Policy
+from anklume.engine.nftables import build_ruleset, counter_labels, generate_ruleset
 
 from .conftest import make_domain, make_infra, make_machine
 
@@ -39,10 +42,12 @@ class TestRulesetStructure:
         ruleset = generate_ruleset(infra)
         assert "ct state established,related accept" in ruleset
 
-    def test_flush_table_idempotent(self):
+    def test_delete_table_idempotent(self):
         infra = make_infra()
         ruleset = generate_ruleset(infra)
-        assert "flush table inet anklume" in ruleset
+        assert ruleset.index("table inet anklume\n") < ruleset.index("delete table inet anklume")
+        assert ruleset.index("delete table inet anklume") < ruleset.index("table inet anklume {")
+        assert "flush" not in ruleset
 
     def test_shebang(self):
         infra = make_infra()
@@ -683,3 +688,426 @@ class TestEdgeCharacterNames:
         assert "ip saddr 10.120.0.5" in ruleset
         assert "ip daddr 10.100.0.3" in ruleset
         assert "tcp dport { 443 }" in ruleset
+
+
+# --- Mode optimisé : verdict maps ---
+
+_LINEAR_RULE = re.compile(
+    r'^iifname "(?P<iif>[^"]+)"(?: ip saddr (?P<saddr>\S+))?'
+    r' oifname "(?P<oif>[^"]+)"(?: ip daddr (?P<daddr>\S+))?'
+    r"(?: (?P<proto>tcp|udp) dport \{ (?P<ports>[\d, -]+) \}| meta l4proto (?P<l4>tcp|udp))?"
+    r" accept$"
+)
+_MAP_HEADER = re.compile(r"^map (\S+) \{$")
+_VMAP_RULE = re.compile(r"^(.+) vmap @(\S+)$")
+
+
+def _linear_allows(ruleset: str, packet: dict) -> bool:
+    """Évalue les règles forward linéaires (hors ct state et passthrough)."""
+    for line in ruleset.splitlines():
+        m = _LINEAR_RULE.match(line.strip())
+        if not m or m["iif"] != packet["iif"] or m["oif"] != packet["oif"]:
+            continue
+        if (m["saddr"] or m["daddr"]) and packet["family"] != 4:
+            continue
+        if m["saddr"] and m["saddr"] != packet["saddr"]:
+            continue
+        if m["daddr"] and m["daddr"] != packet["daddr"]:
+            continue
+        if m["l4"] and m["l4"] != packet["proto"]:
+            continue
+        if m["ports"] and (
+            m["proto"] != packet["proto"]
+            or not any(_port_matches(p.strip(), packet["dport"]) for p in m["ports"].split(","))
+        ):
+            continue
+        return True
+    return False
+
+
+def _parse_maps(ruleset: str) -> dict[str, list[list[str]]]:
+    maps: dict[str, list[list[str]]] = {}
+    current = None
+    for line in ruleset.splitlines():
+        text = line.strip()
+        header = _MAP_HEADER.match(text)
+        if header:
+            current = maps.setdefault(header[1], [])
+        elif current is not None and text.endswith(("accept", "accept,")):
+            key = text.rsplit(":", 1)[0]
+            current.append([part.strip().strip('"') for part in key.split(" . ")])
+        elif text == "}" and line.startswith("    }"):
+            current = None
+    return maps
+
+
+_SELECTORS = {
+    "iifname": "iif",
+    "oifname": "oif",
+    "ip saddr": "saddr",
+    "ip daddr": "daddr",
+    "meta l4proto": "proto",
+    "th dport": "dport",
+}
+
+
+def _optimized_allows(ruleset: str, packet: dict) -> bool:
+    """Évalue les lookups `vmap` du mode optimisé sur leurs maps."""
+    maps = _parse_maps(ruleset)
+    for line in ruleset.splitlines():
+        m = _VMAP_RULE.match(line.strip())
+        if not m:
+            continue
+        fields = [_SELECTORS[s] for s in m[1].split(" . ")]
+        if {"saddr", "daddr"} & set(fields) and packet["family"] != 4:
+            continue
+        if "dport" in fields and packet["proto"] not in ("tcp", "udp"):
+            continue
+        for element in maps[m[2]]:
+            if all(_element_matches(v, packet[f]) for v, f in zip(element, fields, strict=True)):
+                return True
+    return False
+
+
+def _port_matches(value: str, port: int | None) -> bool:
+    """`80` ou intervalle `8000-8100`."""
+    if port is None:
+        return False
+    low, _, high = value.partition("-")
+    return int(low) <= port <= int(high or low)
+
+
+def _element_matches(value: str, actual: object) -> bool:
+    if value in ("0.0.0.0/0", "0-65535"):
+        return True
+    if isinstance(actual, int) and re.fullmatch(r"\d+-\d+", value):
+        return _port_matches(value, actual)
+    return value == str(actual)
+
+
+def _lab_infra():
+    """Infrastructure de TP : domaines, machines, politiques qui se recouvrent."""
+    domains = {
+        "pro": make_domain(
+            "pro", machines={"dev": make_machine("dev", "pro"), "db": make_machine("db", "pro")}
+        ),
+        "perso": make_domain("perso", machines={"web": make_machine("web", "perso")}),
+        "ai": make_domain("ai", machines={"gpu": make_machine("gpu", "ai")}),
+        "lab": make_domain("lab"),
+        "old": make_domain("old", enabled=False),
+    }
+    infra = make_infra(domains=domains)
+    infra.policies = [
+        Policy("Web", "pro", "perso", ports=[443, 80]),
+        Policy("Tout perso", "pro", "perso", ports="all"),
+        Policy("DNS", "lab", "ai", ports=[53], protocol="udp"),
+        Policy("Sans filtre", "lab", "pro"),
+        Policy("Ollama", "pro-dev", "ai-gpu", ports=[11434], bidirectional=True),
+        Policy("Ollama bis", "pro-dev", "ai-gpu", ports=[11434]),
+        Policy("Vers GPU", "perso", "ai-gpu", ports="all", protocol="udp"),
+        Policy("Depuis web", "perso-web", "lab", ports=[]),
+        Policy("Base", "ai", "pro-db", ports=[5432]),
+        Policy("Hôte", "host", "pro", ports=[22]),
+        Policy("Désactivé", "old", "pro", ports="all"),
+    ]
+    assign_addresses(infra)
+    return infra
+
+
+def _packet_grid(infra, ports=(None, 22, 53, 80, 443, 5432, 8080, 11434)):
+    """Paquets entre chaque paire de bridges, machines et adresse inconnue."""
+    bridges = [d.network_name for d in infra.domains.values()]
+    ips = {
+        d.network_name: [m.ip for m in d.machines.values()] + ["10.250.0.9"]
+        for d in infra.domains.values()
+    }
+    for iif, oif in itertools.product(bridges, repeat=2):
+        for saddr, daddr in itertools.product(ips[iif], ips[oif]):
+            for family, proto, dport in itertools.product((4, 6), ("tcp", "udp", "icmp"), ports):
+                if (proto == "icmp") != (dport is None):
+                    continue
+                yield {
+                    "iif": iif,
+                    "oif": oif,
+                    "saddr": saddr,
+                    "daddr": daddr,
+                    "family": family,
+                    "proto": proto,
+                    "dport": dport,
+                }
+
+
+class TestOptimizedMode:
+    """Mode `optimized` : allows compilés en verdict maps."""
+
+    def _ruleset(self) -> str:
+        return generate_ruleset(_lab_infra(), mode="optimized")
+
+    def test_config_selects_mode(self):
+        infra = _lab_infra()
+        infra.config.nftables = NftablesConfig(mode="optimized")
+        assert generate_ruleset(infra) == self._ruleset()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="inconnu"):
+            generate_ruleset(make_infra(), mode="fast")
+
+    def test_one_lookup_per_map(self):
+        ruleset = self._ruleset()
+        assert "iifname . oifname vmap @fwd_bridges" in ruleset
+        assert "iifname . oifname . meta l4proto . th dport vmap @fwd_ports" in ruleset
+        assert "vmap @fwd_hosts" in ruleset
+        assert "vmap @fwd_host_ports" in ruleset
+        assert not _effective_lines(ruleset, "iifname ", "oifname ")
+
+    def test_maps_declared_before_chain(self):
+        ruleset = self._ruleset()
+        assert ruleset.index("map fwd_bridges {") < ruleset.index("chain forward")
+        assert "type ifname . ifname . inet_proto . inet_service : verdict" in ruleset
+
+    def test_intra_domain_elements(self):
+        ruleset = self._ruleset()
+        assert '"net-pro" . "net-pro" : accept' in ruleset
+        assert '"net-old" . "net-old"' not in ruleset
+
+    def test_covered_elements_pruned(self):
+        """`ports: all` couvre 80/443 ; la politique dupliquée n'ajoute rien."""
+        maps = _parse_maps(self._ruleset())
+        assert ["net-pro", "net-perso", "tcp", "0-65535"] in maps["fwd_ports"]
+        assert ["net-pro", "net-perso", "tcp", "80"] not in maps["fwd_ports"]
+        ollama = [e for e in maps["fwd_host_ports"] if e[-1] == "11434"]
+        assert len(ollama) == 2  # aller + retour
+
+    def test_empty_infra_no_map(self):
+        ruleset = generate_ruleset(make_infra(), mode="optimized")
+        assert "map " not in ruleset
+        assert "vmap" not in ruleset
+
+    def test_policy_comments_kept(self):
+        ruleset = self._ruleset()
+        assert "# [hôte] host → pro" in ruleset
+        assert "# [ignoré] domaine 'old' désactivé" in ruleset
+
+    def test_equivalent_to_linear(self):
+        """Même verdict que le ruleset linéaire pour chaque paquet de la grille."""
+        infra = _lab_infra()
+        linear = generate_ruleset(infra, mode="linear")
+        optimized = generate_ruleset(infra, mode="optimized")
+
+        checked = allowed = 0
+        for packet in _packet_grid(infra):
+            expected = _linear_allows(linear, packet)
+            assert _optimized_allows(optimized, packet) == expected, packet
+            checked += 1
+            allowed += expected
+        assert 0 < allowed < checked
+
+
+class TestNamedCounters:
+    """`nftables.counters` : compteur nommé par politique et par bridge."""
+
+    def test_disabled_by_default(self):
+        ruleset = generate_ruleset(_lab_infra())
+        assert "counter" not in ruleset
+
+    def test_config_enables(self):
+        infra = _lab_infra()
+        infra.config.nftables = NftablesConfig(counters=True)
+        assert generate_ruleset(infra) == generate_ruleset(_lab_infra(), counters=True)
+
+    def test_linear_rules_counted(self):
+        ruleset = generate_ruleset(_lab_infra(), counters=True)
+        assert 'iifname "net-pro" oifname "net-pro" counter name "intra_pro" accept' in ruleset
+        assert 'tcp dport { 80, 443 } counter name "policy_1" accept' in ruleset
+        assert "    counter policy_1 {}" in ruleset
+        assert "counter intra_old" not in ruleset
+
+    def test_skipped_policies_not_declared(self):
+        """Politique hôte (#10) et domaine désactivé (#11) : pas de compteur."""
+        ruleset = generate_ruleset(_lab_infra(), counters=True)
+        assert "policy_9 {}" in ruleset
+        assert "policy_10" not in ruleset
+        assert "policy_11" not in ruleset
+
+    def test_bidirectional_shares_counter(self):
+        ruleset = generate_ruleset(_lab_infra(), counters=True)
+        assert ruleset.count('counter name "policy_5" accept') == 2
+
+    def test_hyphenated_domain(self):
+        infra = make_infra(domains={"ai-tools": make_domain("ai-tools")})
+        ruleset = generate_ruleset(infra, counters=True)
+        assert 'counter name "intra_ai_tools"' in ruleset
+
+    def test_optimized_counter_maps(self):
+        ruleset = generate_ruleset(_lab_infra(), mode="optimized", counters=True)
+        maps = _parse_maps(ruleset)
+        assert ["net-pro", "net-pro"] in maps["fwd_bridges"]
+        assert "map cnt_fwd_bridges {" in ruleset
+        assert "type ifname . ifname : counter" in ruleset
+        assert '"net-pro" . "net-pro" : "intra_pro"' in ruleset
+        counted = ruleset.index("counter name iifname . oifname map @cnt_fwd_bridges")
+        assert counted < ruleset.index("iifname . oifname vmap @fwd_bridges")
+
+    def test_optimized_declares_counters_in_order(self):
+        ruleset = build_ruleset(_lab_infra(), mode="optimized", counters=True)
+        # policy_1 (80, 443) est couverte par policy_2 (ports: all) : aucun trafic
+        assert ruleset.counters[:4] == ["intra_ai", "intra_lab", "intra_perso", "intra_pro"]
+        assert ruleset.counters[4:] == [
+            "policy_2",
+            "policy_3",
+            "policy_4",
+            "policy_5",
+            "policy_7",
+            "policy_8",
+            "policy_9",
+        ]
+
+    def test_counters_keep_equivalence(self):
+        infra = _lab_infra()
+        plain = generate_ruleset(infra, mode="optimized")
+        counted = generate_ruleset(infra, mode="optimized", counters=True)
+        packet = {
+            "iif": "net-lab",
+            "oif": "net-ai",
+            "saddr": "10.250.0.9",
+            "daddr": "10.250.0.9",
+            "family": 6,
+            "proto": "udp",
+            "dport": 53,
+        }
+        assert _optimized_allows(counted, packet) == _optimized_allows(plain, packet) is True
+
+    def test_labels(self):
+        labels = counter_labels(_lab_infra())
+        assert labels["intra_pro"] == "intra-domaine pro"
+        assert labels["policy_5"] == "pro-dev ↔ ai-gpu (Ollama)"
+        assert "intra_old" not in labels
+
+
+class TestMergedPolicies:
+    """`nftables.merge_policies` : génération depuis les politiques minimales."""
+
+    def _merged(self):
+        infra = _lab_infra()
+        infra.config.nftables = NftablesConfig(merge_policies=True)
+        return infra
+
+    def test_fewer_rules_same_verdicts(self):
+        plain = generate_ruleset(_lab_infra())
+        infra = self._merged()
+        merged = generate_ruleset(infra)
+
+        assert len(_effective_lines(merged)) < len(_effective_lines(plain))
+        for packet in _packet_grid(infra):
+            assert _linear_allows(merged, packet) == _linear_allows(plain, packet), packet
+
+    def test_optimized_same_verdicts(self):
+        infra = self._merged()
+        linear = generate_ruleset(_lab_infra())
+        optimized = generate_ruleset(infra, mode="optimized")
+        for packet in _packet_grid(infra):
+            assert _optimized_allows(optimized, packet) == _linear_allows(linear, packet)
+
+    def test_counters_keep_policy_numbers(self):
+        infra = self._merged()
+        ruleset = build_ruleset(infra, counters=True)
+        assert "policy_1" not in ruleset.counters  # masquée par #2
+        assert "policy_6" not in ruleset.counters  # doublon de #5
+        assert "policy_9" in ruleset.counters
+        assert "policy_9" in counter_labels(infra)
+
+
+def _range_infra(*policies: Policy):
+    domains = {
+        "pro": make_domain("pro", machines={"dev": make_machine("dev", "pro")}),
+        "perso": make_domain("perso", machines={"web": make_machine("web", "perso")}),
+    }
+    infra = make_infra(domains=domains)
+    infra.policies = list(policies)
+    assign_addresses(infra)
+    return infra
+
+
+class TestPortRanges:
+    """Plages de ports, intervalles compactés et sets fusionnés."""
+
+    def test_range_rendered(self):
+        infra = _range_infra(Policy("Services", "pro", "perso", ports=[22, "8000-8100"]))
+        assert "tcp dport { 22, 8000-8100 } accept" in generate_ruleset(infra)
+
+    def test_consecutive_ports_coalesced(self):
+        infra = _range_infra(Policy("Web", "pro", "perso", ports=[443, 82, 80, 81]))
+        assert "tcp dport { 80-82, 443 } accept" in generate_ruleset(infra)
+
+    def test_same_endpoints_single_set(self):
+        infra = _range_infra(
+            Policy("Web", "pro", "perso", ports=[443]),
+            Policy("Services", "pro", "perso", ports=["8000-8100", 444]),
+            Policy("DNS", "pro", "perso", ports=[53], protocol="udp"),
+        )
+        ruleset = generate_ruleset(infra)
+
+        assert [
+            line.strip()
+            for line in _effective_lines(ruleset, 'iifname "net-pro" oifname "net-perso"')
+        ] == [
+            'iifname "net-pro" oifname "net-perso" tcp dport { 443-444, 8000-8100 } accept',
+            'iifname "net-pro" oifname "net-perso" udp dport { 53 } accept',
+        ]
+        assert "# [fusionnée]" in ruleset
+
+    def test_counters_keep_one_rule_per_policy(self):
+        infra = _range_infra(
+            Policy("Web", "pro", "perso", ports=[443]),
+            Policy("Services", "pro", "perso", ports=["8000-8100"]),
+        )
+        ruleset = generate_ruleset(infra, counters=True)
+        assert len(_effective_lines(ruleset, '"net-pro" oifname "net-perso"')) == 2
+
+    def test_optimized_elements_coalesced(self):
+        infra = _range_infra(
+            Policy("Web", "pro", "perso", ports=[443]),
+            Policy("Alt", "pro", "perso", ports=[444, "8000-8100"]),
+        )
+        maps = _parse_maps(generate_ruleset(infra, mode="optimized"))
+        assert [e[-1] for e in maps["fwd_ports"]] == ["443-444", "8000-8100"]
+
+    def test_overlapping_ranges_split_by_counter(self):
+        infra = _range_infra(
+            Policy("A", "pro", "perso", ports=["8000-8100"]),
+            Policy("B", "pro", "perso", ports=["8050-9000"]),
+        )
+        ruleset = build_ruleset(infra, mode="optimized", counters=True)
+        counters = next(m for m in ruleset.maps if m.name == "cnt_fwd_ports")
+        assert list(counters.elements.values()) == ['"policy_1"', '"policy_2"']
+        assert [key.rsplit(" . ", 1)[1] for key in counters.elements] == [
+            "8000-8100",
+            "8101-9000",
+        ]
+
+    def test_range_trimmed_by_wider_address(self):
+        infra = _range_infra(
+            Policy("Large", "pro-dev", "perso", ports=["8050-9000"]),
+            Policy("Précis", "pro-dev", "perso-web", ports=["8000-8100"]),
+        )
+        maps = _parse_maps(generate_ruleset(infra, mode="optimized"))
+        assert sorted(e[-1] for e in maps["fwd_host_ports"]) == ["8000-8049", "8050-9000"]
+
+    def test_optimized_equivalent_to_linear(self):
+        infra = _range_infra(
+            Policy("Large", "pro-dev", "perso", ports=["8050-9000"]),
+            Policy("Précis", "pro-dev", "perso-web", ports=["8000-8100", 22]),
+            Policy("Web", "pro", "perso", ports=[443, 444]),
+            Policy("Tout", "perso", "pro", ports="all", protocol="udp"),
+            Policy("Plage", "perso", "pro", ports=["1000-2000"], protocol="udp"),
+        )
+        linear = generate_ruleset(infra)
+        optimized = generate_ruleset(infra, mode="optimized")
+        ports = (None, 22, 443, 444, 445, 1000, 7999, 8000, 8049, 8050, 8100, 8101, 9000, 9001)
+        checked = allowed = 0
+        for packet in _packet_grid(infra, ports):
+            expected = _linear_allows(linear, packet)
+            assert _optimized_allows(optimized, packet) == expected, packet
+            checked += 1
+            allowed += expected
+        assert 0 < allowed < checked
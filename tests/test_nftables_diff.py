@@ -0,0 +1,534 @@
+"""Tests du déploiement différentiel nftables (engine/nftables_diff.py)."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from anklume.cli._network import deploy_nftables
+from anklume.engine.addressing import assign_addresses
+from anklume.engine.models import Policy
+from anklume.engine.nftables import build_ruleset
+from anklume.engine.nftables_diff import NftablesDelta, compute_delta, parse_live_table
+
+from .conftest import make_domain, make_infra
+
+ACCEPT = {"accept": None}
+
+
+def _meta(key: str, value: str, op: str = "==") -> dict:
+    return {"match": {"op": op, "left": {"meta": {"key": key}}, "right": value}}
+
+
+def _payload(protocol: str, field: str, value: object) -> dict:
+    return {
+        "match": {
+            "op": "==",
+            "left": {"payload": {"protocol": protocol, "field": field}},
+            "right": value,
+        }
+    }
+
+
+def _rule(handle: int, *expr: dict, chain: str = "forward") -> dict:
+    return {
+        "rule": {
+            "family": "inet",
+            "table": "anklume",
+            "chain": chain,
+            "handle": handle,
+            "expr": [*expr, ACCEPT],
+        }
+    }
+
+
+def _bridge_rule(handle: int, iif: str, oif: str, *extra: dict) -> dict:
+    return _rule(handle, _meta("iifname", iif), _meta("oifname", oif), *extra)
+
+
+FORWARD = {
+    "chain": {
+        "family": "inet",
+        "table": "anklume",
+        "name": "forward",
+        "handle": 1,
+        "type": "filter",
+        "hook": "forward",
+        "prio": 0,
+        "policy": "drop",
+    }
+}
+CT_STATE = _rule(
+    2,
+    {
+        "match": {
+            "op": "in",
+            "left": {"ct": {"key": "state"}},
+            "right": ["established", "related"],
+        }
+    },
+)
+
+
+def _live(*objects: dict) -> dict:
+    return {
+        "nftables": [
+            {"metainfo": {"version": "1.0.9", "json_schema_version": 1}},
+            {"table": {"family": "inet", "name": "anklume", "handle": 1}},
+            FORWARD,
+            CT_STATE,
+            *objects,
+        ]
+    }
+
+
+def _infra(*policies: Policy):
+    infra = make_infra(domains={"pro": make_domain("pro"), "perso": make_domain("perso")})
+    infra.policies = list(policies)
+    assign_addresses(infra)
+    return infra
+
+
+WEB = Policy("Web", "pro", "perso", ports=[443])
+
+# Table vivante correspondant à _infra(WEB) en mode linéaire
+LIVE_WEB = _live(
+    _bridge_rule(3, "net-perso", "net-perso"),
+    _bridge_rule(4, "net-pro", "net-pro"),
+    _bridge_rule(5, "net-pro", "net-perso", _payload("tcp", "dport", 443)),
+)
+
+
+def _delta(infra, live: dict | None, mode: str = "linear") -> NftablesDelta:
+    ruleset = build_ruleset(infra, mode=mode)
+    return compute_delta(ruleset, parse_live_table(live) if live else None)
+
+
+class TestRuleDelta:
+    def test_in_sync(self) -> None:
+        """Set à un port listé sans accolades par nft : même règle."""
+        delta = _delta(_infra(WEB), LIVE_WEB)
+        assert delta.empty
+        assert delta.summary() == "aucun changement"
+
+    def test_policy_added(self) -> None:
+        dns = Policy("DNS", "perso", "pro", ports=[53], protocol="udp")
+        delta = _delta(_infra(WEB, dns), LIVE_WEB)
+
+        assert delta.rules_added == [
+            ("forward", 'iifname "net-perso" oifname "net-pro" udp dport { 53 } accept')
+        ]
+        assert not delta.rules_removed
+        script = delta.script(build_ruleset(_infra(WEB, dns)))
+        assert "flush" not in script
+        assert 'add rule inet anklume forward iifname "net-perso"' in script
+
+    def test_policy_inserted_at_rendered_position(self) -> None:
+        """Politique déclarée avant Web : insérée avant sa règle, pas en fin de chaîne."""
+        dns = Policy("DNS", "perso", "pro", ports=[53], protocol="udp")
+        infra = _infra(dns, WEB)
+
+        delta = _delta(infra, LIVE_WEB)
+
+        rule = 'iifname "net-perso" oifname "net-pro" udp dport { 53 } accept'
+        assert delta.rules_inserted == [("forward", 5, rule)]
+        assert not delta.rules_added and not delta.rules_removed
+        script = delta.script(build_ruleset(infra))
+        assert f"insert rule inet anklume forward position 5 {rule}" in script
+        assert delta.summary().startswith("delta : +1/-0 règle(s)")
+
+    def test_reordered_rules_reload(self) -> None:
+        live = _live(
+            _bridge_rule(3, "net-pro", "net-pro"),
+            _bridge_rule(4, "net-perso", "net-perso"),
+            _bridge_rule(5, "net-pro", "net-perso", _payload("tcp", "dport", 443)),
+        )
+        delta = _delta(_infra(WEB), live)
+        assert delta.full_reload
+        assert delta.reason == "ordre des règles modifié"
+
+    def test_policy_removed(self) -> None:
+        delta = _delta(_infra(), LIVE_WEB)
+
+        assert delta.rules_removed == [("forward", 5)]
+        assert not delta.rules_added
+        assert "delete rule inet anklume forward handle 5" in delta.script(build_ruleset(_infra()))
+
+    def test_duplicate_rules_counted(self) -> None:
+        """Sans ports (pas de set à fusionner), deux politiques identiques font deux règles."""
+        unfiltered = Policy("Tout", "pro", "perso")
+        live = _live(
+            _bridge_rule(3, "net-perso", "net-perso"),
+            _bridge_rule(4, "net-pro", "net-pro"),
+            _bridge_rule(5, "net-pro", "net-perso"),
+        )
+        delta = _delta(_infra(unfiltered, unfiltered), live)
+        assert len(delta.rules_added) == 1
+        assert not delta.rules_removed
+
+    def test_merged_port_set(self) -> None:
+        """Deux politiques de mêmes extrémités : un set remplace la règle vivante."""
+        delta = _delta(_infra(WEB, Policy("Alt", "pro", "perso", ports=["8000-8100"])), LIVE_WEB)
+        assert delta.rules_removed == [("forward", 5)]
+        assert delta.rules_added == [
+            ("forward", 'iifname "net-pro" oifname "net-perso" tcp dport { 443, 8000-8100 } accept')
+        ]
+
+    def test_live_port_range(self) -> None:
+        range_rule = _bridge_rule(
+            5, "net-pro", "net-perso", _payload("tcp", "dport", {"range": [8000, 8100]})
+        )
+        live = _live(
+            _bridge_rule(3, "net-perso", "net-perso"),
+            _bridge_rule(4, "net-pro", "net-pro"),
+            range_rule,
+        )
+        delta = _delta(_infra(Policy("Alt", "pro", "perso", ports=["8000-8100"])), live)
+        assert delta.empty
+
+    def test_unknown_expression_replaced(self) -> None:
+        logged = _rule(5, _meta("iifname", "net-pro"), {"log": {"prefix": "x"}})
+        live = _live(
+            _bridge_rule(3, "net-perso", "net-perso"), _bridge_rule(4, "net-pro", "net-pro"), logged
+        )
+
+        delta = _delta(_infra(WEB), live)
+
+        assert delta.rules_removed == [("forward", 5)]
+        assert len(delta.rules_added) == 1
+
+    def test_passthrough_rule_decoded(self) -> None:
+        infra = _infra(WEB)
+        infra.config.network_passthrough = True
+        passthrough = _rule(6, _meta("iifname", "net-*", "!="), _meta("oifname", "net-*", "!="))
+        live = _live(passthrough, *LIVE_WEB["nftables"][4:])
+        assert _delta(infra, live).empty
+
+
+class TestStructureChanges:
+    def test_table_absent(self) -> None:
+        delta = _delta(_infra(WEB), None)
+        assert delta.full_reload
+        ruleset = build_ruleset(_infra(WEB))
+        assert delta.script(ruleset) == ruleset.render()
+
+    def test_chain_policy_changed(self) -> None:
+        live = json.loads(json.dumps(LIVE_WEB))
+        live["nftables"][2]["chain"]["policy"] = "accept"
+        delta = _delta(_infra(WEB), live)
+        assert delta.full_reload
+        assert "chaînes" in delta.reason
+
+    def test_map_appears(self) -> None:
+        delta = _delta(_infra(WEB), LIVE_WEB, mode="optimized")
+        assert delta.full_reload
+        assert "maps" in delta.reason
+
+    def test_optimized_to_linear_drops_maps(self) -> None:
+        """Retour en linéaire : la table est recréée sans les maps vides."""
+        infra = _infra(WEB)
+        ruleset = build_ruleset(infra)
+
+        delta = _delta(infra, LIVE_WEB_OPTIMIZED)
+
+        assert delta.full_reload
+        script = delta.script(ruleset)
+        assert script.index("delete table inet anklume") < script.index("table inet anklume {")
+        assert "fwd_" not in script
+        # Table recréée : les deploys suivants repassent en delta
+        assert _delta(infra, LIVE_WEB).empty
+        dns = Policy("DNS", "perso", "pro", ports=[53], protocol="udp")
+        later = _delta(_infra(WEB, dns), LIVE_WEB)
+        assert not later.full_reload
+        assert len(later.rules_added) == 1
+
+    def test_unknown_object(self) -> None:
+        live = {"nftables": [*LIVE_WEB["nftables"], {"set": {"name": "manuel"}}]}
+        assert _delta(_infra(WEB), live).full_reload
+
+
+def _map(name: str, types: list[str], *keys: list, interval: bool = True) -> dict:
+    body = {
+        "family": "inet",
+        "name": name,
+        "table": "anklume",
+        "type": types,
+        "handle": 10,
+        "map": "verdict",
+        "elem": [[{"concat": key}, ACCEPT] for key in keys],
+    }
+    if interval:
+        body["flags"] = ["interval"]
+    return {"map": body}
+
+
+def _vmap(handle: int, name: str, *selectors: dict) -> dict:
+    return {
+        "rule": {
+            "family": "inet",
+            "table": "anklume",
+            "chain": "forward",
+            "handle": handle,
+            "expr": [{"vmap": {"key": {"concat": list(selectors)}, "data": f"@{name}"}}],
+        }
+    }
+
+
+IIF = {"meta": {"key": "iifname"}}
+OIF = {"meta": {"key": "oifname"}}
+L4 = {"meta": {"key": "l4proto"}}
+DPORT = {"payload": {"protocol": "th", "field": "dport"}}
+
+# Table vivante correspondant à _infra(WEB) en mode optimisé
+LIVE_WEB_OPTIMIZED = _live(
+    _map(
+        "fwd_bridges",
+        ["ifname", "ifname"],
+        ["net-perso", "net-perso"],
+        ["net-pro", "net-pro"],
+        interval=False,
+    ),
+    _map(
+        "fwd_ports",
+        ["ifname", "ifname", "inet_proto", "inet_service"],
+        ["net-pro", "net-perso", "tcp", 443],
+    ),
+    _vmap(3, "fwd_bridges", IIF, OIF),
+    _vmap(4, "fwd_ports", IIF, OIF, L4, DPORT),
+)
+
+
+class TestElementDelta:
+    def test_in_sync(self) -> None:
+        assert _delta(_infra(WEB), LIVE_WEB_OPTIMIZED, mode="optimized").empty
+
+    def test_widened_element(self) -> None:
+        """443 → ports: all : retrait de l'ancien élément avant l'ajout."""
+        infra = _infra(Policy("Tout", "pro", "perso", ports="all"))
+
+        delta = _delta(infra, LIVE_WEB_OPTIMIZED, mode="optimized")
+
+        assert delta.elements_removed == [("fwd_ports", '"net-pro" . "net-perso" . tcp . 443')]
+        assert delta.elements_added == [
+            ("fwd_ports", '"net-pro" . "net-perso" . tcp . 0-65535', "accept")
+        ]
+        assert not delta.rules_added and not delta.rules_removed
+        script = delta.script(build_ruleset(infra, mode="optimized"))
+        assert script.index("delete element") < script.index("add element")
+        assert "tcp . 0-65535 : accept }" in script
+
+    def test_range_element_decoded(self) -> None:
+        live = json.loads(json.dumps(LIVE_WEB_OPTIMIZED))
+        elem = live["nftables"][5]["map"]["elem"][0][0]["concat"]
+        elem[3] = {"range": [0, 65535]}
+        infra = _infra(Policy("Tout", "pro", "perso", ports="all"))
+        assert _delta(infra, live, mode="optimized").empty
+
+    def test_adjacent_port_coalesced(self) -> None:
+        """443 puis 444 : l'élément devient l'intervalle 443-444."""
+        infra = _infra(WEB, Policy("Alt", "pro", "perso", ports=[444]))
+
+        delta = _delta(infra, LIVE_WEB_OPTIMIZED, mode="optimized")
+
+        assert delta.elements_removed == [("fwd_ports", '"net-pro" . "net-perso" . tcp . 443')]
+        assert delta.elements_added == [
+            ("fwd_ports", '"net-pro" . "net-perso" . tcp . 443-444', "accept")
+        ]
+
+
+class TestDeployNftables:
+    @pytest.fixture(autouse=True)
+    def _nft_present(self):
+        with patch("anklume.cli._network.shutil.which", return_value="/usr/sbin/nft"):
+            yield
+
+    def test_applies_delta_only(self) -> None:
+        listed = MagicMock(returncode=0, stdout=json.dumps(LIVE_WEB))
+        applied = MagicMock(returncode=0, stderr="")
+        scripts: list[str] = []
+
+        def run(cmd, **kwargs):
+            if cmd[:2] == ["nft", "-f"]:
+                scripts.append(Path(cmd[2]).read_text())
+                return applied
+            return listed
+
+        with patch("anklume.cli._network.subprocess.run", side_effect=run):
+            delta = deploy_nftables(_infra())
+
+        assert delta.rules_removed == [("forward", 5)]
+        assert scripts == [delta.script(build_ruleset(_infra()))]
+        assert "flush" not in scripts[0]
+
+    def test_no_change_no_nft_call(self) -> None:
+        listed = MagicMock(returncode=0, stdout=json.dumps(LIVE_WEB))
+        with patch("anklume.cli._network.subprocess.run", return_value=listed) as run:
+            delta = deploy_nftables(_infra(WEB))
+        assert delta.empty
+        assert run.call_count == 1
+
+    def test_rejected_delta_falls_back_to_reload(self) -> None:
+        listed = MagicMock(returncode=0, stdout=json.dumps(LIVE_WEB))
+        results = [MagicMock(returncode=1, stderr="No such file"), MagicMock(returncode=0)]
+        scripts: list[str] = []
+
+        def run(cmd, **kwargs):
+            if cmd[:2] == ["nft", "-f"]:
+                scripts.append(Path(cmd[2]).read_text())
+                return results[len(scripts) - 1]
+            return listed
+
+        with patch("anklume.cli._network.subprocess.run", side_effect=run):
+            delta = deploy_nftables(_infra())
+
+        assert delta.full_reload
+        assert "delete table inet anklume" in scripts[1]
+
+    def test_full_skips_listing(self) -> None:
+        applied = MagicMock(returncode=0)
+        with patch("anklume.cli._network.subprocess.run", return_value=applied) as run:
+            delta = deploy_nftables(_infra(WEB), full=True)
+        assert delta.full_reload
+        assert run.call_count == 1
+        assert run.call_args.args[0][:2] == ["nft", "-f"]
+
+
+def _counter(name: str, packets: int = 0) -> dict:
+    return {
+        "counter": {
+            "family": "inet",
+            "name": name,
+            "table": "anklume",
+            "handle": 20,
+            "packets": packets,
+            "bytes": packets * 100,
+        }
+    }
+
+
+def _counted(handle: int, iif: str, oif: str, counter: str, *extra: dict) -> dict:
+    return _bridge_rule(handle, iif, oif, *extra, {"counter": counter})
+
+
+def _counted_infra(*policies: Policy):
+    infra = _infra(*policies)
+    infra.config.nftables.counters = True
+    return infra
+
+
+# Table vivante correspondant à _counted_infra(WEB) en mode linéaire
+LIVE_COUNTED = _live(
+    _counter("intra_perso", 12),
+    _counter("intra_pro", 40),
+    _counter("policy_1", 7),
+    _counted(3, "net-perso", "net-perso", "intra_perso"),
+    _counted(4, "net-pro", "net-pro", "intra_pro"),
+    _counted(5, "net-pro", "net-perso", "policy_1", _payload("tcp", "dport", 443)),
+)
+
+
+class TestCounterDelta:
+    def test_in_sync(self) -> None:
+        assert _delta(_counted_infra(WEB), LIVE_COUNTED).empty
+
+    def test_enabling_counters_replaces_rules(self) -> None:
+        delta = _delta(_counted_infra(WEB), LIVE_WEB)
+
+        assert delta.counters_added == ["intra_perso", "intra_pro", "policy_1"]
+        assert sorted(h for _, h in delta.rules_removed) == [3, 4, 5]
+        script = delta.script(build_ruleset(_counted_infra(WEB)))
+        assert script.index("add counter") < script.index("add rule")
+
+    def test_policy_removed_drops_counter(self) -> None:
+        delta = _delta(_counted_infra(), LIVE_COUNTED)
+
+        assert delta.rules_removed == [("forward", 5)]
+        assert delta.counters_removed == ["policy_1"]
+        script = delta.script(build_ruleset(_counted_infra()))
+        assert script.index("delete rule") < script.index("delete counter inet anklume policy_1")
+        assert "compteur" in delta.summary()
+
+    def test_counter_map_elements(self) -> None:
+        infra = _counted_infra(WEB)
+        live = _live(
+            _counter("intra_perso"),
+            _counter("intra_pro"),
+            _counter("policy_1"),
+            _map(
+                "fwd_bridges",
+                ["ifname", "ifname"],
+                ["net-perso", "net-perso"],
+                ["net-pro", "net-pro"],
+                interval=False,
+            ),
+            {
+                "map": {
+                    "family": "inet",
+                    "name": "cnt_fwd_bridges",
+                    "table": "anklume",
+                    "type": ["ifname", "ifname"],
+                    "map": "counter",
+                    "elem": [
+                        [{"concat": ["net-perso", "net-perso"]}, "intra_perso"],
+                        [{"concat": ["net-pro", "net-pro"]}, "policy_1"],  # valeur changée
+                    ],
+                }
+            },
+            _map(
+                "fwd_ports",
+                ["ifname", "ifname", "inet_proto", "inet_service"],
+                ["net-pro", "net-perso", "tcp", 443],
+            ),
+            {
+                "map": {
+                    "family": "inet",
+                    "name": "cnt_fwd_ports",
+                    "table": "anklume",
+                    "type": ["ifname", "ifname", "inet_proto", "inet_service"],
+                    "flags": ["interval"],
+                    "map": "counter",
+                    "elem": [[{"concat": ["net-pro", "net-perso", "tcp", 443]}, "policy_1"]],
+                }
+            },
+            {
+                "rule": {
+                    "chain": "forward",
+                    "handle": 3,
+                    "expr": [
+                        {
+                            "counter": {
+                                "map": {"key": {"concat": [IIF, OIF]}, "data": "@cnt_fwd_bridges"}
+                            }
+                        }
+                    ],
+                }
+            },
+            _vmap(4, "fwd_bridges", IIF, OIF),
+            {
+                "rule": {
+                    "chain": "forward",
+                    "handle": 5,
+                    "expr": [
+                        {
+                            "counter": {
+                                "map": {
+                                    "key": {"concat": [IIF, OIF, L4, DPORT]},
+                                    "data": "@cnt_fwd_ports",
+                                }
+                            }
+                        }
+                    ],
+                }
+            },
+            _vmap(6, "fwd_ports", IIF, OIF, L4, DPORT),
+        )
+
+        delta = _delta(infra, live, mode="optimized")
+
+        assert not delta.full_reload
+        assert not delta.rules_added and not delta.rules_removed
+        assert delta.elements_removed == [("cnt_fwd_bridges", '"net-pro" . "net-pro"')]
+        assert delta.elements_added == [("cnt_fwd_bridges", '"net-pro" . "net-pro"', '"intra_pro"')]
@@ -0,0 +1,145 @@
+"""Tests des compteurs nommés et de `anklume network stats`."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import typer
+
+from anklume.cli._network import run_network_stats
+from anklume.engine.models import Policy
+from anklume.engine.nftables_stats import (
+    CounterValue,
+    compute_rates,
+    format_rate,
+    parse_counters,
+    sort_rates,
+)
+
+from .conftest import make_domain, make_infra
+
+
+def _counters(**values: tuple[int, int]) -> dict:
+    return {
+        "nftables": [
+            {"metainfo": {"json_schema_version": 1}},
+            *(
+                {
+                    "counter": {
+                        "family": "inet",
+                        "name": name,
+                        "table": "anklume",
+                        "handle": i,
+                        "packets": packets,
+                        "bytes": octets,
+                    }
+                }
+                for i, (name, (packets, octets)) in enumerate(values.items())
+            ),
+        ]
+    }
+
+
+class TestRates:
+    def test_parse_counters(self) -> None:
+        counters = parse_counters(_counters(policy_1=(10, 1500), intra_pro=(0, 0)))
+        assert counters == {
+            "policy_1": CounterValue(10, 1500),
+            "intra_pro": CounterValue(0, 0),
+        }
+
+    def test_rates_from_two_samples(self) -> None:
+        before = {"policy_1": CounterValue(100, 10_000)}
+        after = {"policy_1": CounterValue(300, 60_000)}
+
+        [rate] = compute_rates(before, after, 2.0, {"policy_1": "pro → ai"})
+
+        assert (rate.pps, rate.bps) == (100.0, 200_000.0)
+        assert (rate.packets, rate.label) == (300, "pro → ai")
+
+    def test_reset_counts_from_zero(self) -> None:
+        before = {"policy_1": CounterValue(1000, 10**6)}
+        [rate] = compute_rates(before, {"policy_1": CounterValue(10, 1000)}, 1.0)
+        assert rate.pps == 10.0
+
+    def test_new_counter(self) -> None:
+        [rate] = compute_rates({}, {"policy_2": CounterValue(5, 500)}, 1.0)
+        assert rate.bps == 4000.0
+
+    def test_sort_by_traffic(self) -> None:
+        after = {
+            "policy_1": CounterValue(10, 100),
+            "policy_2": CounterValue(5, 9000),
+            "intra_pro": CounterValue(50, 5000),
+        }
+        rates = compute_rates({}, after, 1.0)
+        assert [r.name for r in sort_rates(rates)] == ["policy_2", "intra_pro", "policy_1"]
+        assert sort_rates(rates, "pps")[0].name == "intra_pro"
+        assert sort_rates(rates, "name")[0].name == "intra_pro"
+        with pytest.raises(ValueError, match="tri"):
+            sort_rates(rates, "volume")
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(0, "0 b/s"), (999, "999 b/s"), (1500, "1.5 kb/s"), (2.5e9, "2.5 Gb/s")],
+    )
+    def test_format_rate(self, value: float, expected: str) -> None:
+        assert format_rate(value, "b/s") == expected
+
+
+class TestNetworkStatsCommand:
+    @pytest.fixture
+    def infra(self):
+        infra = make_infra(domains={"pro": make_domain("pro"), "ai": make_domain("ai")})
+        infra.policies = [Policy("Ollama", "pro", "ai", ports=[11434])]
+        return infra
+
+    def _run(self, infra, *outputs: MagicMock, sort: str = "bps") -> MagicMock:
+        with (
+            patch("anklume.cli._network.shutil.which", return_value="/usr/sbin/nft"),
+            patch("anklume.cli._network.load_infra", return_value=infra),
+            patch("anklume.cli._network.subprocess.run", side_effect=outputs) as run,
+            patch("anklume.cli._network.time.sleep"),
+        ):
+            run_network_stats(interval=1.0, sort=sort)
+        return run
+
+    def test_table_sorted_by_traffic(self, infra, capsys) -> None:
+        first = _counters(intra_pro=(0, 0), policy_1=(0, 0))
+        second = _counters(intra_pro=(1, 100), policy_1=(50, 500_000))
+
+        run = self._run(
+            infra,
+            MagicMock(returncode=0, stdout=json.dumps(first)),
+            MagicMock(returncode=0, stdout=json.dumps(second)),
+        )
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[1].startswith("policy_1")
+        assert "pro → ai (Ollama)" in lines[1]
+        assert lines[2].startswith("intra_pro")
+        assert run.call_count == 2
+        assert run.call_args.args[0] == [
+            "nft",
+            "-j",
+            "list",
+            "counters",
+            "table",
+            "inet",
+            "anklume",
+        ]
+
+    def test_no_counters_hint(self, infra, capsys) -> None:
+        run = self._run(infra, MagicMock(returncode=0, stdout=json.dumps(_counters())))
+        assert "counters: true" in capsys.readouterr().out
+        assert run.call_count == 1
+
+    def test_table_absent(self, infra) -> None:
+        with pytest.raises(typer.Exit):
+            self._run(infra, MagicMock(returncode=1, stdout=""))
+
+    def test_invalid_sort(self, infra) -> None:
+        with pytest.raises(typer.Exit):
+            self._run(infra, sort="volume")
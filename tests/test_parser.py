@@ -1,11 +1,14 @@
 """Tests du parser anklume (YAML → modèles typés)."""
 
 import logging
+import os
+from unittest.mock import patch
 
 import pytest
 import yaml
 
-from anklume.engine.parser import ParseError, parse_project
+from anklume.engine import parser
+from anklume.engine.parser import ParseError, cache_path, parse_project
 
 
 def _write_anklume_yml(path, schema_version=1):
@@ -261,6 +264,76 @@ class TestParseProject:
 
         assert infra.config.resource_policy is None
 
+    def test_incus_backend_default(self, tmp_path):
+        _write_anklume_yml(tmp_path)
+
+        infra = parse_project(tmp_path)
+
+        assert infra.config.incus_backend == "cli"
+
+    def test_incus_backend_parsed(self, tmp_path):
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "incus_backend": "rest"})
+        )
+
+        infra = parse_project(tmp_path)
+
+        assert infra.config.incus_backend == "rest"
+
+    def test_nftables_mode_parsed(self, tmp_path):
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "nftables": {"mode": "optimized"}})
+        )
+
+        infra = parse_project(tmp_path)
+
+        assert infra.config.nftables.mode == "optimized"
+        assert infra.config.nftables.counters is False
+
+    def test_nftables_counters_parsed(self, tmp_path):
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "nftables": {"counters": True}})
+        )
+
+        assert parse_project(tmp_path).config.nftables.counters is True
+
+    def test_nftables_merge_policies_parsed(self, tmp_path):
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "nftables": {"merge_policies": True}})
+        )
+
+        assert parse_project(tmp_path).config.nftables.merge_policies is True
+
+    def test_snapshots_default(self, tmp_path):
+        _write_anklume_yml(tmp_path)
+
+        infra = parse_project(tmp_path)
+
+        assert infra.config.snapshots.pool_concurrency == 4
+
+    def test_snapshots_parsed(self, tmp_path):
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "snapshots": {"pool_concurrency": 8}})
+        )
+
+        infra = parse_project(tmp_path)
+
+        assert infra.config.snapshots.pool_concurrency == 8
+
+    def test_snapshot_retention_parsed(self, tmp_path):
+        snapshots = {"auto_prune": True, "retention": {"keep_last": 3, "max_age_days": 30}}
+        (tmp_path / "anklume.yml").write_text(
+            yaml.dump({"schema_version": 1, "snapshots": snapshots})
+        )
+
+        config = parse_project(tmp_path).config.snapshots
+
+        assert config.auto_prune is True
+        assert config.retention.keep_last == 3
+        assert config.retention.keep_daily == 0
+        assert config.retention.max_age_days == 30
+        assert config.retention.enabled
+
 
 class TestParsePolicies:
     def test_policies_parsed(self, tmp_path):
@@ -353,6 +426,21 @@ class TestParsePolicies:
         assert p.protocol == "tcp"
         assert p.bidirectional is False
 
+    def test_policies_port_ranges(self, tmp_path):
+        _write_anklume_yml(tmp_path)
+        (tmp_path / "policies.yml").write_text(
+            "policies:\n"
+            "  - description: Services\n"
+            "    from: pro\n"
+            "    to: perso\n"
+            "    ports: [22, 8000-8100]\n"
+        )
+
+        infra = parse_project(tmp_path)
+
+        assert infra.policies[0].ports == [22, "8000-8100"]
+        assert infra.policies[0].port_intervals == [(22, 22), (8000, 8100)]
+
     def test_policies_invalid_ports_string(self, tmp_path):
         _write_anklume_yml(tmp_path)
         _write_policies(
@@ -500,3 +588,82 @@ class TestUnknownKeyWarnings:
             parse_project(tmp_path)
 
         assert caplog.text == ""
+
+
+class TestParseCache:
+    def _project(self, tmp_path):
+        _write_anklume_yml(tmp_path)
+        _write_domain(tmp_path, "pro", {"description": "Pro", "machines": {}})
+        _write_domain(tmp_path, "perso", {"description": "Perso", "machines": {}})
+        _write_policies(tmp_path, [{"from": "pro", "to": "perso", "description": "Web"}])
+
+    def _loads(self, tmp_path) -> list[str]:
+        """Fichiers réellement relus (YAML) lors d'un parse_project."""
+        loaded: list[str] = []
+        real = parser._load_yaml
+
+        def spy(text):
+            loaded.append(text)
+            return real(text)
+
+        with patch.object(parser, "_load_yaml", side_effect=spy):
+            parse_project(tmp_path)
+        return loaded
+
+    def test_second_parse_reads_nothing(self, tmp_path):
+        self._project(tmp_path)
+        assert len(self._loads(tmp_path)) == 4
+        assert self._loads(tmp_path) == []
+        assert cache_path(tmp_path).stat().st_mode & 0o777 == 0o600
+
+    def test_same_result_from_cache(self, tmp_path):
+        self._project(tmp_path)
+        first = parse_project(tmp_path)
+        assert parse_project(tmp_path) == first
+
+    def test_modified_file_invalidated_alone(self, tmp_path):
+        self._project(tmp_path)
+        parse_project(tmp_path)
+
+        _write_domain(tmp_path, "pro", {"description": "Pro modifié", "machines": {}})
+        path = tmp_path / "domains" / "pro.yml"
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert len(self._loads(tmp_path)) == 1
+        assert parse_project(tmp_path).domains["pro"].description == "Pro modifié"
+
+    def test_removed_domain_dropped(self, tmp_path):
+        self._project(tmp_path)
+        parse_project(tmp_path)
+        (tmp_path / "domains" / "perso.yml").unlink()
+        assert sorted(parse_project(tmp_path).domains) == ["pro"]
+
+    def test_warnings_replayed_on_hit(self, tmp_path, caplog):
+        _write_anklume_yml(tmp_path)
+        _write_domain(tmp_path, "pro", {"description": "Pro", "trust_lvl": "x"})
+        parse_project(tmp_path)
+
+        with caplog.at_level(logging.WARNING, logger="anklume.engine.parser"):
+            parse_project(tmp_path)
+        assert "trust_lvl" in caplog.text
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        self._project(tmp_path)
+        path = cache_path(tmp_path)
+        path.parent.mkdir()
+        path.write_bytes(b"pas un pickle")
+        path.chmod(0o600)
+
+        assert sorted(parse_project(tmp_path).domains) == ["perso", "pro"]
+
+    def test_writable_by_others_ignored(self, tmp_path):
+        self._project(tmp_path)
+        parse_project(tmp_path)
+        cache_path(tmp_path).chmod(0o666)
+        assert len(self._loads(tmp_path)) == 4
+
+    def test_disabled(self, tmp_path):
+        self._project(tmp_path)
+        parse_project(tmp_path, cache=False)
+        assert not cache_path(tmp_path).exists()
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock, patch
 
+import pytest
 import typer
 from typer.testing import CliRunner
 
-from anklume.cli import _builtin_names, _discover_plugins, app
+from anklume.cli import _builtin_names, _discover_plugins, _plugins, app
+from anklume.cli._plugins import PluginSpec, cache_path, load_plugin_specs
 
 runner = CliRunner()
 
@@ -33,34 +35,64 @@ class TestBuiltinNames:
             assert expected in names, f"{expected} manquant dans _builtin_names()"
 
 
+def _entry_point(name: str, value: str) -> MagicMock:
+    ep = MagicMock()
+    ep.name = name
+    ep.value = value
+    return ep
+
+
+@pytest.fixture(autouse=True)
+def plugin_cache(tmp_path, monkeypatch):
+    """Cache des plugins isolé, registre nettoyé après chaque test."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    before = dict(_plugins._registry)
+    yield cache_path()
+    _plugins._registry.clear()
+    _plugins._registry.update(before)
+
+
+# Plugin de test, chargé via l'entry point "tests.test_plugin_discovery:plugin_app"
+plugin_app = typer.Typer(help="Mon plugin de test")
+
+
+@plugin_app.command("hello")
+def _hello():
+    typer.echo("Plugin OK")
+
+
+@plugin_app.command("bye")
+def _bye():
+    typer.echo("Bye")
+
+
 class TestDiscoverPlugins:
     """Tests pour _discover_plugins()."""
 
     def test_no_plugins_installed(self):
         """Pas de crash si entry_points lève une exception."""
         with patch("importlib.metadata.entry_points", side_effect=ImportError):
-            _discover_plugins()
+            _discover_plugins(refresh=True)
 
     def test_plugin_load_failure_graceful(self):
         """Un plugin qui plante au chargement ne casse pas la CLI."""
-        mock_ep = MagicMock()
-        mock_ep.name = "broken_plugin"
-        mock_ep.load.side_effect = ImportError("module introuvable")
+        ep = _entry_point("broken_plugin", "module_introuvable:app")
 
-        with patch("importlib.metadata.entry_points", return_value=[mock_ep]):
-            _discover_plugins()
+        with patch("importlib.metadata.entry_points", return_value=[ep]):
+            _discover_plugins(refresh=True)
 
         result = runner.invoke(app, ["--help"])
         assert result.exit_code == 0
+        result = runner.invoke(app, ["broken_plugin"])
+        assert result.exit_code != 0
+        assert "indisponible" in result.output
 
     def test_plugin_conflicts_with_builtin(self):
         """Un plugin nommé comme une commande intégrée est ignoré."""
-        mock_ep = MagicMock()
-        mock_ep.name = "apply"
-        mock_ep.load.return_value = typer.Typer(help="Fake plugin")
+        ep = _entry_point("apply", "tests.test_plugin_discovery:plugin_app")
 
-        with patch("importlib.metadata.entry_points", return_value=[mock_ep]):
-            _discover_plugins()
+        with patch("importlib.metadata.entry_points", return_value=[ep]):
+            _discover_plugins(refresh=True)
 
         result = runner.invoke(app, ["apply", "--help"])
         assert result.exit_code == 0
@@ -68,28 +100,28 @@ class TestDiscoverPlugins:
 
     def test_plugin_registers_typer_app(self):
         """Un plugin valide est ajouté comme sous-commande."""
-        plugin = typer.Typer(help="Mon plugin de test")
-
-        @plugin.command("hello")
-        def hello():
-            typer.echo("Plugin OK")
+        ep = _entry_point("testplugin", "tests.test_plugin_discovery:plugin_app")
 
-        mock_ep = MagicMock()
-        mock_ep.name = "testplugin"
-        mock_ep.load.return_value = plugin
-
-        # Snapshot pour cleanup
-        groups_before = list(app.registered_groups)
-
-        with patch("importlib.metadata.entry_points", return_value=[mock_ep]):
-            _discover_plugins()
+        with patch("importlib.metadata.entry_points", return_value=[ep]):
+            _discover_plugins(refresh=True)
 
         result = runner.invoke(app, ["testplugin", "hello"])
         assert result.exit_code == 0
         assert "Plugin OK" in result.output
 
-        # Cleanup : retirer le plugin ajouté
-        app.registered_groups[:] = groups_before
+    def test_help_does_not_import_plugin(self):
+        """--help liste le plugin sans l'importer."""
+        ep = _entry_point("lazyplugin", "anklume_plugin_absent:app")
+
+        with patch("importlib.metadata.entry_points", return_value=[ep]):
+            _discover_plugins(refresh=True)
+
+        with patch("anklume.cli._plugins.import_module") as imp:
+            result = runner.invoke(app, ["--help"])
+
+        assert result.exit_code == 0
+        assert "lazyplugin" in result.output
+        imp.assert_not_called()
 
     def test_entry_points_exception_handled(self):
         """Si entry_points() lève une exception, pas de crash."""
@@ -97,7 +129,43 @@ class TestDiscoverPlugins:
             "importlib.metadata.entry_points",
             side_effect=RuntimeError("broken metadata"),
         ):
-            _discover_plugins()
+            _discover_plugins(refresh=True)
 
         result = runner.invoke(app, ["--help"])
         assert result.exit_code == 0
+
+
+class TestPluginCache:
+    """Liste des plugins mise en cache sur disque."""
+
+    def test_cached_until_sys_path_changes(self, plugin_cache):
+        ep = _entry_point("testplugin", "tests.test_plugin_discovery:plugin_app")
+
+        with patch("importlib.metadata.entry_points", return_value=[ep]) as scan:
+            first = load_plugin_specs()
+            second = load_plugin_specs()
+
+        assert scan.call_count == 1
+        assert (
+            first == second == [PluginSpec("testplugin", "tests.test_plugin_discovery:plugin_app")]
+        )
+        assert plugin_cache.exists()
+
+    def test_sys_path_change_rescans(self, tmp_path, monkeypatch):
+        with patch("importlib.metadata.entry_points", return_value=[]) as scan:
+            load_plugin_specs()
+            site = tmp_path / "site-packages"
+            site.mkdir()
+            monkeypatch.syspath_prepend(str(site))
+            load_plugin_specs()
+
+        assert scan.call_count == 2
+
+    def test_corrupt_cache_rescans(self, plugin_cache):
+        plugin_cache.parent.mkdir(parents=True)
+        plugin_cache.write_text("pas du json")
+
+        with patch("importlib.metadata.entry_points", return_value=[]) as scan:
+            assert load_plugin_specs() == []
+
+        scan.assert_called_once()
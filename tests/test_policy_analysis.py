@@ -0,0 +1,216 @@
+"""Tests pour engine/policy_analysis.py — masquages, doublons, fusions."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from anklume.cli._network import run_network_analyze
+from anklume.engine.models import Policy
+from anklume.engine.policy_analysis import analyze_policies
+
+from .conftest import make_domain, make_infra, make_machine
+
+
+def _infra(*policies: Policy):
+    infra = make_infra(
+        domains={
+            "pro": make_domain(
+                "pro",
+                machines={
+                    "dev": make_machine("dev", "pro", ip="10.100.1.1"),
+                    "db": make_machine("db", "pro", ip="10.100.1.2"),
+                    "tmp": make_machine("tmp", "pro"),
+                },
+            ),
+            "ai": make_domain("ai", machines={"gpu": make_machine("gpu", "ai", ip="10.100.3.1")}),
+            "lab": make_domain("lab"),
+            "old": make_domain("old", enabled=False),
+        }
+    )
+    infra.policies = list(policies)
+    return infra
+
+
+def _kinds(analysis) -> list[tuple[str, int, list[int]]]:
+    return [(f.kind, f.policy, f.others) for f in analysis.findings]
+
+
+class TestShadowing:
+    def test_machine_shadowed_by_domain_all(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Tout", "pro", "ai", ports="all"),
+                Policy("Ollama", "pro-dev", "ai-gpu", ports=[11434]),
+            )
+        )
+        assert _kinds(analysis) == [("shadowed", 2, [1])]
+        assert list(analysis.policies) == [1]
+        assert (analysis.rules_before, analysis.rules_after) == (2, 1)
+
+    def test_union_of_policies_covers(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Web", "pro", "ai-gpu", ports=[80]),
+                Policy("TLS", "pro-dev", "ai", ports=[443]),
+                Policy("Les deux", "pro-dev", "ai-gpu", ports=[80, 443]),
+            )
+        )
+        assert ("shadowed", 3, [1, 2]) in _kinds(analysis)
+        assert 3 not in analysis.policies
+
+    def test_any_protocol_covers_tcp_and_udp(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Sans filtre", "lab", "ai"),
+                Policy("DNS", "lab", "ai", ports=[53], protocol="udp"),
+            )
+        )
+        assert _kinds(analysis) == [("shadowed", 2, [1])]
+
+    def test_protocol_does_not_cover_any(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Tout tcp", "lab", "ai", ports="all"),
+                Policy("Sans filtre", "lab", "ai"),
+            )
+        )
+        assert _kinds(analysis) == [("shadowed", 1, [2])]
+
+    def test_other_protocol_not_covered(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Tout udp", "lab", "ai", ports="all", protocol="udp"),
+                Policy("SSH", "lab", "ai", ports=[22]),
+            )
+        )
+        assert analysis.findings == []
+
+    def test_intra_domain_policy(self):
+        analysis = analyze_policies(_infra(Policy("Interne", "pro-dev", "pro-db", ports=[5432])))
+        assert _kinds(analysis) == [("shadowed", 1, [])]
+        assert analysis.policies == {}
+
+    def test_machine_without_ip_is_domain_wide(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Tmp", "pro-tmp", "ai", ports=[22]),
+                Policy("Tout pro", "pro", "ai", ports=[22]),
+            )
+        )
+        assert _kinds(analysis) == [("duplicate", 2, [1])]
+
+
+class TestDuplicates:
+    def test_first_declared_kept(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("SSH", "lab", "ai", ports=[22]),
+                Policy("SSH bis", "lab", "ai", ports=[22]),
+            )
+        )
+        assert _kinds(analysis) == [("duplicate", 2, [1])]
+        assert analysis.policies[1].description == "SSH"
+
+    def test_reverse_of_bidirectional(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Ollama", "pro-dev", "ai-gpu", ports=[11434], bidirectional=True),
+                Policy("Retour", "ai-gpu", "pro-dev", ports=[11434]),
+            )
+        )
+        assert _kinds(analysis) == [("duplicate", 2, [1])]
+
+    def test_bidirectional_supersedes_earlier(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Aller", "pro", "ai", ports=[443]),
+                Policy("Les deux sens", "pro", "ai", ports=[443], bidirectional=True),
+            )
+        )
+        assert _kinds(analysis) == [("duplicate", 1, [2])]
+        assert list(analysis.policies) == [2]
+
+    def test_ignored_policies_not_analyzed(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Hôte", "host", "pro", ports=[22]),
+                Policy("Hôte bis", "host", "pro", ports=[22]),
+                Policy("Désactivé", "old", "pro", ports="all"),
+                Policy("Inconnue", "nope", "pro", ports=[22]),
+            )
+        )
+        assert analysis.findings == []
+        assert len(analysis.policies) == 4
+        assert analysis.rules_before == 0
+
+
+class TestOverlapAndMerge:
+    def test_covered_ports_trimmed(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Web", "pro", "ai", ports=[80, 443]),
+                Policy("Dev", "pro-dev", "ai-gpu", ports=[22, 443, 80]),
+            )
+        )
+        assert _kinds(analysis) == [("overlap", 2, [1])]
+        assert "80, 443" in analysis.findings[0].message
+        assert analysis.policies[2].ports == [22]
+
+    def test_bidirectional_trimmed_only_if_both_ways_covered(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("Aller", "pro", "ai", ports=[443]),
+                Policy("Échange", "pro-dev", "ai-gpu", ports=[22, 443], bidirectional=True),
+            )
+        )
+        assert analysis.findings == []
+        assert analysis.policies[2].ports == [22, 443]
+
+    def test_adjacent_ports_merged(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("HTTP", "lab", "ai", ports=[8080]),
+                Policy("SSH", "lab", "ai", ports=[22]),
+                Policy("Alt", "lab", "ai", ports=[8081]),
+            )
+        )
+        assert _kinds(analysis) == [("mergeable", 2, [1]), ("adjacent", 3, [1])]
+        merged = analysis.policies[1]
+        assert merged.ports == [22, "8080-8081"]
+        assert merged.description == "HTTP + SSH + Alt"
+        assert (analysis.rules_before, analysis.rules_after) == (3, 1)
+
+    def test_different_direction_flags_not_merged(self):
+        analysis = analyze_policies(
+            _infra(
+                Policy("SSH", "lab", "ai", ports=[22]),
+                Policy("Web", "lab", "ai", ports=[80], bidirectional=True),
+            )
+        )
+        assert analysis.findings == []
+
+    def test_no_findings(self):
+        analysis = analyze_policies(_infra(Policy("SSH", "lab", "ai", ports=[22])))
+        assert analysis.findings == []
+        assert analysis.rules_before == analysis.rules_after == 1
+
+
+class TestNetworkAnalyzeCommand:
+    def test_reports_findings(self, capsys):
+        infra = _infra(
+            Policy("Tout", "pro", "ai", ports="all"),
+            Policy("Ollama", "pro-dev", "ai-gpu", ports=[11434]),
+        )
+        with patch("anklume.cli._network.load_infra", return_value=infra):
+            run_network_analyze()
+
+        out = capsys.readouterr().out
+        assert "politique #2 (masquée) : couverte par #1" in out
+        assert "1/2 politique(s)" in out
+        assert "merge_policies: true" in out
+
+    def test_clean(self, capsys):
+        infra = _infra(Policy("SSH", "lab", "ai", ports=[22]))
+        with patch("anklume.cli._network.load_infra", return_value=infra):
+            run_network_analyze()
+        assert "Aucun masquage" in capsys.readouterr().out
@@ -11,6 +11,7 @@ from anklume.engine.incus_driver import (
     IncusInstance,
     IncusNetwork,
     IncusProject,
+    IncusStateSnapshot,
 )
 from anklume.engine.reconciler import Action, ReconcileResult, reconcile
 
@@ -155,6 +156,7 @@ class TestIdempotence:
                         status="Running",
                         type="container",
                         project="pro",
+                        profiles=["default"],
                     )
                 ]
             },
@@ -164,6 +166,48 @@ class TestIdempotence:
         # Aucune action nécessaire
         assert len(result.actions) == 0
 
+    def test_single_state_read(self) -> None:
+        """Le plan lit l'état Incus une seule fois, sans requête par domaine."""
+        domains = {
+            name: make_domain(name, machines={"dev": make_machine("dev", name)})
+            for name in ("pro", "perso", "lab")
+        }
+        infra = make_infra(domains=domains)
+        driver = mock_driver(projects=[IncusProject(name=n) for n in domains])
+
+        reconcile(infra, driver, dry_run=True)
+
+        driver.state_snapshot.assert_called_once()
+        driver.network_exists.assert_not_called()
+        driver.profile_exists.assert_not_called()
+
+    def test_state_provided(self) -> None:
+        """Un état fourni par l'appelant n'est pas relu."""
+        machine = make_machine("dev", "pro")
+        domain = make_domain("pro", machines={"dev": machine})
+        infra = make_infra(domains={"pro": domain})
+        driver = mock_driver()
+        state = IncusStateSnapshot(
+            projects=[IncusProject(name="pro")],
+            networks={"pro": [IncusNetwork(name="net-pro")]},
+            instances={
+                "pro": [
+                    IncusInstance(
+                        name="pro-dev",
+                        status="Running",
+                        type="container",
+                        project="pro",
+                        profiles=["default"],
+                    )
+                ]
+            },
+        )
+
+        result = reconcile(infra, driver, state=state)
+
+        driver.state_snapshot.assert_not_called()
+        assert result.actions == []
+
     def test_project_exists_network_missing(self) -> None:
         """Projet existe mais réseau manquant → crée réseau + instance."""
         machine = make_machine("dev", "pro")
@@ -196,6 +240,7 @@ class TestIdempotence:
                         status="Stopped",
                         type="container",
                         project="pro",
+                        profiles=["default"],
                     )
                 ]
             },
@@ -370,6 +415,274 @@ class TestExecution:
         assert len(result.executed) > 0
 
 
+# ============================================================
+# Exécution parallèle (--jobs)
+# ============================================================
+
+
+def _three_domains():
+    domains = {}
+    for zone, name in enumerate(("alpha", "beta", "gamma")):
+        machines = {
+            m: make_machine(m, name, ip=f"10.120.{zone}.{i + 1}")
+            for i, m in enumerate(("a", "b", "c"))
+        }
+        domains[name] = make_domain(
+            name,
+            machines=machines,
+            subnet=f"10.120.{zone}.0/24",
+            gateway=f"10.120.{zone}.254",
+        )
+    return make_infra(domains=domains)
+
+
+class TestParallelExecution:
+    def test_same_result_order_as_sequential(self) -> None:
+        """jobs > 1 → mêmes actions exécutées, dans l'ordre du plan."""
+        infra = _three_domains()
+
+        sequential = reconcile(infra, mock_driver())
+        parallel = reconcile(infra, mock_driver(), jobs=4)
+
+        assert parallel.actions == sequential.actions
+        assert parallel.executed == sequential.executed
+        assert parallel.executed == parallel.actions
+
+    def test_instances_created_concurrently(self) -> None:
+        """Les instances d'un domaine sont créées en parallèle après le réseau."""
+        import threading
+
+        machines = {m: make_machine(m, "pro") for m in ("a", "b", "c")}
+        infra = make_infra(domains={"pro": make_domain("pro", machines=machines)})
+        driver = mock_driver()
+        barrier = threading.Barrier(3, timeout=5)
+        driver.instance_create.side_effect = lambda **kw: barrier.wait()
+
+        result = reconcile(infra, driver, jobs=3)
+
+        assert result.success
+        assert driver.instance_create.call_count == 3
+        driver.network_create.assert_called_once()
+
+    def test_instance_error_isolated(self) -> None:
+        """Un échec d'instance saute son start, pas les autres instances."""
+        from anklume.engine.incus_driver import IncusError
+
+        infra = _three_domains()
+        driver = mock_driver()
+
+        def fail_beta_b(**kwargs):
+            if kwargs["name"] == "beta-b":
+                raise IncusError(command=["incus", "init"], returncode=1, stderr="boom")
+
+        driver.instance_create.side_effect = fail_beta_b
+
+        result = reconcile(infra, driver, jobs=4)
+
+        failed = [(a.verb, a.target) for a, _ in result.errors]
+        assert failed == [("create", "beta-b"), ("start", "beta-b")]
+        assert result.errors[1][1] == "Ignoré suite à une erreur précédente"
+        assert driver.instance_start.call_count == 8
+
+    def test_project_error_skips_domain_only(self) -> None:
+        """Projet en erreur → tout le domaine ignoré, les autres continuent."""
+        from anklume.engine.incus_driver import IncusError
+
+        infra = _three_domains()
+        driver = mock_driver()
+
+        def fail_alpha(name, description=""):
+            if name == "alpha":
+                raise IncusError(command=["incus", "project"], returncode=1, stderr="boom")
+
+        driver.project_create.side_effect = fail_alpha
+
+        result = reconcile(infra, driver, jobs=4)
+
+        assert {a.project for a, _ in result.errors} == {"alpha"}
+        assert len(result.errors) == 1 + 1 + 6  # projet, réseau, 3 x (create + start)
+        assert {a.project for a in result.executed} == {"beta", "gamma"}
+
+
+# ============================================================
+# Dépendances entre actions (DAG)
+# ============================================================
+
+
+class TestDependencies:
+    def _infra_with_custom_profile(self):
+        from anklume.engine.models import Profile
+
+        machines = {
+            "dev": make_machine("dev", "pro", profiles=["default", "heavy"]),
+            "web": make_machine("web", "pro"),
+        }
+        domain = make_domain("pro", machines=machines)
+        domain.profiles = {"heavy": Profile(name="heavy", config={"limits.cpu": "4"})}
+        return make_infra(domains={"pro": domain})
+
+    def test_plan_dependencies(self) -> None:
+        """start → create → réseau + profils utilisés → projet."""
+        result = reconcile(self._infra_with_custom_profile(), mock_driver(), dry_run=True)
+        by_key = {a.key: a for a in result.actions}
+
+        project = "create:project:pro/pro"
+        profile = "create:profile:pro/heavy"
+        network = "create:network:pro/net-pro"
+        assert by_key[profile].deps == [project]
+        assert by_key[network].deps == [project]
+        assert by_key["create:instance:pro/pro-dev"].deps == [project, network, profile]
+        assert by_key["create:instance:pro/pro-web"].deps == [project, network]
+        assert by_key["start:instance:pro/pro-dev"].deps == ["create:instance:pro/pro-dev"]
+
+    def test_existing_resources_no_deps(self) -> None:
+        """Instance arrêtée dans un domaine complet → start sans dépendance."""
+        infra = make_infra(
+            domains={"pro": make_domain("pro", machines={"dev": make_machine("dev", "pro")})}
+        )
+        driver = mock_driver(
+            projects=[IncusProject(name="pro")],
+            networks={"pro": [IncusNetwork(name="net-pro")]},
+            instances={
+                "pro": [
+                    IncusInstance(
+                        name="pro-dev",
+                        status="Stopped",
+                        type="container",
+                        project="pro",
+                        profiles=["default"],
+                    )
+                ]
+            },
+        )
+
+        result = reconcile(infra, driver, dry_run=True)
+
+        assert [(a.verb, a.deps) for a in result.actions] == [("start", [])]
+        assert result.critical_path == 1
+
+    def test_profile_error_skips_only_its_users(self) -> None:
+        """Profil en échec → seules les machines qui l'utilisent sont ignorées."""
+        from anklume.engine.incus_driver import IncusError
+
+        driver = mock_driver()
+        driver.profile_exists.return_value = False
+        driver.profile_create.side_effect = IncusError(
+            command=["incus", "profile", "create"], returncode=1, stderr="boom"
+        )
+
+        result = reconcile(self._infra_with_custom_profile(), driver)
+
+        failed = [(a.verb, a.target) for a, _ in result.errors]
+        assert failed == [("create", "heavy"), ("create", "pro-dev"), ("start", "pro-dev")]
+        assert "boom" in result.errors[0][1]
+        assert result.errors[1][1] == "Ignoré suite à une erreur précédente"
+        assert ("start", "pro-web") in {(a.verb, a.target) for a in result.executed}
+
+    def test_custom_profile_created_in_one_call(self) -> None:
+        """Config et devices du profil custom passés à la création."""
+        infra = self._infra_with_custom_profile()
+        infra.domains["pro"].profiles["heavy"].devices = {
+            "data": {"type": "disk", "path": "/data", "source": "/srv/data"}
+        }
+        driver = mock_driver()
+        driver.profile_exists.return_value = False
+
+        reconcile(infra, driver)
+
+        driver.profile_create.assert_called_once_with(
+            "heavy",
+            "pro",
+            config={"limits.cpu": "4"},
+            devices={"data": {"type": "disk", "path": "/data", "source": "/srv/data"}},
+        )
+        driver.profile_device_add.assert_not_called()
+        driver.profile_config_set.assert_not_called()
+
+    def test_instance_created_fully_configured(self) -> None:
+        """Config, limites et profils passés à la création : un seul appel."""
+        infra = self._infra_with_custom_profile()
+        infra.domains["pro"].machines["dev"].config["limits.cpu"] = "2"
+        driver = mock_driver()
+
+        reconcile(infra, driver)
+
+        calls = {c.kwargs["name"]: c.kwargs for c in driver.instance_create.call_args_list}
+        dev = calls["pro-dev"]
+        assert dev["profiles"] == ["default", "heavy"]
+        assert dev["config"]["limits.cpu"] == "2"
+        assert dev["config"]["security.protection.delete"] == "true"
+        assert dev["network"] == "net-pro"
+        driver.instance_config_set.assert_not_called()
+        driver.instance_profile_add.assert_not_called()
+
+    def test_critical_path_reported(self) -> None:
+        """projet → réseau → create → start = 4, quel que soit le nombre d'instances."""
+        result = reconcile(_three_domains(), mock_driver(), jobs=4)
+        assert len(result.actions) == 3 * (2 + 3 * 2)
+        assert result.critical_path == 4
+
+
+# ============================================================
+# Backend asynchrone — créations soumises ensemble
+# ============================================================
+
+
+class TestAsyncBackend:
+    def _async_driver(self):
+        from anklume.engine.incus_driver import IncusOperation
+
+        driver = mock_driver()
+        driver.supports_async = True
+        driver.instance_create_async.side_effect = lambda **kw: IncusOperation(
+            f"create {kw['name']}", id=f"/1.0/operations/{kw['name']}", status="Running"
+        )
+
+        def wait_all(operations, timeout=None):
+            for op in operations:
+                op.status = "Failure" if op.id.endswith("pro-b") else "Success"
+                op.err = "image absente" if op.id.endswith("pro-b") else ""
+            return operations
+
+        driver.wait_all.side_effect = wait_all
+        return driver
+
+    def test_creations_waited_in_one_batch(self) -> None:
+        machines = {m: make_machine(m, "pro") for m in ("a", "b", "c")}
+        infra = make_infra(domains={"pro": make_domain("pro", machines=machines)})
+        driver = self._async_driver()
+
+        result = reconcile(infra, driver)
+
+        driver.instance_create.assert_not_called()
+        assert driver.instance_create_async.call_count == 3
+        driver.wait_all.assert_called_once()
+        batch = driver.wait_all.call_args[0][0]
+        assert [op.id for op in batch] == [
+            "/1.0/operations/pro-a",
+            "/1.0/operations/pro-b",
+            "/1.0/operations/pro-c",
+        ]
+        # L'opération en échec n'ignore que le start de son instance
+        assert [(a.verb, a.target) for a, _ in result.errors] == [
+            ("create", "pro-b"),
+            ("start", "pro-b"),
+        ]
+        assert result.errors[0][1] == "image absente"
+        assert driver.instance_start.call_count == 2
+
+    def test_mock_driver_stays_synchronous(self) -> None:
+        machine = make_machine("dev", "pro")
+        infra = make_infra(domains={"pro": make_domain("pro", machines={"dev": machine})})
+        driver = mock_driver()
+
+        reconcile(infra, driver)
+
+        driver.instance_create.assert_called_once()
+        driver.instance_create_async.assert_not_called()
+        driver.wait_all.assert_not_called()
+
+
 # ============================================================
 # Réseau — configuration
 # ============================================================
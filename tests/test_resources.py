@@ -6,6 +6,7 @@ from unittest.mock import patch
 
 import pytest
 
+from anklume.engine.incus_driver import IncusError, IncusInstance, IncusProject
 from anklume.engine.models import (
     Domain,
     GlobalConfig,
@@ -22,7 +23,11 @@ from anklume.engine.resources import (
     detect_hardware_fallback,
     parse_memory_value,
     parse_reserve,
+    rebalance,
 )
+from anklume.engine.usage import InstanceUsage
+
+from .conftest import mock_driver
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -209,6 +214,68 @@ class TestProportionalAllocation:
         assert a.cpu_value == "12"  # 16 - 4 = 12
 
 
+# ---------------------------------------------------------------------------
+# compute_resource_allocation — adaptive mode
+# ---------------------------------------------------------------------------
+
+
+class TestAdaptiveAllocation:
+    def _policy(self) -> ResourcePolicyConfig:
+        return ResourcePolicyConfig(
+            host_reserve_cpu="0%",
+            host_reserve_memory="0%",
+            mode="adaptive",
+            cpu_mode="count",
+            memory_enforce="hard",
+        )
+
+    def _allocs(self, usage):
+        infra = _infra([_machine("ollama"), _machine("idle")], self._policy())
+        allocs = compute_resource_allocation(infra, _hw(16, 32), usage)
+        return {a.instance_name: a for a in allocs}
+
+    def test_busy_instance_gets_pool(self):
+        """Poids égaux : la moitié par poids, l'autre moitié vers la charge."""
+        usage = {
+            "dom-ollama": InstanceUsage(cpu=4.0, memory=8 * 1024**3),
+            "dom-idle": InstanceUsage(cpu=0.0, memory=0.0),
+        }
+        allocs = self._allocs(usage)
+
+        assert allocs["dom-ollama"].cpu_value == "12"  # 4 + 8
+        assert allocs["dom-idle"].cpu_value == "4"  # plancher
+        assert allocs["dom-ollama"].memory_value == "24576MB"
+        assert allocs["dom-idle"].memory_value == "8192MB"
+
+    def test_weights_are_floors(self):
+        infra = _infra([_machine("heavy", weight=3), _machine("busy")], self._policy())
+        usage = {"dom-busy": InstanceUsage(cpu=2.0, memory=1024**3)}
+
+        allocs = {
+            a.instance_name: a for a in compute_resource_allocation(infra, _hw(16, 32), usage)
+        }
+
+        assert allocs["dom-heavy"].cpu_value == "6"  # 3/4 de 8
+        assert allocs["dom-busy"].cpu_value == "10"  # 2 + 8
+
+    def test_without_usage_is_proportional(self):
+        allocs = self._allocs(None)
+        assert allocs["dom-ollama"].cpu_value == allocs["dom-idle"].cpu_value == "8"
+
+    def test_no_demand_is_proportional(self):
+        usage = {"dom-ollama": InstanceUsage(), "dom-idle": InstanceUsage()}
+        assert self._allocs(usage)["dom-ollama"].cpu_value == "8"
+
+    def test_usage_ignored_in_proportional_mode(self):
+        infra = _infra(
+            [_machine("a"), _machine("b")],
+            ResourcePolicyConfig(host_reserve_cpu="0%", cpu_mode="count"),
+        )
+        usage = {"dom-a": InstanceUsage(cpu=8.0)}
+        allocs = compute_resource_allocation(infra, _hw(16, 32), usage)
+        assert {a.cpu_value for a in allocs} == {"8"}
+
+
 # ---------------------------------------------------------------------------
 # compute_resource_allocation — equal mode
 # ---------------------------------------------------------------------------
@@ -690,6 +757,29 @@ class TestDetectHardware:
         assert hw.cpu_threads == 4
         assert hw.memory_bytes == 16384000 * 1024
 
+    def test_cached_until_refresh(self):
+        detect_hardware(driver=_mock_driver(cpu=24, memory=1024))
+
+        other = _mock_driver(cpu=8, memory=2048)
+        assert detect_hardware(driver=other).cpu_threads == 24
+        other.host_resources.assert_not_called()
+        assert detect_hardware(driver=other, refresh=True).cpu_threads == 8
+
+    def test_fallback_not_cached(self):
+        with patch("anklume.engine.resources.os.cpu_count", return_value=4):
+            detect_hardware(driver=_mock_driver(fail=True))
+
+        assert detect_hardware(driver=_mock_driver(cpu=24)).cpu_threads == 24
+
+    def test_default_driver_follows_backend(self, monkeypatch):
+        """Sans driver fourni : backend choisi par ANKLUME_INCUS_BACKEND."""
+        monkeypatch.setenv("ANKLUME_INCUS_BACKEND", "rest")
+        resources = {"cpu": {"total": 12}, "memory": {"total": 1024}}
+        with patch(
+            "anklume.engine.incus_rest.IncusRestDriver.host_resources", return_value=resources
+        ):
+            assert detect_hardware(refresh=True).cpu_threads == 12
+
 
 class TestDetectHardwareFallback:
     def test_fallback_uses_os_cpu_count(self):
@@ -763,6 +853,234 @@ class TestEdgeCases:
         assert int(normal.cpu_value) >= 1
 
 
+# ---------------------------------------------------------------------------
+# Rééquilibrage à chaud
+# ---------------------------------------------------------------------------
+
+# Allocation de deux machines (conteneur a, VM b) sur _hw() ; l'ajout
+# de la machine c ramène a à 27% / 8739MB et b à 5 CPU.
+_TWO_MACHINES = {
+    "dom-a": {
+        "limits.cpu.allowance": "41%",
+        "limits.memory": "13108MB",
+        "limits.memory.enforce": "soft",
+    },
+    "dom-b": {"limits.cpu": "7", "limits.memory": "13108MB"},
+}
+
+
+class TestRebalance:
+    def _setup(self, b_status: str = "Running", live: dict | None = None):
+        infra = _infra(
+            [_machine("a"), _machine("b", type="vm"), _machine("c")],
+            ResourcePolicyConfig(),
+        )
+        live = live or _TWO_MACHINES
+        instances = [
+            IncusInstance(
+                name="dom-a",
+                status="Running",
+                type="container",
+                project="dom",
+                config={**live["dom-a"], "volatile.uuid": "x"},
+            ),
+            IncusInstance(
+                name="dom-b",
+                status=b_status,
+                type="virtual-machine",
+                project="dom",
+                config=dict(live["dom-b"]),
+            ),
+        ]
+        driver = mock_driver(projects=[IncusProject(name="dom")], instances={"dom": instances})
+        return infra, driver
+
+    def test_only_changed_keys_pushed(self):
+        infra, driver = self._setup(b_status="Stopped")
+
+        result = rebalance(infra, driver, _hw())
+
+        assert result.success
+        driver.instance_config_update.assert_any_call(
+            "dom-a", "dom", {"limits.cpu.allowance": "27%", "limits.memory": "8739MB"}
+        )
+        driver.instance_config_update.assert_any_call(
+            "dom-b", "dom", {"limits.cpu": "5", "limits.memory": "8739MB"}
+        )
+        assert driver.instance_config_update.call_count == 2
+
+    def test_running_vm_written_and_requires_restart(self):
+        """La config d'une VM en cours d'exécution est écrite (prise au prochain boot)."""
+        infra, driver = self._setup()
+
+        result = rebalance(infra, driver, _hw())
+
+        [vm] = result.restart_required
+        assert vm.instance == "dom-b"
+        assert vm.changes == {"limits.cpu": "5", "limits.memory": "8739MB"}
+        assert {c.instance for c in result.applied} == {"dom-a", "dom-b"}
+        driver.instance_config_update.assert_any_call("dom-b", "dom", vm.changes)
+
+    def test_restarted_vm_keeps_new_limits(self):
+        """Après redémarrage, la VM tourne avec les nouvelles limites : plus rien à faire."""
+        infra, driver = self._setup()
+        instances = {i.name: i for i in driver.instance_list("dom")}
+
+        def update(name, project, config):
+            instances[name].config.update(config)
+
+        driver.instance_config_update.side_effect = update
+        rebalance(infra, driver, _hw())
+
+        # Redémarrage : la VM repasse Running avec la config écrite ;
+        # la passe suivante relit le projet
+        instances["dom-b"].status = "Running"
+        fresh, _ = self._setup()
+        again = rebalance(fresh, driver, _hw())
+
+        assert instances["dom-b"].config["limits.cpu"] == "5"
+        assert again.changes == []
+        assert again.restart_required == []
+
+    def test_dry_run_lists_running_vm(self):
+        infra, driver = self._setup()
+
+        result = rebalance(infra, driver, _hw(), dry_run=True)
+
+        assert [c.instance for c in result.restart_required] == ["dom-b"]
+        driver.instance_config_update.assert_not_called()
+
+    def test_stopped_vm_updated(self):
+        infra, driver = self._setup(b_status="Stopped")
+
+        result = rebalance(infra, driver, _hw())
+
+        assert result.restart_required == []
+        assert {c.instance for c in result.applied} == {"dom-a", "dom-b"}
+
+    def test_up_to_date(self):
+        infra = _infra([_machine("a"), _machine("b", type="vm")], ResourcePolicyConfig())
+        _, driver = self._setup()
+
+        result = rebalance(infra, driver, _hw())
+
+        assert result.changes == []
+        driver.instance_config_update.assert_not_called()
+
+    def test_mode_switch_removes_stale_key(self):
+        """cpu_mode count : limits.cpu.allowance retirée du conteneur."""
+        infra, driver = self._setup()
+        infra.config.resource_policy.cpu_mode = "count"
+
+        result = rebalance(infra, driver, _hw())
+
+        changes = next(c.changes for c in result.changes if c.instance == "dom-a")
+        assert changes["limits.cpu.allowance"] is None
+        assert "limits.cpu" in changes
+
+    def test_hand_set_limit_kept(self):
+        """limits.processes posée à la main : jamais retirée."""
+        live = {**_TWO_MACHINES, "dom-a": {**_TWO_MACHINES["dom-a"], "limits.processes": "500"}}
+        infra, driver = self._setup(live=live)
+
+        result = rebalance(infra, driver, _hw(), dry_run=True)
+
+        changes = next(c.changes for c in result.changes if c.instance == "dom-a")
+        assert "limits.processes" not in changes
+
+    def test_dry_run(self):
+        infra, driver = self._setup()
+
+        result = rebalance(infra, driver, _hw(), dry_run=True)
+
+        assert len(result.changes) == 2
+        assert result.applied == []
+        driver.instance_config_update.assert_not_called()
+
+    def test_error_reported(self):
+        infra, driver = self._setup(b_status="Stopped")
+
+        def update(name, project, config):
+            if name == "dom-b":
+                raise IncusError(["incus"], 1, "refus")
+
+        driver.instance_config_update.side_effect = update
+
+        result = rebalance(infra, driver, _hw())
+
+        assert not result.success
+        assert [c.instance for c in result.applied] == ["dom-a"]
+        assert result.errors[0][0].instance == "dom-b"
+
+
+class TestRebalanceInterval:
+    def test_incus_error_does_not_stop_loop(self, tmp_path, capsys):
+        """Snapshot en échec (démon redémarré) : passe signalée, la boucle continue."""
+        from anklume.cli._resource import run_resource_rebalance
+        from anklume.engine.nesting import NestingContext
+
+        setup = TestRebalance()._setup
+        _, driver = setup(b_status="Stopped")
+        snapshot = driver.state_snapshot.side_effect
+        driver.state_snapshot.side_effect = [IncusError(["incus"], 1, "socket fermée"), snapshot()]
+
+        with (
+            patch("anklume.cli._common.load_infra", side_effect=lambda path: setup()[0]),
+            patch("anklume.cli._common.get_driver", return_value=driver),
+            patch("anklume.engine.nesting.detect_nesting_context", return_value=NestingContext()),
+            patch("anklume.cli._resource.detect_hardware", return_value=_hw()),
+            patch("anklume.cli._resource.time.sleep", side_effect=[None, KeyboardInterrupt]),
+        ):
+            run_resource_rebalance(str(tmp_path), interval=60)
+
+        captured = capsys.readouterr()
+        assert "socket fermée" in captured.err
+        assert "2 instance(s) mise(s) à jour" in captured.out
+        assert "Rééquilibrage interrompu" in captured.out
+        assert driver.instance_config_update.call_count == 2
+
+    def test_invalid_project_does_not_stop_loop(self, tmp_path, capsys):
+        """anklume.yml invalide le temps d'une passe : la boucle continue."""
+        import typer
+
+        from anklume.cli._resource import run_resource_rebalance
+        from anklume.engine.nesting import NestingContext
+
+        setup = TestRebalance()._setup
+        _, driver = setup(b_status="Stopped")
+        loads = [typer.Exit(1), setup()[0]]
+
+        def load(path):
+            loaded = loads.pop(0)
+            if isinstance(loaded, typer.Exit):
+                raise loaded
+            return loaded
+
+        with (
+            patch("anklume.cli._common.load_infra", side_effect=load),
+            patch("anklume.cli._common.get_driver", return_value=driver),
+            patch("anklume.engine.nesting.detect_nesting_context", return_value=NestingContext()),
+            patch("anklume.cli._resource.detect_hardware", return_value=_hw()),
+            patch("anklume.cli._resource.time.sleep", side_effect=[None, KeyboardInterrupt]),
+        ):
+            run_resource_rebalance(str(tmp_path), interval=60)
+
+        captured = capsys.readouterr()
+        assert "2 instance(s) mise(s) à jour" in captured.out
+        assert "Rééquilibrage interrompu" in captured.out
+
+    def test_invalid_project_fails_single_pass(self, tmp_path):
+        import typer
+
+        from anklume.cli._resource import run_resource_rebalance
+
+        with (
+            patch("anklume.cli._common.load_infra", side_effect=typer.Exit(1)),
+            pytest.raises(typer.Exit),
+        ):
+            run_resource_rebalance(str(tmp_path))
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
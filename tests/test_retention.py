@@ -0,0 +1,231 @@
+"""Tests pour engine/retention.py — élagage générationnel des snapshots."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from anklume.engine.incus_driver import IncusError, IncusProject, IncusSnapshot
+from anklume.engine.models import SnapshotRetention
+from anklume.engine.nesting import NestingContext
+from anklume.engine.retention import (
+    plan_prune,
+    prune_snapshots,
+    select_prunable,
+    snapshot_time,
+)
+
+from .conftest import (
+    make_domain,
+    make_infra,
+    make_machine,
+    mock_driver,
+    running_instance,
+    write_test_project,
+)
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=UTC)
+
+
+def _snap(phase: str, when: datetime) -> IncusSnapshot:
+    return IncusSnapshot(name=f"anklume-{phase}-{when:%Y%m%d-%H%M%S}")
+
+
+def _daily(phase: str, days: int) -> list[IncusSnapshot]:
+    """Un snapshot par jour, du plus ancien (J-days+1) au plus récent (J)."""
+    return [_snap(phase, NOW - timedelta(days=d)) for d in reversed(range(days))]
+
+
+def _names(snaps: list[IncusSnapshot]) -> set[str]:
+    return {s.name for s in snaps}
+
+
+class TestSnapshotTime:
+    def test_from_name(self) -> None:
+        snap = IncusSnapshot(name="anklume-pre-20260307-143022")
+        assert snapshot_time(snap, "anklume-pre-") == datetime(2026, 3, 7, 14, 30, 22, tzinfo=UTC)
+
+    def test_fallback_created_at(self) -> None:
+        snap = IncusSnapshot(name="anklume-pre-x", created_at="2026-03-07T14:30:22Z")
+        assert snapshot_time(snap, "anklume-pre-") == datetime(2026, 3, 7, 14, 30, 22, tzinfo=UTC)
+
+    def test_unknown(self) -> None:
+        assert snapshot_time(IncusSnapshot(name="anklume-pre-x"), "anklume-pre-") is None
+
+
+class TestSelectPrunable:
+    def test_disabled_policy(self) -> None:
+        assert select_prunable(_daily("pre", 10), SnapshotRetention(), NOW) == []
+
+    def test_keep_last_per_phase(self) -> None:
+        snaps = _daily("pre", 5) + _daily("post", 2)
+        prunable = select_prunable(snaps, SnapshotRetention(keep_last=3), NOW)
+        assert _names(prunable) == _names(_daily("pre", 5)[:2])
+
+    def test_keep_daily_one_per_day(self) -> None:
+        # deux snapshots par jour sur 4 jours
+        snaps = [_snap("post", NOW - timedelta(days=d, hours=h)) for d in range(4) for h in (0, 1)]
+        prunable = select_prunable(snaps, SnapshotRetention(keep_daily=2), NOW)
+        kept = _names(snaps) - _names(prunable)
+        assert kept == {_snap("post", NOW).name, _snap("post", NOW - timedelta(days=1)).name}
+
+    def test_keep_weekly(self) -> None:
+        snaps = _daily("pre", 21)
+        prunable = select_prunable(snaps, SnapshotRetention(keep_weekly=3), NOW)
+        assert len(snaps) - len(prunable) == 3
+
+    def test_rules_combine(self) -> None:
+        snaps = _daily("pre", 30)
+        policy = SnapshotRetention(keep_last=2, keep_daily=5, keep_weekly=4)
+        kept = _names(snaps) - _names(select_prunable(snaps, policy, NOW))
+        assert _names(_daily("pre", 5)) <= kept
+        assert len(kept) <= 2 + 5 + 4
+
+    def test_max_age_only(self) -> None:
+        snaps = _daily("pre", 10)
+        prunable = select_prunable(snaps, SnapshotRetention(max_age_days=7), NOW)
+        assert _names(prunable) == _names(snaps[:2])
+
+    def test_max_age_overrides_keep(self) -> None:
+        snaps = _daily("pre", 10)
+        prunable = select_prunable(snaps, SnapshotRetention(keep_last=10, max_age_days=3), NOW)
+        assert len(prunable) == 6
+
+    def test_newest_always_kept(self) -> None:
+        old = [_snap("pre", NOW - timedelta(days=100)), _snap("pre", NOW - timedelta(days=200))]
+        prunable = select_prunable(old, SnapshotRetention(max_age_days=30), NOW)
+        assert _names(prunable) == {old[1].name}
+
+    def test_user_named_never_pruned(self) -> None:
+        snaps = [IncusSnapshot(name="avant-migration", created_at="2020-01-01T00:00:00Z")]
+        snaps += _daily("snap", 3)
+        prunable = select_prunable(snaps, SnapshotRetention(keep_last=1, max_age_days=1), NOW)
+        assert "avant-migration" not in _names(prunable)
+        assert len(prunable) == 2
+
+
+def _infra(**retention):
+    infra = make_infra(
+        domains={"pro": make_domain("pro", machines={"dev": make_machine("dev", "pro")})}
+    )
+    infra.config.snapshots.retention = SnapshotRetention(**retention)
+    return infra
+
+
+class TestPruneSnapshots:
+    def test_plan_from_bulk_listing(self) -> None:
+        inst = running_instance("pro-dev", "pro")
+        inst.snapshots = _daily("pre", 4)
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": [inst]})
+
+        plan = plan_prune(driver, _infra(keep_last=1), now=NOW)
+
+        assert [snap for _, _, snap in plan] == [s.name for s in _daily("pre", 4)[:3]]
+        driver.snapshot_list.assert_not_called()
+
+    def test_disabled_no_listing(self) -> None:
+        driver = mock_driver()
+        assert plan_prune(driver, _infra(), now=NOW) == []
+        driver.state_snapshot.assert_not_called()
+
+    def test_parallel_delete(self) -> None:
+        machines = {f"m{i}": make_machine(f"m{i}", "pro") for i in range(4)}
+        infra = make_infra(domains={"pro": make_domain("pro", machines=machines)})
+        infra.config.snapshots.retention = SnapshotRetention(keep_last=1)
+        instances = []
+        for i in range(4):
+            inst = running_instance(f"pro-m{i}", "pro")
+            inst.snapshots = _daily("post", 3)
+            instances.append(inst)
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": instances})
+        barrier = threading.Barrier(4, timeout=5)
+        driver.snapshot_delete.side_effect = lambda *a: barrier.wait() and time.sleep(0.01)
+
+        result = prune_snapshots(driver, infra, jobs=4, now=NOW)
+
+        assert len(result.deleted) == 8
+        assert result.success
+
+    def test_errors_reported(self) -> None:
+        inst = running_instance("pro-dev", "pro")
+        inst.snapshots = _daily("pre", 3)
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": [inst]})
+        oldest = _daily("pre", 3)[0].name
+
+        def snapshot_delete(instance, project, name):
+            if name == oldest:
+                raise IncusError(["incus", "snapshot", "delete"], 1, "busy")
+
+        driver.snapshot_delete.side_effect = snapshot_delete
+
+        result = prune_snapshots(driver, _infra(keep_last=1), now=NOW)
+
+        assert [snap for _, _, snap in result.deleted] == [_daily("pre", 3)[1].name]
+        assert [entry[2] for entry, _ in result.errors] == [oldest]
+        assert not result.success
+
+    def test_dry_run(self) -> None:
+        inst = running_instance("pro-dev", "pro")
+        inst.snapshots = _daily("pre", 3)
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": [inst]})
+
+        result = prune_snapshots(driver, _infra(keep_last=1), dry_run=True, now=NOW)
+
+        assert len(result.deleted) == 2
+        driver.snapshot_delete.assert_not_called()
+
+
+class TestAutoPrune:
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        write_test_project(
+            tmp_path,
+            {"pro": {"description": "Pro", "machines": {"dev": {"description": "Dev"}}}},
+        )
+        monkeypatch.setenv("ANKLUME_INFRA_DIR", str(tmp_path))
+        return tmp_path
+
+    def _apply(self, project, driver, snapshots_config: dict) -> None:
+        import yaml
+
+        from anklume.cli._apply import run_apply
+
+        path = project / "anklume.yml"
+        data = yaml.safe_load(path.read_text())
+        data["snapshots"] = snapshots_config
+        path.write_text(yaml.dump(data))
+
+        with (
+            patch("anklume.cli._apply.get_driver", return_value=driver),
+            patch("anklume.cli._apply.detect_nesting_context", return_value=NestingContext()),
+            patch("anklume.cli._network.deploy_nftables"),
+        ):
+            run_apply(no_provision=True, full=True)
+
+    def _driver(self):
+        inst = running_instance("pro-dev", "pro")
+        inst.snapshots = [
+            IncusSnapshot(name="anklume-post-20200101-000000"),
+            IncusSnapshot(name="anklume-post-20200102-000000"),
+        ]
+        return mock_driver(
+            projects=[IncusProject(name="pro")],
+            instances={"pro": [inst]},
+            profiles={"pro": ["default"]},
+        )
+
+    def test_prunes_after_post_phase(self, project) -> None:
+        driver = self._driver()
+        self._apply(project, driver, {"auto_prune": True, "retention": {"keep_last": 1}})
+        driver.snapshot_delete.assert_called_once_with(
+            "pro-dev", "pro", "anklume-post-20200101-000000"
+        )
+
+    def test_off_by_default(self, project) -> None:
+        driver = self._driver()
+        self._apply(project, driver, {"retention": {"keep_last": 1}})
+        driver.snapshot_delete.assert_not_called()
@@ -0,0 +1,241 @@
+"""Tests unitaires pour engine/scheduler.py — ordonnanceur DAG."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pytest
+
+from anklume.engine.scheduler import (
+    SKIPPED_MESSAGE,
+    critical_path_length,
+    run_dag,
+)
+
+
+@dataclass
+class Step:
+    name: str
+    deps: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return self.name
+
+
+def _names(steps) -> list[str]:
+    return [s.name for s in steps]
+
+
+class TestCriticalPath:
+    def test_empty(self) -> None:
+        assert critical_path_length([]) == 0
+
+    def test_independent(self) -> None:
+        assert critical_path_length([Step("a"), Step("b"), Step("c")]) == 1
+
+    def test_longest_chain(self) -> None:
+        steps = [
+            Step("project"),
+            Step("network", ["project"]),
+            Step("create-a", ["network"]),
+            Step("start-a", ["create-a"]),
+            Step("create-b", ["network"]),
+        ]
+        assert critical_path_length(steps) == 4
+
+    def test_unknown_dep_ignored(self) -> None:
+        """Dépendance absente du plan = ressource déjà présente."""
+        assert critical_path_length([Step("start", ["create"])]) == 1
+
+    def test_cycle(self) -> None:
+        with pytest.raises(ValueError, match="cycliques"):
+            critical_path_length([Step("a", ["b"]), Step("b", ["a"])])
+
+    def test_duplicate_key(self) -> None:
+        with pytest.raises(ValueError, match="dupliquées"):
+            critical_path_length([Step("a"), Step("a")])
+
+
+class TestRunDagSequential:
+    def test_plan_order(self) -> None:
+        calls: list[str] = []
+        steps = [Step("a"), Step("b", ["a"]), Step("c")]
+
+        result = run_dag(steps, lambda s: calls.append(s.name))
+
+        assert calls == ["a", "b", "c"]
+        assert _names(result.executed) == ["a", "b", "c"]
+        assert result.errors == []
+        assert result.critical_path == 2
+
+    def test_failure_skips_dependents_only(self) -> None:
+        steps = [
+            Step("profile"),
+            Step("network"),
+            Step("create-a", ["network", "profile"]),
+            Step("start-a", ["create-a"]),
+            Step("create-b", ["network"]),
+            Step("start-b", ["create-b"]),
+        ]
+
+        def run(step: Step) -> None:
+            if step.name == "profile":
+                raise RuntimeError("boom")
+
+        result = run_dag(steps, run)
+
+        assert _names(result.executed) == ["network", "create-b", "start-b"]
+        assert [(s.name, msg) for s, msg in result.errors] == [
+            ("profile", "boom"),
+            ("create-a", SKIPPED_MESSAGE),
+            ("start-a", SKIPPED_MESSAGE),
+        ]
+
+    def test_unreported_exception_propagates(self) -> None:
+        def run(step: Step) -> None:
+            raise KeyError(step.name)
+
+        with pytest.raises(KeyError):
+            run_dag([Step("a")], run, errors=(RuntimeError,))
+
+
+class TestRunDagParallel:
+    def test_ready_actions_run_concurrently(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+        steps = [Step("net"), *(Step(f"create-{i}", ["net"]) for i in range(3))]
+
+        def run(step: Step) -> None:
+            if step.name != "net":
+                barrier.wait()
+
+        result = run_dag(steps, run, jobs=3)
+
+        assert len(result.executed) == 4
+        assert result.errors == []
+
+    def test_dependencies_respected(self) -> None:
+        done: list[str] = []
+        lock = threading.Lock()
+        steps = [
+            Step("project"),
+            Step("network", ["project"]),
+            *(Step(f"create-{i}", ["network"]) for i in range(4)),
+            *(Step(f"start-{i}", [f"create-{i}"]) for i in range(4)),
+        ]
+
+        def run(step: Step) -> None:
+            with lock:
+                assert all(dep in done for dep in step.deps)
+            time.sleep(0.005)
+            with lock:
+                done.append(step.name)
+
+        result = run_dag(steps, run, jobs=4)
+
+        assert result.executed == steps
+        assert result.critical_path == 4
+
+    def test_makespan_bounded_by_longest_chain(self) -> None:
+        """8 chaînes de 2 actions, 8 workers → ~2 pas, pas 16."""
+        delay = 0.05
+        steps = []
+        for i in range(8):
+            steps += [Step(f"create-{i}"), Step(f"start-{i}", [f"create-{i}"])]
+
+        start = time.monotonic()
+        result = run_dag(steps, lambda s: time.sleep(delay), jobs=8)
+        elapsed = time.monotonic() - start
+
+        assert result.critical_path == 2
+        assert elapsed < delay * 6
+
+    def test_failure_skips_dependents_in_plan_order(self) -> None:
+        steps = [
+            Step("create-a"),
+            Step("create-b"),
+            Step("start-a", ["create-a"]),
+            Step("start-b", ["create-b"]),
+        ]
+
+        def run(step: Step) -> None:
+            if step.name == "create-a":
+                raise RuntimeError("image absente")
+
+        result = run_dag(steps, run, jobs=4)
+
+        assert _names(result.executed) == ["create-b", "start-b"]
+        assert [(s.name, msg) for s, msg in result.errors] == [
+            ("create-a", "image absente"),
+            ("start-a", SKIPPED_MESSAGE),
+        ]
+
+
+class TestRunDagWait:
+    """Actions qui retournent un handle d'opération, attendu en lot."""
+
+    def test_ready_actions_submitted_before_wait(self) -> None:
+        events: list[str] = []
+        steps = [Step("net"), *(Step(f"create-{i}", ["net"]) for i in range(3))]
+
+        def run(step: Step) -> str | None:
+            events.append(f"submit {step.name}")
+            return step.name if step.name.startswith("create") else None
+
+        def wait(handles: list[str]) -> list[str | None]:
+            events.append(f"wait {','.join(handles)}")
+            return [None] * len(handles)
+
+        result = run_dag(steps, run, wait=wait)
+
+        assert events == [
+            "submit net",
+            "submit create-0",
+            "submit create-1",
+            "submit create-2",
+            "wait create-0,create-1,create-2",
+        ]
+        assert result.executed == steps
+
+    def test_failed_operation_skips_dependents(self) -> None:
+        steps = [
+            Step("create-a"),
+            Step("create-b"),
+            Step("start-a", ["create-a"]),
+            Step("start-b", ["create-b"]),
+        ]
+        started: list[str] = []
+
+        def run(step: Step) -> str | None:
+            if step.name.startswith("start"):
+                started.append(step.name)
+                return None
+            return step.name
+
+        def wait(handles: list[str]) -> list[str | None]:
+            return ["image absente" if h == "create-a" else None for h in handles]
+
+        result = run_dag(steps, run, wait=wait)
+
+        assert started == ["start-b"]
+        assert [(s.name, msg) for s, msg in result.errors] == [
+            ("create-a", "image absente"),
+            ("start-a", SKIPPED_MESSAGE),
+        ]
+
+    def test_parallel_waits_each_handle(self) -> None:
+        waited: list[list[str]] = []
+        lock = threading.Lock()
+
+        def wait(handles: list[str]) -> list[str | None]:
+            with lock:
+                waited.append(handles)
+            return [None] * len(handles)
+
+        steps = [Step("a"), Step("b")]
+        result = run_dag(steps, lambda s: s.name, jobs=2, wait=wait)
+
+        assert sorted(waited) == [["a"], ["b"]]
+        assert result.executed == steps
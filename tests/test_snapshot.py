@@ -7,9 +7,20 @@ listing, restauration, résolution de projet.
 
 from __future__ import annotations
 
+import json
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
 
-from anklume.engine.incus_driver import IncusError, IncusProject, IncusSnapshot
+from anklume.engine.incus_driver import (
+    IncusError,
+    IncusInstance,
+    IncusProject,
+    IncusSnapshot,
+    IncusStateSnapshot,
+)
 from anklume.engine.snapshot import (
     create_auto_snapshots,
     create_snapshot,
@@ -228,11 +239,13 @@ class TestCreateAutoSnapshots:
                 ]
             },
         )
-        # pro-desktop (alphabétiquement premier) échoue, pro-dev réussit
-        driver.snapshot_create.side_effect = [
-            IncusError(["incus", "snapshot", "create"], 1, "failed"),
-            None,
-        ]
+        # pro-desktop échoue, pro-dev réussit (ordre d'appel indéterminé en parallèle)
+
+        def snapshot_create(instance, project, name):
+            if instance == "pro-desktop":
+                raise IncusError(["incus", "snapshot", "create"], 1, "failed")
+
+        driver.snapshot_create.side_effect = snapshot_create
 
         created = create_auto_snapshots(driver, infra, "pre")
 
@@ -255,6 +268,75 @@ class TestCreateAutoSnapshots:
         assert len(created) == 1
 
 
+def _on_pool(name: str, project: str, pool: str) -> IncusInstance:
+    root = {"root": {"type": "disk", "path": "/", "pool": pool}}
+    return IncusInstance(
+        name=name, status="Running", type="container", project=project, expanded_devices=root
+    )
+
+
+class TestParallelAutoSnapshots:
+    """Snapshots lancés en parallèle, limités par pool de stockage."""
+
+    @staticmethod
+    def _infra(count: int):
+        machines = {f"m{i}": make_machine(f"m{i}", "pro") for i in range(count)}
+        return make_infra(domains={"pro": make_domain("pro", machines=machines)})
+
+    @staticmethod
+    def _tracking_driver(instances: list[IncusInstance], delay: float = 0.02):
+        """Driver qui mesure le nombre maximal de snapshots simultanés par pool."""
+        pools = {i.name: i.storage_pool for i in instances}
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+        lock = threading.Lock()
+
+        def snapshot_create(instance, project, name):
+            pool = pools[instance]
+            with lock:
+                active[pool] = active.get(pool, 0) + 1
+                peak[pool] = max(peak.get(pool, 0), active[pool])
+            time.sleep(delay)
+            with lock:
+                active[pool] -= 1
+
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": instances})
+        driver.snapshot_create.side_effect = snapshot_create
+        return driver, peak
+
+    def test_pool_concurrency_cap(self) -> None:
+        instances = [_on_pool(f"pro-m{i}", "pro", "zfs" if i < 6 else "btrfs") for i in range(8)]
+        driver, peak = self._tracking_driver(instances)
+
+        created = create_auto_snapshots(driver, self._infra(8), "pre", pool_concurrency=2)
+
+        assert len(created) == 8
+        assert peak == {"zfs": 2, "btrfs": 2}
+
+    def test_config_default(self) -> None:
+        instances = [_on_pool(f"pro-m{i}", "pro", "default") for i in range(6)]
+        driver, peak = self._tracking_driver(instances)
+        infra = self._infra(6)
+        infra.config.snapshots.pool_concurrency = 3
+
+        create_auto_snapshots(driver, infra, "post")
+
+        assert peak == {"default": 3}
+
+    def test_result_in_plan_order(self) -> None:
+        """Ordre de retour indépendant de l'ordre de fin des snapshots."""
+        instances = [_on_pool(f"pro-m{i}", "pro", f"pool{i % 3}") for i in range(6)]
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": instances})
+        driver.snapshot_create.side_effect = lambda inst, proj, name: time.sleep(
+            0.01 * (6 - int(inst[-1]))
+        )
+
+        created = create_auto_snapshots(driver, self._infra(6), "pre")
+
+        assert [inst for inst, _, _ in created] == [f"pro-m{i}" for i in range(6)]
+        assert len({snap for _, _, snap in created}) == 1
+
+
 # ============================================================
 # list_all_snapshots
 # ============================================================
@@ -334,6 +416,56 @@ class TestListAllSnapshots:
         result = list_all_snapshots(driver, infra)
         assert result == {}
 
+    def test_embedded_snapshots_single_query(self) -> None:
+        """Snapshots embarqués dans l'état (recursion=2) : pas de snapshot_list."""
+        domain = make_domain("pro", machines={"dev": make_machine("dev", "pro")})
+        infra = make_infra(domains={"pro": domain})
+        inst = running_instance("pro-dev", "pro")
+        inst.snapshots = [IncusSnapshot(name="snap1", created_at="2026-03-07T14:30Z")]
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": [inst]})
+
+        result = list_all_snapshots(driver, infra)
+
+        assert [s.name for s in result["pro-dev"]] == ["snap1"]
+        driver.snapshot_list.assert_not_called()
+        driver.state_snapshot.assert_called_once()
+
+
+class TestSnapshotListCli:
+    def _run(self, capsys, driver, **kwargs) -> str:
+        from anklume.cli._snapshot import run_snapshot_list
+
+        infra = make_infra(
+            domains={"pro": make_domain("pro", machines={"dev": make_machine("dev", "pro")})}
+        )
+        with (
+            patch("anklume.cli._snapshot.load_infra", return_value=infra),
+            patch("anklume.cli._snapshot.get_driver", return_value=driver),
+        ):
+            run_snapshot_list(**kwargs)
+        return capsys.readouterr().out
+
+    def test_json_lines(self, capsys) -> None:
+        driver = mock_driver(
+            projects=[IncusProject(name="pro")],
+            instances={"pro": [running_instance("pro-dev", "pro")]},
+            snapshots={"pro-dev": [IncusSnapshot(name="snap1", created_at="2026-03-07")]},
+        )
+
+        out = self._run(capsys, driver, json_output=True)
+
+        assert [json.loads(line) for line in out.splitlines()] == [
+            {
+                "instance": "pro-dev",
+                "project": "pro",
+                "snapshots": [{"name": "snap1", "created_at": "2026-03-07"}],
+            }
+        ]
+
+    def test_text_empty(self, capsys) -> None:
+        out = self._run(capsys, mock_driver())
+        assert "Aucun snapshot" in out
+
 
 # ============================================================
 # restore_snapshot
@@ -357,6 +489,15 @@ class TestRestoreSnapshot:
         )
         driver.instance_start.assert_called_once_with("pro-dev", "pro")
 
+    def test_known_status_skips_lookup(self) -> None:
+        driver = mock_driver()
+
+        restore_snapshot(driver, "pro-dev", "pro", "snap", was_running=True)
+
+        driver.instance_list.assert_not_called()
+        driver.instance_stop.assert_called_once_with("pro-dev", "pro")
+        driver.instance_start.assert_called_once_with("pro-dev", "pro")
+
     def test_restore_stopped_instance(self) -> None:
         """Restaurer un snapshot sur une instance stopped : restore seulement."""
         driver = mock_driver(
@@ -454,10 +595,10 @@ class TestRollbackPreApply:
             },
         )
 
-        restored = rollback_pre_apply(driver, infra)
+        result = rollback_pre_apply(driver, infra)
 
-        assert len(restored) == 1
-        inst, proj, snap = restored[0]
+        assert len(result.restored) == 1
+        inst, proj, snap = result.restored[0]
         assert inst == "pro-dev"
         assert proj == "pro"
         assert snap == "anklume-pre-20260310-120000"
@@ -483,9 +624,9 @@ class TestRollbackPreApply:
             },
         )
 
-        restored = rollback_pre_apply(driver, infra)
+        result = rollback_pre_apply(driver, infra)
 
-        assert len(restored) == 0
+        assert len(result.restored) == 0
 
     def test_dry_run_does_not_restore(self) -> None:
         """En dry-run, liste les snapshots mais ne restaure pas."""
@@ -507,9 +648,9 @@ class TestRollbackPreApply:
             },
         )
 
-        restored = rollback_pre_apply(driver, infra, dry_run=True)
+        result = rollback_pre_apply(driver, infra, dry_run=True)
 
-        assert len(restored) == 1
+        assert len(result.restored) == 1
         driver.snapshot_restore.assert_not_called()
         driver.instance_stop.assert_not_called()
 
@@ -540,9 +681,9 @@ class TestRollbackPreApply:
             },
         )
 
-        restored = rollback_pre_apply(driver, infra)
+        result = rollback_pre_apply(driver, infra)
 
-        assert len(restored) == 2
+        assert len(result.restored) == 2
 
     def test_skips_absent_instances(self) -> None:
         """Ne tente pas de restaurer les instances absentes."""
@@ -556,9 +697,9 @@ class TestRollbackPreApply:
             instances={"pro": []},
         )
 
-        restored = rollback_pre_apply(driver, infra)
+        result = rollback_pre_apply(driver, infra)
 
-        assert len(restored) == 0
+        assert len(result.restored) == 0
 
     def test_skips_absent_project(self) -> None:
         """Ne tente pas de restaurer si le projet n'existe pas."""
@@ -569,9 +710,9 @@ class TestRollbackPreApply:
         infra = make_infra(domains={"pro": domain})
         driver = mock_driver()
 
-        restored = rollback_pre_apply(driver, infra)
+        result = rollback_pre_apply(driver, infra)
 
-        assert len(restored) == 0
+        assert len(result.restored) == 0
 
     def test_restore_failure_continues(self) -> None:
         """Si la restauration échoue sur une instance, les autres continuent."""
@@ -606,14 +747,72 @@ class TestRollbackPreApply:
                 ],
             },
         )
-        # snapshot_restore échoue sur le premier appel (pro-desktop), réussit sur pro-dev
-        driver.snapshot_restore.side_effect = [
-            IncusError(["incus", "snapshot", "restore"], 1, "failed"),
-            None,
-        ]
+        # snapshot_restore échoue sur pro-desktop, réussit sur pro-dev
 
-        restored = rollback_pre_apply(driver, infra)
+        def snapshot_restore(instance, project, name):
+            if instance == "pro-desktop":
+                raise IncusError(["incus", "snapshot", "restore"], 1, "failed")
+
+        driver.snapshot_restore.side_effect = snapshot_restore
+
+        result = rollback_pre_apply(driver, infra)
 
         # pro-desktop échoue (restore_snapshot raises), pro-dev réussit
-        assert len(restored) == 1
-        assert restored[0][0] == "pro-dev"
+        assert len(result.restored) == 1
+        assert result.restored[0][0] == "pro-dev"
+        assert [(inst, proj) for inst, proj, _ in result.errors] == [("pro-desktop", "pro")]
+        assert not result.success
+
+    def test_single_state_read(self) -> None:
+        """Statut et snapshots lus une fois : pas d'instance_list par restauration."""
+        domain = make_domain("pro", machines={"dev": make_machine("dev", "pro")})
+        infra = make_infra(domains={"pro": domain})
+        inst = stopped_instance("pro-dev", "pro")
+        inst.snapshots = [IncusSnapshot(name="anklume-pre-20260310-120000")]
+        driver = mock_driver()
+        driver.state_snapshot.side_effect = None
+        driver.state_snapshot.return_value = IncusStateSnapshot(
+            projects=[IncusProject(name="pro")], instances={"pro": [inst]}
+        )
+
+        result = rollback_pre_apply(driver, infra)
+
+        assert result.restored == [("pro-dev", "pro", "anklume-pre-20260310-120000")]
+        driver.state_snapshot.assert_called_once()
+        driver.instance_list.assert_not_called()
+        driver.snapshot_list.assert_not_called()
+        driver.instance_stop.assert_not_called()
+
+    def test_parallel_with_cap_and_timings(self) -> None:
+        machines = {f"m{i}": make_machine(f"m{i}", "pro") for i in range(6)}
+        infra = make_infra(domains={"pro": make_domain("pro", machines=machines)})
+        instances = []
+        for i in range(6):
+            inst = running_instance(f"pro-m{i}", "pro")
+            inst.snapshots = [IncusSnapshot(name="anklume-pre-20260310-120000")]
+            instances.append(inst)
+        driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": instances})
+
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def snapshot_restore(instance, project, name):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        driver.snapshot_restore.side_effect = snapshot_restore
+
+        result = rollback_pre_apply(driver, infra, jobs=3)
+
+        assert peak == 3
+        assert [inst for inst, _, _ in result.restored] == [f"pro-m{i}" for i in range(6)]
+        assert sorted(result.timings) == [f"pro-m{i}" for i in range(6)]
+        assert all(t >= 0.02 for t in result.timings.values())
+        assert driver.instance_stop.call_count == 6
+        assert driver.instance_start.call_count == 6
@@ -0,0 +1,117 @@
+"""Tests pour engine/usage.py — mesures de consommation lissées (EWMA)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from anklume.engine.incus_driver import IncusError, IncusInstance, IncusProject
+from anklume.engine.usage import (
+    InstanceUsage,
+    load_usage,
+    refresh_usage,
+    sample_usage,
+    save_usage,
+    update_usage,
+    usage_path,
+)
+
+from .conftest import make_domain, make_infra, make_machine, mock_driver
+
+_GIB = 1024**3
+
+
+def _instance(name: str, status: str = "Running") -> IncusInstance:
+    return IncusInstance(name=name, status=status, type="container", project="pro")
+
+
+def _setup(*instances: IncusInstance):
+    machines = {n: make_machine(n, "pro") for n in ("ollama", "dev")}
+    infra = make_infra(domains={"pro": make_domain("pro", machines=machines)})
+    driver = mock_driver(projects=[IncusProject(name="pro")], instances={"pro": list(instances)})
+    return infra, driver
+
+
+def _state(cpu_ns: int, memory: int) -> dict:
+    return {"cpu": {"usage": cpu_ns}, "memory": {"usage": memory}}
+
+
+class TestUpdateUsage:
+    def test_first_sample_has_no_cpu_rate(self) -> None:
+        usage = update_usage(None, cpu_ns=5 * 10**9, memory=_GIB, now=100.0)
+        assert usage == InstanceUsage(cpu=0.0, memory=_GIB, cpu_ns=5 * 10**9, sampled_at=100.0)
+
+    def test_cpu_rate_smoothed(self) -> None:
+        previous = InstanceUsage(cpu=1.0, memory=_GIB, cpu_ns=0, sampled_at=0.0)
+        # 20 s CPU en 10 s → 2 cœurs ; EWMA 0.3 * 2 + 0.7 * 1
+        usage = update_usage(previous, cpu_ns=20 * 10**9, memory=2 * _GIB, now=10.0)
+        assert usage.cpu == pytest.approx(1.3)
+        assert usage.memory == pytest.approx(1.3 * _GIB)
+
+    def test_counter_reset_keeps_cpu(self) -> None:
+        """Instance redémarrée : compteur plus bas, pas de débit pour cette passe."""
+        previous = InstanceUsage(cpu=1.5, cpu_ns=10**12, sampled_at=0.0)
+        usage = update_usage(previous, cpu_ns=10**9, memory=0, now=10.0)
+        assert usage.cpu == 1.5
+        assert usage.cpu_ns == 10**9
+
+
+class TestSampleUsage:
+    def test_running_instances_read(self) -> None:
+        infra, driver = _setup(_instance("pro-ollama"), _instance("pro-dev"))
+        driver.instance_state.side_effect = lambda name, project: _state(0, 2 * _GIB)
+
+        usage = sample_usage(infra, driver, {}, now=1.0)
+
+        assert set(usage) == {"pro-ollama", "pro-dev"}
+        assert usage["pro-ollama"].memory == 2 * _GIB
+        assert driver.instance_state.call_count == 2
+
+    def test_stopped_instance_decays(self) -> None:
+        infra, driver = _setup(_instance("pro-dev", status="Stopped"))
+        previous = {"pro-dev": InstanceUsage(cpu=1.0, memory=_GIB, cpu_ns=50, sampled_at=0.0)}
+
+        usage = sample_usage(infra, driver, previous, now=1.0)
+
+        assert usage["pro-dev"].cpu == pytest.approx(0.7)
+        assert usage["pro-dev"].memory == pytest.approx(0.7 * _GIB)
+        driver.instance_state.assert_not_called()
+
+    def test_missing_instance_dropped(self) -> None:
+        infra, driver = _setup(_instance("pro-dev"))
+        driver.instance_state.return_value = _state(0, 0)
+
+        usage = sample_usage(infra, driver, {"pro-old": InstanceUsage()}, now=1.0)
+
+        assert set(usage) == {"pro-dev"}
+
+    def test_read_error_keeps_history(self) -> None:
+        infra, driver = _setup(_instance("pro-dev"))
+        driver.instance_state.side_effect = IncusError(["incus"], 1, "down")
+        previous = {"pro-dev": InstanceUsage(cpu=2.0, sampled_at=0.0)}
+
+        assert sample_usage(infra, driver, previous, now=1.0) == previous
+
+
+class TestPersistence:
+    def test_round_trip(self, tmp_path: Path) -> None:
+        usage = {"pro-dev": InstanceUsage(cpu=1.5, memory=_GIB, cpu_ns=42, sampled_at=3.0)}
+        save_usage(tmp_path, usage)
+        assert load_usage(tmp_path) == usage
+
+    def test_missing_or_invalid(self, tmp_path: Path) -> None:
+        assert load_usage(tmp_path) == {}
+        usage_path(tmp_path).parent.mkdir()
+        usage_path(tmp_path).write_text("{pas du json")
+        assert load_usage(tmp_path) == {}
+
+    def test_refresh_dry_run_not_saved(self, tmp_path: Path) -> None:
+        infra, driver = _setup(_instance("pro-dev"))
+        driver.instance_state.return_value = _state(0, _GIB)
+
+        refresh_usage(tmp_path, infra, driver, persist=False)
+        assert not usage_path(tmp_path).exists()
+
+        refresh_usage(tmp_path, infra, driver)
+        assert set(load_usage(tmp_path)) == {"pro-dev"}
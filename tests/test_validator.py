@@ -7,8 +7,11 @@ from anklume.engine.models import (
     GlobalConfig,
     Infrastructure,
     Machine,
+    NftablesConfig,
     Policy,
     Profile,
+    SnapshotConfig,
+    SnapshotRetention,
 )
 from anklume.engine.validator import validate
 
@@ -93,6 +96,62 @@ class TestValidInfrastructure:
         assert result.valid
 
 
+class TestIncusBackendValidation:
+    @pytest.mark.parametrize("backend", ["cli", "rest"])
+    def test_known_backend_valid(self, backend):
+        result = validate(_minimal_infra(config=GlobalConfig(incus_backend=backend)))
+        assert result.valid
+
+    def test_unknown_backend_rejected(self):
+        result = validate(_minimal_infra(config=GlobalConfig(incus_backend="grpc")))
+        assert not result.valid
+        assert "incus_backend" in str(result)
+
+
+class TestNftablesValidation:
+    @pytest.mark.parametrize("mode", ["linear", "optimized"])
+    def test_known_mode_valid(self, mode):
+        config = GlobalConfig(nftables=NftablesConfig(mode=mode))
+        assert validate(_minimal_infra(config=config)).valid
+
+    def test_unknown_mode_rejected(self):
+        config = GlobalConfig(nftables=NftablesConfig(mode="fast"))
+        result = validate(_minimal_infra(config=config))
+        assert not result.valid
+        assert "nftables.mode" in str(result)
+
+    def test_counters_not_bool_rejected(self):
+        config = GlobalConfig(nftables=NftablesConfig(counters="yes"))
+        result = validate(_minimal_infra(config=config))
+        assert not result.valid
+        assert "nftables.counters" in str(result)
+
+    def test_merge_policies_not_bool_rejected(self):
+        config = GlobalConfig(nftables=NftablesConfig(merge_policies=1))
+        result = validate(_minimal_infra(config=config))
+        assert not result.valid
+        assert "nftables.merge_policies" in str(result)
+
+
+class TestSnapshotsValidation:
+    def test_default_valid(self):
+        assert validate(_minimal_infra()).valid
+
+    @pytest.mark.parametrize("value", [0, -1, "4", True])
+    def test_invalid_pool_concurrency(self, value):
+        config = GlobalConfig(snapshots=SnapshotConfig(pool_concurrency=value))
+        result = validate(_minimal_infra(config=config))
+        assert not result.valid
+        assert "pool_concurrency" in str(result)
+
+    @pytest.mark.parametrize("key", ["keep_last", "keep_daily", "keep_weekly", "max_age_days"])
+    def test_invalid_retention(self, key):
+        config = GlobalConfig(snapshots=SnapshotConfig(retention=SnapshotRetention(**{key: -1})))
+        result = validate(_minimal_infra(config=config))
+        assert not result.valid
+        assert f"retention.{key}" in str(result)
+
+
 class TestDomainNameValidation:
     def test_uppercase_rejected(self):
         result = validate(
@@ -489,6 +548,22 @@ class TestPolicyValidation:
         assert not result.valid
         assert any("protocole" in str(e) for e in result.errors)
 
+    def _ports(self, ports):
+        return validate(
+            _minimal_infra(
+                policies=[Policy(description="T", from_target="pro", to_target="host", ports=ports)]
+            )
+        )
+
+    def test_port_range_valid(self):
+        assert self._ports([22, "8000-8100", "443-443"]).valid
+
+    @pytest.mark.parametrize("port", ["8100-8000", "0-80", "80-70000", "http", "80-", True, 70000])
+    def test_invalid_port_rejected(self, port):
+        result = self._ports([port])
+        assert not result.valid
+        assert "invalide" in str(result)
+
 
 class TestMultipleErrors:
     def test_errors_collected(self):